@@ -0,0 +1,35 @@
+"""assetmemory — AI-samenvatting en entiteiten per opname (incrementele JourneyMemory)
+
+Revision ID: 20261017_asset_memory
+Revises: 20261017_usb_package
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_asset_memory"
+down_revision = "20261017_usb_package"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "assetmemory",
+        sa.Column("media_asset_id", sa.String(), sa.ForeignKey("mediaasset.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("journey_id", sa.String(), sa.ForeignKey("journey.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("chapter_id", sa.String(32), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False, server_default=""),
+        sa.Column("people", sa.JSON(), nullable=False),
+        sa.Column("places", sa.JSON(), nullable=False),
+        sa.Column("events", sa.JSON(), nullable=False),
+        sa.Column("themes", sa.JSON(), nullable=False),
+        sa.Column("sentiment", sa.String(32), nullable=True),
+        sa.Column("built_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_assetmemory_journey_id", "assetmemory", ["journey_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_assetmemory_journey_id", table_name="assetmemory")
+    op.drop_table("assetmemory")
@@ -0,0 +1,49 @@
+"""blog_tag — genormaliseerde (post, tag)-paren met index, gevuld uit blogpost.tags
+
+Revision ID: 20261017_blog_tags
+Revises: 20261017_search_index
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_blog_tags"
+down_revision = "20261017_search_index"
+branch_labels = None
+depends_on = None
+
+
+def _parse_tags(raw):
+    # Zelfde normalisatie als app.db.blog_tags.parse_tags (hier bevroren)
+    tags = []
+    for part in (raw or "").split(","):
+        tag = "".join(part.lower().split())[:100]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blog_tag",
+        sa.Column("post_id", sa.String(length=36), nullable=False),
+        sa.Column("tag", sa.String(length=100), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["blogpost.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("post_id", "tag"),
+    )
+    op.create_index("ix_blog_tag_tag", "blog_tag", ["tag", "post_id"])
+
+    connection = op.get_bind()
+    rows = [
+        {"post_id": post_id, "tag": tag}
+        for post_id, tags in connection.execute(sa.text("SELECT id, tags FROM blogpost WHERE tags IS NOT NULL"))
+        for tag in _parse_tags(tags)
+    ]
+    if rows:
+        blog_tag = sa.table("blog_tag", sa.column("post_id", sa.String), sa.column("tag", sa.String))
+        op.bulk_insert(blog_tag, rows)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_blog_tag_tag", table_name="blog_tag")
+    op.drop_table("blog_tag")
@@ -0,0 +1,58 @@
+"""journey_chapter_stats — bijgehouden tellers per journey en hoofdstuk
+
+Revision ID: 20261017_chapter_stats
+Revises: 20261017_journey_version
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_chapter_stats"
+down_revision = "20261017_journey_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "journey_chapter_stats",
+        sa.Column("journey_id", sa.String(), nullable=False),
+        sa.Column("chapter_id", sa.String(32), nullable=False),
+        sa.Column("media_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ready_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("video_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("audio_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("text_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("duration_seconds", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_recorded_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["journey_id"], ["journey.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("journey_id", "chapter_id"),
+    )
+
+    # Backfill: één INSERT ... SELECT over de bestaande opnames
+    op.execute(
+        """
+        INSERT INTO journey_chapter_stats (
+            journey_id, chapter_id, media_count, ready_count, video_count, audio_count,
+            text_count, duration_seconds, last_recorded_at, updated_at
+        )
+        SELECT
+            journey_id,
+            chapter_id,
+            COUNT(*),
+            SUM(CASE WHEN storage_state IN ('ready', 'processing') THEN 1 ELSE 0 END),
+            SUM(CASE WHEN storage_state IN ('ready', 'processing') AND modality = 'video' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN storage_state IN ('ready', 'processing') AND modality = 'audio' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN storage_state IN ('ready', 'processing') AND modality = 'text' THEN 1 ELSE 0 END),
+            COALESCE(SUM(CASE WHEN storage_state IN ('ready', 'processing') THEN duration_seconds ELSE 0 END), 0),
+            MAX(CASE WHEN storage_state IN ('ready', 'processing') THEN recorded_at END),
+            CURRENT_TIMESTAMP
+        FROM mediaasset
+        GROUP BY journey_id, chapter_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("journey_chapter_stats")
@@ -0,0 +1,59 @@
+"""mediaasset.full_transcript — gematerialiseerde transcripttekst per opname
+
+Revision ID: 20261017_full_transcript
+Revises: 20261017_asset_memory
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_full_transcript"
+down_revision = "20261017_asset_memory"
+branch_labels = None
+depends_on = None
+
+_BATCH = 500
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("mediaasset") as batch_op:
+        batch_op.add_column(sa.Column("full_transcript", sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column("transcript_word_count", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("transcript_language", sa.String(8), nullable=True))
+        batch_op.add_column(sa.Column("transcript_version", sa.Integer(), nullable=False, server_default="0"))
+
+    # Backfill: segmenten per opname samenvoegen zoals de lezers dat voorheen deden
+    bind = op.get_bind()
+    asset_ids = [
+        row[0] for row in bind.execute(sa.text("SELECT DISTINCT media_asset_id FROM transcriptsegment"))
+    ]
+    update = sa.text(
+        "UPDATE mediaasset SET full_transcript = :text, transcript_word_count = :words, "
+        "transcript_language = 'nl', transcript_version = 1 WHERE id = :id"
+    )
+    for start in range(0, len(asset_ids), _BATCH):
+        batch = asset_ids[start:start + _BATCH]
+        texts: dict[str, list[str]] = {}
+        rows = bind.execute(
+            sa.text(
+                "SELECT media_asset_id, text FROM transcriptsegment "
+                "WHERE media_asset_id IN :ids ORDER BY media_asset_id, start_ms"
+            ).bindparams(sa.bindparam("ids", expanding=True)),
+            {"ids": batch},
+        )
+        for asset_id, text in rows:
+            texts.setdefault(asset_id, []).append(text)
+        params = []
+        for asset_id, parts in texts.items():
+            full = " ".join(parts).strip()
+            params.append({"id": asset_id, "text": full, "words": len(full.split())})
+        if params:
+            bind.execute(update, params)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("mediaasset") as batch_op:
+        batch_op.drop_column("transcript_version")
+        batch_op.drop_column("transcript_language")
+        batch_op.drop_column("transcript_word_count")
+        batch_op.drop_column("full_transcript")
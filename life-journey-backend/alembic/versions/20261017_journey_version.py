@@ -0,0 +1,23 @@
+"""journey.content_version — versie voor ETag/response-cache van het journey-detail
+
+Revision ID: 20261017_journey_version
+Revises: 20261017_full_transcript
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_journey_version"
+down_revision = "20261017_full_transcript"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("journey") as batch_op:
+        batch_op.add_column(sa.Column("content_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("journey") as batch_op:
+        batch_op.drop_column("content_version")
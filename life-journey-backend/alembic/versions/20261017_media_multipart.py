@@ -0,0 +1,25 @@
+"""mediaasset.upload_id/upload_part_size — lopende multipart-upload per opname
+
+Revision ID: 20261017_media_multipart
+Revises: 20261017_chapter_stats
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_media_multipart"
+down_revision = "20261017_chapter_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("mediaasset") as batch_op:
+        batch_op.add_column(sa.Column("upload_id", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("upload_part_size", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("mediaasset") as batch_op:
+        batch_op.drop_column("upload_part_size")
+        batch_op.drop_column("upload_id")
@@ -0,0 +1,31 @@
+"""mediapeaks — voorberekende golfvorm (audiowaveform .dat) per opname
+
+Revision ID: 20261017_media_peaks
+Revises: 20261017_media_renditions
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_media_peaks"
+down_revision = "20261017_media_renditions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "mediapeaks",
+        sa.Column("media_asset_id", sa.String(), nullable=False),
+        sa.Column("sample_rate", sa.Integer(), nullable=False),
+        sa.Column("samples_per_peak", sa.Integer(), nullable=False),
+        sa.Column("length", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["media_asset_id"], ["mediaasset.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("media_asset_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("mediapeaks")
@@ -0,0 +1,23 @@
+"""mediaasset.renditions — afspeelversies (AAC/Opus, preview, HLS) per opname
+
+Revision ID: 20261017_media_renditions
+Revises: 20261017_media_multipart
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_media_renditions"
+down_revision = "20261017_media_multipart"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("mediaasset") as batch_op:
+        batch_op.add_column(sa.Column("renditions", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("mediaasset") as batch_op:
+        batch_op.drop_column("renditions")
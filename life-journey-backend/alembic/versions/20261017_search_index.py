@@ -0,0 +1,117 @@
+"""searchdocument — full-text zoekindex over transcripties, tekst, memo's en quick thoughts
+
+Postgres: gegenereerde tsvector-kolom (Nederlandse configuratie) met GIN-index.
+SQLite: FTS5-tabel die via triggers gelijk loopt met searchdocument.
+Bestaande data wordt direct geïndexeerd.
+
+Revision ID: 20261017_search_index
+Revises: 20261017_media_peaks
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_search_index"
+down_revision = "20261017_media_peaks"
+branch_labels = None
+depends_on = None
+
+
+_POSTGRES_DDL = (
+    """
+    ALTER TABLE searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+      setweight(to_tsvector('dutch', coalesce(title, '')), 'A') || setweight(to_tsvector('dutch', body), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX ix_searchdocument_vector ON searchdocument USING gin (search_vector)",
+)
+
+_SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE searchdocument_fts USING fts5(
+      title, body, content='searchdocument', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER searchdocument_ai AFTER INSERT ON searchdocument BEGIN
+      INSERT INTO searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER searchdocument_ad AFTER DELETE ON searchdocument BEGIN
+      INSERT INTO searchdocument_fts(searchdocument_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER searchdocument_au AFTER UPDATE ON searchdocument BEGIN
+      INSERT INTO searchdocument_fts(searchdocument_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+      INSERT INTO searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+)
+
+_COLUMNS = "journey_id, kind, source_id, media_asset_id, chapter_id, start_ms, title, body, updated_at"
+
+_BACKFILL = (
+    f"""
+    INSERT INTO searchdocument ({_COLUMNS})
+    SELECT m.journey_id, 'transcript', s.id, s.media_asset_id, m.chapter_id, s.start_ms, NULL, s.text, CURRENT_TIMESTAMP
+    FROM transcriptsegment s JOIN mediaasset m ON m.id = s.media_asset_id
+    WHERE trim(s.text) <> ''
+    """,
+    f"""
+    INSERT INTO searchdocument ({_COLUMNS})
+    SELECT journey_id, 'text', id, id, chapter_id, NULL, NULL, text_content, CURRENT_TIMESTAMP
+    FROM mediaasset
+    WHERE modality = 'text' AND is_current AND text_content IS NOT NULL AND trim(text_content) <> ''
+    """,
+    f"""
+    INSERT INTO searchdocument ({_COLUMNS})
+    SELECT journey_id, 'memo', id, NULL, chapter_id, NULL, title, content, CURRENT_TIMESTAMP
+    FROM memo
+    WHERE trim(content) <> '' OR trim(title) <> ''
+    """,
+    f"""
+    INSERT INTO searchdocument ({_COLUMNS})
+    SELECT journey_id, 'quick_thought', id, NULL, chapter_id, NULL, title, transcript, CURRENT_TIMESTAMP
+    FROM quickthought
+    WHERE archived_at IS NULL AND transcript IS NOT NULL AND trim(transcript) <> ''
+    """,
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "searchdocument",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("journey_id", sa.String(), nullable=False),
+        sa.Column("kind", sa.String(16), nullable=False),
+        sa.Column("source_id", sa.String(), nullable=False),
+        sa.Column("media_asset_id", sa.String(), nullable=True),
+        sa.Column("chapter_id", sa.String(32), nullable=True),
+        sa.Column("start_ms", sa.Integer(), nullable=True),
+        sa.Column("title", sa.String(200), nullable=True),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["journey_id"], ["journey.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["media_asset_id"], ["mediaasset.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_searchdocument_journey_id", "searchdocument", ["journey_id"], unique=False)
+    op.create_index("ix_searchdocument_media_asset_id", "searchdocument", ["media_asset_id"], unique=False)
+    op.create_index("ix_searchdocument_source", "searchdocument", ["kind", "source_id"], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    for statement in _POSTGRES_DDL if dialect == "postgresql" else _SQLITE_DDL if dialect == "sqlite" else ():
+        op.execute(statement)
+    for statement in _BACKFILL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS searchdocument_fts")
+    op.drop_index("ix_searchdocument_source", table_name="searchdocument")
+    op.drop_index("ix_searchdocument_media_asset_id", table_name="searchdocument")
+    op.drop_index("ix_searchdocument_journey_id", table_name="searchdocument")
+    op.drop_table("searchdocument")
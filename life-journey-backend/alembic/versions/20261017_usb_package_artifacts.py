@@ -0,0 +1,29 @@
+"""vooraf gebouwde USB-pakketten op order (status, voortgang, content-hash, object_key)
+
+Revision ID: 20261017_usb_package
+Revises: 20260717_text_content
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_usb_package"
+down_revision = "20260717_text_content"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("order", sa.Column("usb_package_status", sa.String(16), nullable=True))
+    op.add_column("order", sa.Column("usb_package_progress", sa.Integer(), nullable=True))
+    op.add_column("order", sa.Column("usb_package_hash", sa.String(64), nullable=True))
+    op.add_column("order", sa.Column("usb_package_key", sa.String(512), nullable=True))
+    op.add_column("order", sa.Column("usb_package_built_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("order", "usb_package_built_at")
+    op.drop_column("order", "usb_package_key")
+    op.drop_column("order", "usb_package_hash")
+    op.drop_column("order", "usb_package_progress")
+    op.drop_column("order", "usb_package_status")
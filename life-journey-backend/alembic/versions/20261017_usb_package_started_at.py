@@ -0,0 +1,21 @@
+"""order.usb_package_started_at — verweesde USB-builds (queued/building) herkennen
+
+Revision ID: 20261017_usb_started_at
+Revises: 20261017_blog_tags
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_usb_started_at"
+down_revision = "20261017_blog_tags"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("order", sa.Column("usb_package_started_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("order", "usb_package_started_at")
@@ -31,6 +31,7 @@ from app.api.v1.routes import (
     backup,
     baby,
     publish,
+    search,
 )
 
 
@@ -45,6 +46,7 @@ api_router.include_router(assistant.router, prefix="/assistant", tags=["assistan
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(chapters.router, prefix="/chapters", tags=["chapters"])
 api_router.include_router(memos.router, prefix="/memos", tags=["memos"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
 api_router.include_router(timeline.router, prefix="/timeline", tags=["timeline"])
 api_router.include_router(family.router, prefix="/family", tags=["family"])
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, get_db
@@ -37,6 +37,7 @@ from app.services.ai.conversation import (
     add_response_to_conversation,
     end_conversation_session,
 )
+from app.services.ai.conversation_store import ConversationStoreUnavailable
 from app.models.user import User
 from app.services.journey_progress import get_previous_chapters_summary
 from loguru import logger
@@ -44,6 +45,9 @@ from loguru import logger
 
 router = APIRouter()
 
+# Session store (Redis) unreadable: never continue from a possibly stale record
+_STORE_UNAVAILABLE = "Je gesprek is even niet bereikbaar. Probeer het zo opnieuw."
+
 
 @router.post("/prompt", response_model=AssistantPromptResponse, summary="Generate interview prompt")
 @limiter.limit(RateLimits.AI_PROMPT)
@@ -297,16 +301,19 @@ def continue_conversation(
   """
   from app.services.ai.conversation import _get_or_load_conversation
 
-  next_question = add_response_to_conversation(
-    db=db,
-    session_id=payload.session_id,
-    response_text=payload.response_text,
-  )
+  try:
+    next_question = add_response_to_conversation(
+      db=db,
+      session_id=payload.session_id,
+      response_text=payload.response_text,
+    )
 
-  conversation_complete = next_question is None
+    # Get turn number and story depth from the (possibly restored) session
+    conversation = _get_or_load_conversation(db, payload.session_id)
+  except ConversationStoreUnavailable:
+    raise HTTPException(status_code=503, detail=_STORE_UNAVAILABLE)
 
-  # Get turn number and story depth from the (possibly restored) session
-  conversation = _get_or_load_conversation(db, payload.session_id)
+  conversation_complete = next_question is None
   turn_number = len(conversation.turns) if conversation else 0
   story_depth = None
   if conversation and conversation.turns and conversation.turns[-1].analysis:
@@ -338,7 +345,10 @@ def end_conversation(
   - Key themes discovered
   - People mentioned
   """
-  summary = end_conversation_session(db=db, session_id=payload.session_id)
+  try:
+    summary = end_conversation_session(db=db, session_id=payload.session_id)
+  except ConversationStoreUnavailable:
+    raise HTTPException(status_code=503, detail=_STORE_UNAVAILABLE)
 
   return EndConversationResponse(
     total_turns=summary.get("total_turns", 0),
@@ -13,21 +13,22 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from typing import Any, Literal
 
-import boto3
 from botocore.exceptions import BotoCoreError
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 from loguru import logger
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
 from app.api.deps import get_current_user, get_db
 from app.core.config import settings
 from app.core.rate_limiter import limiter
 from app.models.journey import Journey
-from app.models.media import MediaAsset, TranscriptSegment
+from app.models.media import MediaAsset
 from app.models.memo import Memo
 from app.models.user import User
 from app.services.export.pdf_generator import generate_pdf_bytes, generate_pdf_html
+from app.services.media.storage import get_s3_client, s3_configured
+from app.services.media.transcripts import texts_for_assets
 
 router = APIRouter()
 
@@ -113,17 +114,6 @@ _CHAPTER_NAMES: dict[str, str] = {
 
 # ─── S3 helpers ───────────────────────────────────────────────────────────────
 
-def _s3() -> Any:
-    endpoint = settings.s3_endpoint_url or f"https://s3.{settings.s3_region}.amazonaws.com"
-    return boto3.client(
-        "s3",
-        region_name=settings.s3_region,
-        endpoint_url=endpoint,
-        aws_access_key_id=settings.aws_access_key_id,
-        aws_secret_access_key=settings.aws_secret_access_key,
-    )
-
-
 def _download_one(s3: Any, key: str) -> bytes | None:
     try:
         return s3.get_object(Bucket=settings.s3_bucket, Key=key)["Body"].read()
@@ -168,6 +158,7 @@ def _build_quick_zip(journey: Journey, user: User, db: Session) -> io.BytesIO:
 
     assets = (
         db.query(MediaAsset)
+        .options(undefer(MediaAsset.full_transcript))
         .filter(
             MediaAsset.journey_id == journey.id,
             MediaAsset.modality == "audio",
@@ -177,17 +168,7 @@ def _build_quick_zip(journey: Journey, user: User, db: Session) -> io.BytesIO:
         .all()
     )
 
-    asset_ids = [a.id for a in assets]
-    all_segs: list[TranscriptSegment] = (
-        db.query(TranscriptSegment)
-        .filter(TranscriptSegment.media_asset_id.in_(asset_ids))
-        .order_by(TranscriptSegment.start_ms)
-        .all()
-        if asset_ids else []
-    )
-    segs_by_asset: dict[str, list[TranscriptSegment]] = {}
-    for seg in all_segs:
-        segs_by_asset.setdefault(seg.media_asset_id, []).append(seg)
+    transcript_texts = texts_for_assets(db, assets)
 
     memos = (
         db.query(Memo)
@@ -196,7 +177,7 @@ def _build_quick_zip(journey: Journey, user: User, db: Session) -> io.BytesIO:
         .all()
     )
 
-    s3 = _s3() if settings.s3_bucket and settings.aws_access_key_id else None
+    s3 = get_s3_client() if s3_configured() else None
     downloaded = _download_parallel(s3, assets) if s3 else {}
 
     buf = io.BytesIO()
@@ -232,8 +213,7 @@ def _build_quick_zip(journey: Journey, user: User, db: Session) -> io.BytesIO:
                 zf.writestr(f"01_Verhalen/{phase}/{base}.{ext}", audio_data)
 
             # Transcriptie als .txt naast het audiobestand
-            segs = sorted(segs_by_asset.get(asset.id, []), key=lambda s: s.start_ms)
-            transcript = " ".join(s.text for s in segs).strip()
+            transcript = transcript_texts.get(asset.id, "")
             if transcript:
                 txt = (
                     f"{display}\n"
@@ -287,7 +267,7 @@ def _build_full_zip(journey: Journey, user: User, db: Session) -> io.BytesIO:
         .all()
     )
 
-    s3 = _s3() if settings.s3_bucket and settings.aws_access_key_id else None
+    s3 = get_s3_client() if s3_configured() else None
     downloaded = _usb_dl(s3, assets) if s3 else {}
 
     chapters_by_phase: dict[str, list[dict]] = {}
@@ -12,9 +12,14 @@ Endpoints:
 - DELETE /blog/{id}             → Post verwijderen
 - POST   /blog/{id}/publish     → Publiceer + ping zoekmachines
 - POST   /blog/{id}/unpublish   → Zet terug naar concept
+
+Publieke endpoints (/blog/public/...) sturen Cache-Control en een ETag (losse
+posts ook Last-Modified) zodat een CDN ze kan serveren; wijzigingen aan
+gepubliceerde posts purgen die caches (app/services/blog_purge.py).
 """
 import asyncio
 import json
+import re
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Optional
@@ -70,16 +75,16 @@ except ImportError:
     def _sanitize_html(html: str | None) -> str | None:  # type: ignore[misc]
         return html
 
-import boto3
-from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, Response, UploadFile
 from fastapi.responses import FileResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from loguru import logger
 from openai import AsyncOpenAI
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_admin_user, get_db
 from app.core.config import settings
+from app.core.http_cache import http_date, not_modified
 from app.core.rate_limiter import RateLimits, limiter
 from app.models.blog_post import BlogPost
 from app.models.user import User
@@ -96,7 +101,11 @@ from app.schemas.blog_post import (
     SeoOptimizeRequest,
     SeoOptimizeResponse,
 )
+from app.services.blog_listings import build_listing, invalidate_listings, list_query, published_listing
+from app.services.blog_purge import purge_public_caches
+from app.services.blog_views import flush_pending_views, most_read, record_view
 from app.services.indexing import ping_google_indexing_api, ping_index_now
+from app.services.media.storage import get_s3_client, s3_configured
 
 router = APIRouter()
 
@@ -156,6 +165,9 @@ def _repair_truncated_json(raw: str) -> str:
 
     return raw
 
+# Zelfde vorm als BlogPostCreate.slug
+_SLUG_RE = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+
 _ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
 _MAX_IMAGE_BYTES = 5 * 1024 * 1024  # 5 MB
 
@@ -175,6 +187,44 @@ _ALLOWED_AUDIO_TYPES = {
 _MAX_AUDIO_BYTES = 150 * 1024 * 1024  # 150 MB
 
 
+def _store_blog_upload(
+    content: bytes,
+    filename: str,
+    content_type: str,
+    *,
+    object_prefix: str,
+    local_dir: str,
+    url_path: str,
+    kind: str,
+) -> str:
+    """
+    Sla een blog-upload op in S3 (indien geconfigureerd) of lokaal en geef de publieke URL terug.
+
+    Blocking (S3/disk): vanuit een async route via `run_in_threadpool` aanroepen.
+    """
+    if s3_configured():
+        try:
+            object_key = f"{object_prefix}/{filename}"
+            get_s3_client().put_object(
+                Bucket=settings.s3_bucket,
+                Key=object_key,
+                Body=content,
+                ContentType=content_type,
+            )
+            if settings.s3_public_url:
+                return f"{settings.s3_public_url.rstrip('/')}/{object_key}"
+            if settings.s3_endpoint_url:
+                return f"{settings.s3_endpoint_url.rstrip('/')}/{settings.s3_bucket}/{object_key}"
+            return f"https://{settings.s3_bucket}.s3.{settings.s3_region}.amazonaws.com/{object_key}"
+        except Exception as exc:
+            logger.warning(f"S3 {kind} upload mislukt, lokale opslag: {exc}")
+
+    target_dir = Path(local_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    (target_dir / filename).write_bytes(content)
+    return f"{settings.api_base_url.rstrip('/')}{settings.api_v1_prefix}/blog/{url_path}/{filename}"
+
+
 def _get_post_or_404(db: Session, post_id: str) -> BlogPost:
     post = db.query(BlogPost).filter(BlogPost.id == post_id).first()
     if not post:
@@ -187,7 +237,7 @@ def _get_post_or_404(db: Session, post_id: str) -> BlogPost:
 # ---------------------------------------------------------------------------
 
 @router.get("", response_model=List[BlogPostListItem])
-async def list_blog_posts(
+def list_blog_posts(
     status: Optional[str] = Query(None),
     section: Optional[str] = Query(None),
     limit: int = Query(50, le=200),
@@ -195,7 +245,7 @@ async def list_blog_posts(
     admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db),
 ):
-    q = db.query(BlogPost)
+    q = list_query(db)
     if status:
         q = q.filter(BlogPost.status == status)
     if section:
@@ -204,7 +254,7 @@ async def list_blog_posts(
 
 
 @router.post("", response_model=BlogPostResponse, status_code=201)
-async def create_blog_post(
+def create_blog_post(
     payload: BlogPostCreate,
     admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db),
@@ -216,6 +266,7 @@ async def create_blog_post(
     post = BlogPost(id=str(uuid4()), author_id=admin.id, **data)
     db.add(post)
     db.commit()
+    invalidate_listings()
     db.refresh(post)
     return post
 
@@ -508,46 +559,15 @@ async def upload_blog_image(
         raise HTTPException(400, detail="Afbeelding mag maximaal 5 MB zijn")
 
     ext = Path(file.filename or "image.jpg").suffix.lower() or ".jpg"
-    filename = f"{uuid4()}{ext}"
-
-    # S3 als geconfigureerd
-    if settings.s3_bucket and settings.aws_access_key_id:
-        try:
-            s3 = boto3.client(
-                "s3",
-                region_name=settings.s3_region,
-                aws_access_key_id=settings.aws_access_key_id,
-                aws_secret_access_key=settings.aws_secret_access_key,
-                **({"endpoint_url": settings.s3_endpoint_url} if settings.s3_endpoint_url else {}),
-            )
-            object_key = f"blog/{filename}"
-            s3.put_object(
-                Bucket=settings.s3_bucket,
-                Key=object_key,
-                Body=content,
-                ContentType=file.content_type or "image/jpeg",
-            )
-            if settings.s3_public_url:
-                url = f"{settings.s3_public_url.rstrip('/')}/{object_key}"
-            elif settings.s3_endpoint_url:
-                url = f"{settings.s3_endpoint_url.rstrip('/')}/{settings.s3_bucket}/{object_key}"
-            else:
-                url = f"https://{settings.s3_bucket}.s3.{settings.s3_region}.amazonaws.com/{object_key}"
-            return ImageUploadResponse(url=url)
-        except Exception as exc:
-            logger.warning(f"S3 upload mislukt, lokale opslag: {exc}")
-
-    # Lokale opslag als fallback
-    blog_dir = Path("media_storage/blog")
-    blog_dir.mkdir(parents=True, exist_ok=True)
-    (blog_dir / filename).write_bytes(content)
-
-    url = f"{settings.api_base_url.rstrip('/')}{settings.api_v1_prefix}/blog/images/{filename}"
+    url = await run_in_threadpool(
+        _store_blog_upload, content, f"{uuid4()}{ext}", file.content_type or "image/jpeg",
+        object_prefix="blog", local_dir="media_storage/blog", url_path="images", kind="afbeelding",
+    )
     return ImageUploadResponse(url=url)
 
 
 @router.get("/images/{filename}")
-async def serve_blog_image(filename: str):
+def serve_blog_image(filename: str):
     """Serveert lokaal opgeslagen blog-afbeeldingen (development)."""
     if "/" in filename or "\\" in filename or ".." in filename:
         raise HTTPException(400, detail="Ongeldig bestandspad")
@@ -575,44 +595,15 @@ async def upload_blog_video(
         raise HTTPException(400, detail="Video mag maximaal 200 MB zijn")
 
     ext = Path(file.filename or "video.mp4").suffix.lower() or ".mp4"
-    filename = f"{uuid4()}{ext}"
-
-    if settings.s3_bucket and settings.aws_access_key_id:
-        try:
-            s3 = boto3.client(
-                "s3",
-                region_name=settings.s3_region,
-                aws_access_key_id=settings.aws_access_key_id,
-                aws_secret_access_key=settings.aws_secret_access_key,
-                **({"endpoint_url": settings.s3_endpoint_url} if settings.s3_endpoint_url else {}),
-            )
-            object_key = f"blog/videos/{filename}"
-            s3.put_object(
-                Bucket=settings.s3_bucket,
-                Key=object_key,
-                Body=content,
-                ContentType=file.content_type or "video/mp4",
-            )
-            if settings.s3_public_url:
-                url = f"{settings.s3_public_url.rstrip('/')}/{object_key}"
-            elif settings.s3_endpoint_url:
-                url = f"{settings.s3_endpoint_url.rstrip('/')}/{settings.s3_bucket}/{object_key}"
-            else:
-                url = f"https://{settings.s3_bucket}.s3.{settings.s3_region}.amazonaws.com/{object_key}"
-            return ImageUploadResponse(url=url)
-        except Exception as exc:
-            logger.warning(f"S3 video upload mislukt, lokale opslag: {exc}")
-
-    video_dir = Path("media_storage/blog/videos")
-    video_dir.mkdir(parents=True, exist_ok=True)
-    (video_dir / filename).write_bytes(content)
-
-    url = f"{settings.api_base_url.rstrip('/')}{settings.api_v1_prefix}/blog/videos/{filename}"
+    url = await run_in_threadpool(
+        _store_blog_upload, content, f"{uuid4()}{ext}", file.content_type or "video/mp4",
+        object_prefix="blog/videos", local_dir="media_storage/blog/videos", url_path="videos", kind="video",
+    )
     return ImageUploadResponse(url=url)
 
 
 @router.get("/videos/{filename}")
-async def serve_blog_video(filename: str):
+def serve_blog_video(filename: str):
     """Serveert lokaal opgeslagen blog-video's (development)."""
     if "/" in filename or "\\" in filename or ".." in filename:
         raise HTTPException(400, detail="Ongeldig bestandspad")
@@ -647,44 +638,15 @@ async def upload_blog_audio(
         raise HTTPException(400, detail="Audio mag maximaal 150 MB zijn")
 
     ext = Path(file.filename or "audio.m4a").suffix.lower() or ".m4a"
-    filename = f"{uuid4()}{ext}"
-
-    if settings.s3_bucket and settings.aws_access_key_id:
-        try:
-            s3 = boto3.client(
-                "s3",
-                region_name=settings.s3_region,
-                aws_access_key_id=settings.aws_access_key_id,
-                aws_secret_access_key=settings.aws_secret_access_key,
-                **({"endpoint_url": settings.s3_endpoint_url} if settings.s3_endpoint_url else {}),
-            )
-            object_key = f"blog/audio/{filename}"
-            s3.put_object(
-                Bucket=settings.s3_bucket,
-                Key=object_key,
-                Body=content,
-                ContentType=file.content_type or "audio/mp4",
-            )
-            if settings.s3_public_url:
-                url = f"{settings.s3_public_url.rstrip('/')}/{object_key}"
-            elif settings.s3_endpoint_url:
-                url = f"{settings.s3_endpoint_url.rstrip('/')}/{settings.s3_bucket}/{object_key}"
-            else:
-                url = f"https://{settings.s3_bucket}.s3.{settings.s3_region}.amazonaws.com/{object_key}"
-            return AudioUploadResponse(url=url)
-        except Exception as exc:
-            logger.warning(f"S3 audio upload mislukt, lokale opslag: {exc}")
-
-    audio_dir = Path("media_storage/blog/audio")
-    audio_dir.mkdir(parents=True, exist_ok=True)
-    (audio_dir / filename).write_bytes(content)
-
-    url = f"{settings.api_base_url.rstrip('/')}{settings.api_v1_prefix}/blog/audio/{filename}"
+    url = await run_in_threadpool(
+        _store_blog_upload, content, f"{uuid4()}{ext}", file.content_type or "audio/mp4",
+        object_prefix="blog/audio", local_dir="media_storage/blog/audio", url_path="audio", kind="audio",
+    )
     return AudioUploadResponse(url=url)
 
 
 @router.get("/audio/{filename}")
-async def serve_blog_audio(filename: str):
+def serve_blog_audio(filename: str):
     """Serveert lokaal opgeslagen podcast-audio (development)."""
     if "/" in filename or "\\" in filename or ".." in filename:
         raise HTTPException(400, detail="Ongeldig bestandspad")
@@ -699,7 +661,7 @@ async def serve_blog_audio(filename: str):
 
 
 @router.get("/{post_id}", response_model=BlogPostResponse)
-async def get_blog_post(
+def get_blog_post(
     post_id: str,
     admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db),
@@ -708,13 +670,15 @@ async def get_blog_post(
 
 
 @router.patch("/{post_id}", response_model=BlogPostResponse)
-async def update_blog_post(
+def update_blog_post(
     post_id: str,
     payload: BlogPostUpdate,
+    background_tasks: BackgroundTasks,
     admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db),
 ):
     post = _get_post_or_404(db, post_id)
+    old_slug = post.slug
     if payload.slug and payload.slug != post.slug:
         if db.query(BlogPost).filter(
             BlogPost.slug == payload.slug, BlogPost.id != post_id
@@ -725,28 +689,30 @@ async def update_blog_post(
             value = _sanitize_html(value)
         setattr(post, field, value)
     db.commit()
+    invalidate_listings()
     db.refresh(post)
+    if post.status == "published":
+        background_tasks.add_task(purge_public_caches, post.slug, post.section, old_slug=old_slug)
     return post
 
 
 @router.delete("/{post_id}", status_code=204)
-async def delete_blog_post(
+def delete_blog_post(
     post_id: str,
+    background_tasks: BackgroundTasks,
     admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db),
 ):
     post = _get_post_or_404(db, post_id)
+    was_published, slug, section = post.status == "published", post.slug, post.section
     db.delete(post)
     db.commit()
+    invalidate_listings()
+    if was_published:
+        background_tasks.add_task(purge_public_caches, slug, section)
 
 
-@router.post("/{post_id}/publish", response_model=BlogPostResponse)
-async def publish_blog_post(
-    post_id: str,
-    admin: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
-):
-    """Publiceer een post en ping IndexNow + Google. Fout in indexering stopt publicatie NIET."""
+def _mark_published(db: Session, post_id: str) -> BlogPost:
     post = _get_post_or_404(db, post_id)
     if post.status == "published":
         raise HTTPException(status_code=409, detail="Post is al gepubliceerd")
@@ -755,13 +721,26 @@ async def publish_blog_post(
     if not post.published_at:
         post.published_at = datetime.now(timezone.utc)
     db.commit()
+    invalidate_listings()
     db.refresh(post)
+    return post
+
+
+@router.post("/{post_id}/publish", response_model=BlogPostResponse)
+async def publish_blog_post(
+    post_id: str,
+    admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db),
+):
+    """Publiceer een post en ping IndexNow + Google. Fout in indexering stopt publicatie NIET."""
+    post = await run_in_threadpool(_mark_published, db, post_id)
 
     section_path = "kennisbank" if post.section == "knowledge" else "blog"
     full_url = f"{settings.site_url}/{section_path}/{post.slug}"
     await asyncio.gather(
         ping_index_now([full_url]),
         ping_google_indexing_api(full_url),
+        purge_public_caches(post.slug, post.section),
         return_exceptions=True,
     )
     logger.info(f"Gepubliceerd: {post.slug} ({post.section})")
@@ -769,8 +748,9 @@ async def publish_blog_post(
 
 
 @router.post("/{post_id}/unpublish", response_model=BlogPostResponse)
-async def unpublish_blog_post(
+def unpublish_blog_post(
     post_id: str,
+    background_tasks: BackgroundTasks,
     admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db),
 ):
@@ -778,7 +758,9 @@ async def unpublish_blog_post(
     post.status = "draft"
     post.published_at = None
     db.commit()
+    invalidate_listings()
     db.refresh(post)
+    background_tasks.add_task(purge_public_caches, post.slug, post.section)
     return post
 
 
@@ -786,9 +768,24 @@ async def unpublish_blog_post(
 # Publieke endpoints (geen authenticatie vereist)
 # ---------------------------------------------------------------------------
 
+# Een CDN mag deze antwoorden bewaren; publiceren/bewerken purget ze. Lijsten
+# korter, omdat tag- en paginavarianten alleen via hun s-maxage verlopen.
+_LIST_CACHE_CONTROL = "public, max-age=60, s-maxage=300, stale-while-revalidate=600"
+_POST_CACHE_CONTROL = "public, max-age=300, s-maxage=3600, stale-while-revalidate=86400"
+
+
+def _public_json(request: Request, body: bytes, etag: str, last_modified, cache_control: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if not_modified(request.headers, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/public/list", response_model=List[BlogPostListItem])
 @limiter.limit(RateLimits.READ_STANDARD)
-async def list_public_posts(
+def list_public_posts(
     request: Request,
     section: Optional[str] = Query(None),
     tag: Optional[str] = Query(None),
@@ -796,71 +793,75 @@ async def list_public_posts(
     offset: int = Query(0, ge=0),
     db: Session = Depends(get_db),
 ):
-    """Geeft gepubliceerde artikelen terug — geen authenticatie vereist."""
-    q = db.query(BlogPost).filter(BlogPost.status == "published")
-    if section:
-        q = q.filter(BlogPost.section == section)
-    if tag:
-        # Tags zijn kommagescheiden opgeslagen, bijv. "vaderdag,cadeau,familie".
-        # Exact op token matchen — voorkomt dat "va" ook "vaderdag" raakt.
-        # We normaliseren spaties rond komma's zodat " tag " ook matcht.
-        normalized = tag.strip().lower()
-        pattern = f"%,{normalized},%"
-        wrapped = func.replace(func.lower(BlogPost.tags), " ", "")
-        q = q.filter(("," + wrapped + ",").like(pattern))
-    return q.order_by(BlogPost.published_at.desc()).offset(offset).limit(limit).all()
+    """
+    Geeft gepubliceerde artikelen terug — geen authenticatie vereist.
+
+    Tags matchen exact op token via `blog_tag` ("va" raakt geen "vaderdag"),
+    ongeacht hoofdletters en spaties. Lijsten komen uit de lijstcache.
+    """
+    listing = published_listing(db, section=section, tag=tag or None, limit=limit, offset=offset)
+    return _public_json(request, listing.body, listing.etag, None, _LIST_CACHE_CONTROL)
 
 
 @router.get("/public/most-read", response_model=List[BlogPostListItem])
 @limiter.limit(RateLimits.READ_STANDARD)
-async def get_most_read_posts(
+def get_most_read_posts(
     request: Request,
     section: Optional[str] = Query(None),
     limit: int = Query(5, le=20),
     db: Session = Depends(get_db),
 ):
     """Meest gelezen gepubliceerde artikelen — gesorteerd op view_count, dan published_at."""
-    q = db.query(BlogPost).filter(BlogPost.status == "published")
-    if section:
-        q = q.filter(BlogPost.section == section)
-    return (
-        q.order_by(BlogPost.view_count.desc(), BlogPost.published_at.desc())
-        .limit(limit)
-        .all()
-    )
+    listing = build_listing(most_read(db, section=section, limit=limit))
+    return _public_json(request, listing.body, listing.etag, None, _LIST_CACHE_CONTROL)
 
 
 @router.post("/public/{slug}/view", status_code=204)
 @limiter.limit(RateLimits.WRITE_STANDARD)
-async def increment_view_count(
+def increment_view_count(
     request: Request,
     slug: str,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
 ):
-    """Verhoog het aantal weergaven van een gepubliceerd artikel."""
-    post = (
-        db.query(BlogPost)
-        .filter(BlogPost.slug == slug, BlogPost.status == "published")
-        .first()
-    )
-    if post:
-        post.view_count = (post.view_count or 0) + 1
-        db.commit()
+    """
+    Verhoog het aantal weergaven van een gepubliceerd artikel.
+
+    Gebufferd (app/services/blog_views.py): de weergave wordt opgeteld en
+    periodiek met één UPDATE per slug weggeschreven. Onbekende of
+    ongepubliceerde slugs vallen bij die UPDATE vanzelf af.
+    """
+    if not _SLUG_RE.match(slug):
+        return
+    if record_view(slug):
+        background_tasks.add_task(flush_pending_views)
 
 
 @router.get("/public/slug/{slug}", response_model=BlogPostResponse)
 @limiter.limit(RateLimits.READ_STANDARD)
-async def get_public_post_by_slug(
+def get_public_post_by_slug(
     request: Request,
     slug: str,
     db: Session = Depends(get_db),
 ):
-    """Geeft één gepubliceerd artikel op basis van slug — geen authenticatie vereist."""
-    post = (
-        db.query(BlogPost)
+    """
+    Geeft één gepubliceerd artikel op basis van slug — geen authenticatie vereist.
+
+    ETag en Last-Modified volgen `updated_at`; een revalidatie zonder wijziging
+    kost één kleine query en laadt de content niet. `view_count` in de body kan
+    daardoor achterlopen tot de volgende wijziging van het artikel.
+    """
+    meta = (
+        db.query(BlogPost.id, BlogPost.updated_at, BlogPost.published_at, BlogPost.created_at)
         .filter(BlogPost.slug == slug, BlogPost.status == "published")
         .first()
     )
-    if not post:
+    if not meta:
         raise HTTPException(status_code=404, detail="Artikel niet gevonden")
-    return post
+
+    last_modified = meta.updated_at or meta.published_at or meta.created_at
+    etag = f'W/"post-{meta.id}-{last_modified:%Y%m%d%H%M%S%f}"'
+    if not_modified(request.headers, etag, last_modified):
+        return _public_json(request, b"", etag, last_modified, _POST_CACHE_CONTROL)
+    post = db.query(BlogPost).filter(BlogPost.id == meta.id).one()
+    body = BlogPostResponse.model_validate(post).model_dump_json().encode("utf-8")
+    return _public_json(request, body, etag, last_modified, _POST_CACHE_CONTROL)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
 from app.core.rate_limiter import limiter, RateLimits
+from app.db.journey_version import bump_journey_version
 from app.db.session import get_db
 from app.models.journey import Journey
 from app.models.preferences import ChapterPreference
@@ -61,6 +62,7 @@ def update_chapter_state(
       for chapter in payload.active_chapters
     ]
   )
+  bump_journey_version(db, journey_id)
   db.commit()
 
   if payload.active_chapters:
@@ -1,8 +1,9 @@
 """Helpdesk AI chat route — werkt voor gasten en ingelogde gebruikers."""
 
 from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
 
-from app.api.deps import get_optional_user
+from app.api.deps import get_db, get_optional_user
 from app.core.rate_limiter import limiter
 from app.models.user import User
 from app.schemas.helpdesk import HelpdeskChatRequest, HelpdeskChatResponse, HelpdeskActionLink
@@ -13,10 +14,11 @@ router = APIRouter()
 
 @router.post("/chat", response_model=HelpdeskChatResponse)
 @limiter.limit("20/minute")
-async def helpdesk_chat(
+def helpdesk_chat(
     request: Request,
     payload: HelpdeskChatRequest,
     current_user: User | None = Depends(get_optional_user),
+    db: Session = Depends(get_db),
 ):
     """
     Verwerk een helpdesk-vraag via AI.
@@ -33,6 +35,7 @@ async def helpdesk_chat(
         user_message=payload.message,
         conversation_history=history,
         user_name=user_name,
+        db=db,
     )
 
     return HelpdeskChatResponse(
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+import threading
+from collections import OrderedDict
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session, selectinload, joinedload
 from pydantic import BaseModel
 
+from app.core.config import settings
+from app.core.http_cache import etag_matches
 from app.core.rate_limiter import limiter, RateLimits
+from app.db.journey_version import bump_journey_version
 from app.db.session import get_db
 from app.models.journey import Journey as JourneyModel
 from app.models.media import MediaAsset as MediaAssetModel, TranscriptSegment as TranscriptSegmentModel
@@ -13,6 +19,7 @@ from app.schemas.media import MediaAsset as MediaAssetSchema
 from app.schemas.user import UserProfile as UserProfileSchema, AccessibilitySettings, DeadlineEntry
 from app.api.deps import get_current_user
 from app.models.user import User
+from app.services.media.alignment import alignment_for
 from app.services.journey_progress import get_all_chapter_statuses, get_next_available_chapter, CHAPTER_ORDER
 from app.services.email.events import trigger_chapter_complete_email
 
@@ -45,6 +52,7 @@ def activate_chapters(
   db.query(ChapterPreferenceModel).filter(
     ChapterPreferenceModel.journey_id == journey_id
   ).delete()
+  bump_journey_version(db, journey_id)
 
   # Create new chapter preferences
   for chapter_id in payload.chapter_ids:
@@ -60,6 +68,35 @@ def activate_chapters(
   return [chapter_id.value for chapter_id in payload.chapter_ids]
 
 
+# Geserialiseerde JourneyDetail per journey: journey_id -> (content_version, JSON-bytes).
+# Per proces; de versie in de sleutel maakt een verouderde entry onbruikbaar.
+_detail_cache: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+_detail_cache_lock = threading.Lock()
+
+
+def _detail_etag(journey_id: str, version: int) -> str:
+  return f'W/"{journey_id}-{version}"'
+
+
+def _cached_detail(journey_id: str, version: int) -> bytes | None:
+  with _detail_cache_lock:
+    hit = _detail_cache.get(journey_id)
+    if hit is None or hit[0] != version:
+      return None
+    _detail_cache.move_to_end(journey_id)
+    return hit[1]
+
+
+def _store_detail(journey_id: str, version: int, body: bytes) -> None:
+  if settings.journey_detail_cache_size <= 0:
+    return
+  with _detail_cache_lock:
+    _detail_cache[journey_id] = (version, body)
+    _detail_cache.move_to_end(journey_id)
+    while len(_detail_cache) > settings.journey_detail_cache_size:
+      _detail_cache.popitem(last=False)
+
+
 @router.get("/{journey_id}", response_model=JourneyDetail)
 @limiter.limit(RateLimits.READ_HEAVY)
 def get_journey_detail(
@@ -67,7 +104,38 @@ def get_journey_detail(
   journey_id: str,
   db: Session = Depends(get_db),
   current_user: User = Depends(get_current_user),
-) -> JourneyDetail:
+) -> Response:
+  # Eerst alleen eigenaar + contentversie: bij een ongewijzigde journey is dat de enige query
+  row = (
+    db.query(JourneyModel.user_id, JourneyModel.content_version)
+    .filter(JourneyModel.id == journey_id)
+    .first()
+  )
+  if not row:
+    raise HTTPException(status_code=404, detail="Journey niet gevonden")
+
+  if row.user_id != current_user.id:
+    raise HTTPException(status_code=403, detail="Geen toegang tot deze journey")
+
+  etag = _detail_etag(journey_id, row.content_version)
+  headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+  if etag_matches(request.headers.get("if-none-match"), etag):
+    return Response(status_code=304, headers=headers)
+
+  body = _cached_detail(journey_id, row.content_version)
+  if body is None:
+    body = _build_journey_detail(db, journey_id).model_dump_json().encode("utf-8")
+    _store_detail(journey_id, row.content_version, body)
+  return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _highlight_quote(alignment, item) -> str | None:
+  if alignment is None:
+    return None
+  return alignment.text_between(item.start_ms, item.end_ms) or None
+
+
+def _build_journey_detail(db: Session, journey_id: str) -> JourneyDetail:
   # PERFORMANCE OPTIMIZATION: Single query with eager loading of all relationships
   # This reduces 12+ separate queries to just 2-3 queries total (6x faster!)
   journey = (
@@ -89,9 +157,6 @@ def get_journey_detail(
   if not journey:
     raise HTTPException(status_code=404, detail="Journey niet gevonden")
 
-  if journey.user_id != current_user.id:
-    raise HTTPException(status_code=403, detail="Geen toegang tot deze journey")
-
   # Now all data is already loaded - no additional queries!
 
   # Sort media assets by recorded_at descending
@@ -138,6 +203,14 @@ def get_journey_detail(
     for transcript in media.transcripts
   ]
 
+  # Eén woord-index per opname met highlights, gedeeld met detector en PDF-export
+  assets_by_id = {media.id: media for media in journey.media_assets}
+  alignments = {
+    asset_id: alignment_for(asset_id, assets_by_id[asset_id].transcript_version, assets_by_id[asset_id].transcripts)
+    for asset_id in {item.media_asset_id for item in journey.highlights}
+    if asset_id in assets_by_id and assets_by_id[asset_id].transcripts
+  }
+
   highlights = [
     HighlightSchema(
       id=item.id,
@@ -147,6 +220,7 @@ def get_journey_detail(
       start_ms=item.start_ms,
       end_ms=item.end_ms,
       created_by=item.created_by,
+      text=_highlight_quote(alignments.get(item.media_asset_id), item),
     )
     for item in journey.highlights
   ]
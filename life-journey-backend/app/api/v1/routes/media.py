@@ -1,26 +1,62 @@
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, undefer
 
 from app.db.session import get_db
-from app.models.media import MediaAsset as MediaAssetModel
+from app.models.media import MediaAsset as MediaAssetModel, MediaPeaks
+from app.models.sharing import Highlight as HighlightModel
 from app.models.journey import Journey as JourneyModel
 from app.models.user import User
-from app.schemas.media import MediaAsset, MediaPresignRequest, MediaPresignResponse
-from app.services.media.presigner import build_presigned_upload
+from app.schemas.media import (
+  MediaAsset,
+  MediaMultipartCreateResponse,
+  MediaMultipartSignRequest,
+  MediaMultipartSignResponse,
+  MediaMultipartStatus,
+  MediaPresignRequest,
+  MediaPresignResponse,
+  WaveformMarker,
+  WaveformMarkers,
+)
+from app.services.media.multipart import (
+  PART_URL_TTL_SECONDS,
+  abort_upload,
+  complete_upload,
+  part_count,
+  part_size_for,
+  presign_parts,
+  start_upload,
+  uploaded_parts,
+)
+from app.services.media.presigner import (
+  build_playback_url,
+  build_presigned_upload,
+  new_object_key,
+  verify_playback_signature,
+)
 from app.services.media.processor import enqueue_transcode_job, enqueue_transcript_job
+from app.services.media.ingest import IngestResult, form_file_chunks, ingest_upload
 from app.services.media.local_storage import local_storage
-from app.services.media.validators import validate_object_key, validate_file_extension
+from app.services.media.storage import get_s3_client, presigned_get_url, s3_configured
+from app.services.media.transcode import pick_rendition, remove_renditions, signed_playlist
+from app.services.media.transcripts import texts_for_assets
+from app.services.media.validators import (
+  ALLOWED_EXTENSIONS,
+  check_file_size,
+  validate_file_extension,
+  validate_object_key,
+)
 from app.services.entitlements import assert_can_record
 from app.services.email.events import trigger_milestone_email
 from app.api.deps import get_current_user
 from app.core.rate_limiter import limiter, RateLimits
 from app.core.config import settings
+from app.core.http_cache import etag_matches
 from loguru import logger
 
-import boto3
 from botocore.exceptions import BotoCoreError, NoCredentialsError
 
 
@@ -34,7 +70,32 @@ def _ensure_journey(journey_id: str, db: Session, user: User) -> JourneyModel:
   return journey
 
 
-def _authorize_object_key(object_key: str, db: Session, user: User) -> str:
+def _owned_asset(asset_id: str, db: Session, user: User) -> MediaAssetModel:
+  asset = db.query(MediaAssetModel).filter(MediaAssetModel.id == asset_id).first()
+  if asset is None:
+    raise HTTPException(status_code=404, detail="Media-item niet gevonden")
+  journey = db.query(JourneyModel).filter(JourneyModel.id == asset.journey_id).first()
+  if journey is None or journey.user_id != user.id:
+    raise HTTPException(status_code=403, detail="Geen toegang tot dit media-item")
+  return asset
+
+
+def _new_asset(payload: MediaPresignRequest, asset_id: str, object_key: str) -> MediaAssetModel:
+  return MediaAssetModel(
+    id=asset_id,
+    journey_id=payload.journey_id,
+    chapter_id=payload.chapter_id.value,
+    modality=payload.modality.value,
+    object_key=object_key,
+    original_filename=payload.filename,
+    size_bytes=payload.size_bytes,
+    storage_state="pending",
+    recorded_at=datetime.now(timezone.utc),
+    is_current=True,
+  )
+
+
+def _authorized_asset(object_key: str, db: Session, user: User) -> tuple[str, MediaAssetModel]:
   """
   Valideer een object_key en controleer of de ingelogde gebruiker eigenaar is.
 
@@ -44,7 +105,7 @@ def _authorize_object_key(object_key: str, db: Session, user: User) -> str:
   het opvragen van andermans privé-opnames (IDOR).
 
   Returns:
-    De gesaneerde object_key (veilig voor opslag-toegang).
+    De gesaneerde object_key (veilig voor opslag-toegang) en het media-item.
   """
   safe_key = validate_object_key(object_key)
   parts = safe_key.split("/")
@@ -61,7 +122,11 @@ def _authorize_object_key(object_key: str, db: Session, user: User) -> str:
   if journey is None or journey.user_id != user.id:
     raise HTTPException(status_code=403, detail="Geen toegang tot dit media-item")
 
-  return safe_key
+  return safe_key, asset
+
+
+def _authorize_object_key(object_key: str, db: Session, user: User) -> str:
+  return _authorized_asset(object_key, db, user)[0]
 
 
 @router.post("/presign", response_model=MediaPresignResponse)
@@ -95,18 +160,7 @@ def presign_upload(
   response = build_presigned_upload(payload)
 
   # Use the object_key from the presign response (which includes chapter_id in the path)
-  asset = MediaAssetModel(
-    id=response.asset_id,
-    journey_id=payload.journey_id,
-    chapter_id=payload.chapter_id.value,
-    modality=payload.modality.value,
-    object_key=response.object_key,
-    original_filename=payload.filename,
-    size_bytes=payload.size_bytes,
-    storage_state="pending",
-    recorded_at=datetime.now(timezone.utc),
-    is_current=True,
-  )
+  asset = _new_asset(payload, response.asset_id, response.object_key)
 
   db.add(asset)
   db.commit()
@@ -114,6 +168,118 @@ def presign_upload(
   return response
 
 
+@router.post("/multipart", response_model=MediaMultipartCreateResponse)
+@limiter.limit(RateLimits.MEDIA_UPLOAD)
+def create_multipart_upload(
+  request: Request,
+  payload: MediaPresignRequest,
+  db: Session = Depends(get_db),
+  current_user: User = Depends(get_current_user),
+) -> MediaMultipartCreateResponse:
+  """
+  Start een hervatbare upload rechtstreeks naar S3/R2 (audio/video).
+
+  Vervolg: deel-URL's via POST /media/{id}/multipart/parts, na een
+  onderbreking de ontbrekende delen via GET /media/{id}/multipart, en tot
+  slot POST /media/{id}/complete. Zonder S3 of voor tekst geeft dit 409 en
+  gebruikt de client /media/presign.
+
+  Nog niet gebruikt door de frontend-recorder; vereist bucket-CORS (zie
+  app/services/media/multipart.py).
+  """
+  _ensure_journey(payload.journey_id, db, current_user)
+  assert_can_record(db, current_user, payload.journey_id, payload.chapter_id.value)
+  if payload.modality.value == "text" or not s3_configured():
+    raise HTTPException(status_code=409, detail="Multipart-upload niet beschikbaar; gebruik /media/presign")
+
+  extension = validate_file_extension(payload.filename)
+  check_file_size(payload.size_bytes, extension)
+  asset_id, object_key = new_object_key(payload)
+  object_key = validate_object_key(object_key)
+
+  part_size = part_size_for(payload.size_bytes)
+  asset = _new_asset(payload, asset_id, object_key)
+  asset.upload_id = start_upload(object_key, ALLOWED_EXTENSIONS[extension][0])
+  asset.upload_part_size = part_size
+  db.add(asset)
+  db.commit()
+
+  return MediaMultipartCreateResponse(
+    asset_id=asset_id,
+    object_key=object_key,
+    part_size=part_size,
+    part_count=part_count(payload.size_bytes, part_size),
+  )
+
+
+def _pending_multipart(asset_id: str, db: Session, user: User) -> MediaAssetModel:
+  asset = _owned_asset(asset_id, db, user)
+  if not asset.upload_id:
+    raise HTTPException(status_code=409, detail="Geen lopende multipart-upload voor dit media-item")
+  return asset
+
+
+@router.get("/{asset_id}/multipart", response_model=MediaMultipartStatus)
+@limiter.limit(RateLimits.READ_STANDARD)
+def get_multipart_status(
+  request: Request,
+  asset_id: str,
+  db: Session = Depends(get_db),
+  current_user: User = Depends(get_current_user),
+) -> MediaMultipartStatus:
+  """Welke delen de bucket al heeft, om een onderbroken upload te hervatten."""
+  asset = _pending_multipart(asset_id, db, current_user)
+  return MediaMultipartStatus(
+    asset_id=asset.id,
+    part_size=asset.upload_part_size,
+    part_count=part_count(asset.size_bytes, asset.upload_part_size),
+    uploaded_parts=[part["PartNumber"] for part in uploaded_parts(asset.object_key, asset.upload_id)],
+  )
+
+
+@router.post("/{asset_id}/multipart/parts", response_model=MediaMultipartSignResponse)
+@limiter.limit(RateLimits.WRITE_STANDARD)
+def sign_multipart_parts(
+  request: Request,
+  asset_id: str,
+  body: MediaMultipartSignRequest,
+  db: Session = Depends(get_db),
+  current_user: User = Depends(get_current_user),
+) -> MediaMultipartSignResponse:
+  """Presigned PUT-URL's voor de gevraagde deelnummers."""
+  asset = _pending_multipart(asset_id, db, current_user)
+  count = part_count(asset.size_bytes, asset.upload_part_size)
+  numbers = sorted(set(body.part_numbers))
+  if not numbers or any(number < 1 or number > count for number in numbers):
+    raise HTTPException(status_code=400, detail=f"Deelnummers moeten tussen 1 en {count} liggen")
+  return MediaMultipartSignResponse(
+    urls=presign_parts(asset.object_key, asset.upload_id, numbers),
+    expires_in=PART_URL_TTL_SECONDS,
+  )
+
+
+def _complete_multipart(db: Session, asset: MediaAssetModel) -> None:
+  """Stel de multipart-upload samen na controle van de delen; 409 laat hem hervatbaar."""
+  extension = validate_file_extension(asset.object_key.split("/")[-1])
+  try:
+    asset.size_bytes = complete_upload(
+      asset.object_key, asset.upload_id, asset.size_bytes, asset.upload_part_size, extension,
+    )
+  except HTTPException as exc:
+    if exc.status_code == 409:
+      raise
+    # Inhoud afgekeurd en object verwijderd: niet meer te hervatten
+    asset.upload_id = None
+    asset.storage_state = "failed"
+    db.add(asset)
+    db.commit()
+    raise
+  asset.upload_id = None
+  asset.upload_part_size = None
+  db.add(asset)
+  db.commit()
+
+
 @router.delete("/{asset_id}")
 @limiter.limit(RateLimits.WRITE_STANDARD)
 def delete_recording(
@@ -125,13 +291,11 @@ def delete_recording(
   """
   Delete a media recording and its associated file
   """
-  asset = db.query(MediaAssetModel).filter(MediaAssetModel.id == asset_id).first()
-  if asset is None:
-    raise HTTPException(status_code=404, detail="Media-item niet gevonden")
+  asset = _owned_asset(asset_id, db, current_user)
 
-  journey = db.query(JourneyModel).filter(JourneyModel.id == asset.journey_id).first()
-  if journey is None or journey.user_id != current_user.id:
-    raise HTTPException(status_code=403, detail="Geen toegang tot dit media-item")
+  # Lopende multipart-upload afbreken, anders blijven de delen in de bucket staan
+  if asset.upload_id:
+    abort_upload(asset.object_key, asset.upload_id)
 
   # Delete the file from storage if it exists
   if asset.object_key:
@@ -140,6 +304,7 @@ def delete_recording(
     except Exception as e:
       # Log but don't fail if file deletion fails
       print(f"Warning: Could not delete file {asset.object_key}: {e}")
+  remove_renditions(asset.renditions)
 
   # Delete from database
   db.delete(asset)
@@ -192,13 +357,12 @@ def finalize_upload(
   db: Session = Depends(get_db),
   current_user: User = Depends(get_current_user),
 ) -> dict[str, str]:
-  asset = db.query(MediaAssetModel).filter(MediaAssetModel.id == asset_id).first()
-  if asset is None:
-    raise HTTPException(status_code=404, detail="Media-item niet gevonden")
+  asset = _owned_asset(asset_id, db, current_user)
+  journey = asset.journey
 
-  journey = db.query(JourneyModel).filter(JourneyModel.id == asset.journey_id).first()
-  if journey is None or journey.user_id != current_user.id:
-    raise HTTPException(status_code=403, detail="Geen toegang tot dit media-item")
+  # Direct-to-bucket upload: delen bij S3 controleren en samenstellen
+  if asset.upload_id:
+    _complete_multipart(db, asset)
 
   # Text is fully stored on /complete (transcribe/transcript are audio/video-only),
   # so mark it ready immediately. Audio/video start in 'processing' and are advanced
@@ -245,12 +409,16 @@ def get_transcript(
   """
   Get transcript text for a media asset.
 
-  Returns the joined transcript if available, or a 202 with ready=False
-  when transcription is still in progress.
+  Returns the materialised transcript if available (segments only for
+  recordings transcribed before it existed), or ready=False while
+  transcription is still in progress.
   """
-  from app.models.media import TranscriptSegment
-
-  asset = db.query(MediaAssetModel).filter(MediaAssetModel.id == asset_id).first()
+  asset = (
+    db.query(MediaAssetModel)
+    .options(undefer(MediaAssetModel.full_transcript))
+    .filter(MediaAssetModel.id == asset_id)
+    .first()
+  )
   if asset is None:
     raise HTTPException(status_code=404, detail="Media-item niet gevonden")
 
@@ -258,22 +426,125 @@ def get_transcript(
   if journey is None or journey.user_id != current_user.id:
     raise HTTPException(status_code=403, detail="Geen toegang tot dit media-item")
 
-  segments = (
-    db.query(TranscriptSegment)
-    .filter(TranscriptSegment.media_asset_id == asset_id)
-    .order_by(TranscriptSegment.start_ms.asc())
-    .all()
-  )
-
-  if not segments:
+  text = texts_for_assets(db, [asset]).get(asset.id)
+  if not text:
     # Text assets keep their content in text_content (DB is source of truth).
     if asset.modality == "text" and asset.text_content is not None:
-      return {"ready": True, "text": asset.text_content, "segment_count": 0}
+      return {"ready": True, "text": asset.text_content, "word_count": len(asset.text_content.split())}
     # Audio/video still transcribing (or worker unavailable).
     return {"ready": False, "text": None, "storage_state": asset.storage_state}
+  return {"ready": True, "text": text, "word_count": asset.transcript_word_count or len(text.split())}
+
+
+# Peaks veranderen alleen als de opname opnieuw wordt verwerkt; de ETag vangt dat op
+_PEAKS_CACHE_CONTROL = "private, max-age=86400"
+
+
+def _peaks_etag(peaks: MediaPeaks) -> str:
+  return f'"peaks-{peaks.media_asset_id}-{int(peaks.created_at.timestamp())}"'
+
+
+@router.get("/{asset_id}/peaks")
+@limiter.limit(RateLimits.MEDIA_READ)
+def get_waveform_peaks(
+  request: Request,
+  asset_id: str,
+  db: Session = Depends(get_db),
+  current_user: User = Depends(get_current_user),
+) -> Response:
+  """
+  Voorberekende golfvorm van een opname (audiowaveform .dat, 8-bit min/max).
+
+  Een paar tientallen KB in plaats van de audio; peaks.js en vergelijkbare
+  spelers tekenen dit direct. 404 zolang de worker de peaks nog niet heeft
+  berekend. Highlights voor op de golfvorm: GET /media/{asset_id}/peaks/markers.
+  """
+  _owned_asset(asset_id, db, current_user)
+  peaks = db.get(MediaPeaks, asset_id)
+  if peaks is None:
+    raise HTTPException(status_code=404, detail="Golfvorm nog niet beschikbaar")
+
+  etag = _peaks_etag(peaks)
+  headers = {"ETag": etag, "Cache-Control": _PEAKS_CACHE_CONTROL}
+  if etag_matches(request.headers.get("if-none-match"), etag):
+    return Response(status_code=304, headers=headers)
+  return Response(content=peaks.data, media_type="application/octet-stream", headers=headers)
+
+
+@router.get("/{asset_id}/peaks/markers", response_model=WaveformMarkers)
+@limiter.limit(RateLimits.READ_STANDARD)
+def get_waveform_markers(
+  request: Request,
+  asset_id: str,
+  db: Session = Depends(get_db),
+  current_user: User = Depends(get_current_user),
+) -> WaveformMarkers:
+  """Highlights van een opname als posities op de golfvorm (peak-index én ms)."""
+  _owned_asset(asset_id, db, current_user)
+  # Alleen de schaal; de blob zelf is hier niet nodig
+  scale = (
+    db.query(MediaPeaks.sample_rate, MediaPeaks.samples_per_peak, MediaPeaks.length)
+    .filter(MediaPeaks.media_asset_id == asset_id)
+    .first()
+  )
+  highlights = (
+    db.query(HighlightModel)
+    .filter(HighlightModel.media_asset_id == asset_id)
+    .order_by(HighlightModel.start_ms.asc())
+    .all()
+  )
+
+  def index_at(ms: int) -> int | None:
+    if scale is None or not scale.length:
+      return None
+    return max(0, min(scale.length - 1, ms * scale.sample_rate // (1000 * scale.samples_per_peak)))
+
+  return WaveformMarkers(
+    asset_id=asset_id,
+    sample_rate=scale.sample_rate if scale else None,
+    samples_per_peak=scale.samples_per_peak if scale else None,
+    length=scale.length if scale else None,
+    markers=[
+      WaveformMarker(
+        id=h.id,
+        label=h.label,
+        start_ms=h.start_ms,
+        end_ms=h.end_ms,
+        created_by=h.created_by,
+        start_index=index_at(h.start_ms),
+        end_index=index_at(h.end_ms),
+      )
+      for h in highlights
+    ],
+  )
+
+
+def _mark_uploaded(db: Session, upload: IngestResult) -> None:
+  """Werk het asset bij na een opgeslagen upload: tekstinhoud, grootte en status ready."""
+  # Determine asset_id (format: journey_id/chapter_id/asset_id/filename)
+  parts = upload.object_key.split("/")
+  asset_id_from_key = parts[2] if len(parts) >= 3 else None
+  if not asset_id_from_key:
+    return
+  asset = db.query(MediaAssetModel).filter(MediaAssetModel.id == asset_id_from_key).first()
+  if not asset:
+    return
+
+  # --- Text: store content IN the database (source of truth). ---
+  # Object storage is ephemeral on Railway; keeping text only as a .txt caused
+  # "Kon tekst niet laden" after every redeploy. The object copy is kept for
+  # backward-compat, but the DB copy is authoritative.
+  if upload.text_body is not None and upload.object_key.lower().endswith(".txt"):
+    try:
+      asset.text_content = upload.text_body.decode("utf-8")
+    except UnicodeDecodeError:
+      asset.text_content = upload.text_body.decode("utf-8", errors="replace")
+    logger.info(f"Stored text_content in DB for asset {asset_id_from_key} ({len(asset.text_content)} chars)")
 
-  text = " ".join(s.text for s in segments)
-  return {"ready": True, "text": text, "segment_count": len(segments)}
+  asset.size_bytes = upload.size_bytes
+  asset.storage_state = "ready"
+  db.add(asset)
+  db.commit()
 
 
 @router.put("/local-upload/{object_key:path}")
@@ -286,18 +557,18 @@ async def local_upload(
   db: Session = Depends(get_db),
 ) -> dict[str, str]:
   """
-  Upload endpoint: proxies to S3/R2 when configured, falls back to local storage.
+  Upload endpoint: streams to S3/R2 when configured, falls back to local storage.
+
+  The body is never held in memory as a whole; see app/services/media/ingest.py.
 
   Security features:
   - Capability-based autorisatie: alleen een door /media/presign ondertekende
     URL (HMAC over object_key + vervaltijd) wordt geaccepteerd. De presign-stap
     heeft de eigenaarscheck al uitgevoerd.
-  - File type validation (only allowed extensions)
+  - File type validation (only allowed extensions, magic bytes, size limit)
   - Filename sanitization
   - Path traversal protection
   """
-  import io
-  from app.core.config import settings as app_settings
   from app.services.media.presigner import verify_upload_signature
 
   # Autoriseer via de ondertekende upload-URL voordat we iets accepteren.
@@ -306,96 +577,33 @@ async def local_upload(
 
   try:
     logger.info(f"Upload attempt - object_key: {object_key}")
+    extension = validate_file_extension(object_key.split("/")[-1])
+    safe_object_key = validate_object_key(object_key)
 
     # Read body — handle both raw and multipart/form-data
     content_type = request.headers.get("content-type", "")
     if "multipart/form-data" in content_type:
       form = await request.form()
       file = form.get("file")
-      if file and hasattr(file, "read"):
-        body = await file.read()
-        # Detect content type from the uploaded file part
-        file_content_type = getattr(file, "content_type", None) or "application/octet-stream"
-      else:
+      if not (file and hasattr(file, "read")):
         raise HTTPException(status_code=400, detail="No file in form data")
+      chunks = form_file_chunks(file)
+      # Detect content type from the uploaded file part
+      file_content_type = getattr(file, "content_type", None) or "application/octet-stream"
     else:
-      body = await request.body()
+      chunks = request.stream()
       file_content_type = content_type or "application/octet-stream"
 
-    logger.info(f"Received {len(body)} bytes")
+    upload = await ingest_upload(chunks, safe_object_key, extension, file_content_type)
 
-    filename = object_key.split("/")[-1]
-    validate_file_extension(filename)
-    safe_object_key = validate_object_key(object_key)
-
-    # Determine asset_id (format: journey_id/chapter_id/asset_id/filename)
-    parts = safe_object_key.split("/")
-    asset_id_from_key = parts[2] if len(parts) >= 3 else None
-
-    # --- Text: store content IN the database (source of truth). ---
-    # Object storage is ephemeral on Railway; keeping text only as a .txt caused
-    # "Kon tekst niet laden" after every redeploy. We still attempt the object
-    # upload below for backward-compat, but the DB copy is authoritative.
-    if filename.lower().endswith(".txt") and asset_id_from_key:
-      try:
-        text_value = body.decode("utf-8")
-      except UnicodeDecodeError:
-        text_value = body.decode("utf-8", errors="replace")
-      asset = db.query(MediaAssetModel).filter(MediaAssetModel.id == asset_id_from_key).first()
-      if asset:
-        asset.text_content = text_value
-        asset.storage_state = "ready"
-        db.add(asset)
-        db.commit()
-        logger.info(f"Stored text_content in DB for asset {asset_id_from_key} ({len(text_value)} chars)")
-
-    # --- Upload to S3/R2 server-side when configured ---
-    if app_settings.s3_bucket and app_settings.aws_access_key_id and app_settings.aws_secret_access_key:
-      try:
-        endpoint_url = app_settings.s3_endpoint_url
-        if not endpoint_url and app_settings.s3_region:
-          endpoint_url = f"https://s3.{app_settings.s3_region}.amazonaws.com"
-
-        s3 = boto3.client(
-          "s3",
-          region_name=app_settings.s3_region,
-          endpoint_url=endpoint_url,
-          aws_access_key_id=app_settings.aws_access_key_id,
-          aws_secret_access_key=app_settings.aws_secret_access_key,
-        )
-        s3.put_object(
-          Bucket=app_settings.s3_bucket,
-          Key=safe_object_key,
-          Body=body,
-          ContentType=file_content_type,
-        )
-        logger.info(f"Uploaded {len(body)} bytes to R2/S3: {safe_object_key}")
-
-        if asset_id_from_key:
-          asset = db.query(MediaAssetModel).filter(MediaAssetModel.id == asset_id_from_key).first()
-          if asset:
-            asset.storage_state = "ready"
-            db.add(asset)
-            db.commit()
-
-        return {"status": "uploaded", "object_key": safe_object_key}
-      except (BotoCoreError, NoCredentialsError) as exc:
-        logger.warning(f"S3 credentials error, falling back to local storage: {exc}")
-      except Exception as exc:
-        logger.warning(f"S3 upload failed, falling back to local storage: {exc}")
-
-    # --- Fallback: local storage ---
-    file_like = io.BytesIO(body)
-    stored_key = local_storage.save_file(safe_object_key, file_like)
-
-    if asset_id_from_key:
-      asset = db.query(MediaAssetModel).filter(MediaAssetModel.id == asset_id_from_key).first()
-      if asset:
-        asset.storage_state = "ready"
-        db.add(asset)
-        db.commit()
-
-    return {"status": "uploaded", "object_key": stored_key}
+    # DB-update is blocking: buiten de event loop uitvoeren
+    await run_in_threadpool(_mark_uploaded, db, upload)
+    return {
+      "status": "uploaded",
+      "object_key": upload.object_key,
+      "size_bytes": str(upload.size_bytes),
+      "sha256": upload.sha256,
+    }
 
   except HTTPException as e:
     logger.error(f"Validation error in local_upload: {e.detail}")
@@ -407,7 +615,7 @@ async def local_upload(
 
 @router.get("/local-file/{object_key:path}")
 @limiter.limit(RateLimits.MEDIA_READ)
-async def serve_local_file(
+def serve_local_file(
   request: Request,
   object_key: str,
   db: Session = Depends(get_db),
@@ -444,9 +652,11 @@ async def serve_local_file(
 
 @router.get("/file/{object_key:path}")
 @limiter.limit(RateLimits.MEDIA_READ)
-async def serve_file(
+def serve_file(
   request: Request,
   object_key: str,
+  quality: str | None = None,
+  hls: bool = False,
   db: Session = Depends(get_db),
   current_user: User = Depends(get_current_user),
 ):
@@ -455,38 +665,37 @@ async def serve_file(
   Vereist authenticatie en eigenaarschap van het media-item.
   Text files (.txt) are proxied server-side to avoid browser CORS issues with R2.
   Audio/video files return a presigned URL for direct browser playback.
+
+  For audio/video the smallest playable rendition is served instead of the
+  original (see app/services/media/transcode.py): `quality=preview` or a
+  `Save-Data: on` header selects the low-bitrate preview, `hls=true` the HLS
+  playlist for players that support it.
   """
-  object_key = _authorize_object_key(object_key, db, current_user)
+  object_key, asset = _authorized_asset(object_key, db, current_user)
+
+  rendition, rendition_type = "original", None
+  if asset.renditions and "/derived/" not in object_key:
+    rendition, object_key, rendition_type = pick_rendition(
+      object_key,
+      asset.size_bytes,
+      asset.renditions,
+      user_agent=request.headers.get("user-agent", ""),
+      save_data=quality == "preview" or request.headers.get("save-data", "").lower() == "on",
+      accept_hls=hls,
+    )
+    if rendition == "hls":
+      return {"url": build_playback_url(object_key), "type": "hls", "rendition": rendition}
 
   # Text: the database is the source of truth (object storage is ephemeral).
-  if object_key.endswith(".txt"):
-    parts = object_key.split("/")
-    asset_id = parts[2] if len(parts) >= 3 else None
-    asset = (
-      db.query(MediaAssetModel).filter(MediaAssetModel.id == asset_id).first()
-      if asset_id else None
-    )
-    if asset is not None and asset.text_content is not None:
-      return {"content": asset.text_content, "type": "local"}
+  if object_key.endswith(".txt") and asset.text_content is not None:
+    return {"content": asset.text_content, "type": "local"}
 
-  if settings.s3_bucket and settings.aws_access_key_id and settings.aws_secret_access_key:
+  if s3_configured():
     try:
-      endpoint_url = settings.s3_endpoint_url
-      if not endpoint_url and settings.s3_region:
-        endpoint_url = f"https://s3.{settings.s3_region}.amazonaws.com"
-
-      client = boto3.client(
-        "s3",
-        region_name=settings.s3_region,
-        endpoint_url=endpoint_url,
-        aws_access_key_id=settings.aws_access_key_id,
-        aws_secret_access_key=settings.aws_secret_access_key,
-      )
-
       # Text files: proxy content server-side so the browser never touches R2 directly
       if object_key.endswith(".txt"):
         try:
-          s3_response = client.get_object(Bucket=settings.s3_bucket, Key=object_key)
+          s3_response = get_s3_client().get_object(Bucket=settings.s3_bucket, Key=object_key)
           content = s3_response["Body"].read().decode("utf-8")
           logger.info(f"Proxied text content from S3 for {object_key}")
           return {"content": content, "type": "local"}
@@ -494,15 +703,15 @@ async def serve_file(
           logger.warning(f"Text file not in S3 ({object_key}): {exc}")
           # Fall through to local storage
       else:
-        params: dict = {"Bucket": settings.s3_bucket, "Key": object_key}
-        if object_key.endswith((".webm", ".mp4", ".m4a")):
-          params["ResponseContentType"] = "video/webm" if object_key.endswith(".webm") else "audio/mp4"
-        elif object_key.endswith((".mp3", ".wav", ".ogg")):
-          params["ResponseContentType"] = "audio/mpeg" if object_key.endswith(".mp3") else f"audio/{object_key.split('.')[-1]}"
+        content_type = rendition_type
+        if content_type is None and object_key.endswith((".webm", ".mp4", ".m4a")):
+          content_type = "video/webm" if object_key.endswith(".webm") else "audio/mp4"
+        elif content_type is None and object_key.endswith((".mp3", ".wav", ".ogg")):
+          content_type = "audio/mpeg" if object_key.endswith(".mp3") else f"audio/{object_key.split('.')[-1]}"
 
-        presigned_url = client.generate_presigned_url("get_object", Params=params, ExpiresIn=3600)
-        logger.info(f"Generated S3 presigned URL for {object_key}")
-        return {"url": presigned_url, "type": "s3"}
+        # Hergebruikt tot kort voor het verlopen: herhaald afspelen ondertekent niet opnieuw
+        presigned_url = presigned_get_url(object_key, expires_in=3600, response_content_type=content_type)
+        return {"url": presigned_url, "type": "s3", "rendition": rendition}
 
     except (BotoCoreError, NoCredentialsError) as exc:
       logger.warning(f"S3 not available, trying local storage: {exc}")
@@ -528,7 +737,7 @@ async def serve_file(
     ".wav": "audio/wav",
     ".m4a": "audio/mp4",
   }
-  media_type = media_type_map.get(suffix, "application/octet-stream")
+  media_type = rendition_type or media_type_map.get(suffix, "application/octet-stream")
 
   return FileResponse(
     path=str(file_path),
@@ -537,6 +746,32 @@ async def serve_file(
   )
 
 
+@router.get("/hls/{object_key:path}")
+@limiter.limit(RateLimits.MEDIA_READ)
+def serve_hls_playlist(
+  request: Request,
+  object_key: str,
+  exp: int = 0,
+  sig: str = "",
+) -> Response:
+  """
+  HLS-playlist met presigned segment-URL's.
+
+  Geautoriseerd via de ondertekende URL die serve_file uitgeeft (native
+  spelers sturen geen Bearer-token mee).
+  """
+  if not verify_playback_signature(object_key, exp, sig):
+    raise HTTPException(status_code=403, detail="Ongeldige of verlopen afspeel-URL")
+  safe_key = validate_object_key(object_key)
+  if not safe_key.endswith(".m3u8") or not s3_configured():
+    raise HTTPException(status_code=404, detail="Playlist niet gevonden")
+  return Response(
+    content=signed_playlist(safe_key),
+    media_type="application/vnd.apple.mpegurl",
+    headers={"Cache-Control": "private, max-age=300"},
+  )
+
+
 @router.post("/admin/backfill-text-content")
 @limiter.limit(RateLimits.WRITE_STANDARD)
 def backfill_text_content(
@@ -561,18 +796,7 @@ def backfill_text_content(
     .all()
   )
 
-  s3_client = None
-  if settings.s3_bucket and settings.aws_access_key_id and settings.aws_secret_access_key:
-    endpoint_url = settings.s3_endpoint_url
-    if not endpoint_url and settings.s3_region:
-      endpoint_url = f"https://s3.{settings.s3_region}.amazonaws.com"
-    s3_client = boto3.client(
-      "s3",
-      region_name=settings.s3_region,
-      endpoint_url=endpoint_url,
-      aws_access_key_id=settings.aws_access_key_id,
-      aws_secret_access_key=settings.aws_secret_access_key,
-    )
+  s3_client = get_s3_client() if s3_configured() else None
 
   recovered, from_s3, from_local, missing = 0, 0, 0, 0
   missing_ids: list[str] = []
@@ -24,6 +24,7 @@ from app.schemas.orders import (
     OrderStatusPublic,
     StartRedemptionRequest,
 )
+from app.services.media.storage import presigned_get_url, s3_configured
 from loguru import logger
 
 router = APIRouter()
@@ -450,24 +451,9 @@ def _gift_media_playback_url(object_key: str | None) -> str | None:
     # Publieke R2-URL heeft geen vervaldatum en werkt altijd als de bucket publiek is
     if settings.s3_public_url:
         return f"{settings.s3_public_url.rstrip('/')}/{object_key}"
-    if settings.s3_bucket and settings.aws_access_key_id and settings.aws_secret_access_key:
+    if s3_configured():
         try:
-            import boto3
-            endpoint_url = settings.s3_endpoint_url
-            if not endpoint_url and settings.s3_region:
-                endpoint_url = f"https://s3.{settings.s3_region}.amazonaws.com"
-            s3 = boto3.client(
-                "s3",
-                region_name=settings.s3_region,
-                endpoint_url=endpoint_url,
-                aws_access_key_id=settings.aws_access_key_id,
-                aws_secret_access_key=settings.aws_secret_access_key,
-            )
-            return s3.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": settings.s3_bucket, "Key": object_key},
-                ExpiresIn=604800,  # 7 dagen
-            )
+            return presigned_get_url(object_key, expires_in=604800)  # 7 dagen
         except Exception as exc:
             logger.warning(f"Kon presigned URL niet maken voor {object_key}: {exc}")
     return f"{settings.api_base_url}/api/v1/media/local-file/{object_key}"
@@ -27,14 +27,16 @@ import hmac
 import re
 from datetime import datetime, timezone
 
-import httpx
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response
+from starlette.concurrency import run_in_threadpool
 from loguru import logger
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.core.config import settings
 from app.models.blog_post import BlogPost
+from app.services.blog_listings import invalidate_listings
+from app.services.blog_purge import purge_public_caches, section_path
 from app.services.indexing import ping_google_indexing_api, ping_index_now
 
 router = APIRouter()
@@ -42,7 +44,7 @@ router = APIRouter()
 
 # ── Korte healthcheck (monitoring) ──────────────────────────────────────────
 @router.get("/health", tags=["publish"])
-async def publish_health(db: Session = Depends(get_db)):
+def publish_health(db: Session = Depends(get_db)):
     """Compacte health-probe voor de publish-flow: DB-reachable + key config.
 
     Gebruik dit endpoint in externe monitoring (bijv. UptimeRobot) in plaats
@@ -66,7 +68,12 @@ async def publish_health(db: Session = Depends(get_db)):
 
 # ── Verwijder een Agent OS-gepubliceerd artikel (slug) ─────────────────────
 @router.delete("/{slug}", tags=["publish"])
-async def delete_published(request: Request, slug: str, db: Session = Depends(get_db)):
+def delete_published(
+    request: Request,
+    slug: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
     """Verwijder een via Agent OS gepubliceerd artikel op basis van slug.
 
     Dezelfde Bearer-auth als POST /api/v1/publish (PUBLISH_API_KEY). Bedoeld
@@ -84,8 +91,11 @@ async def delete_published(request: Request, slug: str, db: Session = Depends(ge
             status_code=404,
             media_type="application/json",
         )
+    section = post.section
     db.delete(post)
     db.commit()
+    invalidate_listings()
+    background_tasks.add_task(purge_public_caches, slug, section)
     logger.info(f"Agent OS artikel verwijderd: {slug}")
     return Response(
         content='{"success":true,"slug":"' + slug + '"}',
@@ -154,52 +164,8 @@ def _clean_excerpt(content: str, explicit: str = "") -> str:
     return text[:500]
 
 
-def _section_path(section: str) -> str:
-    return "kennisbank" if section == "knowledge" else "blog"
-
-
-async def _trigger_revalidate(slug: str, section: str) -> None:
-    """Laat de frontend (/api/revalidate) de statische pagina's vernieuwen,
-    zodat het artikel direct zichtbaar is i.p.v. te wachten op de ISR-window."""
-    frontend = (settings.app_base_url or settings.site_url).rstrip("/")
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            await client.post(
-                f"{frontend}/api/revalidate",
-                json={"slug": slug, "section": _section_path(section)},
-            )
-    except Exception as e:  # revalidate is best-effort
-        logger.warning(f"Revalidate frontend mislukt (niet kritiek): {e}")
-
-
-# ── Endpoint ──────────────────────────────────────────────────────────────────
-@router.post("")
-async def agent_os_publish(request: Request, db: Session = Depends(get_db)):
-    if not _is_authorized(request):
-        return Response(
-            content='{"error":"Unauthorized"}',
-            status_code=401,
-            media_type="application/json",
-        )
-
-    try:
-        body = await request.json()
-    except Exception:
-        return Response(
-            content='{"error":"Ongeldige JSON"}',
-            status_code=400,
-            media_type="application/json",
-        )
-
-    title = (body.get("title") or "").strip()
-    content = (body.get("content") or "").strip()
-    if not title or not content:
-        return Response(
-            content='{"error":"title en content zijn verplicht"}',
-            status_code=400,
-            media_type="application/json",
-        )
-
+def _upsert_post(db: Session, body: dict, title: str, content: str) -> tuple[str, str, str]:
+    """Maak of update het artikel (upsert op slug). Geeft (id, slug, section) terug."""
     # Slug: expliciet meegestuurd (gesanitized) of afgeleid van de titel.
     requested = (body.get("slug") or "").strip().lower()
     base_slug = _slugify(requested) if _SLUG_RE.match(requested) else _slugify(title)
@@ -264,9 +230,43 @@ async def agent_os_publish(request: Request, db: Session = Depends(get_db)):
         db.add(post)
 
     db.commit()
+    invalidate_listings()
     db.refresh(post)
+    return post.id, post.slug, section
+
+
+# ── Endpoint ──────────────────────────────────────────────────────────────────
+@router.post("")
+async def agent_os_publish(request: Request, db: Session = Depends(get_db)):
+    if not _is_authorized(request):
+        return Response(
+            content='{"error":"Unauthorized"}',
+            status_code=401,
+            media_type="application/json",
+        )
+
+    try:
+        body = await request.json()
+    except Exception:
+        return Response(
+            content='{"error":"Ongeldige JSON"}',
+            status_code=400,
+            media_type="application/json",
+        )
+
+    title = (body.get("title") or "").strip()
+    content = (body.get("content") or "").strip()
+    if not title or not content:
+        return Response(
+            content='{"error":"title en content zijn verplicht"}',
+            status_code=400,
+            media_type="application/json",
+        )
+
+    # DB-werk (slug-zoektocht, upsert) is blocking: buiten de event loop uitvoeren
+    post_id, post_slug, section = await run_in_threadpool(_upsert_post, db, body, title, content)
 
-    url = f"{settings.site_url}/{_section_path(section)}/{post.slug}"
+    url = f"{settings.site_url}/{section_path(section)}/{post_slug}"
 
     # Zoekmachines pingen (parallel, fouten blokkeren niet)
     index_now_ok = google_ok = False
@@ -281,15 +281,15 @@ async def agent_os_publish(request: Request, db: Session = Depends(get_db)):
     except Exception as e:
         logger.warning(f"Index-ping gefaald: {e}")
 
-    # Frontend direct verversen (best-effort)
-    await _trigger_revalidate(post.slug, section)
+    # Frontend en CDN direct verversen (best-effort)
+    await purge_public_caches(post_slug, section)
 
-    logger.info(f"Agent OS gepubliceerd: {post.slug} ({section}) → {url}")
+    logger.info(f"Agent OS gepubliceerd: {post_slug} ({section}) → {url}")
     return Response(
         content=__import__("json").dumps({
             "success": True,
-            "id": post.id,
-            "slug": post.slug,
+            "id": post_id,
+            "slug": post_slug,
             "url": url,
             "source": body.get("source", "agent-os"),
             "indexing": {
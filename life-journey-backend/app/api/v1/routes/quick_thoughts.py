@@ -17,13 +17,12 @@ from datetime import datetime, timezone
 from typing import Optional
 from uuid import uuid4
 
-import boto3
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 from loguru import logger
-import io
 
 from app.db.session import get_db
 from app.models.quick_thought import QuickThought
@@ -44,7 +43,10 @@ from app.schemas.quick_thought import (
 from app.api.deps import get_current_user
 from app.core.rate_limiter import limiter, RateLimits
 from app.core.config import settings
+from app.services.media.ingest import form_file_chunks, ingest_upload
 from app.services.media.local_storage import local_storage
+from app.services.media.storage import invalidate_presigned_urls, presigned_get_url, s3_configured
+from app.services.media.validators import validate_file_extension, validate_object_key
 from app.services.quick_thoughts.processor import (
     enqueue_quick_thought_transcript,
     enqueue_quick_thought_analysis,
@@ -115,29 +117,15 @@ def _thought_to_response(thought: QuickThought, media_url: Optional[str] = None)
     )
 
 
-async def _get_media_url(object_key: str) -> Optional[str]:
+def _get_media_url(object_key: str) -> Optional[str]:
     """Generate a playback URL: presigned GET from R2/S3 when configured, local endpoint otherwise."""
     if not object_key:
         return None
 
-    if settings.s3_bucket and settings.aws_access_key_id and settings.aws_secret_access_key:
+    if s3_configured():
         try:
-            endpoint_url = settings.s3_endpoint_url
-            if not endpoint_url and settings.s3_region:
-                endpoint_url = f"https://s3.{settings.s3_region}.amazonaws.com"
-
-            client = boto3.client(
-                "s3",
-                region_name=settings.s3_region,
-                endpoint_url=endpoint_url,
-                aws_access_key_id=settings.aws_access_key_id,
-                aws_secret_access_key=settings.aws_secret_access_key,
-            )
-            return client.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": settings.s3_bucket, "Key": object_key},
-                ExpiresIn=3600,
-            )
+            # Gedeelde client; de URL wordt hergebruikt tot kort voor hij verloopt
+            return presigned_get_url(object_key, expires_in=3600)
         except Exception as exc:
             logger.warning(f"Could not generate presigned GET URL for {object_key}: {exc}")
 
@@ -150,7 +138,7 @@ async def _get_media_url(object_key: str) -> Optional[str]:
 
 @router.post("", response_model=QuickThoughtResponse)
 @limiter.limit(RateLimits.WRITE_STANDARD)
-async def create_text_thought(
+def create_text_thought(
     request: Request,
     data: QuickThoughtCreateText,
     db: Session = Depends(get_db),
@@ -190,7 +178,7 @@ async def create_text_thought(
 
 @router.post("/presign", response_model=QuickThoughtPresignResponse)
 @limiter.limit(RateLimits.MEDIA_UPLOAD)
-async def presign_upload(
+def presign_upload(
     request: Request,
     data: QuickThoughtPresignRequest,
     db: Session = Depends(get_db),
@@ -234,7 +222,7 @@ async def presign_upload(
 
 @router.post("/{thought_id}/complete", response_model=QuickThoughtCompleteResponse)
 @limiter.limit(RateLimits.WRITE_STANDARD)
-async def complete_upload(
+def complete_upload(
     request: Request,
     thought_id: str,
     db: Session = Depends(get_db),
@@ -276,7 +264,7 @@ async def complete_upload(
 
 @router.get("", response_model=QuickThoughtListResponse)
 @limiter.limit(RateLimits.READ_STANDARD)
-async def list_thoughts(
+def list_thoughts(
     request: Request,
     chapter_id: Optional[str] = None,
     modality: Optional[str] = None,
@@ -327,7 +315,7 @@ async def list_thoughts(
     # Build responses with media URLs
     responses = []
     for thought in items:
-        media_url = await _get_media_url(thought.object_key) if thought.object_key else None
+        media_url = _get_media_url(thought.object_key) if thought.object_key else None
         responses.append(_thought_to_response(thought, media_url))
 
     return QuickThoughtListResponse(
@@ -341,7 +329,7 @@ async def list_thoughts(
 
 @router.get("/stats", response_model=QuickThoughtStats)
 @limiter.limit(RateLimits.READ_STANDARD)
-async def get_stats(
+def get_stats(
     request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -402,7 +390,7 @@ async def get_stats(
 
 @router.get("/for-interview/{chapter_id}", response_model=QuickThoughtsForInterviewResponse)
 @limiter.limit(RateLimits.READ_STANDARD)
-async def get_thoughts_for_interview(
+def get_thoughts_for_interview(
     request: Request,
     chapter_id: str,
     db: Session = Depends(get_db),
@@ -453,12 +441,12 @@ async def get_thoughts_for_interview(
     # Build responses
     direct_responses = []
     for thought in direct_thoughts:
-        media_url = await _get_media_url(thought.object_key) if thought.object_key else None
+        media_url = _get_media_url(thought.object_key) if thought.object_key else None
         direct_responses.append(_thought_to_response(thought, media_url))
 
     suggested_responses = []
     for thought in suggested_thoughts:
-        media_url = await _get_media_url(thought.object_key) if thought.object_key else None
+        media_url = _get_media_url(thought.object_key) if thought.object_key else None
         suggested_responses.append(_thought_to_response(thought, media_url))
 
     return QuickThoughtsForInterviewResponse(
@@ -470,7 +458,7 @@ async def get_thoughts_for_interview(
 
 @router.get("/{thought_id}", response_model=QuickThoughtResponse)
 @limiter.limit(RateLimits.READ_STANDARD)
-async def get_thought(
+def get_thought(
     request: Request,
     thought_id: str,
     db: Session = Depends(get_db),
@@ -478,7 +466,7 @@ async def get_thought(
 ) -> QuickThoughtResponse:
     """Get a single quick thought by ID."""
     thought = _get_thought_for_user(db, thought_id, current_user.id)
-    media_url = await _get_media_url(thought.object_key) if thought.object_key else None
+    media_url = _get_media_url(thought.object_key) if thought.object_key else None
     return _thought_to_response(thought, media_url)
 
 
@@ -488,7 +476,7 @@ async def get_thought(
 
 @router.patch("/{thought_id}", response_model=QuickThoughtResponse)
 @limiter.limit(RateLimits.WRITE_STANDARD)
-async def update_thought(
+def update_thought(
     request: Request,
     thought_id: str,
     data: QuickThoughtUpdate,
@@ -511,13 +499,13 @@ async def update_thought(
 
     logger.info(f"Updated quick thought {thought_id}")
 
-    media_url = await _get_media_url(thought.object_key) if thought.object_key else None
+    media_url = _get_media_url(thought.object_key) if thought.object_key else None
     return _thought_to_response(thought, media_url)
 
 
 @router.post("/{thought_id}/link/{chapter_id}", response_model=QuickThoughtResponse)
 @limiter.limit(RateLimits.WRITE_STANDARD)
-async def link_to_chapter(
+def link_to_chapter(
     request: Request,
     thought_id: str,
     chapter_id: str,
@@ -534,13 +522,13 @@ async def link_to_chapter(
 
     logger.info(f"Linked quick thought {thought_id} to chapter {chapter_id}")
 
-    media_url = await _get_media_url(thought.object_key) if thought.object_key else None
+    media_url = _get_media_url(thought.object_key) if thought.object_key else None
     return _thought_to_response(thought, media_url)
 
 
 @router.post("/{thought_id}/mark-used", response_model=QuickThoughtResponse)
 @limiter.limit(RateLimits.WRITE_STANDARD)
-async def mark_as_used(
+def mark_as_used(
     request: Request,
     thought_id: str,
     db: Session = Depends(get_db),
@@ -557,7 +545,7 @@ async def mark_as_used(
 
     logger.info(f"Marked quick thought {thought_id} as used in interview")
 
-    media_url = await _get_media_url(thought.object_key) if thought.object_key else None
+    media_url = _get_media_url(thought.object_key) if thought.object_key else None
     return _thought_to_response(thought, media_url)
 
 
@@ -567,7 +555,7 @@ async def mark_as_used(
 
 @router.post("/{thought_id}/archive", response_model=QuickThoughtResponse)
 @limiter.limit(RateLimits.WRITE_STANDARD)
-async def archive_thought(
+def archive_thought(
     request: Request,
     thought_id: str,
     db: Session = Depends(get_db),
@@ -583,13 +571,13 @@ async def archive_thought(
 
     logger.info(f"Archived quick thought {thought_id}")
 
-    media_url = await _get_media_url(thought.object_key) if thought.object_key else None
+    media_url = _get_media_url(thought.object_key) if thought.object_key else None
     return _thought_to_response(thought, media_url)
 
 
 @router.delete("/{thought_id}")
 @limiter.limit(RateLimits.WRITE_STANDARD)
-async def delete_thought(
+def delete_thought(
     request: Request,
     thought_id: str,
     db: Session = Depends(get_db),
@@ -604,6 +592,7 @@ async def delete_thought(
             local_storage.delete_file(thought.object_key)
         except Exception as e:
             logger.warning(f"Could not delete file {thought.object_key}: {e}")
+        invalidate_presigned_urls(thought.object_key)
 
     db.delete(thought)
     db.commit()
@@ -617,6 +606,17 @@ async def delete_thought(
 # File Serving
 # =============================================================================
 
+def _record_upload_size(db: Session, object_key: str, size_bytes: int) -> None:
+    """Werk de grootte van de gedachte bij na een opgeslagen upload."""
+    parts = object_key.split("/")
+    if len(parts) >= 3:
+        thought_id = parts[2]
+        thought = db.query(QuickThought).filter(QuickThought.id == thought_id).first()
+        if thought:
+            thought.size_bytes = size_bytes
+            db.commit()
+
+
 @router.put("/local-upload/{object_key:path}")
 @limiter.limit(RateLimits.MEDIA_UPLOAD)
 async def local_upload(
@@ -626,36 +626,33 @@ async def local_upload(
 ) -> dict:
     """
     Local storage upload endpoint for quick thoughts.
+
+    Streams the body to disk (app/services/media/ingest.py) after checking
+    the extension, magic bytes and size.
     """
     try:
+        extension = validate_file_extension(object_key.split("/")[-1])
+        safe_object_key = validate_object_key(object_key)
         content_type = request.headers.get("content-type", "")
 
         if "multipart/form-data" in content_type:
             form = await request.form()
             file = form.get("file")
             if file and hasattr(file, "read"):
-                body = await file.read()
+                chunks = form_file_chunks(file)
             else:
                 raise HTTPException(status_code=400, detail="No file in form data")
         else:
-            body = await request.body()
+            chunks = request.stream()
 
-        logger.info(f"Quick thought upload: {len(body)} bytes to {object_key}")
-
-        # Save file
-        file_like = io.BytesIO(body)
-        stored_key = local_storage.save_file(object_key, file_like)
-
-        # Update thought record if we can find it
-        parts = object_key.split("/")
-        if len(parts) >= 3:
-            thought_id = parts[2]
-            thought = db.query(QuickThought).filter(QuickThought.id == thought_id).first()
-            if thought:
-                thought.size_bytes = len(body)
-                db.commit()
+        upload = await ingest_upload(
+            chunks, safe_object_key, extension, content_type or "application/octet-stream", use_s3=False,
+        )
+        logger.info(f"Quick thought upload: {upload.size_bytes} bytes to {upload.object_key}")
 
-        return {"status": "uploaded", "object_key": stored_key}
+        # DB-update is blocking: buiten de event loop uitvoeren
+        await run_in_threadpool(_record_upload_size, db, upload.object_key, upload.size_bytes)
+        return {"status": "uploaded", "object_key": upload.object_key, "sha256": upload.sha256}
 
     except HTTPException:
         raise
@@ -666,7 +663,7 @@ async def local_upload(
 
 @router.get("/file/{object_key:path}")
 @limiter.limit(RateLimits.MEDIA_READ)
-async def serve_file(
+def serve_file(
     request: Request,
     object_key: str,
 ) -> FileResponse:
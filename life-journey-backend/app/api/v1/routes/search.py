@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user
+from app.core.rate_limiter import limiter, RateLimits
+from app.db.session import get_db
+from app.models.journey import Journey
+from app.models.user import User
+from app.schemas.search import SearchHit, SearchKind, SearchResponse
+from app.services.search import search_journey
+
+
+router = APIRouter()
+
+
+@router.get("/{journey_id}", response_model=SearchResponse)
+@limiter.limit(RateLimits.READ_STANDARD)
+def search(
+  request: Request,
+  journey_id: str,
+  q: str = Query(..., min_length=1, max_length=200),
+  kind: list[SearchKind] | None = Query(None),
+  limit: int = Query(20, ge=1, le=50),
+  db: Session = Depends(get_db),
+  current_user: User = Depends(get_current_user),
+) -> SearchResponse:
+  """
+  Doorzoek transcripties, tekstopnames, memo's en quick thoughts van een journey.
+
+  Gerangschikt op relevantie, met een gemarkeerd fragment per treffer;
+  optioneel beperkt tot bepaalde soorten (`kind=memo&kind=transcript`).
+  """
+  owner = db.query(Journey.user_id).filter(Journey.id == journey_id).scalar()
+  if owner is None:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Journey niet gevonden")
+  if owner != current_user.id:
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Geen toegang tot deze journey")
+
+  hits = search_journey(db, journey_id, q, kinds=kind, limit=limit)
+  return SearchResponse(query=q, results=[SearchHit(**hit) for hit in hits])
@@ -12,6 +12,7 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Header, HTTPException, Request
 from loguru import logger
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.db.session import get_db
@@ -111,9 +112,9 @@ async def resend_webhook(
     logger.info(f"Resend webhook received: type={event_type}, email_id={resend_email_id}")
 
     if event_type == "email.bounced":
-        _handle_bounce(db, resend_email_id, data)
+        await run_in_threadpool(_handle_bounce, db, resend_email_id, data)
     elif event_type == "email.complained":
-        _handle_complaint(db, resend_email_id, data)
+        await run_in_threadpool(_handle_complaint, db, resend_email_id, data)
     elif event_type == "email.delivery_delayed":
         logger.warning(f"Delivery delayed for resend_id={resend_email_id}: {data.get('reason', 'unknown')}")
     else:
@@ -232,10 +233,11 @@ async def stripe_webhook(
 
     if event_type == "payment_intent.succeeded":
         data = event["data"]["object"] if isinstance(event, dict) else event.data.object
-        _handle_payment_succeeded(db, data)
+        # DB-werk en e-mails zijn blocking: buiten de event loop uitvoeren
+        await run_in_threadpool(_handle_payment_succeeded, db, data)
     elif event_type == "payment_intent.payment_failed":
         data = event["data"]["object"] if isinstance(event, dict) else event.data.object
-        _handle_payment_failed(db, data)
+        await run_in_threadpool(_handle_payment_failed, db, data)
 
     return {"ok": True}
 
@@ -292,6 +294,17 @@ def _handle_payment_succeeded(db: Session, payment_intent: dict) -> None:
         except Exception as exc:
             logger.warning(f"Kon cadeaubericht-transcriptie niet starten voor order {order.id}: {exc}")
 
+    # Fysiek pakket: bouw het USB-pakket alvast in de achtergrond. Best-effort.
+    try:
+        from app.schemas.orders import PHYSICAL_PACKAGES
+        from app.services.export.usb_package import mark_build_started
+        from app.services.media.processor import enqueue_usb_package_job
+        if order.package_type in PHYSICAL_PACKAGES and enqueue_usb_package_job(order.id):
+            mark_build_started(order, "queued")
+            db.commit()
+    except Exception as exc:
+        logger.warning(f"Kon USB-pakket niet inplannen voor order {order.id}: {exc}")
+
     contact_email = metadata.get("contact_email") or order.guest_email or ""
 
     # Interne verkoopmelding naar de eigenaar (faalt nooit hard)
@@ -48,16 +48,36 @@ class Settings(BaseSettings):
   media_encryption_kms_key: str | None = None
   # Publieke basis-URL voor opgeslagen bestanden (bijv. Cloudflare R2 public dev URL of custom domain)
   s3_public_url: str | None = None
+  # Gedeelde S3-client (app/services/media/storage.py)
+  s3_max_pool_connections: int = 32   # gelijktijdige verbindingen per proces
+  s3_presign_cache_size: int = 4096   # gecachete presigned GET-URL's (0 = uit)
+  # Streamende uploads (app/services/media/ingest.py): deelgrootte voor S3 multipart en schrijfblokken
+  upload_part_size_bytes: int = 8 * 1024 * 1024   # minimaal 5 MB voor S3 multipart
+  # Afspeelversies (app/services/media/transcode.py)
+  transcode_hls_min_seconds: int = 600   # vanaf deze lengte ook HLS-segmenten
 
   # AI/Whisper configuration
   whisper_endpoint: str | None = None
   whisper_model: str = "openai/whisper-large-v3"
   whisper_backend: str = "openrouter"
+  # Transcriptie (app/services/ai/transcriber.py): lange opnames in stukken, parallel
+  transcription_chunk_seconds: int = 600        # max. lengte per Whisper-request
+  transcription_max_concurrency: int = 4        # gelijktijdige Whisper-requests per opname
+  transcription_timeout_seconds: float = 300.0  # per request
   openai_api_base: str = "https://openrouter.ai/api/v1"
   openai_api_key: str | None = None
   openai_model: str = "anthropic/claude-sonnet-4-6"
   openrouter_app_name: str = "Life Journey"
   openrouter_app_url: str = ""
+  # Shared LLM client (app/services/ai/llm_client.py)
+  llm_max_concurrency: int = 8             # parallelle LLM-calls per proces
+  llm_call_timeout_seconds: float = 30.0   # per call
+  llm_latency_budget_seconds: float = 25.0 # totaal voor een fan-out (bijv. memory-extractie)
+  # Journey-memory (app/services/ai/memory.py): herbouw na transcriptie in de achtergrond
+  memory_refresh_debounce_seconds: int = 90   # uploads binnen dit venster delen één rebuild
+  memory_max_staleness_hours: float = 24.0    # oudere cache wordt nog gebruikt, maar ververst
+  # GET /journeys/{id}: geserialiseerde responses per proces (0 = uit; ETag/304 werkt altijd)
+  journey_detail_cache_size: int = 256
 
   # Email (Resend)
   resend_api_key: str | None = None
@@ -99,6 +119,10 @@ class Settings(BaseSettings):
   indexnow_key: str | None = None
   google_service_account_json: str | None = None
 
+  # CDN voor de publieke blog-endpoints: na publiceren de gecachete URL's purgen
+  cloudflare_zone_id: str | None = None
+  cloudflare_api_token: str | None = None
+
   # Machine-publicatie (Agent OS → live). Deze key moet gelijk zijn aan
   # BEWAARDVOORJOU_PUBLISH_KEY in de Agent OS .env. Timing-safe gecheckt.
   publish_api_key: str | None = None
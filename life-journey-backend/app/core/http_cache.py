@@ -0,0 +1,43 @@
+"""Conditionele GET-verzoeken: ETag- en Last-Modified-vergelijking voor 304 Not Modified."""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+  """Weak comparison (RFC 9110 §13.1.2): de W/-prefix telt niet mee."""
+  if not if_none_match:
+    return False
+  if if_none_match.strip() == "*":
+    return True
+  candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+  return etag.removeprefix("W/") in candidates
+
+
+def _as_utc(moment: datetime) -> datetime:
+  # Naive datetimes uit de database zijn UTC
+  return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def http_date(moment: datetime) -> str:
+  """Datum voor Last-Modified, bijv. "Sat, 17 Oct 2026 09:30:00 GMT"."""
+  return format_datetime(_as_utc(moment), usegmt=True)
+
+
+def not_modified(headers, etag: str, last_modified: datetime | None = None) -> bool:
+  """
+  Mag het antwoord 304 zijn? If-None-Match gaat voor; alleen zonder die header
+  telt If-Modified-Since (RFC 9110 §13.2.2). HTTP-datums hebben hele seconden.
+  """
+  if_none_match = headers.get("if-none-match")
+  if if_none_match is not None:
+    return etag_matches(if_none_match, etag)
+  if_modified_since = headers.get("if-modified-since")
+  if not if_modified_since or last_modified is None:
+    return False
+  try:
+    since = parsedate_to_datetime(if_modified_since)
+  except (TypeError, ValueError):
+    return False
+  if since.tzinfo is None:
+    since = since.replace(tzinfo=timezone.utc)
+  return _as_utc(last_modified).replace(microsecond=0) <= since
@@ -1,11 +1,14 @@
 from app.models import base  # noqa: F401
 from app.models.user import User  # noqa: F401
 from app.models.journey import Journey  # noqa: F401
-from app.models.media import MediaAsset, TranscriptSegment, PromptRun  # noqa: F401
+from app.models.media import MediaAsset, MediaPeaks, TranscriptSegment, PromptRun  # noqa: F401
 from app.models.sharing import Highlight, ShareGrant  # noqa: F401
 from app.models.legacy import LegacyPolicy  # noqa: F401
 from app.models.consent import ConsentLog  # noqa: F401
 from app.models.preferences import ChapterPreference  # noqa: F401
+from app.models.chapter_stats import JourneyChapterStats  # noqa: F401
 from app.models.memo import Memo  # noqa: F401
+from app.models.search import SearchDocument  # noqa: F401
+from app.models.blog_post import BlogPost, BlogTag  # noqa: F401
 from app.models.family import FamilyMember, FamilyInvite  # noqa: F401
 from app.models.conversation import ConversationSessionRecord  # noqa: F401
@@ -0,0 +1,56 @@
+"""
+Onderhoud van `blog_tag`, de geïndexeerde vorm van `BlogPost.tags`.
+
+De editor en de publish-API schrijven tags als één kommagescheiden string.
+Na elke flush die een post aanmaakt, zijn tags wijzigt of hem verwijdert,
+worden de (post, tag)-rijen van die post in dezelfde transactie vervangen.
+Zo vindt een tagpagina haar posts via de index op `blog_tag.tag` in plaats
+van met een LIKE over de hele `blogpost`-tabel.
+"""
+from sqlalchemy import delete, event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.blog_post import BlogPost, BlogTag
+
+_TAGS = BlogTag.__table__
+_MAX_TAG_LENGTH = 100
+
+
+def normalize_tag(tag: str) -> str:
+  """Lowercase en zonder spaties: " Familie Geschiedenis " → "familiegeschiedenis"."""
+  return "".join(tag.lower().split())[:_MAX_TAG_LENGTH]
+
+
+def parse_tags(raw: str | None) -> list[str]:
+  """Unieke genormaliseerde tags uit een kommagescheiden string, in volgorde."""
+  tags: list[str] = []
+  for part in (raw or "").split(","):
+    tag = normalize_tag(part)
+    if tag and tag not in tags:
+      tags.append(tag)
+  return tags
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_tags_on_flush(session: Session, flush_context) -> None:
+  posts: dict[str, BlogPost | None] = {}
+  for obj in (*session.new, *session.dirty, *session.deleted):
+    if not isinstance(obj, BlogPost):
+      continue
+    if obj in session.deleted:
+      posts[obj.id] = None
+    elif obj in session.new or inspect(obj).attrs.tags.history.has_changes():
+      posts[obj.id] = obj
+
+  if not posts:
+    return
+
+  connection = session.connection()
+  connection.execute(delete(_TAGS).where(_TAGS.c.post_id.in_(list(posts))))
+  rows = [
+    {"post_id": post_id, "tag": tag}
+    for post_id, post in posts.items() if post is not None
+    for tag in parse_tags(post.tags)
+  ]
+  if rows:
+    connection.execute(_TAGS.insert(), rows)
@@ -0,0 +1,165 @@
+"""
+Onderhoud van `journey_chapter_stats`.
+
+Na elke flush die een MediaAsset aanmaakt, wijzigt (status, hoofdstuk,
+vervanging via `is_current`) of verwijdert, worden de tellers van de geraakte
+(journey, hoofdstuk)-paren opnieuw berekend uit de mediatabel — in dezelfde
+transactie, met één geaggregeerde query. Herberekenen in plaats van +1/-1
+houdt de rij correct bij dubbele flushes en statuswissels.
+
+Twee gelijktijdige transacties op hetzelfde hoofdstuk kunnen elkaars opname
+nog niet zien; `reconcile_chapter_stats` (nachtelijke Celery-taak) trekt zulke
+afwijkingen recht. Bulk-operaties buiten de unit of work roepen zelf
+`refresh_chapter_stats` aan.
+"""
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import case, delete, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.chapter_stats import JourneyChapterStats
+from app.models.media import MediaAsset
+
+_STATS = JourneyChapterStats.__table__
+_COUNTED_STATES = ("ready", "processing")
+_VALUE_COLUMNS = (
+  "media_count", "ready_count", "video_count", "audio_count", "text_count",
+  "duration_seconds", "last_recorded_at",
+)
+
+
+def _aggregate():
+  counted = MediaAsset.storage_state.in_(_COUNTED_STATES)
+
+  def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+  return (
+    select(
+      MediaAsset.journey_id,
+      MediaAsset.chapter_id,
+      func.count(MediaAsset.id),
+      _count_if(counted),
+      _count_if(counted & (MediaAsset.modality == "video")),
+      _count_if(counted & (MediaAsset.modality == "audio")),
+      _count_if(counted & (MediaAsset.modality == "text")),
+      func.coalesce(func.sum(case((counted, MediaAsset.duration_seconds), else_=0)), 0),
+      func.max(case((counted, MediaAsset.recorded_at), else_=None)),
+    )
+    .group_by(MediaAsset.journey_id, MediaAsset.chapter_id)
+  )
+
+
+def _computed(
+  db, journey_ids: Iterable[str] | None = None, chapter_ids: Iterable[str] | None = None,
+) -> dict[tuple[str, str], dict]:
+  query = _aggregate()
+  if journey_ids is not None:
+    query = query.where(MediaAsset.journey_id.in_(list(journey_ids)))
+  if chapter_ids is not None:
+    query = query.where(MediaAsset.chapter_id.in_(list(chapter_ids)))
+  return {
+    (row[0], row[1]): {
+      **dict(zip(_VALUE_COLUMNS[:-1], (int(v or 0) for v in row[2:8]))),
+      "last_recorded_at": row[8],
+    }
+    for row in db.execute(query).all()
+  }
+
+
+def _upsert(db, rows: list[dict]) -> None:
+  if not rows:
+    return
+  dialect = db.get_bind().dialect.name if isinstance(db, Session) else db.dialect.name
+  now = datetime.now(timezone.utc)
+  rows = [{**row, "updated_at": now} for row in rows]
+  if dialect in ("postgresql", "sqlite"):
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(_STATS)
+    db.execute(
+      stmt.on_conflict_do_update(
+        index_elements=[_STATS.c.journey_id, _STATS.c.chapter_id],
+        set_={name: stmt.excluded[name] for name in (*_VALUE_COLUMNS, "updated_at")},
+      ),
+      rows,
+    )
+    return
+  for row in rows:
+    db.execute(delete(_STATS).where(
+      _STATS.c.journey_id == row["journey_id"], _STATS.c.chapter_id == row["chapter_id"],
+    ))
+  db.execute(_STATS.insert(), rows)
+
+
+def _delete_keys(db, keys: Iterable[tuple[str, str]]) -> None:
+  for journey_id, chapter_id in keys:
+    db.execute(delete(_STATS).where(
+      _STATS.c.journey_id == journey_id, _STATS.c.chapter_id == chapter_id,
+    ))
+
+
+def refresh_chapter_stats(db, keys: Iterable[tuple[str, str]]) -> None:
+  """Herbereken de tellers van de gegeven (journey_id, chapter_id)-paren."""
+  keys = {key for key in keys if key[0] and key[1]}
+  if not keys:
+    return
+  computed = _computed(db, {key[0] for key in keys}, {key[1] for key in keys})
+  _upsert(db, [
+    {"journey_id": key[0], "chapter_id": key[1], **computed[key]}
+    for key in keys if key in computed
+  ])
+  # Laatste opname weg: rij verwijderen (ook als de journey zelf net verwijderd is)
+  _delete_keys(db, [key for key in keys if key not in computed])
+
+
+def reconcile_chapter_stats(db: Session, journey_ids: Iterable[str] | None = None) -> int:
+  """
+  Vergelijk de tellers met de mediatabel en herstel afwijkingen.
+
+  Geeft het aantal gecorrigeerde rijen terug; committen is aan de aanroeper.
+  """
+  ids = list(journey_ids) if journey_ids is not None else None
+  computed = _computed(db, ids)
+  query = select(_STATS)
+  if ids is not None:
+    query = query.where(_STATS.c.journey_id.in_(ids))
+  stored = {
+    (row.journey_id, row.chapter_id): {name: getattr(row, name) for name in _VALUE_COLUMNS}
+    for row in db.execute(query).all()
+  }
+
+  changed = [
+    {"journey_id": key[0], "chapter_id": key[1], **values}
+    for key, values in computed.items()
+    if stored.get(key) != values
+  ]
+  stale = [key for key in stored if key not in computed]
+  _upsert(db, changed)
+  _delete_keys(db, stale)
+  return len(changed) + len(stale)
+
+
+def _touched_keys(session: Session) -> set[tuple[str, str]]:
+  keys: set[tuple[str, str]] = set()
+  for obj in (*session.new, *session.dirty, *session.deleted):
+    if not isinstance(obj, MediaAsset):
+      continue
+    if obj in session.dirty and not session.is_modified(obj):
+      continue
+    keys.add((obj.journey_id, obj.chapter_id))
+    if obj in session.dirty:
+      # Verplaatst naar een ander hoofdstuk/journey: ook de oude rij bijwerken
+      state = inspect(obj)
+      old_journeys = state.attrs.journey_id.history.deleted or [obj.journey_id]
+      old_chapters = state.attrs.chapter_id.history.deleted or [obj.chapter_id]
+      keys.update((j, c) for j in old_journeys for c in old_chapters)
+  return keys
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_on_flush(session: Session, flush_context) -> None:
+  keys = _touched_keys(session)
+  if keys:
+    refresh_chapter_stats(session.connection(), keys)
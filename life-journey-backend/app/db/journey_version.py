@@ -0,0 +1,82 @@
+"""
+Per-journey contentversie voor GET /journeys/{id}.
+
+`Journey.content_version` wordt opgehoogd bij elke wijziging aan data die in
+het journey-detail terechtkomt: media en transcripties, prompt runs,
+highlights, share grants, consent, hoofdstukvoorkeuren, legacy policy, de
+journey zelf en de profielvelden van de eigenaar. De route gebruikt de versie
+als (weak) ETag en als sleutel voor de response-cache, zodat een herbezoek
+zonder wijzigingen één kleine lookup kost.
+
+Wijzigingen via de unit of work worden automatisch opgepikt (before_flush).
+Bulk-operaties (`query(...).delete()`, `bulk_save_objects`) gaan buiten de
+flush om; roep daar zelf `bump_journey_version` aan.
+"""
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session
+
+from app.models.consent import ConsentLog
+from app.models.journey import Journey
+from app.models.legacy import LegacyPolicy
+from app.models.media import MediaAsset, PromptRun, TranscriptSegment
+from app.models.preferences import ChapterPreference
+from app.models.sharing import Highlight, ShareGrant
+from app.models.user import User
+
+# Modellen met een journey_id die in het journey-detail zichtbaar zijn
+_JOURNEY_CHILDREN = (MediaAsset, PromptRun, Highlight, ShareGrant, ConsentLog, ChapterPreference, LegacyPolicy)
+
+# Profielvelden van de eigenaar die in JourneyDetail.owner staan
+_OWNER_FIELDS = (
+  "display_name", "email", "locale", "country", "birth_year", "privacy_level",
+  "target_recipients", "deadline_label", "deadline_at", "captions", "high_contrast", "large_text",
+)
+
+
+def bump_journey_version(db: Session, *journey_ids: str) -> None:
+  """Hoog de contentversie van de gegeven journeys op (in de lopende transactie)."""
+  ids = [journey_id for journey_id in dict.fromkeys(journey_ids) if journey_id]
+  if not ids:
+    return
+  db.execute(
+    update(Journey)
+    .where(Journey.id.in_(ids))
+    .values(content_version=Journey.content_version + 1)
+    .execution_options(synchronize_session=False)
+  )
+
+
+def _owner_changed(user: User) -> bool:
+  state = inspect(user)
+  return any(state.attrs[name].history.has_changes() for name in _OWNER_FIELDS)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_on_flush(session: Session, flush_context, instances) -> None:
+  journey_ids: set[str] = set()
+  owner_ids: set[str] = set()
+
+  for obj in (*session.new, *session.dirty, *session.deleted):
+    if obj in session.dirty and not session.is_modified(obj):
+      continue
+    if isinstance(obj, _JOURNEY_CHILDREN):
+      journey_ids.add(obj.journey_id)
+    elif isinstance(obj, TranscriptSegment):
+      asset = session.get(MediaAsset, obj.media_asset_id)
+      if asset is not None:
+        journey_ids.add(asset.journey_id)
+    elif isinstance(obj, Journey):
+      if obj not in session.new and obj not in session.deleted:
+        journey_ids.add(obj.id)
+    elif isinstance(obj, User):
+      if obj in session.dirty and _owner_changed(obj):
+        owner_ids.add(obj.id)
+
+  bump_journey_version(session, *journey_ids)
+  if owner_ids:
+    session.execute(
+      update(Journey)
+      .where(Journey.user_id.in_(owner_ids))
+      .values(content_version=Journey.content_version + 1)
+      .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,176 @@
+"""
+Onderhoud van de zoekindex (`searchdocument`).
+
+Na elke flush worden de documenten van geraakte bronnen bijgewerkt, in
+dezelfde transactie en alleen voor wat er veranderde:
+
+  • TranscriptSegment aangemaakt/gewijzigd/verwijderd → dat ene segment
+    (generate_transcript schrijft zo zijn segmenten meteen in de index)
+  • MediaAsset met gewijzigde tekst, versie of hoofdstuk → de tekstopname;
+    verwijderd → alle documenten van de opname
+  • Memo en QuickThought → het document van die memo of gedachte
+
+De tekst zelf wordt door de database geïndexeerd (tsvector-kolom of FTS5,
+zie app/models/search.py). Bulk-operaties buiten de unit of work en
+bestaande data gaan via `reindex_journey`.
+"""
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import delete, event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models.media import MediaAsset, TranscriptSegment
+from app.models.memo import Memo
+from app.models.quick_thought import QuickThought
+from app.models.search import SearchDocument
+
+_DOCS = SearchDocument.__table__
+# Velden waarvan een wijziging het document van een opname raakt
+_ASSET_FIELDS = ("text_content", "is_current", "chapter_id", "journey_id")
+
+
+def _text_document(asset: MediaAsset) -> dict | None:
+  if asset.modality != "text" or asset.is_current is False or not (asset.text_content or "").strip():
+    return None
+  return {
+    "journey_id": asset.journey_id, "kind": "text", "source_id": asset.id, "media_asset_id": asset.id,
+    "chapter_id": asset.chapter_id, "start_ms": None, "title": None, "body": asset.text_content,
+  }
+
+
+def _segment_document(segment: TranscriptSegment, asset) -> dict | None:
+  if asset is None or not (segment.text or "").strip():
+    return None
+  return {
+    "journey_id": asset.journey_id, "kind": "transcript", "source_id": segment.id,
+    "media_asset_id": segment.media_asset_id, "chapter_id": asset.chapter_id,
+    "start_ms": segment.start_ms, "title": None, "body": segment.text,
+  }
+
+
+def _memo_document(memo: Memo) -> dict | None:
+  if not (memo.content or "").strip() and not (memo.title or "").strip():
+    return None
+  return {
+    "journey_id": memo.journey_id, "kind": "memo", "source_id": memo.id, "media_asset_id": None,
+    "chapter_id": memo.chapter_id, "start_ms": None, "title": memo.title, "body": memo.content or "",
+  }
+
+
+def _thought_document(thought: QuickThought) -> dict | None:
+  if thought.archived_at is not None or not (thought.transcript or "").strip():
+    return None
+  return {
+    "journey_id": thought.journey_id, "kind": "quick_thought", "source_id": thought.id, "media_asset_id": None,
+    "chapter_id": thought.chapter_id, "start_ms": None, "title": thought.title, "body": thought.transcript,
+  }
+
+
+def _insert(db, documents: Iterable[dict | None]) -> int:
+  now = datetime.now(timezone.utc)
+  rows = [{**doc, "updated_at": now} for doc in documents if doc is not None]
+  if rows:
+    db.execute(_DOCS.insert(), rows)
+  return len(rows)
+
+
+def _replace(db, kind: str, source_ids: Iterable[str], documents: Iterable[dict | None]) -> None:
+  """Vervang de documenten van `source_ids` door `documents` (lege worden overgeslagen)."""
+  ids = list(source_ids)
+  if ids:
+    db.execute(delete(_DOCS).where(_DOCS.c.kind == kind, _DOCS.c.source_id.in_(ids)))
+  _insert(db, documents)
+
+
+def _changed(session: Session, obj, fields: Iterable[str] | None = None) -> bool:
+  if obj in session.new or obj in session.deleted:
+    return True
+  if not session.is_modified(obj):
+    return False
+  if fields is None:
+    return True
+  state = inspect(obj)
+  return any(state.attrs[name].history.has_changes() for name in fields)
+
+
+def reindex_journey(db, journey_id: str) -> int:
+  """Bouw alle documenten van een journey opnieuw op; geeft het aantal terug. Committen is aan de aanroeper."""
+  db.execute(delete(_DOCS).where(_DOCS.c.journey_id == journey_id))
+  documents: list[dict | None] = []
+  assets = {
+    asset.id: asset
+    for asset in db.execute(select(MediaAsset).where(MediaAsset.journey_id == journey_id)).scalars()
+  }
+  documents += [_text_document(asset) for asset in assets.values()]
+  if assets:
+    segments = db.execute(
+      select(TranscriptSegment).where(TranscriptSegment.media_asset_id.in_(list(assets)))
+    ).scalars()
+    documents += [_segment_document(segment, assets[segment.media_asset_id]) for segment in segments]
+  documents += [
+    _memo_document(memo) for memo in db.execute(select(Memo).where(Memo.journey_id == journey_id)).scalars()
+  ]
+  documents += [
+    _thought_document(thought)
+    for thought in db.execute(select(QuickThought).where(QuickThought.journey_id == journey_id)).scalars()
+  ]
+  return _insert(db, documents)
+
+
+@event.listens_for(Session, "after_flush")
+def _index_on_flush(session: Session, flush_context) -> None:
+  segments: dict[str, TranscriptSegment | None] = {}
+  text_assets: dict[str, MediaAsset] = {}
+  moved_assets: list[MediaAsset] = []
+  deleted_assets: list[str] = []
+  memos: dict[str, Memo | None] = {}
+  thoughts: dict[str, QuickThought | None] = {}
+
+  for obj in (*session.new, *session.dirty, *session.deleted):
+    removed = obj in session.deleted
+    if isinstance(obj, TranscriptSegment) and _changed(session, obj, ("text", "start_ms", "media_asset_id")):
+      segments[obj.id] = None if removed else obj
+    elif isinstance(obj, MediaAsset):
+      if removed:
+        deleted_assets.append(obj.id)
+      elif obj in session.new:
+        if obj.modality == "text":
+          text_assets[obj.id] = obj
+      elif _changed(session, obj, _ASSET_FIELDS):
+        text_assets[obj.id] = obj
+        if _changed(session, obj, ("chapter_id", "journey_id")):
+          moved_assets.append(obj)
+    elif isinstance(obj, Memo) and _changed(session, obj):
+      memos[obj.id] = None if removed else obj
+    elif isinstance(obj, QuickThought) and _changed(session, obj):
+      thoughts[obj.id] = None if removed else obj
+
+  if not (segments or text_assets or deleted_assets or memos or thoughts):
+    return
+
+  connection = session.connection()
+  if deleted_assets:
+    connection.execute(delete(_DOCS).where(_DOCS.c.media_asset_id.in_(deleted_assets)))
+  for asset in moved_assets:
+    # Transcriptsegmenten van een verplaatste opname verhuizen mee
+    connection.execute(
+      update(_DOCS)
+      .where(_DOCS.c.media_asset_id == asset.id)
+      .values(journey_id=asset.journey_id, chapter_id=asset.chapter_id)
+    )
+  if text_assets:
+    _replace(connection, "text", text_assets, (_text_document(asset) for asset in text_assets.values()))
+  if segments:
+    asset_ids = {segment.media_asset_id for segment in segments.values() if segment is not None}
+    assets = {asset_id: session.get(MediaAsset, asset_id) for asset_id in asset_ids}
+    _replace(connection, "transcript", segments, (
+      _segment_document(segment, assets.get(segment.media_asset_id))
+      for segment in segments.values() if segment is not None
+    ))
+  if memos:
+    _replace(connection, "memo", memos, (_memo_document(memo) for memo in memos.values() if memo is not None))
+  if thoughts:
+    _replace(connection, "quick_thought", thoughts, (
+      _thought_document(thought) for thought in thoughts.values() if thought is not None
+    ))
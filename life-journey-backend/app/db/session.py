@@ -4,6 +4,10 @@ from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 from app.db import base  # noqa: F401 ensure models are imported before metadata creation
+from app.db import blog_tags  # noqa: F401 registers the blog_tag listener
+from app.db import chapter_stats  # noqa: F401 registers the journey_chapter_stats listener
+from app.db import journey_version  # noqa: F401 registers the journey content-version listener
+from app.db import search_index  # noqa: F401 registers the search index listener
 from app.models.base import Base
 
 
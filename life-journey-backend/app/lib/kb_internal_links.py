@@ -21,6 +21,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Iterable
 
 
@@ -96,13 +97,33 @@ KB_ANCHORS: list[KbAnchor] = [
 # ---------------------------------------------------------------------------
 # Injector
 # ---------------------------------------------------------------------------
+# Alle ankers staan in één voorgecompileerde automaat (`_KbMatcher`): een
+# trie van de frases als één regex, die per blok in één keer alle
+# voorkomens van alle frases vindt. Daarna worden de ankers in de volgorde
+# van de map afgehandeld, precies zoals de oorspronkelijke per-anker-lus
+# (`_inject_block_sequential`) dat deed: zelfde woordgrenzen, zelfde
+# `require`- en al-gelinkt-controles, zelfde uitvoer. In de zeldzame gevallen
+# waar eerder geïnjecteerde markup een latere match zou beïnvloeden (frase
+# binnen of direct naast een nieuwe link) valt het blok terug op die lus.
+# ---------------------------------------------------------------------------
 
 # Verbied matching binnen deze tags (koppen, code, bestaande links, quotes
 # die we met rust laten). We matchen alleen binnen <p>...</p> en <li>...</li>.
 _PARA_RE = re.compile(r"(<(p|li)\b[^>]*>)(.*?)(</\2>)", re.IGNORECASE | re.DOTALL)
 # Een bestaande <a>-tag met href (om te zien of het doel al gelinkt is).
 _LINK_HREF_RE = re.compile(r'href=["\']([^"\']+)["\']', re.IGNORECASE)
+_A_TAG_RE = re.compile(r"<a\b[^>]*>", re.IGNORECASE)
+_OPEN_A_TAG_RE = re.compile(r"<a\b[^>]*$", re.IGNORECASE)
+_ANY_TAG_RE = re.compile(r"<[^>]*>")
+# Tekens die een woordgrens blokkeren (zelfde als de lookarounds in _phrase_re)
+_BOUNDARY_BLOCKER_RE = re.compile(r"[\w/]")
+# Frases met deze tekens kunnen met markup overlappen; die gaan altijd via de lus
+_MARKUP_CHARS = set("<>\"'&=")
+_KENNISBANK = "/kennisbank/"
+
+
 # Woordgrens-safe phrase-match (case-insensitive).
+@lru_cache(maxsize=512)
 def _phrase_re(phrase: str) -> re.Pattern:
     esc = re.escape(phrase)
     return re.compile(rf"(?<![\w/]){esc}(?![\w/])", re.IGNORECASE)
@@ -110,13 +131,198 @@ def _phrase_re(phrase: str) -> re.Pattern:
 
 def _already_linked_to(text: str, target_slug: str) -> bool:
     """True als `text` al een <a href='.../kennisbank/<target_slug>'> bevat."""
-    for m in re.finditer(r"<a\b[^>]*>", text, re.IGNORECASE):
+    for m in _A_TAG_RE.finditer(text):
         href = _LINK_HREF_RE.search(m.group(0))
-        if href and href.group(1).rstrip("/").endswith(f"/kennisbank/{target_slug}"):
+        if href and href.group(1).rstrip("/").endswith(f"{_KENNISBANK}{target_slug}"):
             return True
     return False
 
 
+def _link(anchor: KbAnchor, text: str) -> str:
+    return f'<a href="{_KENNISBANK}{anchor.target}">{text}</a>'
+
+
+def _inject_block_sequential(inner: str, anchors: list[KbAnchor], max_per_anchor: int) -> str:
+    """Referentie-implementatie: elk anker apart over de (steeds bijgewerkte) bloktekst."""
+    out = inner
+    for anchor in anchors:
+        if _already_linked_to(out, anchor.target):
+            continue
+        if anchor.require and anchor.require.lower() not in out.lower():
+            continue
+        out = _phrase_re(anchor.anchor).sub(lambda m, _a=anchor: _link(_a, m.group(0)), out, count=max_per_anchor)
+    return out
+
+
+def _trie_pattern(keys: Iterable[str]) -> str:
+    """Eén regex voor alle frases, gefactoriseerd op gemeenschappelijke prefixen; langste eerst."""
+    trie: dict = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _plain_case(phrase: str) -> bool:
+    """Frase waarvan .lower() precies overeenkomt met wat re.IGNORECASE als gelijk ziet."""
+    return all(len(ch.lower()) == 1 and ch.upper().lower() == ch.lower() for ch in phrase)
+
+
+class _KbMatcher:
+    """Voorgecompileerde matcher voor een vaste reeks ankers."""
+
+    def __init__(self, anchors: tuple[KbAnchor, ...]):
+        self.anchors = anchors
+        keys = list(dict.fromkeys(anchor.anchor.lower() for anchor in anchors))
+        # De snelle weg alleen als hij gegarandeerd hetzelfde doet als de lus
+        self.exact = bool(keys) and all(
+            anchor.anchor
+            and _plain_case(anchor.anchor)
+            and not _MARKUP_CHARS & set(anchor.anchor)
+            and not (anchor.require and _MARKUP_CHARS & set(anchor.require))
+            and "/" not in anchor.target
+            for anchor in anchors
+        )
+        self._keys = set(keys)
+        # Bij elke positie vindt de trie de langste frase; kortere frases die
+        # daar ook beginnen zijn er een prefix van
+        self._shorter = {key: [other for other in keys if other != key and key.startswith(other)] for key in keys}
+        self._scan = re.compile(f"(?=({_trie_pattern(keys)}))", re.IGNORECASE) if self.exact else None
+        # (anker, doel) waarbij de frase binnen een geïnjecteerde <a>-tag naar dat doel zou matchen
+        targets = {anchor.target for anchor in anchors}
+        self._matches_in_tag = {
+            (anchor, target)
+            for anchor in anchors
+            for target in targets
+            if target != anchor.target
+            and _phrase_re(anchor.anchor).search(f'<a href="{_KENNISBANK}{target}"></a>')
+        }
+
+    def _occurrences(self, inner: str) -> dict[str, list[int]] | None:
+        found: dict[str, list[int]] = {}
+        for m in self._scan.finditer(inner):
+            key = m.group(1).lower()
+            if key not in self._keys:
+                return None
+            found.setdefault(key, []).append(m.start())
+            for shorter in self._shorter[key]:
+                found.setdefault(shorter, []).append(m.start())
+        return found
+
+    def inject_block(self, inner: str, anchors: list[KbAnchor], max_per_anchor: int) -> str:
+        if not self.exact or _OPEN_A_TAG_RE.search(inner):
+            return _inject_block_sequential(inner, anchors, max_per_anchor)
+        found = self._occurrences(inner)
+        if found is None:
+            return _inject_block_sequential(inner, anchors, max_per_anchor)
+        if not found:
+            return inner
+
+        # re.sub: count=0 is onbeperkt, een negatieve count vervangt niets
+        limit = max_per_anchor if max_per_anchor > 0 else (len(inner) + 1 if max_per_anchor == 0 else 0)
+        tags = [(tag.start(), tag.end()) for tag in _ANY_TAG_RE.finditer(inner)]
+        linked: set[str] = set()
+        for tag in _A_TAG_RE.finditer(inner):
+            href = _LINK_HREF_RE.search(tag.group(0))
+            if href:
+                link = href.group(1).rstrip("/")
+                cut = link.rfind(_KENNISBANK)
+                if cut >= 0:
+                    linked.add(link[cut + len(_KENNISBANK):])
+
+        # Geïnjecteerde links als (begin, eind, anker) in posities van `inner`
+        spans: list[tuple[int, int, KbAnchor]] = []
+        current: str | None = inner
+
+        for anchor in anchors:
+            if anchor.target in linked:
+                continue
+            if any((anchor, other.target) in self._matches_in_tag for _, _, other in spans):
+                return _inject_block_sequential(inner, anchors, max_per_anchor)
+            starts = found.get(anchor.anchor.lower())
+            if not starts:
+                continue
+            if anchor.require:
+                if current is None:
+                    current = self._render(inner, spans)
+                if anchor.require.lower() not in current.lower():
+                    continue
+
+            accepted: list[tuple[int, int, KbAnchor]] = []
+            last_end = 0
+            for start in sorted(set(starts)):
+                if len(accepted) >= limit:
+                    break
+                end = start + len(anchor.anchor)
+                if start < last_end:
+                    continue
+                if any(tag_start < end and start < tag_end for tag_start, tag_end in tags):
+                    # Binnen bestaande markup (bijv. een attribuut): laat de lus het afhandelen
+                    return _inject_block_sequential(inner, anchors, max_per_anchor)
+                verdict = self._place(inner, start, end, spans)
+                if verdict is None:
+                    return _inject_block_sequential(inner, anchors, max_per_anchor)
+                if verdict:
+                    accepted.append((start, end, anchor))
+                    last_end = end
+            if accepted:
+                spans = sorted(spans + accepted, key=lambda span: span[0])
+                linked.add(anchor.target)
+                current = None
+
+        return self._render(inner, spans)
+
+    @staticmethod
+    def _place(inner: str, start: int, end: int, spans: list[tuple[int, int, KbAnchor]]) -> bool | None:
+        """
+        Zou de lus hier matchen? True/False, of None als het antwoord van de
+        eerder ingevoegde markup afhangt (frase valt binnen een nieuwe link).
+        """
+        before = inner[start - 1] if start else ""
+        after = inner[end] if end < len(inner) else ""
+        for span_start, span_end, _ in spans:
+            if start < span_end and end > span_start:
+                if span_start <= start and end <= span_end:
+                    inside_before = ">" if start == span_start else before
+                    inside_after = "<" if end == span_end else after
+                    if not _BOUNDARY_BLOCKER_RE.match(inside_before or " ") and not _BOUNDARY_BLOCKER_RE.match(inside_after or " "):
+                        return None
+                # Half over een nieuwe link: daar staat nu markup, geen match
+                return False
+            # Direct na "</a>" of direct voor "<a ...>" is er wél een woordgrens
+            if start == span_end:
+                before = ">"
+            if end == span_start:
+                after = "<"
+        return not _BOUNDARY_BLOCKER_RE.match(before or " ") and not _BOUNDARY_BLOCKER_RE.match(after or " ")
+
+    @staticmethod
+    def _render(inner: str, spans: list[tuple[int, int, KbAnchor]]) -> str:
+        parts: list[str] = []
+        cursor = 0
+        for start, end, anchor in spans:
+            parts.append(inner[cursor:start])
+            parts.append(_link(anchor, inner[start:end]))
+            cursor = end
+        parts.append(inner[cursor:])
+        return "".join(parts)
+
+
+@lru_cache(maxsize=16)
+def _matcher_for(anchors: tuple[KbAnchor, ...]) -> _KbMatcher:
+    return _KbMatcher(anchors)
+
+
 def inject_kb_internal_links(
     html: str,
     anchors: Iterable[KbAnchor] | None = None,
@@ -132,32 +338,12 @@ def inject_kb_internal_links(
     - Per (anchor, target) wordt standaard hooguit 1x gelinkt (de eerste
       natuurlijke positie), zodat de tekst leesbaar blijft.
     """
-    anchors = list(anchors if anchors is not None else KB_ANCHORS)
-    if exclude_slug:
-        anchors = [a for a in anchors if a.target != exclude_slug]
+    matcher = _matcher_for(tuple(anchors if anchors is not None else KB_ANCHORS))
+    active = [a for a in matcher.anchors if a.target != exclude_slug] if exclude_slug else list(matcher.anchors)
 
     def _replace_block(match: re.Match) -> str:
         open_tag, _, inner, close_tag = match.groups()
-        # Sla blokken over die al een link naar een van onze doelen bevatten
-        # (voorkomt dubbele injectie in gemengde content).
-        out = inner
-        for anchor in anchors:
-            if _already_linked_to(out, anchor.target):
-                continue
-            if anchor.require and anchor.require.lower() not in out.lower():
-                continue
-            href = f"/kennisbank/{anchor.target}"
-            # Injecteer hooguit max_per_anchor keer.
-            repl = (
-                lambda m, _h=href, _a=anchor.anchor:  # noqa: E731
-                f'<a href="{_h}">{m.group(0)}</a>'
-            )
-            out, n = _phrase_re(anchor.anchor).subn(repl, out, count=max_per_anchor)
-            if n:
-                # één anchor per blok volstaat voor leesbaarheid; break niet
-                # strikt nodig maar houdt het conservatief.
-                pass
-        return f"{open_tag}{out}{close_tag}"
+        return f"{open_tag}{matcher.inject_block(inner, active, max_per_anchor)}{close_tag}"
 
     return _PARA_RE.sub(_replace_block, html)
 
@@ -85,7 +85,7 @@ def create_app() -> FastAPI:
   )
 
   @app.get("/healthz", tags=["system"], summary="Lightweight health probe")
-  async def healthz() -> dict[str, str]:
+  def healthz() -> dict[str, str]:
     from app.core.health_cache import db_healthy
     from app.db.session import SessionLocal
     db = SessionLocal()
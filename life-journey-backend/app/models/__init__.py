@@ -1,7 +1,7 @@
 """SQLAlchemy model package for Life Journey."""
 
 from app.models.audit_log import AuditLog  # noqa: F401 — ensures Alembic picks up the model
-from app.models.memory_cache import JourneyMemoryCache  # noqa: F401
+from app.models.memory_cache import AssetMemory, JourneyMemoryCache  # noqa: F401
 from app.models.waitlist import WaitlistEntry  # noqa: F401
 from app.models.promo_code import PromoCode  # noqa: F401
 from app.models.support_ticket import SupportTicket, TicketMessage  # noqa: F401
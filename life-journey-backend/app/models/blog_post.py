@@ -2,7 +2,7 @@
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 
 from app.models.base import Base
 
@@ -48,6 +48,7 @@ class BlogPost(Base):
     meta_description = Column(String(160), nullable=True)
     og_image = Column(String(512), nullable=True)
     keywords = Column(String(500), nullable=True)
+    # Kommagescheiden zoals de editor ze toont; genormaliseerd gespiegeld in blog_tag
     tags = Column(String(500), nullable=True)
 
     # Podcast / NotebookLM audio
@@ -95,3 +96,21 @@ class BlogPost(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class BlogTag(Base):
+    """
+    Eén (post, tag)-paar: de genormaliseerde vorm van `BlogPost.tags`.
+
+    Bijgehouden door de listener in app/db/blog_tags.py, zodat tagpagina's
+    via de index op `tag` zoeken in plaats van met LIKE door alle posts.
+    """
+    __tablename__ = "blog_tag"
+
+    post_id = Column(String(36), ForeignKey("blogpost.id", ondelete="CASCADE"), primary_key=True)
+    # Lowercase, zonder spaties (zie app.db.blog_tags.normalize_tag)
+    tag = Column(String(100), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_blog_tag_tag", "tag", "post_id"),
+    )
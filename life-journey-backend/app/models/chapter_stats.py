@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from app.models.base import Base
+
+
+def _utc_now() -> datetime:
+  return datetime.now(timezone.utc)
+
+
+class JourneyChapterStats(Base):
+  """
+  Bijgehouden tellers per (journey, hoofdstuk), afgeleid van MediaAsset.
+
+  Geschreven in dezelfde transactie als de opname zelf (zie
+  app/db/chapter_stats.py) en 's nachts gereconcilieerd. Voortgang,
+  ontgrendeling, hoofdstuk-limiet en tijdlijn lezen deze rijen in plaats van
+  de mediatabel te aggregeren.
+  """
+  __tablename__ = "journey_chapter_stats"
+
+  journey_id = Column(String, ForeignKey("journey.id", ondelete="CASCADE"), primary_key=True)
+  chapter_id = Column(String(32), primary_key=True)
+  # Alle opnames, ongeacht status (voortgang en hoofdstuk-limiet)
+  media_count = Column(Integer, nullable=False, default=0)
+  # Alleen opnames in "ready"/"processing" (tijdlijn)
+  ready_count = Column(Integer, nullable=False, default=0)
+  video_count = Column(Integer, nullable=False, default=0)
+  audio_count = Column(Integer, nullable=False, default=0)
+  text_count = Column(Integer, nullable=False, default=0)
+  duration_seconds = Column(Integer, nullable=False, default=0)
+  last_recorded_at = Column(DateTime, nullable=True)
+  updated_at = Column(DateTime, nullable=False, default=_utc_now)
@@ -3,7 +3,7 @@ from datetime import datetime, timezone
 def utc_now():
     """Returns current UTC time as timezone-aware datetime."""
     return datetime.now(timezone.utc)
-from sqlalchemy import Column, DateTime, ForeignKey, JSON, String
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -16,6 +16,8 @@ class Journey(Base):
   progress = Column(JSON, nullable=False, default=lambda: {})
   created_at = Column(DateTime, default=utc_now, nullable=False)
   updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
+  # Opgehoogd bij elke wijziging die in GET /journeys/{id} zichtbaar is (zie app/db/journey_version.py)
+  content_version = Column(Integer, nullable=False, default=0, server_default="0")
 
   # Relationships for eager loading (performance optimization)
   user = relationship("User", backref="journeys")
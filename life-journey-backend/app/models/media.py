@@ -3,9 +3,9 @@ from datetime import datetime, timezone
 def utc_now():
     """Returns current UTC time as timezone-aware datetime."""
     return datetime.now(timezone.utc)
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, JSON, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, JSON, LargeBinary, String
 import sqlalchemy as sa
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from app.models.base import Base
 
@@ -29,6 +29,22 @@ class MediaAsset(Base):
   # Superseded saves point replaced_by at the newer asset id and is_current=False.
   is_current = Column(Boolean, nullable=False, default=True, index=False)
   replaced_by = Column(String, nullable=True)
+  # Materialised transcript: written once per transcription by generate_transcript.
+  # Readers use this instead of joining TranscriptSegment rows; the segments are
+  # only needed for time-aligned views (highlights, PDF quotes). Deferred so
+  # listings don't drag the text along; readers undefer() it or go through
+  # app.services.media.transcripts.texts_for_assets.
+  full_transcript = deferred(Column(sa.Text, nullable=True))
+  transcript_word_count = Column(Integer, nullable=True)
+  transcript_language = Column(String(8), nullable=True)
+  transcript_version = Column(Integer, nullable=False, default=0, server_default="0")
+  # Direct-to-bucket multipart upload in progress (app/services/media/multipart.py);
+  # cleared by /complete once the parts are verified and assembled.
+  upload_id = Column(String, nullable=True)
+  upload_part_size = Column(Integer, nullable=True)
+  # Afspeelversies naast het origineel (app/services/media/transcode.py):
+  # naam -> {key, content_type, size_bytes, full_quality}
+  renditions = Column(JSON, nullable=True)
 
   __table_args__ = (
     sa.Index(
@@ -51,6 +67,17 @@ class TranscriptSegment(Base):
   emotion_hint = Column(String(32), nullable=True)
 
 
+class MediaPeaks(Base):
+  # Golfvorm per opname (app/services/media/peaks.py), audiowaveform .dat met 8-bit peaks.
+  # Apart van MediaAsset zodat lijstqueries de blob niet meeladen.
+  media_asset_id = Column(String, ForeignKey("mediaasset.id", ondelete="CASCADE"), primary_key=True)
+  sample_rate = Column(Integer, nullable=False)
+  samples_per_peak = Column(Integer, nullable=False)
+  length = Column(Integer, nullable=False)
+  data = Column(LargeBinary, nullable=False)
+  created_at = Column(DateTime, default=utc_now, nullable=False)
+
+
 class PromptRun(Base):
   id = Column(String, primary_key=True)
   journey_id = Column(String, ForeignKey("journey.id", ondelete="CASCADE"), nullable=False, index=True)
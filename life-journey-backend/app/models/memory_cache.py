@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, Text
 
 from app.models.base import Base
 
@@ -15,3 +15,22 @@ class JourneyMemoryCache(Base):
     memory_json = Column(Text, nullable=False)
     built_at = Column(DateTime, nullable=False, default=_utc_now)
     chapters_included = Column(Integer, nullable=False, default=0)
+
+
+class AssetMemory(Base):
+    """
+    AI-extracted memory for a single recording: summary and entities.
+
+    Built once per transcript. JourneyMemory is assembled by merging these rows,
+    so a new recording costs one round of LLM calls instead of a full rebuild.
+    """
+    media_asset_id = Column(String, ForeignKey("mediaasset.id", ondelete="CASCADE"), primary_key=True)
+    journey_id = Column(String, ForeignKey("journey.id", ondelete="CASCADE"), nullable=False, index=True)
+    chapter_id = Column(String(32), nullable=False)
+    summary = Column(Text, nullable=False, default="")
+    people = Column(JSON, nullable=False, default=list)
+    places = Column(JSON, nullable=False, default=list)
+    events = Column(JSON, nullable=False, default=list)
+    themes = Column(JSON, nullable=False, default=list)
+    sentiment = Column(String(32), nullable=True)
+    built_at = Column(DateTime, nullable=False, default=_utc_now)
@@ -77,3 +77,11 @@ class Order(Base):
     # USB-export tracking
     usb_burned_at = Column(DateTime, nullable=True)       # moment van branden
     usb_burned_by = Column(String(255), nullable=True)    # e-mail van de admin
+
+    # Vooraf gebouwd USB-pakket (Celery `usb.build_package`)
+    usb_package_status = Column(String(16), nullable=True)     # queued | building | ready | failed
+    usb_package_progress = Column(Integer, nullable=True)      # 0-100 tijdens het bouwen
+    usb_package_hash = Column(String(64), nullable=True)       # content-hash waarop het pakket is gebouwd
+    usb_package_key = Column(String(512), nullable=True)       # object_key van het ZIP-artefact
+    usb_package_built_at = Column(DateTime, nullable=True)
+    usb_package_started_at = Column(DateTime, nullable=True)   # moment van inplannen/starten; verweesde builds herkennen
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DDL, DateTime, ForeignKey, Index, Integer, String, Text, event
+
+from app.models.base import Base
+
+
+def utc_now():
+  """Returns current UTC time as timezone-aware datetime."""
+  return datetime.now(timezone.utc)
+
+
+class SearchDocument(Base):
+  """
+  Doorzoekbare tekst van een journey, één rij per bron: een transcriptsegment,
+  een tekstopname, een memo of een quick thought. Bijgehouden door de
+  listener in app/db/search_index.py; doorzocht via app/services/search.py.
+
+  De full-text-index zelf hangt af van de database en staat niet op het model:
+  Postgres krijgt een gegenereerde `search_vector` (tsvector, Nederlandse
+  configuratie) met een GIN-index, SQLite een FTS5-tabel `searchdocument_fts`
+  die via triggers gelijk loopt. De integer-id is de rowid waar FTS5 aan koppelt.
+  """
+  id = Column(Integer, primary_key=True, autoincrement=True)
+  journey_id = Column(String, ForeignKey("journey.id", ondelete="CASCADE"), nullable=False, index=True)
+  # "transcript" | "text" | "memo" | "quick_thought"
+  kind = Column(String(16), nullable=False)
+  # Id van de bronrij (segment, opname, memo of quick thought)
+  source_id = Column(String, nullable=False)
+  media_asset_id = Column(String, ForeignKey("mediaasset.id", ondelete="CASCADE"), nullable=True, index=True)
+  chapter_id = Column(String(32), nullable=True)
+  # Plek in de opname, voor transcriptsegmenten
+  start_ms = Column(Integer, nullable=True)
+  title = Column(String(200), nullable=True)
+  body = Column(Text, nullable=False)
+  updated_at = Column(DateTime, default=utc_now, nullable=False)
+
+  __table_args__ = (
+    Index("ix_searchdocument_source", "kind", "source_id"),
+  )
+
+
+POSTGRES_SEARCH_DDL = (
+  """
+  ALTER TABLE searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('dutch', coalesce(title, '')), 'A') || setweight(to_tsvector('dutch', body), 'B')
+  ) STORED
+  """,
+  "CREATE INDEX ix_searchdocument_vector ON searchdocument USING gin (search_vector)",
+)
+
+SQLITE_SEARCH_DDL = (
+  """
+  CREATE VIRTUAL TABLE searchdocument_fts USING fts5(
+    title, body, content='searchdocument', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+  )
+  """,
+  """
+  CREATE TRIGGER searchdocument_ai AFTER INSERT ON searchdocument BEGIN
+    INSERT INTO searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+  END
+  """,
+  """
+  CREATE TRIGGER searchdocument_ad AFTER DELETE ON searchdocument BEGIN
+    INSERT INTO searchdocument_fts(searchdocument_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+  END
+  """,
+  """
+  CREATE TRIGGER searchdocument_au AFTER UPDATE ON searchdocument BEGIN
+    INSERT INTO searchdocument_fts(searchdocument_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    INSERT INTO searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+  END
+  """,
+)
+
+# Ook bij `create_all` (SQLite in development en tests)
+for _statement in POSTGRES_SEARCH_DDL:
+  event.listen(SearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_SEARCH_DDL:
+  event.listen(SearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+  SearchDocument.__table__, "before_drop",
+  DDL("DROP TABLE IF EXISTS searchdocument_fts").execute_if(dialect="sqlite"),
+)
@@ -90,6 +90,7 @@ class BlogPostListItem(BaseModel):
     status: str
     published_at: Optional[datetime] = None
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     model_config = {"from_attributes": True}
 
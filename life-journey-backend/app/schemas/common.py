@@ -195,3 +195,5 @@ class Highlight(BaseModel):
   start_ms: int
   end_ms: int
   created_by: Literal["ai", "user"]
+  # Uitgesproken tekst tussen start_ms en end_ms (uit het transcript van de opname)
+  text: str | None = None
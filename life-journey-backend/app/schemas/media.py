@@ -34,3 +34,48 @@ class MediaPresignResponse(BaseModel):
   fields: dict[str, str] | None = None
   expires_in: int = 900
   object_key: str | None = None
+
+
+class MediaMultipartCreateResponse(BaseModel):
+  asset_id: str
+  object_key: str
+  part_size: int
+  part_count: int
+
+
+class MediaMultipartSignRequest(BaseModel):
+  part_numbers: list[int]
+
+
+class MediaMultipartSignResponse(BaseModel):
+  # Deelnummer -> presigned PUT-URL rechtstreeks naar de bucket
+  urls: dict[int, str]
+  expires_in: int
+
+
+class MediaMultipartStatus(BaseModel):
+  asset_id: str
+  part_size: int
+  part_count: int
+  # Deelnummers die de bucket al heeft; de rest opnieuw uploaden
+  uploaded_parts: list[int]
+
+
+class WaveformMarker(BaseModel):
+  id: str
+  label: str
+  start_ms: int
+  end_ms: int
+  created_by: str
+  # Positie op de golfvorm (peak-index); None zolang de peaks er nog niet zijn
+  start_index: int | None = None
+  end_index: int | None = None
+
+
+class WaveformMarkers(BaseModel):
+  asset_id: str
+  # Zelfde schaal als de .dat van GET /media/{asset_id}/peaks
+  sample_rate: int | None = None
+  samples_per_peak: int | None = None
+  length: int | None = None
+  markers: list[WaveformMarker]
@@ -23,6 +23,10 @@ PackageType = Literal[
     "BEGIN", "VOOR_ALTIJD", "DIGITAAL",
 ]
 
+# Pakketten met een fysieke Erfgoed Box + USB-stick: deze komen in de
+# USB-brandwachtrij en krijgen na betaling een vooraf gebouwd USB-pakket.
+PHYSICAL_PACKAGES: frozenset[str] = frozenset({"ERFGOED", "NALATENSCHAP", "BEGIN", "VOOR_ALTIJD"})
+
 AddonCode = Literal[
     "GIFT_BOX",       # Luxe cadeauverpakking +€15
     "EXTRA_USB",      # Extra USB-stick +€19
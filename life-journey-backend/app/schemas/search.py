@@ -0,0 +1,24 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+SearchKind = Literal["transcript", "text", "memo", "quick_thought"]
+
+
+class SearchHit(BaseModel):
+  kind: SearchKind
+  # Id van de bron: segment (transcript), opname (text), memo of quick thought
+  source_id: str
+  media_asset_id: str | None = None
+  chapter_id: str | None = None
+  # Plek in de opname, voor transcriptsegmenten
+  start_ms: int | None = None
+  title: str | None = None
+  score: float
+  # HTML-veilig fragment met <mark> rond de treffers
+  snippet: str
+
+
+class SearchResponse(BaseModel):
+  query: str
+  results: list[SearchHit]
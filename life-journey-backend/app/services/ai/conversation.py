@@ -17,11 +17,12 @@ from __future__ import annotations
 
 from typing import Optional
 from datetime import datetime, timezone, timedelta
-from openai import OpenAI
 from loguru import logger
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.services.ai.llm_client import get_llm_client
+from app.services.ai.conversation_store import StoredConversation, get_conversation_store
 from app.models.quick_thought import QuickThought
 from app.models.conversation import ConversationSessionRecord
 from app.schemas.common import ChapterId
@@ -77,6 +78,7 @@ class ConversationSession:
         self.turns: list[ConversationTurn] = []
         self.max_turns = 7  # Maximum conversation turns
         self.min_turns = 3  # Minimum turns before considering completion
+        self.unsaved_changes = 0  # Answers not yet written to conversationsessionrecord
 
     def start_conversation(self) -> str:
         """
@@ -354,10 +356,7 @@ class ConversationSession:
                 # Fall through to standard question generation
 
         try:
-            client = OpenAI(
-                api_key=settings.openai_api_key,
-                base_url=settings.openai_api_base,
-            )
+            client = get_llm_client()
 
             system_prompt = get_system_prompt(self.chapter_id, personal_context)
 
@@ -416,10 +415,7 @@ Als de gedachten niet direct relevant zijn voor dit hoofdstuk, genereer dan gewo
             return self._fallback_analysis(response_text)
 
         try:
-            client = OpenAI(
-                api_key=settings.openai_api_key,
-                base_url=settings.openai_api_base,
-            )
+            client = get_llm_client()
 
             analysis_prompt = f"""Analyseer dit transcript van een levensverhaal interview.
 
@@ -510,10 +506,7 @@ Geef het antwoord in dit JSON formaat:
         history = self._build_conversation_history()
 
         try:
-            client = OpenAI(
-                api_key=settings.openai_api_key,
-                base_url=settings.openai_api_base,
-            )
+            client = get_llm_client()
 
             ctx = CHAPTER_CONTEXTS.get(self.chapter_id, {})
 
@@ -626,10 +619,29 @@ Genereer nu één vervolgvraag:"""
 
 # =============================================================================
 # Conversation Manager - Handles session lifecycle
-# DB is the source of truth; _active_conversations is a write-through cache.
+# Live sessions sit in a bounded store (in-process LRU, or Redis shared by all
+# workers). With Redis, conversationsessionrecord is written behind: at start,
+# every _WRITE_BEHIND_TURNS answers, on completion, and by the periodic flush.
+# The in-process store is invisible to other workers and to the flush, so
+# there every answer is written through.
 # =============================================================================
 
-_active_conversations: dict[str, ConversationSession] = {}
+# Answers that may live only in the shared session store before the record is rewritten
+_WRITE_BEHIND_TURNS = 3
+
+
+def _write_behind_turns() -> int:
+    return _WRITE_BEHIND_TURNS if get_conversation_store().shared else 1
+
+
+def _to_micros(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp()) * 1_000_000 + moment.microsecond
+
+
+def _from_micros(micros: int) -> datetime:
+    return datetime.fromtimestamp(micros // 1_000_000, tz=timezone.utc).replace(microsecond=micros % 1_000_000)
 
 
 def _turns_to_json(turns: list[ConversationTurn]) -> list[dict]:
@@ -659,36 +671,121 @@ def _turns_from_json(data: list[dict]) -> list[ConversationTurn]:
     return turns
 
 
-def _persist_session(db: Session, session_id: str, conversation: ConversationSession, is_complete: bool = False) -> None:
-    record = db.query(ConversationSessionRecord).filter(
-        ConversationSessionRecord.id == session_id
-    ).first()
+def _turns_to_compact(turns: list[ConversationTurn]) -> list[list]:
+    """Positional form for the session store: no repeated keys, timestamps as µs."""
+    return [
+        [t.turn_number, t.question, t.user_response, t.analysis, _to_micros(t.timestamp)]
+        for t in turns
+    ]
 
-    now = datetime.now(timezone.utc)
-    turns_json = _turns_to_json(conversation.turns)
 
-    if record:
-        record.turns = turns_json
-        record.is_complete = is_complete
-        record.updated_at = now
-    else:
-        record = ConversationSessionRecord(
-            id=session_id,
-            journey_id=conversation.journey_id,
-            chapter_id=conversation.chapter_id,
-            asset_id=conversation.asset_id,
-            turns=turns_json,
-            is_complete=is_complete,
-            created_at=now,
-            updated_at=now,
+def _turns_from_compact(rows: list[list]) -> list[ConversationTurn]:
+    return [
+        ConversationTurn(
+            turn_number=turn_number,
+            question=question,
+            user_response=user_response,
+            analysis=analysis,
+            timestamp=_from_micros(timestamp),
         )
-        db.add(record)
+        for turn_number, question, user_response, analysis, timestamp in rows
+    ]
+
+
+def _snapshot(conversation: ConversationSession, unsaved: int) -> StoredConversation:
+    return StoredConversation(
+        journey_id=conversation.journey_id,
+        chapter_id=getattr(conversation.chapter_id, "value", conversation.chapter_id),
+        asset_id=conversation.asset_id,
+        turns=_turns_to_compact(conversation.turns),
+        changed_at=_to_micros(datetime.now(timezone.utc)),
+        unsaved=unsaved,
+    )
+
+
+def _conversation_from_store(db: Session, stored: StoredConversation) -> ConversationSession:
+    conversation = ConversationSession(
+        db=db,
+        journey_id=stored.journey_id,
+        chapter_id=ChapterId(stored.chapter_id),
+        asset_id=stored.asset_id,
+    )
+    conversation.turns = _turns_from_compact(stored.turns)
+    conversation.unsaved_changes = stored.unsaved
+    return conversation
+
+
+def _persist_session(
+    db: Session,
+    session_id: str,
+    stored: StoredConversation,
+    is_complete: bool = False,
+    create: bool = False,
+) -> bool:
+    """
+    Write a stored session to conversationsessionrecord.
+
+    updated_at is the session's changed_at, and an update only applies when the
+    record is not newer: a late periodic flush cannot overwrite a fresher write
+    from a worker. Returns False when the write failed.
+    """
+    turns_json = _turns_to_json(_turns_from_compact(stored.turns))
+    changed_at = _from_micros(stored.changed_at)
 
     try:
+        updated = 0
+        if not create:
+            values = {"turns": turns_json, "updated_at": changed_at}
+            if is_complete:
+                values["is_complete"] = True
+            updated = db.query(ConversationSessionRecord).filter(
+                ConversationSessionRecord.id == session_id,
+                ConversationSessionRecord.is_complete == False,  # noqa: E712
+                ConversationSessionRecord.updated_at <= changed_at,
+            ).update(values, synchronize_session=False)
+
+        if not updated and (create or not db.query(
+            db.query(ConversationSessionRecord.id).filter(ConversationSessionRecord.id == session_id).exists()
+        ).scalar()):
+            db.add(ConversationSessionRecord(
+                id=session_id,
+                journey_id=stored.journey_id,
+                chapter_id=stored.chapter_id,
+                asset_id=stored.asset_id,
+                turns=turns_json,
+                is_complete=is_complete,
+                created_at=changed_at,
+                updated_at=changed_at,
+            ))
         db.commit()
     except Exception as e:
         db.rollback()
         logger.error(f"Failed to persist conversation session {session_id}: {e}")
+        return False
+
+    get_conversation_store().mark_saved(session_id, stored.changed_at)
+    return True
+
+
+def _remember(db: Session, session_id: str, stored: StoredConversation) -> None:
+    """Put a session in the store; persist whatever the store had to let go of unsaved."""
+    for dropped_id, dropped in get_conversation_store().put(session_id, stored):
+        _persist_session(db, dropped_id, dropped)
+
+
+def _complete_session(db: Session, session_id: str, stored: StoredConversation) -> None:
+    """
+    Write the final version and mark the record complete.
+
+    Only a successful write lets the session go; otherwise it stays in the
+    store as unsaved so flush_conversation_sessions retries the completion.
+    """
+    stored.complete = True
+    if _persist_session(db, session_id, stored, is_complete=True):
+        get_conversation_store().discard(session_id)
+        return
+    stored.unsaved = max(stored.unsaved, 1)
+    _remember(db, session_id, stored)
 
 
 def _load_session_from_db(db: Session, session_id: str) -> Optional[ConversationSession]:
@@ -711,11 +808,12 @@ def _load_session_from_db(db: Session, session_id: str) -> Optional[Conversation
 
 
 def _get_or_load_conversation(db: Session, session_id: str) -> Optional[ConversationSession]:
-    if session_id in _active_conversations:
-        return _active_conversations[session_id]
+    stored = get_conversation_store().get(session_id)
+    if stored is not None:
+        return _conversation_from_store(db, stored)
     conversation = _load_session_from_db(db, session_id)
     if conversation:
-        _active_conversations[session_id] = conversation
+        _remember(db, session_id, _snapshot(conversation, unsaved=0))
     return conversation
 
 
@@ -742,8 +840,11 @@ def start_conversation_session(
 
     opening_question = conversation.start_conversation()
 
-    _active_conversations[session_id] = conversation
-    _persist_session(db, session_id, conversation)
+    # The record must exist right away: resume finds sessions by journey + chapter
+    stored = _snapshot(conversation, unsaved=0)
+    if not _persist_session(db, session_id, stored, create=True):
+        stored.unsaved = 1
+    _remember(db, session_id, stored)
 
     logger.info(f"Started conversation session {session_id}")
     return session_id, opening_question
@@ -772,10 +873,31 @@ def resume_conversation_session(
         .first()
     )
 
-    if not record or not record.turns:
+    if not record:
+        return None
+
+    # The store may hold answers that have not been written behind yet
+    stored = get_conversation_store().get(record.id)
+    if stored is not None and stored.complete:
+        # Finished; only the record still has to catch up
+        return None
+    if stored is not None:
+        turns = _turns_from_compact(stored.turns)
+    else:
+        turns = _turns_from_json(record.turns or [])
+        if turns:
+            conversation = ConversationSession(
+                db=db,
+                journey_id=record.journey_id,
+                chapter_id=ChapterId(record.chapter_id),
+                asset_id=record.asset_id,
+            )
+            conversation.turns = turns
+            _remember(db, record.id, _snapshot(conversation, unsaved=0))
+
+    if not turns:
         return None
 
-    turns = _turns_from_json(record.turns)
     last_turn = turns[-1]
 
     # The current question is the last one that hasn't been answered yet,
@@ -783,17 +905,6 @@ def resume_conversation_session(
     current_question = last_turn.question
     turn_number = last_turn.turn_number
 
-    # Restore into cache
-    if record.id not in _active_conversations:
-        conversation = ConversationSession(
-            db=db,
-            journey_id=record.journey_id,
-            chapter_id=ChapterId(record.chapter_id),
-            asset_id=record.asset_id,
-        )
-        conversation.turns = turns
-        _active_conversations[record.id] = conversation
-
     logger.info(f"Resumed session {record.id} for chapter {chapter_id}, turn {turn_number}")
     return record.id, current_question, turn_number, False
 
@@ -804,7 +915,14 @@ def add_response_to_conversation(
     response_text: str,
 ) -> Optional[str]:
     """
-    Add user response and get next question. Persists after every turn.
+    Add user response and get next question.
+
+    The session store is updated after every turn; the database record every
+    _WRITE_BEHIND_TURNS answers with the shared store (every answer otherwise)
+    and when the conversation completes.
+
+    Raises:
+        ConversationStoreUnavailable: if the shared store cannot be read
 
     Returns:
         Next question, or None if conversation complete
@@ -818,12 +936,17 @@ def add_response_to_conversation(
     next_question = conversation.generate_next_question()
 
     is_complete = next_question is None
-    _persist_session(db, session_id, conversation, is_complete=is_complete)
+    stored = _snapshot(conversation, unsaved=conversation.unsaved_changes + 1)
 
     if is_complete:
+        _complete_session(db, session_id, stored)
         summary = conversation.get_conversation_summary()
         logger.info(f"Conversation complete: {summary}")
-        _active_conversations.pop(session_id, None)
+        return None
+
+    if stored.unsaved >= _write_behind_turns() and _persist_session(db, session_id, stored):
+        stored.unsaved = 0
+    _remember(db, session_id, stored)
 
     return next_question
 
@@ -848,8 +971,25 @@ def end_conversation_session(db: Session, session_id: str) -> dict:
         return {}
 
     summary = conversation.get_conversation_summary()
-    _persist_session(db, session_id, conversation, is_complete=True)
-    _active_conversations.pop(session_id, None)
+    _complete_session(db, session_id, _snapshot(conversation, unsaved=0))
 
     logger.info(f"Ended conversation session {session_id}")
     return summary
+
+
+def flush_conversation_sessions(db: Session, limit: int = 100) -> int:
+    """
+    Write sessions with unsaved answers from the store to the database.
+
+    Run periodically (Celery `conversation.flush_sessions`) so answers of
+    abandoned sessions reach conversationsessionrecord before the store
+    expires them. Returns the number of sessions written.
+    """
+    store = get_conversation_store()
+    written = 0
+    for session_id, stored in store.dirty(limit):
+        if _persist_session(db, session_id, stored, is_complete=stored.complete):
+            written += 1
+            if stored.complete:
+                store.discard(session_id)
+    return written
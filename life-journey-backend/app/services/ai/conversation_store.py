@@ -0,0 +1,277 @@
+"""
+Sessie-opslag voor lopende interviewgesprekken (app/services/ai/conversation.py).
+
+Een gesprek leeft tussen de beurten in een store, niet in een onbegrensde dict
+per worker:
+
+  * `LocalConversationStore`: LRU in het geheugen van de worker, met een
+    maximum aantal sessies en een TTL. Voor development en als vangnet.
+  * `RedisConversationStore`: gedeeld door alle gunicorn-workers, zodat een
+    vervolgvraag op een andere worker geen `conversationsessionrecord` hoeft
+    te lezen en opnieuw op te bouwen.
+
+`get_conversation_store()` kiest Redis als dat geconfigureerd is.
+
+De store bewaart alleen platte data (`StoredConversation`): beurten als
+compacte lijsten, zonder Session of ORM-objecten. Voor Redis wordt dat JSON,
+boven `_COMPRESS_MIN_BYTES` met zlib gecomprimeerd.
+
+conversationsessionrecord blijft de bron voor hervatten na een herstart. Alleen
+met de gedeelde Redis-store wordt het record niet bij elke beurt herschreven
+(write-behind); een lokale store (`shared = False`) ziet een andere worker of
+de flush-taak niet, dus daar gaat elke beurt direct naar de database. Kan
+Redis niet gelezen worden, dan faalt de aanvraag
+(`ConversationStoreUnavailable`) in plaats van verder te gaan vanaf een record
+dat achter kan lopen. `unsaved` telt de
+wijzigingen die nog niet in de database staan. Sessies met zulke wijzigingen
+die de store kwijtraakt (LRU, TTL, Redis-fout) krijgt de aanroeper terug van
+`put`, om ze alsnog weg te schrijven. Met Redis houdt de store ook bij welke
+sessies nog weggeschreven moeten worden; de Celery-taak
+`conversation.flush_sessions` werkt die lijst af. Een afgerond gesprek
+waarvan de laatste write mislukte blijft zo (met `complete`) in de store tot
+de flush het record heeft afgesloten.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+from loguru import logger
+
+from app.core.config import settings
+
+_LOCAL_MAX_SESSIONS = 500
+_LOCAL_TTL_SECONDS = 2 * 3600
+_REDIS_TTL_SECONDS = 24 * 3600
+_COMPRESS_MIN_BYTES = 1024
+
+_SESSION_KEY = "conversation:session:{}"
+# ZSET: sessie-id → changed_at van de nog niet weggeschreven versie
+_DIRTY_KEY = "conversation:dirty"
+
+# Alleen uit de dirty-set halen als er intussen geen nieuwere versie is geschreven
+_CLEAR_IF_UNCHANGED = """
+if tonumber(redis.call('ZSCORE', KEYS[1], ARGV[1]) or -1) == tonumber(ARGV[2]) then
+  return redis.call('ZREM', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+
+class ConversationStoreUnavailable(Exception):
+    """De store kon niet gelezen worden; het databaserecord kan dan achterlopen."""
+
+
+@dataclass
+class StoredConversation:
+    journey_id: str
+    chapter_id: str
+    asset_id: str
+    # [turn_number, question, user_response, analysis, timestamp in µs]
+    turns: list[list]
+    # Tijdstip (µs sinds epoch) van de laatste wijziging; ook updated_at in de database
+    changed_at: int
+    # Wijzigingen sinds de laatste write naar conversationsessionrecord
+    unsaved: int = 0
+    # Afgerond, maar de laatste write mislukte: de flush markeert het record alsnog als compleet
+    complete: bool = False
+
+
+def dumps(stored: StoredConversation) -> bytes:
+    data = json.dumps(
+        [
+            stored.journey_id, stored.chapter_id, stored.asset_id, stored.turns, stored.changed_at, stored.unsaved,
+            stored.complete,
+        ],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode()
+    if len(data) >= _COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(data)
+    return b"j" + data
+
+
+def loads(blob: bytes) -> StoredConversation:
+    data = zlib.decompress(blob[1:]) if blob[:1] == b"z" else blob[1:]
+    # Sessies van vóór `complete` hebben zes velden
+    journey_id, chapter_id, asset_id, turns, changed_at, unsaved, *rest = json.loads(data)
+    return StoredConversation(journey_id, chapter_id, asset_id, turns, changed_at, unsaved, bool(rest and rest[0]))
+
+
+class ConversationStore(Protocol):
+    # Zichtbaar voor alle workers en de flush-taak; alleen dan is write-behind veilig
+    shared: bool
+
+    def get(self, session_id: str) -> Optional[StoredConversation]:
+        """Raises ConversationStoreUnavailable als de store niet gelezen kon worden."""
+        ...
+
+    def put(self, session_id: str, stored: StoredConversation) -> list[tuple[str, StoredConversation]]:
+        """Bewaar een sessie. Geeft sessies met `unsaved` terug die de store niet (meer) vasthoudt."""
+        ...
+
+    def discard(self, session_id: str) -> None: ...
+
+    def mark_saved(self, session_id: str, changed_at: int) -> None:
+        """De versie met deze `changed_at` staat in de database."""
+        ...
+
+    def dirty(self, limit: int = 100) -> list[tuple[str, StoredConversation]]:
+        """Sessies waarvan de laatste versie nog niet in de database staat."""
+        ...
+
+
+class LocalConversationStore:
+    """Begrensde LRU met TTL in het geheugen van deze worker."""
+
+    shared = False
+
+    def __init__(self, max_sessions: int = _LOCAL_MAX_SESSIONS, ttl_seconds: float = _LOCAL_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, StoredConversation]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, session_id: str) -> Optional[StoredConversation]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            expires_at, stored = entry
+            # Verlopen maar nog niet weggeschreven: nieuwer dan wat in de database staat
+            if expires_at < now and not stored.unsaved:
+                del self._entries[session_id]
+                return None
+            # Glijdende TTL: volgorde van gebruik is ook volgorde van verlopen
+            self._entries[session_id] = (now + self.ttl_seconds, stored)
+            self._entries.move_to_end(session_id)
+            return stored
+
+    def put(self, session_id: str, stored: StoredConversation) -> list[tuple[str, StoredConversation]]:
+        now = time.monotonic()
+        dropped: list[tuple[str, StoredConversation]] = []
+        with self._lock:
+            self._entries[session_id] = (now + self.ttl_seconds, stored)
+            self._entries.move_to_end(session_id)
+            # Verlopen sessies staan vooraan (oudst gebruikt), net als de LRU-kandidaten
+            while self._entries:
+                key, (expires_at, oldest) = next(iter(self._entries.items()))
+                if expires_at >= now and len(self._entries) <= self.max_sessions:
+                    break
+                del self._entries[key]
+                if oldest.unsaved:
+                    dropped.append((key, oldest))
+        return dropped
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def mark_saved(self, session_id: str, changed_at: int) -> None:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry[1].changed_at == changed_at:
+                entry[1].unsaved = 0
+
+    def dirty(self, limit: int = 100) -> list[tuple[str, StoredConversation]]:
+        with self._lock:
+            return [(key, stored) for key, (_, stored) in self._entries.items() if stored.unsaved][:limit]
+
+
+class RedisConversationStore:
+    """Gedeelde store voor alle workers; schrijffouten vallen terug op de database."""
+
+    shared = True
+
+    def __init__(self, client=None, ttl_seconds: int = _REDIS_TTL_SECONDS):
+        self._client = client
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis as redis_lib
+            self._client = redis_lib.from_url(settings.redis_url, socket_connect_timeout=1, socket_timeout=1)
+        return self._client
+
+    def get(self, session_id: str) -> Optional[StoredConversation]:
+        try:
+            blob = self.client.get(_SESSION_KEY.format(session_id))
+            return loads(blob) if blob else None
+        except Exception as e:
+            logger.warning(f"Gesprekstore: kon sessie {session_id} niet uit Redis lezen: {e}")
+            raise ConversationStoreUnavailable(session_id) from e
+
+    def put(self, session_id: str, stored: StoredConversation) -> list[tuple[str, StoredConversation]]:
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.set(_SESSION_KEY.format(session_id), dumps(stored), ex=self.ttl_seconds)
+            if stored.unsaved:
+                pipe.zadd(_DIRTY_KEY, {session_id: stored.changed_at})
+            else:
+                pipe.zrem(_DIRTY_KEY, session_id)
+            pipe.execute()
+            return []
+        except Exception as e:
+            logger.warning(f"Gesprekstore: kon sessie {session_id} niet in Redis zetten: {e}")
+            return [(session_id, stored)] if stored.unsaved else []
+
+    def discard(self, session_id: str) -> None:
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.delete(_SESSION_KEY.format(session_id))
+            pipe.zrem(_DIRTY_KEY, session_id)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Gesprekstore: kon sessie {session_id} niet uit Redis verwijderen: {e}")
+
+    def mark_saved(self, session_id: str, changed_at: int) -> None:
+        try:
+            self.client.eval(_CLEAR_IF_UNCHANGED, 1, _DIRTY_KEY, session_id, changed_at)
+        except Exception as e:
+            logger.warning(f"Gesprekstore: kon sessie {session_id} niet als opgeslagen markeren: {e}")
+
+    def dirty(self, limit: int = 100) -> list[tuple[str, StoredConversation]]:
+        client = self.client
+        result: list[tuple[str, StoredConversation]] = []
+        for raw in client.zrange(_DIRTY_KEY, 0, limit - 1):
+            session_id = raw.decode() if isinstance(raw, bytes) else raw
+            stored = self.get(session_id)
+            if stored is None:
+                # Verlopen of afgerond: niets meer weg te schrijven
+                client.zrem(_DIRTY_KEY, session_id)
+            else:
+                result.append((session_id, stored))
+        return result
+
+
+_store: Optional[ConversationStore] = None
+_store_lock = threading.Lock()
+
+
+def _shared_store_available() -> bool:
+    return bool(settings.redis_url) and settings.redis_url != "redis://localhost:6379/0"
+
+
+def get_conversation_store() -> ConversationStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RedisConversationStore() if _shared_store_available() else LocalConversationStore()
+    return _store
+
+
+def set_conversation_store(store: Optional[ConversationStore]) -> None:
+    """Vervang de store (tests, of een andere backend); None kiest opnieuw op basis van de config."""
+    global _store
+    _store = store
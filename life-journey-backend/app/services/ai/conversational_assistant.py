@@ -5,9 +5,9 @@ Provides interactive help, guidance, and support to participants during their jo
 
 import logging
 from typing import List, Dict
-from openai import OpenAI
 
 from app.core.config import settings
+from app.services.ai.llm_client import get_llm_client
 from app.schemas.common import ChapterId
 
 logger = logging.getLogger(__name__)
@@ -92,11 +92,8 @@ def chat_with_assistant(
         return "Sorry, de AI-assistent is momenteel niet beschikbaar. Probeer het later opnieuw of neem contact op met support."
 
     try:
-        # Initialize OpenAI client (works with OpenRouter too)
-        client = OpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
-        )
+        # Shared OpenAI client (works with OpenRouter too)
+        client = get_llm_client()
 
         # Build messages array
         messages = [
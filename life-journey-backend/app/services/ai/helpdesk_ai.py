@@ -2,18 +2,46 @@
 Helpdesk AI Service — NLU-gestuurd klantenservice systeem
 Begrijpt gebruikersvragen, beantwoordt ze vanuit de kennisbank,
 en escaleert naar een supportticket als de AI er niet uitkomt.
+
+De prompt krijgt alleen de best passende passages mee uit de FAQ hieronder en
+de gepubliceerde kennisbankartikelen (BM25, zie helpdesk_retrieval.py). De
+index wordt opnieuw opgebouwd zodra de blog-lijstcache een nieuwe generatie
+heeft, dus na publiceren, depubliceren of bewerken. Losse eerste vragen
+komen in een antwoordcache (genormaliseerde vraag + generatie, met TTL);
+een herhaalde vraag slaat de LLM dan helemaal over.
 """
 
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
-from openai import OpenAI
+
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.models.blog_post import BlogPost
+from app.services.ai.helpdesk_retrieval import (
+    Bm25Index,
+    Passage,
+    article_passages,
+    faq_passages,
+    normalize_question,
+)
+from app.services.ai.llm_client import get_llm_client
+from app.services.blog_listings import current_generation
 
 logger = logging.getLogger(__name__)
 
-# Volledige FAQ-kennisbank ingebed in het AI-systeem
+# Aantal passages dat in de prompt gaat
+_RETRIEVAL_TOP_K = 4
+# Passages worden in de prompt afgekapt op dit aantal tekens
+_PASSAGE_PROMPT_CHARS = 900
+_ANSWER_CACHE_TTL_SECONDS = 6 * 3600
+_ANSWER_CACHE_SIZE = 256
+
+# Bron voor de FAQ-passages van de retrieval-index
 FAQ_KNOWLEDGE_BASE = """
 === KENNISBANK BEWAARDVOORJOU.NL ===
 
@@ -79,16 +107,23 @@ E-mail: info@bewaardvoorjou.nl
 Reactietijd: Binnen 24 uur op werkdagen
 """
 
-HELPDESK_SYSTEM_PROMPT = f"""Je bent de slimme helpdesk-assistent van BewaardVoorJou.nl — het platform waar mensen hun levensverhaal vastleggen voor toekomstige generaties.
+# Sjabloon: {context} wordt per vraag gevuld met de gevonden passages
+HELPDESK_SYSTEM_PROMPT = """Je bent de slimme helpdesk-assistent van BewaardVoorJou.nl — het platform waar mensen hun levensverhaal vastleggen voor toekomstige generaties.
 
 Jouw taak is om gebruikersvragen te begrijpen en direct te beantwoorden, ook als ze spelfouten maken of omschrijvingen gebruiken.
 
-{FAQ_KNOWLEDGE_BASE}
+=== RELEVANTE INFORMATIE (uit FAQ en kennisbank) ===
+
+{context}
+
+CONTACTGEGEVENS:
+E-mail: info@bewaardvoorjou.nl
+Reactietijd: Binnen 24 uur op werkdagen
 
 === HOE JE REAGEERT ===
 
 Beantwoord de vraag altijd direct en bondig in gewone spreektaal (Nederlands, informeel).
-Gebruik de kennisbank hierboven. Als het antwoord er niet in staat, zeg dan eerlijk dat je het niet weet.
+Gebruik alleen de informatie hierboven. Als het antwoord er niet in staat, zeg dan eerlijk dat je het niet weet.
 
 Wanneer ESCALATE = true (stuur door naar formulier):
 - Accountspecifieke problemen die je niet kunt oplossen (bijv. betaling mislukt, account geblokkeerd)
@@ -118,6 +153,7 @@ Je antwoordt UITSLUITEND met geldig JSON in dit exacte formaat:
 Regels voor action_links (maximaal 2):
 - Gebruik alleen interne paden die beginnen met /
 - Relevante paden: /auth/forgot-password, /dashboard, /chapters, /settings, /family, /faq, /dashboard/support
+- Of het pad van een kennisbankartikel hierboven (/kennisbank/...) als dat de vraag beantwoordt
 - Laat de lijst leeg ([]) als er geen relevante actieknop is
 
 Regels voor suggested_questions (maximaal 3):
@@ -129,10 +165,73 @@ BELANGRIJK: Geef NOOIT antwoord buiten het JSON-formaat. Geen tekst voor of na d
 """
 
 
+_index_lock = threading.Lock()
+# (generatie, met artikelen?, index)
+_index_state: Optional[tuple[int, bool, Bm25Index]] = None
+
+_answer_lock = threading.Lock()
+# "generatie:genormaliseerde vraag" -> (opgeslagen op, antwoord)
+_answer_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+
+def knowledge_index(db: Optional[Session], generation: int) -> Bm25Index:
+    """De retrieval-index voor deze generatie; bouwt hem opnieuw op als de kennisbank veranderde."""
+    global _index_state
+    state = _index_state
+    if state is not None and state[0] == generation and (state[1] or db is None):
+        return state[2]
+
+    with _index_lock:
+        state = _index_state
+        if state is not None and state[0] == generation and (state[1] or db is None):
+            return state[2]
+        passages = faq_passages(FAQ_KNOWLEDGE_BASE)
+        if db is not None:
+            articles = db.query(BlogPost.title, BlogPost.slug, BlogPost.excerpt, BlogPost.content).filter(
+                BlogPost.section == "knowledge", BlogPost.status == "published",
+            )
+            for article in articles:
+                passages += article_passages(article.title, article.slug, article.excerpt, article.content)
+        index = Bm25Index(passages)
+        _index_state = (generation, db is not None, index)
+        logger.info(f"Helpdesk-index opgebouwd: {len(index)} passages (generatie {generation})")
+        return index
+
+
+def _render_context(hits: list[tuple[Passage, float]]) -> str:
+    if not hits:
+        return "(Geen passende informatie gevonden.)"
+    return "\n\n".join(
+        f"[{number}] {passage.title} ({passage.href})\n{passage.text[:_PASSAGE_PROMPT_CHARS]}"
+        for number, (passage, _) in enumerate(hits, start=1)
+    )
+
+
+def _cached_answer(key: str) -> Optional[dict]:
+    with _answer_lock:
+        hit = _answer_cache.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[0] > _ANSWER_CACHE_TTL_SECONDS:
+            del _answer_cache[key]
+            return None
+        _answer_cache.move_to_end(key)
+        return json.loads(json.dumps(hit[1]))
+
+
+def _store_answer(key: str, answer: dict) -> None:
+    with _answer_lock:
+        _answer_cache[key] = (time.monotonic(), answer)
+        _answer_cache.move_to_end(key)
+        while len(_answer_cache) > _ANSWER_CACHE_SIZE:
+            _answer_cache.popitem(last=False)
+
+
 def chat_with_helpdesk(
     user_message: str,
     conversation_history: list[dict] | None = None,
     user_name: Optional[str] = None,
+    db: Optional[Session] = None,
 ) -> dict:
     """
     Verwerk een helpdesk-vraag via AI en retourneer een gestructureerd antwoord.
@@ -141,6 +240,7 @@ def chat_with_helpdesk(
         user_message: De vraag van de gebruiker
         conversation_history: Eerdere berichten in dit gesprek
         user_name: Naam van de ingelogde gebruiker (optioneel, voor personalisatie)
+        db: Sessie om kennisbankartikelen in de index op te nemen (zonder: alleen FAQ)
 
     Returns:
         Dict met: message, escalate, suggested_questions, action_links
@@ -150,13 +250,26 @@ def chat_with_helpdesk(
         local = _local_faq_lookup(user_message)
         return local if local is not None else _fallback_response()
 
+    generation = current_generation()
+    # Alleen losse eerste vragen zijn herbruikbaar; een vervolgvraag hangt af van het gesprek
+    cache_key = None
+    if not conversation_history:
+        normalized = normalize_question(user_message)
+        cache_key = f"{generation}:{normalized}" if normalized else None
+    if cache_key:
+        cached = _cached_answer(cache_key)
+        if cached is not None:
+            return cached
+
     try:
-        client = OpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
-        )
+        client = get_llm_client()
+
+        # De vorige vraag telt mee, zodat "en hoe dan?" nog de juiste passages vindt
+        previous = [m["content"] for m in (conversation_history or []) if m.get("role") == "user"][-1:]
+        hits = knowledge_index(db, generation).search(" ".join([*previous, user_message]), k=_RETRIEVAL_TOP_K)
+        system_prompt = HELPDESK_SYSTEM_PROMPT.format(context=_render_context(hits))
 
-        messages: list[dict] = [{"role": "system", "content": HELPDESK_SYSTEM_PROMPT}]
+        messages: list[dict] = [{"role": "system", "content": system_prompt}]
 
         if conversation_history:
             # Stuur maximaal de laatste 6 berichten mee (3 rondes)
@@ -180,12 +293,16 @@ def chat_with_helpdesk(
         raw = response.choices[0].message.content.strip()
         parsed = json.loads(raw)
 
-        return {
+        result = {
             "message": parsed.get("message", "Dat weet ik helaas niet. Ons team helpt je graag verder."),
             "escalate": bool(parsed.get("escalate", False)),
             "suggested_questions": parsed.get("suggested_questions", [])[:3],
             "action_links": parsed.get("action_links", [])[:2],
         }
+        # Antwoorden met een naam erin niet aan anderen laten zien
+        if cache_key and not user_name:
+            _store_answer(cache_key, result)
+        return result
 
     except json.JSONDecodeError as e:
         logger.error(f"Helpdesk AI returneerde ongeldige JSON: {e}")
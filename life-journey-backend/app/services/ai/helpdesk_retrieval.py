@@ -0,0 +1,153 @@
+"""
+Lokale retrieval voor de helpdesk: BM25 over FAQ-vragen en kennisbankartikelen.
+
+De helpdesk-prompt bevat niet meer de hele FAQ, alleen de paar passages die het
+best bij de vraag passen. Passages zijn:
+
+  * elk vraag-antwoordpaar uit FAQ_KNOWLEDGE_BASE;
+  * stukken van ~120 woorden uit gepubliceerde kennisbankartikelen
+    (`blogpost`, section="knowledge"), met de titel erbij voor de match.
+
+De index is een inverted index in NumPy: per term de passage-indices en het
+vooraf berekende BM25-gewicht, zodat een zoekvraag neerkomt op een paar
+vector-optellingen en een argpartition. Geen embeddings, geen externe dienst.
+"""
+from __future__ import annotations
+
+import html
+import math
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_TAG_RE = re.compile(r"<[^>]+>")
+# Blokgrenzen in artikel-html: hier mag een passage eindigen
+_BLOCK_END_RE = re.compile(r"</(?:p|li|h[1-6]|blockquote|tr)>|<br\s*/?>", re.IGNORECASE)
+_FAQ_HEADER_RE = re.compile(r"^[A-Z &]+:$")
+
+_PASSAGE_WORDS = 120
+_MAX_TOKEN_LENGTH = 40
+
+# Veelvoorkomende Nederlandse woorden die niets zeggen over het onderwerp
+_STOPWORDS = frozenset("""
+aan al als ben bij dan dat de deze die dit doe doen door een en er ga gaat had heb hebben heeft het hier hij hoe
+hun ik in is je jij jou jouw kan kun kunnen maar me meer met mij mijn mn na naar niet nog nu of om onze ook op
+over te tot u uw van veel voor waar wat we wel werd wie wil wij word wordt zal ze zelf zich zijn zo zou
+""".split())
+
+
+@dataclass(frozen=True)
+class Passage:
+    title: str
+    text: str
+    # Pagina waar de gebruiker meer leest: /faq of /kennisbank/<slug>
+    href: str
+    source: str  # "faq" | "kennisbank"
+
+
+def _fold(token: str) -> str:
+    """Accenten weg en een lichte Nederlandse stam: "opnames" en "opname" vallen samen."""
+    token = unicodedata.normalize("NFKD", token).encode("ascii", "ignore").decode()
+    if len(token) > 5 and token.endswith("en"):
+        return token[:-2]
+    if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for raw in _TOKEN_RE.findall(text.lower()):
+        if raw in _STOPWORDS or len(raw) < 2 or len(raw) > _MAX_TOKEN_LENGTH:
+            continue
+        tokens.append(_fold(raw))
+    return tokens
+
+
+def normalize_question(text: str) -> str:
+    """
+    Sleutel voor de antwoordcache: alleen hoofdletters, leestekens en witruimte tellen niet mee.
+
+    Stopwoordfilter, stam en sortering horen bij BM25, niet hier: "kan ik niet
+    opzeggen" en "kan ik opzeggen" moeten verschillende antwoorden houden.
+    """
+    return " ".join(_TOKEN_RE.findall(text.casefold()))
+
+
+def faq_passages(knowledge_base: str) -> list[Passage]:
+    """Eén passage per "Q: … A: …"-paar uit de FAQ-tekst."""
+    passages: list[Passage] = []
+    question = answer = None
+    for line in knowledge_base.splitlines():
+        line = line.strip()
+        if line.startswith("Q:"):
+            question, answer = line[2:].strip(), None
+        elif line.startswith("A:") and question:
+            answer = line[2:].strip()
+            passages.append(Passage(question, f"{question} {answer}", "/faq", "faq"))
+            question = None
+        elif _FAQ_HEADER_RE.match(line):
+            question = None
+    return passages
+
+
+def article_passages(title: str, slug: str, excerpt: str | None, content: str | None) -> list[Passage]:
+    """Knip een artikel op blokgrenzen in stukken van ongeveer `_PASSAGE_WORDS` woorden."""
+    href = f"/kennisbank/{slug}"
+    blocks = [excerpt or ""] + _BLOCK_END_RE.split(content or "")
+    passages: list[Passage] = []
+    words: list[str] = []
+    for block in blocks:
+        words += html.unescape(_TAG_RE.sub(" ", block)).split()
+        if len(words) >= _PASSAGE_WORDS:
+            passages.append(Passage(title, " ".join(words), href, "kennisbank"))
+            words = []
+    if words or not passages:
+        passages.append(Passage(title, " ".join(words) or title, href, "kennisbank"))
+    return passages
+
+
+class Bm25Index:
+    """Okapi BM25 over een vaste set passages (titel telt mee in de match)."""
+
+    def __init__(self, passages: Iterable[Passage], *, k1: float = 1.5, b: float = 0.75):
+        self.passages = list(passages)
+        documents = [tokenize(f"{p.title} {p.text}") for p in self.passages]
+        lengths = np.array([len(doc) for doc in documents], dtype=np.float32)
+        average = float(lengths.mean()) if len(documents) and lengths.mean() > 0 else 1.0
+
+        frequencies: dict[str, dict[int, int]] = {}
+        for index, doc in enumerate(documents):
+            for term in doc:
+                counts = frequencies.setdefault(term, {})
+                counts[index] = counts.get(index, 0) + 1
+
+        total = len(documents)
+        norm = k1 * (1 - b + b * lengths / average)
+        self._postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for term, counts in frequencies.items():
+            ids = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            idf = math.log(1 + (total - len(counts) + 0.5) / (len(counts) + 0.5))
+            self._postings[term] = (ids, (idf * tf * (k1 + 1) / (tf + norm[ids])).astype(np.float32))
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def search(self, query: str, k: int = 4) -> list[tuple[Passage, float]]:
+        """De `k` best scorende passages (score > 0), hoogste eerst."""
+        if not self.passages:
+            return []
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+        k = min(k, len(self.passages))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.passages[i], float(scores[i])) for i in top if scores[i] > 0]
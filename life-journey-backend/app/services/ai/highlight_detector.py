@@ -3,10 +3,10 @@ AI Highlight Detection Service - Detects emotional highlights in transcripts
 Uses Claude via OpenRouter to identify key moments worth highlighting
 """
 from typing import List
-from openai import OpenAI
 from loguru import logger
 
 from app.core.config import settings
+from app.services.ai.llm_client import get_llm_client
 from app.schemas.common import HighlightLabel
 
 
@@ -19,7 +19,8 @@ def detect_highlights(transcript_text: str, chapter_id: str) -> List[dict]:
         chapter_id: The chapter context for better detection
 
     Returns:
-        List of highlight suggestions with labels and approximate positions
+        List of highlight suggestions with labels and quoted text; positions
+        come from app.services.media.alignment
     """
     if not settings.openai_api_key:
         logger.warning("OpenAI/OpenRouter API key not configured, skipping highlight detection")
@@ -30,10 +31,7 @@ def detect_highlights(transcript_text: str, chapter_id: str) -> List[dict]:
         return []
 
     try:
-        client = OpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
-        )
+        client = get_llm_client()
 
         system_prompt = """Je bent een empathische AI die belangrijke emotionele momenten detecteert in levensverhalen.
 
@@ -95,41 +93,6 @@ Focus op authentieke, betekenisvolle momenten. Niet elk verhaal heeft alle label
         return []
 
 
-def find_text_position(full_text: str, highlight_text: str, words_per_second: float = 2.5) -> tuple[int, int]:
-    """
-    Find approximate start and end position (in ms) of highlight text in full transcript
-
-    Args:
-        full_text: Full transcript text
-        highlight_text: Text snippet to find
-        words_per_second: Average speaking rate for time estimation
-
-    Returns:
-        tuple: (start_ms, end_ms)
-    """
-    # Try to find the text
-    pos = full_text.lower().find(highlight_text.lower())
-
-    if pos == -1:
-        # If exact match not found, return estimate based on text length
-        logger.warning("Could not find exact position for highlight text")
-        words_before = len(full_text.split()) // 2
-        highlight_words = len(highlight_text.split())
-        start_ms = int((words_before / words_per_second) * 1000)
-        end_ms = int(((words_before + highlight_words) / words_per_second) * 1000)
-        return start_ms, end_ms
-
-    # Calculate position based on words before the highlight
-    text_before = full_text[:pos]
-    words_before = len(text_before.split())
-    highlight_words = len(highlight_text.split())
-
-    start_ms = int((words_before / words_per_second) * 1000)
-    end_ms = int(((words_before + highlight_words) / words_per_second) * 1000)
-
-    return start_ms, end_ms
-
-
 def validate_highlight_label(label: str) -> HighlightLabel | None:
     """Validate and convert string label to HighlightLabel enum"""
     try:
@@ -8,12 +8,12 @@ Features:
 - Follow-up engine for deeper conversations
 """
 from typing import Iterable
-from openai import OpenAI
 from loguru import logger
 from sqlalchemy.orm import Session
 
 from app.schemas.common import ChapterId
 from app.core.config import settings
+from app.services.ai.llm_client import get_llm_client
 from app.services.ai.memory import get_personalized_prompt_context
 
 
@@ -1182,11 +1182,8 @@ def build_prompt_with_ai(
             logger.warning(f"Failed to get personalized context: {e}")
 
     try:
-        # Initialize OpenAI client (works with OpenRouter too)
-        client = OpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
-        )
+        # Shared OpenAI client (works with OpenRouter too)
+        client = get_llm_client()
 
         # Build context from follow-up history
         history_context = ""
@@ -1306,10 +1303,7 @@ def generate_follow_up(
     ctx = CHAPTER_CONTEXTS.get(chapter, {})
 
     try:
-        client = OpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
-        )
+        client = get_llm_client()
 
         # Analyze transcript for entities and themes
         analysis = analyze_transcript_for_themes(current_transcript)
@@ -1506,7 +1500,6 @@ def detect_voice_emotion(audio_file_path: str) -> dict[str, float]:
     """
     import json
     from pathlib import Path
-    from openai import OpenAI
 
     _neutral: dict[str, float] = {"joy": 0.0, "sadness": 0.0, "anger": 0.0, "fear": 0.0, "neutral": 1.0, "confidence": 0.0}
 
@@ -1519,7 +1512,8 @@ def detect_voice_emotion(audio_file_path: str) -> dict[str, float]:
         logger.warning(f"Audio file not found for emotion detection: {audio_file_path}")
         return _neutral
 
-    client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_api_base)
+    # Whisper on a full recording needs more than the default per-call timeout
+    client = get_llm_client().with_options(timeout=300.0)
     extra_headers = {
         "HTTP-Referer": settings.openrouter_app_url or "http://localhost",
         "X-Title": settings.openrouter_app_name,
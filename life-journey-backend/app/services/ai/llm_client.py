@@ -0,0 +1,107 @@
+"""
+Shared LLM client for app/services/ai.
+
+One process-wide OpenAI/OpenRouter client with a pooled HTTP connection (no
+TLS handshake per call), a per-call timeout, and a bounded thread pool for
+fanning out independent calls — e.g. the people/places/events/summary
+extraction in memory.py — so they cost one round-trip instead of several.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, TypeVar
+
+import httpx
+from loguru import logger
+from openai import OpenAI
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# No overall budget: wait for every call (each still bounded by llm_call_timeout_seconds).
+# For background work, where no user is waiting for the answer.
+NO_BUDGET = float("inf")
+
+_client: OpenAI | None = None
+_client_key: tuple[str | None, str] | None = None
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def get_llm_client() -> OpenAI:
+    """
+    Return the shared chat client.
+
+    Rebuilt only when the API key or base URL changes (tests, settings reload).
+    """
+    global _client, _client_key
+    key = (settings.openai_api_key, settings.openai_api_base)
+    with _lock:
+        if _client is None or _client_key != key:
+            _client = OpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_api_base,
+                timeout=settings.llm_call_timeout_seconds,
+                max_retries=1,
+                http_client=httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=settings.llm_max_concurrency * 2,
+                        max_keepalive_connections=settings.llm_max_concurrency,
+                    ),
+                    timeout=settings.llm_call_timeout_seconds,
+                ),
+            )
+            _client_key = key
+        return _client
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.llm_max_concurrency, thread_name_prefix="llm",
+            )
+        return _executor
+
+
+def run_parallel(
+    calls: dict[str, Callable[[], T]],
+    budget_seconds: float | None = None,
+) -> dict[str, T]:
+    """
+    Run independent LLM calls concurrently on the shared pool.
+
+    Concurrency is bounded process-wide by `settings.llm_max_concurrency`.
+    Calls still running when the latency budget is spent are left out of the
+    result (they finish in the background and are discarded), as are calls
+    that raised — callers fall back to their non-AI default for missing keys.
+    Pass `NO_BUDGET` from background work to wait for every call.
+    """
+    if not calls:
+        return {}
+    budget = settings.llm_latency_budget_seconds if budget_seconds is None else budget_seconds
+    started = time.monotonic()
+    executor = _get_executor()
+    futures = {executor.submit(fn): name for name, fn in calls.items()}
+    done, pending = wait(futures, timeout=None if budget == NO_BUDGET else budget)
+
+    results: dict[str, Any] = {}
+    for future in done:
+        name = futures[future]
+        try:
+            results[name] = future.result()
+        except Exception as exc:
+            logger.warning(f"LLM call {name} failed: {exc}")
+    for future in pending:
+        future.cancel()
+    if pending:
+        logger.warning(
+            f"LLM latency budget of {budget:.0f}s exceeded: "
+            f"{len(pending)}/{len(calls)} call(s) dropped ({', '.join(sorted(futures[f] for f in pending))})"
+        )
+    logger.debug(f"LLM fan-out of {len(calls)} call(s) took {time.monotonic() - started:.2f}s")
+    return results
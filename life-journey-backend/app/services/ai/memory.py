@@ -8,14 +8,18 @@ from __future__ import annotations
 
 import json
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
-from openai import OpenAI
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.models.media import MediaAsset, TranscriptSegment
+from app.models.media import MediaAsset
+from app.services.ai.llm_client import NO_BUDGET, get_llm_client, run_parallel
+from app.services.media.transcripts import texts_for_assets
+
+if TYPE_CHECKING:
+    from app.models.memory_cache import AssetMemory
 
 
 _CACHE_TTL_HOURS = 6
@@ -92,8 +96,7 @@ def _call_claude(system: str, user: str, max_tokens: int = 256) -> str | None:
     if not settings.openai_api_key:
         return None
     try:
-        client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_api_base)
-        resp = client.chat.completions.create(
+        resp = get_llm_client().chat.completions.create(
             model=settings.openai_model,
             messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
             max_tokens=max_tokens,
@@ -105,8 +108,21 @@ def _call_claude(system: str, user: str, max_tokens: int = 256) -> str | None:
         return None
 
 
-def _ai_extract_people(text: str) -> list[str]:
-    """Use Claude to extract named persons with their relation."""
+def _json_list(result: str | None, limit: int) -> list[str] | None:
+    """Parse a JSON array answer; None when the call failed or the answer is not a list."""
+    if not result:
+        return None
+    try:
+        parsed = json.loads(result)
+    except (json.JSONDecodeError, ValueError):
+        return None
+    if not isinstance(parsed, list):
+        return None
+    return [str(item) for item in parsed[:limit]]
+
+
+def _ai_extract_people(text: str) -> list[str] | None:
+    """Use Claude to extract named persons with their relation. None when the LLM failed."""
     result = _call_claude(
         system="Je bent een Nederlandse NLP-assistent. Extraheer personen uit de tekst.",
         user=(
@@ -116,14 +132,11 @@ def _ai_extract_people(text: str) -> list[str]:
         ),
         max_tokens=200,
     )
-    if result:
-        try:
-            parsed = json.loads(result)
-            if isinstance(parsed, list):
-                return [str(p) for p in parsed[:8]]
-        except (json.JSONDecodeError, ValueError):
-            pass
-    # keyword fallback
+    return _json_list(result, 8)
+
+
+def _people_fallback(text: str) -> list[str]:
+    """Keyword fallback when the LLM is unavailable."""
     keywords = ["mama", "papa", "opa", "oma", "partner", "vriend", "vriendin", "broer", "zus", "man", "vrouw"]
     found = set()
     lower = text.lower()
@@ -133,8 +146,8 @@ def _ai_extract_people(text: str) -> list[str]:
     return list(found)[:5]
 
 
-def _ai_extract_places(text: str) -> list[str]:
-    """Use Claude to extract locations from text."""
+def _ai_extract_places(text: str) -> list[str] | None:
+    """Use Claude to extract locations from text. None when the LLM failed."""
     result = _call_claude(
         system="Je bent een Nederlandse NLP-assistent. Extraheer plaatsnamen uit de tekst.",
         user=(
@@ -144,18 +157,11 @@ def _ai_extract_places(text: str) -> list[str]:
         ),
         max_tokens=200,
     )
-    if result:
-        try:
-            parsed = json.loads(result)
-            if isinstance(parsed, list):
-                return [str(p) for p in parsed[:8]]
-        except (json.JSONDecodeError, ValueError):
-            pass
-    return []
-
-
-def _ai_extract_events(text: str) -> list[str]:
-    """Use Claude to extract key life events from text."""
+    return _json_list(result, 8)
+
+
+def _ai_extract_events(text: str) -> list[str] | None:
+    """Use Claude to extract key life events from text. None when the LLM failed."""
     result = _call_claude(
         system="Je bent een Nederlandse NLP-assistent die levensverhalen analyseert.",
         user=(
@@ -166,18 +172,11 @@ def _ai_extract_events(text: str) -> list[str]:
         ),
         max_tokens=200,
     )
-    if result:
-        try:
-            parsed = json.loads(result)
-            if isinstance(parsed, list):
-                return [str(e) for e in parsed[:5]]
-        except (json.JSONDecodeError, ValueError):
-            pass
-    return []
-
-
-def _ai_summarize_chapter(chapter_id: str, text: str) -> str:
-    """Use Claude to produce a 2-3 sentence summary of a chapter transcript."""
+    return _json_list(result, 5)
+
+
+def _ai_summarize_chapter(chapter_id: str, text: str) -> str | None:
+    """Use Claude to produce a 2-3 sentence summary of a chapter transcript. None when the LLM failed."""
     result = _call_claude(
         system=(
             "Je bent een empathische assistent die levensverhalen samenvat. "
@@ -191,95 +190,174 @@ def _ai_summarize_chapter(chapter_id: str, text: str) -> str:
         ),
         max_tokens=160,
     )
-    if result:
-        return result
-    # fallback: first 120 chars
+    return result or None
+
+
+def _summary_fallback(text: str) -> str:
+    """First 120 characters, cut at a word boundary."""
     if len(text) > 120:
         return text[:120].rsplit(" ", 1)[0] + "…"
     return text
 
 
-def build_journey_memory(db: Session, journey_id: str) -> JourneyMemory:
-    """Build a JourneyMemory from all ready recordings. Uses DB cache to avoid redundant AI calls."""
-    from app.models.memory_cache import JourneyMemoryCache
+def _merge_ranked(lists: list[list[str]], limit: int) -> list[str]:
+    """Merge entity lists from several recordings, most-mentioned first, case-insensitive dedupe."""
+    counts: dict[str, int] = {}
+    display: dict[str, str] = {}
+    for items in lists:
+        for item in dict.fromkeys(i.strip() for i in items if i and i.strip()):
+            key = item.lower()
+            counts[key] = counts.get(key, 0) + 1
+            display.setdefault(key, item)
+    ranked = sorted(counts, key=lambda k: counts[k], reverse=True)  # stable: first-seen wins ties
+    return [display[k] for k in ranked[:limit]]
+
+
+def _build_asset_memories(
+    recordings: list[tuple[MediaAsset, str, str | None]],
+    budget_seconds: float | None = None,
+) -> list[tuple[AssetMemory, bool]]:
+    """
+    Run the per-recording LLM extraction for new transcripts.
+
+    All summary/people/places/events calls for all recordings are fanned out
+    concurrently on the shared LLM pool. Returns (entry, complete) per
+    recording. The extractors return None when the LLM failed; heuristic
+    fallbacks are applied here only, and such an entry (or one with a call
+    that missed the latency budget) is incomplete, so it is never stored.
+    Background rebuilds pass `NO_BUDGET`: with many new recordings the
+    request-path budget would drop most of the calls.
+    """
+    from app.models.memory_cache import AssetMemory
+
+    calls: dict[str, Any] = {}
+    for asset, text, _ in recordings:
+        calls[f"{asset.id}:summary"] = lambda a=asset, t=text: _ai_summarize_chapter(a.chapter_id, t)
+        calls[f"{asset.id}:people"] = lambda t=text: _ai_extract_people(t)
+        calls[f"{asset.id}:places"] = lambda t=text: _ai_extract_places(t)
+        calls[f"{asset.id}:events"] = lambda t=text: _ai_extract_events(t)
+    results = run_parallel(calls, budget_seconds)
+
+    built: list[tuple[AssetMemory, bool]] = []
+    for asset, text, sentiment in recordings:
+        summary, people, places, events = (
+            results.get(f"{asset.id}:{part}") for part in ("summary", "people", "places", "events")
+        )
+        entry = AssetMemory(
+            media_asset_id=asset.id,
+            journey_id=asset.journey_id,
+            chapter_id=asset.chapter_id,
+            summary=summary if summary is not None else _summary_fallback(text),
+            people=people if people is not None else _people_fallback(text),
+            places=places if places is not None else [],
+            events=events if events is not None else [],
+            themes=_match_themes(text),
+            sentiment=sentiment,
+            built_at=datetime.now(timezone.utc),
+        )
+        built.append((entry, None not in (summary, people, places, events)))
+    return built
+
+
+def _memory_from_dict(journey_id: str, data: dict[str, Any]) -> JourneyMemory:
+    return JourneyMemory(
+        journey_id=journey_id,
+        themes=data.get("themes", []),
+        key_people=data.get("key_people", []),
+        key_places=data.get("key_places", []),
+        key_events=data.get("key_events", []),
+        emotional_tone=data.get("emotional_tone", "reflectief"),
+        completed_chapters=data.get("completed_chapters", []),
+        chapter_summaries=data.get("chapter_summaries", {}),
+    )
+
+
+def _cache_age(built_at: datetime) -> timedelta:
+    if built_at.tzinfo is None:
+        built_at = built_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - built_at
+
+
+def _ready_count(db: Session, journey_id: str) -> int:
+    return db.query(MediaAsset).filter(
+        MediaAsset.journey_id == journey_id,
+        MediaAsset.storage_state == "ready",
+    ).count()
+
+
+def build_journey_memory(db: Session, journey_id: str, *, force: bool = False) -> JourneyMemory:
+    """
+    Build a JourneyMemory from all ready recordings.
+
+    Summaries and entities are stored per recording (AssetMemory), so only
+    recordings without an entry trigger LLM calls; the journey-level view is a
+    cheap merge that is itself cached in JourneyMemoryCache. `force` skips the
+    cache check and the LLM latency budget (background refresh after a
+    (re)transcription). Recordings whose extraction failed are left out of
+    `chapters_included`; see `recordings_missing_from_memory`.
+    """
+    from app.models.memory_cache import AssetMemory, JourneyMemoryCache
 
     # Check cache
     cached: JourneyMemoryCache | None = (
         db.query(JourneyMemoryCache).filter(JourneyMemoryCache.journey_id == journey_id).first()
     )
-    if cached:
-        age = datetime.now(timezone.utc) - (
-            cached.built_at.replace(tzinfo=timezone.utc) if cached.built_at.tzinfo is None else cached.built_at
-        )
-        current_count = db.query(MediaAsset).filter(
-            MediaAsset.journey_id == journey_id,
-            MediaAsset.storage_state == "ready",
-        ).count()
-        if age < timedelta(hours=_CACHE_TTL_HOURS) and current_count == cached.chapters_included:
+    if cached and not force:
+        age = _cache_age(cached.built_at)
+        if age < timedelta(hours=_CACHE_TTL_HOURS) and _ready_count(db, journey_id) == cached.chapters_included:
             try:
-                data: dict[str, Any] = json.loads(cached.memory_json)
-                return JourneyMemory(
-                    journey_id=journey_id,
-                    themes=data.get("themes", []),
-                    key_people=data.get("key_people", []),
-                    key_places=data.get("key_places", []),
-                    key_events=data.get("key_events", []),
-                    emotional_tone=data.get("emotional_tone", "reflectief"),
-                    completed_chapters=data.get("completed_chapters", []),
-                    chapter_summaries=data.get("chapter_summaries", {}),
-                )
+                return _memory_from_dict(journey_id, json.loads(cached.memory_json))
             except Exception:
                 pass  # Rebuild on corrupt cache
 
-    # Fetch assets and transcripts
     assets = (
         db.query(MediaAsset)
         .filter(MediaAsset.journey_id == journey_id, MediaAsset.storage_state == "ready")
         .order_by(MediaAsset.recorded_at.asc())
         .all()
     )
+    entries: dict[str, AssetMemory] = {
+        e.media_asset_id: e
+        for e in db.query(AssetMemory).filter(AssetMemory.journey_id == journey_id).all()
+    }
 
-    transcripts: list[dict[str, Any]] = []
-    for asset in assets:
-        segs = (
-            db.query(TranscriptSegment)
-            .filter(TranscriptSegment.media_asset_id == asset.id)
-            .order_by(TranscriptSegment.start_ms.asc())
-            .all()
-        )
-        if segs:
-            full_text = " ".join(s.text for s in segs)
-            transcripts.append({
-                "chapter_id": asset.chapter_id,
-                "text": full_text,
-                "sentiment": segs[0].sentiment,
-            })
-
+    # Only recordings without an entry need their transcript and the LLM
+    missing = [a for a in assets if a.id not in entries]
+    texts = texts_for_assets(db, missing)
+
+    # Segment sentiment is never filled by the transcription pipeline
+    recordings = [(asset, texts[asset.id], None) for asset in missing if asset.id in texts]
+    new_entries = 0
+    incomplete = 0
+    for entry, complete in _build_asset_memories(recordings, NO_BUDGET if force else None):
+        entries[entry.media_asset_id] = entry
+        # Heuristic fallbacks (no API key, LLM error, budget exceeded) are cheap — don't freeze them in
+        if settings.openai_api_key and complete:
+            db.add(entry)
+        elif settings.openai_api_key:
+            incomplete += 1
+        new_entries += 1
+
+    ordered = [entries[a.id] for a in assets if a.id in entries]
     completed_chapters = list(dict.fromkeys(a.chapter_id for a in assets))
-    all_text = " ".join(t["text"] for t in transcripts)
-
-    themes = _extract_themes(transcripts)
-    key_people = _ai_extract_people(all_text) if all_text else []
-    key_places = _ai_extract_places(all_text) if all_text else []
-    key_events = _ai_extract_events(all_text) if all_text else []
-    emotional_tone = _determine_emotional_tone(transcripts)
-    chapter_summaries = {
-        t["chapter_id"]: _ai_summarize_chapter(t["chapter_id"], t["text"])
-        for t in transcripts
-    }
 
-    memory = JourneyMemory(
-        journey_id=journey_id,
-        themes=themes,
-        key_people=key_people,
-        key_places=key_places,
-        key_events=key_events,
-        emotional_tone=emotional_tone,
-        completed_chapters=completed_chapters,
-        chapter_summaries=chapter_summaries,
-    )
+    theme_counts: dict[str, int] = {}
+    for e in ordered:
+        for theme in e.themes or []:
+            theme_counts[theme] = theme_counts.get(theme, 0) + 1
+    themes = [t for t, _ in sorted(theme_counts.items(), key=lambda x: x[1], reverse=True)[:5]]
+
+    summaries_by_chapter: dict[str, list[str]] = {}
+    for e in ordered:
+        if e.summary:
+            summaries_by_chapter.setdefault(e.chapter_id, []).append(e.summary)
+    chapter_summaries = {c: " ".join(parts) for c, parts in summaries_by_chapter.items()}
+
+    key_people = _merge_ranked([e.people or [] for e in ordered], limit=8)
+    key_places = _merge_ranked([e.places or [] for e in ordered], limit=8)
+    key_events = _merge_ranked([e.events or [] for e in ordered], limit=5)
+    emotional_tone = _determine_emotional_tone([{"sentiment": e.sentiment} for e in ordered])
 
-    # Persist to cache
     memory_dict: dict[str, Any] = {
         "themes": themes,
         "key_people": key_people,
@@ -289,43 +367,89 @@ def build_journey_memory(db: Session, journey_id: str) -> JourneyMemory:
         "completed_chapters": completed_chapters,
         "chapter_summaries": chapter_summaries,
     }
+    memory = _memory_from_dict(journey_id, memory_dict)
+
+    # Recordings that only got fallbacks don't count as covered: the count
+    # mismatch makes the next call retry their LLM extraction.
+    covered = len(assets) - incomplete
+
+    # Persist to cache
     try:
         if cached:
             cached.memory_json = json.dumps(memory_dict, ensure_ascii=False)
             cached.built_at = datetime.now(timezone.utc)
-            cached.chapters_included = len(assets)
+            cached.chapters_included = covered
         else:
             db.add(JourneyMemoryCache(
                 journey_id=journey_id,
                 memory_json=json.dumps(memory_dict, ensure_ascii=False),
                 built_at=datetime.now(timezone.utc),
-                chapters_included=len(assets),
+                chapters_included=covered,
             ))
         db.commit()
     except Exception as exc:
         logger.warning(f"Failed to persist memory cache for journey {journey_id}: {exc}")
+        db.rollback()
 
-    logger.info(f"Built memory for journey {journey_id}: {len(completed_chapters)} chapters, {len(key_people)} people, {len(key_places)} places")
+    logger.info(
+        f"Built memory for journey {journey_id}: {len(completed_chapters)} chapters, "
+        f"{new_entries} new recording(s) summarised, {len(key_people)} people, {len(key_places)} places"
+    )
     return memory
 
 
-def _extract_themes(transcripts: list[dict]) -> list[str]:
-    theme_keywords = {
-        "familie": ["familie", "ouders", "kinderen", "broer", "zus", "opa", "oma"],
-        "liefde": ["liefde", "verliefd", "partner", "huwelijk", "relatie"],
-        "werk": ["werk", "baan", "carrière", "collega", "kantoor"],
-        "jeugd": ["jeugd", "kindertijd", "school", "spelen", "opgroeien"],
-        "verlies": ["verlies", "afscheid", "missen", "verdriet", "dood"],
-        "groei": ["geleerd", "groeien", "veranderen", "ontwikkeling"],
-        "dromen": ["droom", "hopen", "toekomst", "wens", "ambitie"],
-    }
-    theme_counts: dict[str, int] = {}
-    for t in transcripts:
-        text = t["text"].lower()
-        for theme, keywords in theme_keywords.items():
-            if any(k in text for k in keywords):
-                theme_counts[theme] = theme_counts.get(theme, 0) + 1
-    return [t for t, _ in sorted(theme_counts.items(), key=lambda x: x[1], reverse=True)[:5]]
+def invalidate_asset_memory(db: Session, asset_id: str, journey_id: str) -> None:
+    """
+    Drop the memory entry of a (re)transcribed recording.
+
+    The journey-level cache is kept so prompts can keep using it until the
+    background refresh (see `enqueue_memory_refresh_job`) has rebuilt it; that
+    rebuild only re-summarises this recording. Caller commits.
+    """
+    from app.models.memory_cache import AssetMemory
+
+    db.query(AssetMemory).filter(AssetMemory.media_asset_id == asset_id).delete(synchronize_session=False)
+
+
+def recordings_missing_from_memory(db: Session, journey_id: str) -> int:
+    """Ready recordings that the cached memory does not cover yet (all of them without a cache)."""
+    from app.models.memory_cache import JourneyMemoryCache
+
+    included = (
+        db.query(JourneyMemoryCache.chapters_included).filter(JourneyMemoryCache.journey_id == journey_id).scalar()
+    )
+    return max(0, _ready_count(db, journey_id) - (included or 0))
+
+
+def load_cached_journey_memory(db: Session, journey_id: str) -> tuple[JourneyMemory, timedelta] | None:
+    """Return the cached JourneyMemory and its age without rebuilding, or None if there is none."""
+    from app.models.memory_cache import JourneyMemoryCache
+
+    cached: JourneyMemoryCache | None = (
+        db.query(JourneyMemoryCache).filter(JourneyMemoryCache.journey_id == journey_id).first()
+    )
+    if not cached:
+        return None
+    try:
+        return _memory_from_dict(journey_id, json.loads(cached.memory_json)), _cache_age(cached.built_at)
+    except Exception:
+        return None
+
+
+_THEME_KEYWORDS: dict[str, list[str]] = {
+    "familie": ["familie", "ouders", "kinderen", "broer", "zus", "opa", "oma"],
+    "liefde": ["liefde", "verliefd", "partner", "huwelijk", "relatie"],
+    "werk": ["werk", "baan", "carrière", "collega", "kantoor"],
+    "jeugd": ["jeugd", "kindertijd", "school", "spelen", "opgroeien"],
+    "verlies": ["verlies", "afscheid", "missen", "verdriet", "dood"],
+    "groei": ["geleerd", "groeien", "veranderen", "ontwikkeling"],
+    "dromen": ["droom", "hopen", "toekomst", "wens", "ambitie"],
+}
+
+
+def _match_themes(text: str) -> list[str]:
+    lower = text.lower()
+    return [theme for theme, keywords in _THEME_KEYWORDS.items() if any(k in lower for k in keywords)]
 
 
 def _determine_emotional_tone(transcripts: list[dict]) -> str:
@@ -342,5 +466,36 @@ def _determine_emotional_tone(transcripts: list[dict]) -> str:
 
 
 def get_personalized_prompt_context(db: Session, journey_id: str, chapter_id: str) -> str:
-    memory = build_journey_memory(db, journey_id)
+    """
+    Prompt context from the precomputed journey memory.
+
+    The cache is rebuilt in the background after every transcription, so this
+    normally only reads it. A cache older than `memory_max_staleness_hours`, or
+    one that misses ready recordings, is still used for this prompt and a
+    (debounced) refresh is scheduled. A journey without any cache yet gets only
+    the chapters it has recordings in, plus a refresh; the LLM fan-out never
+    runs on the request path.
+    """
+    cached = load_cached_journey_memory(db, journey_id)
+    if cached is None:
+        completed_chapters = [
+            chapter_id for (chapter_id,) in (
+                db.query(MediaAsset.chapter_id)
+                .filter(MediaAsset.journey_id == journey_id, MediaAsset.storage_state == "ready")
+                .distinct()
+                .all()
+            )
+        ]
+        if completed_chapters:
+            from app.services.media.processor import enqueue_memory_refresh_job
+            enqueue_memory_refresh_job(journey_id)
+        memory = _memory_from_dict(journey_id, {"completed_chapters": completed_chapters, "emotional_tone": ""})
+    else:
+        memory, age = cached
+        if (
+            age > timedelta(hours=settings.memory_max_staleness_hours)
+            or recordings_missing_from_memory(db, journey_id)
+        ):
+            from app.services.media.processor import enqueue_memory_refresh_job
+            enqueue_memory_refresh_job(journey_id)
     return memory.to_context_string(current_chapter=chapter_id)
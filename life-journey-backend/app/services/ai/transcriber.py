@@ -1,17 +1,62 @@
 """
 AI Transcription Service - Transcribes audio/video using Whisper via OpenRouter
+
+Short recordings go to Whisper in one request. Long recordings are cut at
+silences with ffmpeg into chunks of at most `transcription_chunk_seconds`,
+transcribed concurrently (capped by `transcription_max_concurrency`) and
+stitched back together: Whisper's segment timestamps are shifted by each
+chunk's offset, so TranscriptSegment rows carry real audio positions.
 """
-from typing import BinaryIO
-from openai import OpenAI
+from __future__ import annotations
+
+import re
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO
+
 from loguru import logger
 
 from app.core.config import settings
+from app.services.ai.llm_client import get_llm_client
+
+# Taal die aan Whisper wordt meegegeven en bij de opname wordt opgeslagen
+TRANSCRIPTION_LANGUAGE = "nl"
+
+# Silence detection: quieter than this for at least this long counts as a pause
+_SILENCE_NOISE_DB = -35
+_SILENCE_MIN_SECONDS = 0.5
+# A cut may move back from its target by at most this fraction of a chunk
+_CUT_WINDOW_FRACTION = 0.25
+
+_SILENCE_START_RE = re.compile(r"silence_start: (-?\d+(?:\.\d+)?)")
+_SILENCE_END_RE = re.compile(r"silence_end: (\d+(?:\.\d+)?)")
+
+
+def _whisper_client():
+    """The shared pooled client, with a timeout suited to audio uploads."""
+    if not settings.openai_api_key:
+        logger.error("OpenAI/OpenRouter API key not configured for transcription")
+        raise ValueError("Transcription service not configured")
+    return get_llm_client().with_options(timeout=settings.transcription_timeout_seconds)
+
+
+def _extra_headers() -> dict[str, str]:
+    return {
+        "HTTP-Referer": settings.openrouter_app_url if settings.openrouter_app_url else "http://localhost",
+        "X-Title": settings.openrouter_app_name,
+    }
 
 
 def transcribe_audio(audio_file: BinaryIO, filename: str) -> str:
     """
     Transcribe audio file using Whisper via OpenRouter
 
+    Plain text only; use `transcribe_with_timestamps` when segment timings
+    are needed.
+
     Args:
         audio_file: Binary file object containing audio data
         filename: Original filename for the audio file
@@ -22,30 +67,16 @@ def transcribe_audio(audio_file: BinaryIO, filename: str) -> str:
     Raises:
         Exception: If transcription fails
     """
-    if not settings.openai_api_key:
-        logger.error("OpenAI/OpenRouter API key not configured for transcription")
-        raise ValueError("Transcription service not configured")
-
+    client = _whisper_client()
     try:
-        # Initialize OpenAI client (works with OpenRouter)
-        client = OpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
-        )
-
         logger.info(f"Starting transcription for {filename} using {settings.whisper_model}")
 
-        # Call Whisper API via OpenRouter
-        # Note: OpenRouter supports Whisper via the audio/transcriptions endpoint
         response = client.audio.transcriptions.create(
             model=settings.whisper_model,
             file=(filename, audio_file),
-            language="nl",  # Dutch
+            language=TRANSCRIPTION_LANGUAGE,
             response_format="text",
-            extra_headers={
-                "HTTP-Referer": settings.openrouter_app_url if settings.openrouter_app_url else "http://localhost",
-                "X-Title": settings.openrouter_app_name,
-            }
+            extra_headers=_extra_headers(),
         )
 
         # Response is a string when response_format="text"
@@ -59,41 +90,193 @@ def transcribe_audio(audio_file: BinaryIO, filename: str) -> str:
         raise
 
 
-def split_into_segments(text: str, max_words_per_segment: int = 50) -> list[dict]:
+def _field(obj: Any, name: str, default: Any = None) -> Any:
+    return obj.get(name, default) if isinstance(obj, dict) else getattr(obj, name, default)
+
+
+def _transcribe_chunk(path: Path, filename: str, offset_ms: int, duration_ms: int | None) -> list[dict]:
+    """
+    Transcribe one file with segment timestamps, shifted by `offset_ms`.
+
+    Falls back to estimated timings spread over the chunk when the backend
+    returns text without segments.
     """
-    Split transcribed text into segments for storage
+    with open(path, "rb") as audio_file:
+        response = _whisper_client().audio.transcriptions.create(
+            model=settings.whisper_model,
+            file=(filename, audio_file),
+            language=TRANSCRIPTION_LANGUAGE,
+            response_format="verbose_json",
+            timestamp_granularities=["segment"],
+            extra_headers=_extra_headers(),
+        )
+
+    if isinstance(response, str):
+        return split_into_segments(response, offset_ms=offset_ms, duration_ms=duration_ms)
+
+    raw_segments = _field(response, "segments") or []
+    segments = []
+    for seg in raw_segments:
+        text = (_field(seg, "text") or "").strip()
+        if not text:
+            continue
+        segments.append({
+            "text": text,
+            "start_ms": offset_ms + int(float(_field(seg, "start", 0)) * 1000),
+            "end_ms": offset_ms + int(float(_field(seg, "end", 0)) * 1000),
+        })
+    if segments:
+        return segments
+    return split_into_segments(_field(response, "text") or "", offset_ms=offset_ms, duration_ms=duration_ms)
+
+
+def probe_duration_seconds(path: Path | str) -> float | None:
+    """Container duration via ffprobe (local file or URL); None when unavailable."""
+    if not shutil.which("ffprobe"):
+        return None
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(path)],
+        capture_output=True, text=True, timeout=60,
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def detect_silences(path: Path) -> list[tuple[float, float]]:
+    """(start, end) of every pause in the recording, in seconds."""
+    result = subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-nostats", "-i", str(path), "-vn",
+            "-af", f"silencedetect=noise={_SILENCE_NOISE_DB}dB:d={_SILENCE_MIN_SECONDS}",
+            "-f", "null", "-",
+        ],
+        capture_output=True, text=True, timeout=600,
+    )
+    starts = [max(0.0, float(v)) for v in _SILENCE_START_RE.findall(result.stderr)]
+    ends = [float(v) for v in _SILENCE_END_RE.findall(result.stderr)]
+    return list(zip(starts, ends))
+
+
+def plan_chunks(
+    duration: float,
+    silences: list[tuple[float, float]],
+    chunk_seconds: float,
+) -> list[tuple[float, float]]:
+    """
+    Cut points for a recording of `duration` seconds.
+
+    Each chunk is at most `chunk_seconds` long. A cut is placed in the middle
+    of the latest pause before its target, if one lies within the cut window;
+    otherwise the recording is cut hard at the target.
+    """
+    window = chunk_seconds * _CUT_WINDOW_FRACTION
+    pauses = sorted((start + end) / 2 for start, end in silences)
+    cuts = [0.0]
+    while duration - cuts[-1] > chunk_seconds:
+        target = cuts[-1] + chunk_seconds
+        candidates = [p for p in pauses if target - window <= p <= target]
+        cuts.append(candidates[-1] if candidates else target)
+    cuts.append(duration)
+    return list(zip(cuts, cuts[1:]))
+
+
+def _extract_chunk(source: Path, start: float, end: float, target: Path) -> None:
+    """Mono 16 kHz MP3 of [start, end): small uploads, video stripped."""
+    subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+            "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", str(source),
+            "-vn", "-ac", "1", "-ar", "16000", "-codec:a", "libmp3lame", "-b:a", "48k",
+            str(target),
+        ],
+        check=True, capture_output=True, timeout=600,
+    )
+
+
+def transcribe_with_timestamps(path: Path, filename: str) -> list[dict]:
+    """
+    Transcribe a recording into timed segments (`text`, `start_ms`, `end_ms`).
+
+    Recordings longer than `transcription_chunk_seconds` are split at pauses
+    and the chunks are transcribed concurrently. Without ffmpeg the file is
+    sent in one request.
+    """
+    chunk_seconds = settings.transcription_chunk_seconds
+    duration = probe_duration_seconds(path) if shutil.which("ffmpeg") else None
+    if duration is None or duration <= chunk_seconds:
+        duration_ms = int(duration * 1000) if duration else None
+        logger.info(f"Transcribing {filename} in one request using {settings.whisper_model}")
+        return _transcribe_chunk(path, filename, 0, duration_ms)
+
+    chunks = plan_chunks(duration, detect_silences(path), chunk_seconds)
+    logger.info(
+        f"Transcribing {filename} ({duration:.0f}s) in {len(chunks)} chunks, "
+        f"{settings.transcription_max_concurrency} at a time"
+    )
+
+    with tempfile.TemporaryDirectory(prefix="transcribe-") as tmp:
+        def _run(index: int, start: float, end: float) -> list[dict]:
+            chunk_path = Path(tmp) / f"chunk-{index:03d}.mp3"
+            _extract_chunk(path, start, end, chunk_path)
+            try:
+                return _transcribe_chunk(
+                    chunk_path, chunk_path.name, int(start * 1000), int((end - start) * 1000),
+                )
+            finally:
+                chunk_path.unlink(missing_ok=True)
+
+        with ThreadPoolExecutor(
+            max_workers=settings.transcription_max_concurrency, thread_name_prefix="whisper",
+        ) as pool:
+            futures = [pool.submit(_run, i, start, end) for i, (start, end) in enumerate(chunks)]
+            # result() in chunk order re-raises the first failure
+            parts = [future.result() for future in futures]
+
+    segments = [seg for part in parts for seg in part]
+    logger.info(f"Transcribed {filename}: {len(segments)} segments from {len(chunks)} chunks")
+    return segments
+
+
+def split_into_segments(
+    text: str,
+    max_words_per_segment: int = 50,
+    *,
+    offset_ms: int = 0,
+    duration_ms: int | None = None,
+) -> list[dict]:
+    """
+    Split transcribed text into segments with estimated timing
+
+    Fallback for backends that return no segment timestamps. Timings assume
+    150 words per minute, or are spread evenly over `duration_ms` when the
+    length of the audio is known.
 
     Args:
         text: Full transcribed text
         max_words_per_segment: Maximum words per segment
+        offset_ms: Start of the audio this text belongs to
+        duration_ms: Length of that audio, if known
 
     Returns:
-        List of segment dictionaries with text and estimated timing
+        List of segment dictionaries with text and timing
     """
     words = text.split()
-    segments = []
+    if not words:
+        return []
 
     # Estimate timing (rough approximation: 150 words per minute)
-    words_per_second = 150 / 60
-
-    current_segment = []
-    current_start_ms = 0
-
-    for i, word in enumerate(words):
-        current_segment.append(word)
-
-        if len(current_segment) >= max_words_per_segment or i == len(words) - 1:
-            segment_text = " ".join(current_segment)
-            duration_seconds = len(current_segment) / words_per_second
-            end_ms = current_start_ms + int(duration_seconds * 1000)
-
-            segments.append({
-                "text": segment_text,
-                "start_ms": current_start_ms,
-                "end_ms": end_ms,
-            })
-
-            current_start_ms = end_ms
-            current_segment = []
+    ms_per_word = 60_000 / 150
+    if duration_ms:
+        ms_per_word = duration_ms / len(words)
 
+    segments = []
+    for first in range(0, len(words), max_words_per_segment):
+        chunk = words[first:first + max_words_per_segment]
+        segments.append({
+            "text": " ".join(chunk),
+            "start_ms": offset_ms + int(first * ms_per_word),
+            "end_ms": offset_ms + int((first + len(chunk)) * ms_per_word),
+        })
     return segments
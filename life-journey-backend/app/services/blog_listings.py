@@ -0,0 +1,146 @@
+"""
+Publieke blog- en kennisbanklijsten, met tagfilter via `blog_tag` en een cache.
+
+Elke tag- en sectiepagina van de Next.js-frontend vraagt dezelfde handvol
+lijsten op. De query selecteert alleen de kolommen van `BlogPostListItem`
+(nooit `content` of `transcript`, en geen ORM-objecten) en filtert op tag via
+de index op `blog_tag`. Het resultaat blijft `_TTL_SECONDS` in het geheugen van
+de worker staan, samen met de geserialiseerde JSON en de ETag, zodat een
+cache-hit alleen nog bytes teruggeeft.
+
+Publiceren, depubliceren en bewerken roepen `invalidate_listings` aan. Die
+leegt de eigen cache en hoogt, als Redis er is, een gedeelde generatie op.
+Andere gunicorn-workers zien die nieuwe generatie bij hun volgende lookup en
+vragen opnieuw op. Zonder Redis (development) is de TTL de bovengrens voor
+hoe lang een andere worker nog een oude lijst kan tonen.
+"""
+import hashlib
+import threading
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from loguru import logger
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.blog_tags import normalize_tag
+from app.models.blog_post import BlogPost, BlogTag
+from app.schemas.blog_post import BlogPostListItem
+
+_TTL_SECONDS = 300.0
+# Bovengrens voor het aantal (sectie, tag, pagina)-combinaties in het geheugen
+_MAX_ENTRIES = 512
+_GENERATION_KEY = "blog:listings:generation"
+
+# Alles wat BlogPostListItem toont; content en transcript blijven in de database
+LIST_COLUMNS = (
+    BlogPost.id,
+    BlogPost.section,
+    BlogPost.title,
+    BlogPost.slug,
+    BlogPost.excerpt,
+    BlogPost.tags,
+    BlogPost.header_color,
+    BlogPost.header_text_color,
+    BlogPost.view_count,
+    BlogPost.status,
+    BlogPost.published_at,
+    BlogPost.created_at,
+    BlogPost.updated_at,
+)
+_LIST_ADAPTER = TypeAdapter(list[BlogPostListItem])
+
+
+class Listing(NamedTuple):
+    items: list[dict]
+    # JSON zoals de publieke route hem teruggeeft
+    body: bytes
+    # Alleen een ETag: de nieuwste tijdstempel van de items kan teruglopen na
+    # depubliceren of verwijderen, dus Last-Modified zou 304's geven op een gewijzigde lijst
+    etag: str
+
+_lock = threading.Lock()
+_cache: dict[tuple, tuple[float, int, Listing]] = {}
+_local_generation = 0
+_redis = None
+
+
+def _shared_cache_available() -> bool:
+    return bool(settings.redis_url) and settings.redis_url != "redis://localhost:6379/0"
+
+
+def _redis_client():
+    global _redis
+    if _redis is None:
+        import redis as redis_lib
+        _redis = redis_lib.from_url(settings.redis_url, socket_connect_timeout=1, socket_timeout=1)
+    return _redis
+
+
+def current_generation() -> int:
+    """Versie van de gepubliceerde lijsten; verandert bij elke invalidate_listings."""
+    if not _shared_cache_available():
+        return _local_generation
+    try:
+        return int(_redis_client().get(_GENERATION_KEY) or 0)
+    except Exception as e:
+        logger.warning(f"Blog-lijstcache: Redis-generatie niet leesbaar, alleen lokale cache: {e}")
+        return _local_generation
+
+
+def invalidate_listings() -> None:
+    """Gooi alle gecachete lijsten weg, in deze worker en (via Redis) in de andere."""
+    global _local_generation
+    with _lock:
+        _local_generation += 1
+        _cache.clear()
+    if _shared_cache_available():
+        try:
+            _redis_client().incr(_GENERATION_KEY)
+        except Exception as e:
+            logger.warning(f"Blog-lijstcache: kon andere workers niet invalideren: {e}")
+
+
+def list_query(db: Session):
+    """Query die alleen de lijstkolommen selecteert (rijen, geen BlogPost-objecten)."""
+    return db.query(*LIST_COLUMNS)
+
+
+def build_listing(records: Iterable) -> Listing:
+    """Serialiseer lijstrijen (of dicts) één keer: items, JSON-body en ETag."""
+    models = [BlogPostListItem.model_validate(record) for record in records]
+    body = _LIST_ADAPTER.dump_json(models)
+    etag = f'W/"{hashlib.sha256(body).hexdigest()[:20]}"'
+    return Listing([model.model_dump() for model in models], body, etag)
+
+
+def published_listing(
+    db: Session,
+    *,
+    section: Optional[str] = None,
+    tag: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> Listing:
+    """Gepubliceerde posts, nieuwste eerst; optioneel per sectie en/of tag."""
+    normalized = normalize_tag(tag) if tag else None
+    key = (section, normalized, limit, offset)
+    generation = current_generation()
+    now = time.monotonic()
+    cached = _cache.get(key)
+    if cached is not None and cached[1] == generation and now - cached[0] < _TTL_SECONDS:
+        return cached[2]
+
+    q = list_query(db).filter(BlogPost.status == "published")
+    if section:
+        q = q.filter(BlogPost.section == section)
+    if normalized is not None:
+        q = q.join(BlogTag, BlogTag.post_id == BlogPost.id).filter(BlogTag.tag == normalized)
+    listing = build_listing(q.order_by(BlogPost.published_at.desc()).offset(offset).limit(limit))
+
+    with _lock:
+        if len(_cache) >= _MAX_ENTRIES:
+            _cache.clear()
+        _cache[key] = (now, generation, listing)
+    return listing
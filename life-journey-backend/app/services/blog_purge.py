@@ -0,0 +1,83 @@
+"""
+Publieke blogcaches verversen na publiceren, depubliceren, bewerken of verwijderen.
+
+De publieke endpoints (/blog/public/...) sturen Cache-Control met s-maxage, zodat
+een CDN ze kan serveren. Na een wijziging aan een gepubliceerd artikel:
+
+  * revalideert de Next.js-frontend de artikel- en overzichtspagina's
+    (/api/revalidate, zoals de Agent OS-publicatie al deed);
+  * worden bij Cloudflare de API-URL's van het artikel en de vaste lijsten
+    gepurged, als CLOUDFLARE_ZONE_ID en CLOUDFLARE_API_TOKEN gezet zijn.
+
+Lijsten met een tag- of paginaparameter zijn niet op te sommen; die lopen binnen
+hun s-maxage vanzelf af. Alles is best-effort: een mislukte purge breekt de
+publicatie NOOIT.
+"""
+import asyncio
+from typing import Optional
+
+import httpx
+from loguru import logger
+
+from app.core.config import settings
+
+
+def section_path(section: str) -> str:
+    return "kennisbank" if section == "knowledge" else "blog"
+
+
+def public_api_urls(slug: str, section: str) -> list[str]:
+    """De gecachete API-URL's die door dit artikel veranderen."""
+    base = f"{settings.api_base_url.rstrip('/')}{settings.api_v1_prefix}/blog/public"
+    return [
+        f"{base}/slug/{slug}",
+        f"{base}/list",
+        f"{base}/list?section={section}",
+        f"{base}/most-read",
+        f"{base}/most-read?section={section}",
+    ]
+
+
+async def revalidate_frontend(slug: str, section: str) -> None:
+    """Laat de frontend (/api/revalidate) de statische pagina's vernieuwen,
+    zodat het artikel direct zichtbaar is i.p.v. te wachten op de ISR-window."""
+    frontend = (settings.app_base_url or settings.site_url).rstrip("/")
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            await client.post(
+                f"{frontend}/api/revalidate",
+                json={"slug": slug, "section": section_path(section)},
+            )
+    except Exception as e:  # revalidate is best-effort
+        logger.warning(f"Revalidate frontend mislukt (niet kritiek): {e}")
+
+
+async def purge_cdn(urls: list[str]) -> None:
+    """Purge URL's uit de Cloudflare-cache (hooguit 30 per verzoek)."""
+    if not (settings.cloudflare_zone_id and settings.cloudflare_api_token):
+        logger.debug("CLOUDFLARE_ZONE_ID/CLOUDFLARE_API_TOKEN niet ingesteld, CDN-purge overgeslagen")
+        return
+    endpoint = f"https://api.cloudflare.com/client/v4/zones/{settings.cloudflare_zone_id}/purge_cache"
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            for start in range(0, len(urls), 30):
+                resp = await client.post(
+                    endpoint,
+                    json={"files": urls[start:start + 30]},
+                    headers={"Authorization": f"Bearer {settings.cloudflare_api_token}"},
+                )
+                if resp.status_code != 200:
+                    logger.warning(f"CDN-purge HTTP {resp.status_code}: {resp.text[:200]}")
+    except Exception as e:
+        logger.warning(f"CDN-purge mislukt (niet kritiek): {e}")
+
+
+async def purge_public_caches(slug: str, section: str, *, old_slug: Optional[str] = None) -> None:
+    """Frontend revalideren en de CDN purgen voor dit artikel (en een eventuele oude slug)."""
+    urls = public_api_urls(slug, section)
+    if old_slug and old_slug != slug:
+        urls += public_api_urls(old_slug, section)[:1]
+    await asyncio.gather(
+        revalidate_frontend(slug, section),
+        purge_cdn(urls),
+    )
@@ -0,0 +1,204 @@
+"""
+Gebufferde weergavetelling voor blog- en kennisbankartikelen.
+
+POST /blog/public/{slug}/view schrijft niet meer per weergave naar de
+database. De weergave komt in een buffer: een Redis-hash die alle workers
+delen, of zonder Redis (development) een teller in het geheugen van de worker.
+`flush_views` verwerkt de buffer met één atomaire
+`UPDATE blogpost SET view_count = view_count + n` per slug, zodat gelijktijdige
+weergaven geen ophogingen meer verliezen.
+
+Er wordt hooguit eens per `_FLUSH_INTERVAL_SECONDS` geflusht. Het verkeer stuurt
+dat zelf aan: de view-route plant dan een achtergrondtaak in. De Celery-taak
+`blog.flush_views` is het vangnet voor de laatste weergaven als het stil wordt.
+Is de buffer leeg, dan raakt een flush de database niet, zodat Neon naar nul
+kan schalen. Zonder Redis gaan weergaven die nog in het geheugen staan verloren
+bij een herstart; hooguit één interval aan tellingen.
+
+Na elke flush wordt de ranglijst voor "meest gelezen" opnieuw opgebouwd: per
+sectie de top `RANKING_SIZE`, op view_count en daarna published_at.
+`most_read` leest alleen die ranglijst. De ranglijst hoort bij een generatie
+van de lijstcache (app/services/blog_listings.py), zodat publiceren,
+depubliceren of bewerken hem ook ververst.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.blog_post import BlogPost
+from app.schemas.blog_post import BlogPostListItem
+from app.services.blog_listings import current_generation, list_query
+
+_FLUSH_INTERVAL_SECONDS = 60
+# Gelijk aan de maximale `limit` van /blog/public/most-read
+RANKING_SIZE = 20
+_SECTIONS = ("blog", "knowledge")
+# Bovengrens voor verschillende slugs in de geheugenbuffer (verzonnen slugs van bots)
+_MAX_PENDING_SLUGS = 5000
+
+_PENDING_KEY = "blog:views:pending"
+_FLUSH_LOCK_KEY = "blog:views:flush-lock"
+_RANKING_KEY = "blog:views:ranking"
+
+_POSTS = BlogPost.__table__
+_INCREMENT = (
+    update(_POSTS)
+    .where(_POSTS.c.slug == bindparam("b_slug"), _POSTS.c.status == "published")
+    # updated_at expliciet laten staan: een weergave is geen inhoudelijke wijziging
+    .values(view_count=_POSTS.c.view_count + bindparam("b_count"), updated_at=_POSTS.c.updated_at)
+)
+
+_lock = threading.Lock()
+_pending: Counter = Counter()
+_last_flush = time.monotonic()
+# (generatie van de lijstcache, {sectie of "": [BlogPostListItem als dict]})
+_ranking: Optional[tuple[int, dict[str, list[dict]]]] = None
+_redis = None
+
+
+def _shared_buffer_available() -> bool:
+    return bool(settings.redis_url) and settings.redis_url != "redis://localhost:6379/0"
+
+
+def _redis_client():
+    global _redis
+    if _redis is None:
+        import redis as redis_lib
+        _redis = redis_lib.from_url(settings.redis_url, socket_connect_timeout=1, socket_timeout=1)
+    return _redis
+
+
+def record_view(slug: str) -> bool:
+    """Tel één weergave. True als het tijd is om de buffer te flushen."""
+    global _last_flush
+    if _shared_buffer_available():
+        try:
+            client = _redis_client()
+            client.hincrby(_PENDING_KEY, slug, 1)
+            # Wie de lock krijgt, flusht; de rest van het interval telt alleen
+            return bool(client.set(_FLUSH_LOCK_KEY, "1", nx=True, ex=_FLUSH_INTERVAL_SECONDS))
+        except Exception as e:
+            logger.warning(f"Weergavebuffer: Redis niet bereikbaar, tel lokaal: {e}")
+
+    with _lock:
+        if slug in _pending or len(_pending) < _MAX_PENDING_SLUGS:
+            _pending[slug] += 1
+        now = time.monotonic()
+        if now - _last_flush >= _FLUSH_INTERVAL_SECONDS:
+            _last_flush = now
+            return True
+    return False
+
+
+def _take_pending() -> Counter:
+    """Haal de buffer leeg (atomair) en geef de opgetelde weergaven per slug terug."""
+    with _lock:
+        pending = Counter(_pending)
+        _pending.clear()
+    if _shared_buffer_available():
+        try:
+            pipe = _redis_client().pipeline(transaction=True)
+            pipe.hgetall(_PENDING_KEY)
+            pipe.delete(_PENDING_KEY)
+            shared, _ = pipe.execute()
+            for slug, count in shared.items():
+                pending[slug.decode() if isinstance(slug, bytes) else slug] += int(count)
+        except Exception as e:
+            logger.warning(f"Weergavebuffer: kon Redis-buffer niet ophalen: {e}")
+    return pending
+
+
+def _restore(pending: Counter) -> None:
+    """Zet weergaven terug in de buffer na een mislukte flush."""
+    if _shared_buffer_available():
+        try:
+            pipe = _redis_client().pipeline(transaction=False)
+            for slug, count in pending.items():
+                pipe.hincrby(_PENDING_KEY, slug, count)
+            pipe.execute()
+            return
+        except Exception as e:
+            logger.warning(f"Weergavebuffer: terugzetten in Redis mislukt, bewaar lokaal: {e}")
+    with _lock:
+        _pending.update(pending)
+
+
+def flush_views(db: Session) -> int:
+    """Schrijf de gebufferde weergaven weg; geeft het aantal weergaven terug. Commit zelf."""
+    pending = _take_pending()
+    if not pending:
+        return 0
+    try:
+        db.execute(_INCREMENT, [{"b_slug": slug, "b_count": count} for slug, count in pending.items()])
+        db.commit()
+    except Exception:
+        db.rollback()
+        _restore(pending)
+        raise
+    rebuild_ranking(db)
+    return sum(pending.values())
+
+
+def flush_pending_views() -> int:
+    """Flush met een eigen sessie; voor de achtergrondtaak van de route en Celery."""
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return flush_views(db)
+    except Exception as e:
+        logger.error(f"Weergaven flushen mislukt (blijven gebufferd): {e}")
+        return 0
+    finally:
+        db.close()
+
+
+def _top(db: Session, section: Optional[str]) -> list[dict]:
+    q = list_query(db).filter(BlogPost.status == "published")
+    if section:
+        q = q.filter(BlogPost.section == section)
+    posts = q.order_by(BlogPost.view_count.desc(), BlogPost.published_at.desc()).limit(RANKING_SIZE).all()
+    return [BlogPostListItem.model_validate(post).model_dump(mode="json") for post in posts]
+
+
+def rebuild_ranking(db: Session) -> dict[str, list[dict]]:
+    """Bouw de top per sectie (en over alle secties, sleutel "") opnieuw op uit de database."""
+    global _ranking
+    generation = current_generation()
+    ranking = {"": _top(db, None), **{section: _top(db, section) for section in _SECTIONS}}
+    _ranking = (generation, ranking)
+    if _shared_buffer_available():
+        try:
+            _redis_client().set(_RANKING_KEY, json.dumps({"generation": generation, "ranking": ranking}))
+        except Exception as e:
+            logger.warning(f"Weergavebuffer: ranglijst niet naar Redis geschreven: {e}")
+    return ranking
+
+
+def _stored_ranking() -> Optional[tuple[int, dict[str, list[dict]]]]:
+    if _shared_buffer_available():
+        try:
+            raw = _redis_client().get(_RANKING_KEY)
+            if raw:
+                stored = json.loads(raw)
+                return stored["generation"], stored["ranking"]
+        except Exception as e:
+            logger.warning(f"Weergavebuffer: ranglijst niet uit Redis te lezen: {e}")
+    return _ranking
+
+
+def most_read(db: Session, *, section: Optional[str] = None, limit: int = 5) -> list[dict]:
+    """Meest gelezen gepubliceerde artikelen uit de ranglijst; bouwt die op als hij ontbreekt of verouderd is."""
+    stored = _stored_ranking()
+    if stored is None or stored[0] != current_generation():
+        ranking = rebuild_ranking(db)
+    else:
+        ranking = stored[1]
+    return ranking.get(section or "", [])[:limit]
@@ -101,6 +101,35 @@ celery_app.conf.beat_schedule = {
         "schedule": crontab(hour=7, minute=30),
         "options": {"expires": 3600},
     },
+    # Elk uur — USB-pakketten in de wachtrij (her)bouwen als de inhoud wijzigde.
+    # Draait op de media-worker (taak geregistreerd in app.services.export.tasks).
+    "usb-package-prebuild": {
+        "task": "usb.prebuild_queue",
+        "schedule": crontab(minute=20),
+        "options": {"expires": 3600, "queue": "media"},
+    },
+    # Dagelijks 03:40 Amsterdam (beat-timezone, niet UTC) — journey_chapter_stats rechttrekken t.o.v. de mediatabel.
+    # Draait op de media-worker (taak geregistreerd in app.services.media.tasks).
+    "chapter-stats-reconcile": {
+        "task": "stats.reconcile_chapter_stats",
+        "schedule": crontab(hour=3, minute=40),
+        "options": {"expires": 3600, "queue": "media"},
+    },
+    # Elke 5 minuten — gebufferde blogweergaven wegschrijven (leeg = geen DB-query).
+    # Draait op de media-worker (taak geregistreerd in app.services.media.tasks).
+    "blog-views-flush": {
+        "task": "blog.flush_views",
+        "schedule": crontab(minute="*/5"),
+        "options": {"expires": 240, "queue": "media"},
+    },
+    # Elke 5 minuten — interviewsessies met nog niet opgeslagen antwoorden uit
+    # Redis naar conversationsessionrecord (niets te doen = geen DB-query).
+    # Draait op de media-worker (taak geregistreerd in app.services.media.tasks).
+    "conversation-sessions-flush": {
+        "task": "conversation.flush_sessions",
+        "schedule": crontab(minute="2-59/5"),
+        "options": {"expires": 240, "queue": "media"},
+    },
 }
 celery_app.conf.timezone = "Europe/Amsterdam"
 
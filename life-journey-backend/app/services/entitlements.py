@@ -13,7 +13,7 @@ from datetime import datetime, timezone
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.models.media import MediaAsset
+from app.models.chapter_stats import JourneyChapterStats
 from app.models.user import User
 
 # Pakketten met onbeperkte toegang (geen proefperiode- of hoofdstuk-limiet).
@@ -76,12 +76,12 @@ def assert_can_record(
 
     # 2) Hoofdstuk-limiet bereikt? (NULL = onbeperkt)
     if user.max_chapters is not None:
+        # Eén rij per hoofdstuk met opnames (bijgehouden tellers, geen DISTINCT)
         used_chapters = {
             row[0]
             for row in (
-                db.query(MediaAsset.chapter_id)
-                .filter(MediaAsset.journey_id == journey_id)
-                .distinct()
+                db.query(JourneyChapterStats.chapter_id)
+                .filter(JourneyChapterStats.journey_id == journey_id)
                 .all()
             )
         }
@@ -22,11 +22,13 @@ from typing import Optional
 from loguru import logger
 from sqlalchemy.orm import Session
 
-from app.models.media import MediaAsset, TranscriptSegment, PromptRun
+from app.models.media import MediaAsset, PromptRun
 from app.models.memo import Memo
 from app.models.sharing import Highlight
 from app.models.user import User
 from app.services.email.chapter_names import get_chapter_name
+from app.services.media.alignment import TranscriptAlignment, alignment_for
+from app.services.media.transcripts import assemble_text, load_segments
 
 # ─── Hoofdstuk-volgorde (chronologisch door het leven) ───────────────────────
 
@@ -164,9 +166,11 @@ def _paragraphify(text: str, spp: int = 4) -> list[str]:
     return paras
 
 
-def _highlight_text(h: Highlight, segs: list[TranscriptSegment], limit: int = 220) -> str:
-    matching = [s for s in segs if s.start_ms <= h.end_ms and s.end_ms >= h.start_ms]
-    text = " ".join(s.text for s in matching).strip()
+def _highlight_text(h: Highlight, alignment: Optional[TranscriptAlignment], limit: int = 220) -> str:
+    # Tijden zijn per opname; alleen de index van de eigen opname is bruikbaar
+    if alignment is None:
+        return ""
+    text = alignment.text_between(h.start_ms, h.end_ms).strip()
     if len(text) > limit:
         text = text[:limit].rsplit(" ", 1)[0] + "…"
     return text
@@ -186,28 +190,17 @@ def _collect(journey_id: str, db: Session) -> tuple[list[PhaseContent], dict]:
         .all()
     )
 
-    asset_ids = [a.id for a in assets]
-    all_segs: list[TranscriptSegment] = (
-        db.query(TranscriptSegment)
-        .filter(TranscriptSegment.media_asset_id.in_(asset_ids))
-        .order_by(TranscriptSegment.start_ms)
-        .all()
-        if asset_ids else []
-    )
-
-    segs_by_asset: dict[str, list[TranscriptSegment]] = {}
-    for seg in all_segs:
-        segs_by_asset.setdefault(seg.media_asset_id, []).append(seg)
+    segs_by_asset = load_segments(db, [a.id for a in assets])
 
     transcript_by_chapter: dict[str, str] = {}
-    segs_by_chapter: dict[str, list[TranscriptSegment]] = {}
+    alignment_by_asset: dict[str, TranscriptAlignment] = {}
     for asset in assets:
-        segs = sorted(segs_by_asset.get(asset.id, []), key=lambda s: s.start_ms)
-        text = " ".join(s.text for s in segs).strip()
+        segs = segs_by_asset.get(asset.id, [])
+        text = assemble_text(segs)
         if text:
             prev = transcript_by_chapter.get(asset.chapter_id, "")
             transcript_by_chapter[asset.chapter_id] = (prev + " " + text).strip()
-            segs_by_chapter.setdefault(asset.chapter_id, []).extend(segs)
+            alignment_by_asset[asset.id] = alignment_for(asset.id, asset.transcript_version, segs)
 
     # Meest recente vraag per hoofdstuk
     question_by_chapter: dict[str, str] = {}
@@ -246,16 +239,15 @@ def _collect(journey_id: str, db: Session) -> tuple[list[PhaseContent], dict]:
             if not raw and chapter_id not in memos_by_chapter:
                 continue
 
-            chapter_segs = segs_by_chapter.get(chapter_id, [])
-            snippets = [
-                HighlightSnippet(
-                    label=h.label,
-                    text=_highlight_text(h, chapter_segs),
-                    color=_LABEL_COLOR.get(h.label, "#c9963a"),
-                )
-                for h in highlights_by_chapter.get(chapter_id, [])
-                if _highlight_text(h, chapter_segs)
-            ]
+            snippets = []
+            for h in highlights_by_chapter.get(chapter_id, []):
+                text = _highlight_text(h, alignment_by_asset.get(h.media_asset_id))
+                if text:
+                    snippets.append(HighlightSnippet(
+                        label=h.label,
+                        text=text,
+                        color=_LABEL_COLOR.get(h.label, "#c9963a"),
+                    ))
 
             chapters.append(ChapterContent(
                 chapter_id=chapter_id,
@@ -0,0 +1,160 @@
+"""
+Celery-taken voor het vooraf bouwen van USB-pakketten.
+
+Draait op de media-worker (queue "media"). Het pakket wordt als ZIP-stream
+rechtstreeks naar objectopslag geüpload onder `usb-packages/{order}/{hash}.zip`;
+de admin-download is daarna een presigned-URL redirect.
+
+Een mislukte build wordt tot `_MAX_RETRIES` keer opnieuw geprobeerd
+(60s, 120s). Een build die door een gecrashte worker op queued/building
+blijft staan, pakt `prebuild_usb_queue` na `BUILD_STALE_AFTER` weer op.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.order import Order
+from app.schemas.orders import PHYSICAL_PACKAGES
+from app.services.export.usb_package import (
+    artifact_key,
+    build_in_flight,
+    collect_package_inputs,
+    mark_build_started,
+    package_fingerprint,
+    s3_client,
+    upload_package_artifact,
+)
+from app.services.media.storage import s3_configured
+from app.services.media.tasks import celery_app
+
+# Voortgang pas wegschrijven na zoveel procentpunten — scheelt commits bij grote journeys
+_PROGRESS_STEP = 5
+_MAX_RETRIES = 2
+_RETRY_BASE_SECONDS = 60
+
+
+@celery_app.task(name="usb.build_package", bind=True, acks_late=True, max_retries=_MAX_RETRIES)
+def build_usb_package(self, order_id: str, force: bool = False) -> str | None:
+    """
+    Bouw het USB-pakket voor een order en bewaar het in objectopslag.
+
+    Idempotent: als er al een pakket met dezelfde content-hash klaarstaat wordt
+    niets opnieuw gebouwd (tenzij `force`). Geeft de object_key terug.
+    """
+    if not s3_configured():
+        logger.info(f"USB-pakket {order_id} overgeslagen: geen objectopslag geconfigureerd")
+        return None
+
+    db: Session = SessionLocal()
+    try:
+        order = db.query(Order).filter(Order.id == order_id).first()
+        if not order:
+            logger.error(f"Order {order_id} niet gevonden voor USB-pakket")
+            return None
+
+        fingerprint = package_fingerprint(db, order)
+        if not force and order.usb_package_status == "ready" and order.usb_package_hash == fingerprint:
+            logger.info(f"USB-pakket {order_id} is actueel ({fingerprint}), niets te doen")
+            return order.usb_package_key
+
+        previous_key = order.usb_package_key
+        mark_build_started(order, "building")
+        db.commit()
+
+        inputs = collect_package_inputs(db, order, with_audio=True)
+        key = artifact_key(order_id, fingerprint)
+        s3 = s3_client()
+
+        def _on_progress(done: int, total: int) -> None:
+            percent = int(done * 100 / total) if total else 100
+            # 100% wordt pas gezet als de upload echt klaar is
+            percent = min(percent, 99)
+            if percent - (order.usb_package_progress or 0) >= _PROGRESS_STEP:
+                order.usb_package_progress = percent
+                db.commit()
+
+        upload_package_artifact(s3, inputs, key, on_progress=_on_progress)
+
+        order.usb_package_status = "ready"
+        order.usb_package_progress = 100
+        order.usb_package_hash = fingerprint
+        order.usb_package_key = key
+        order.usb_package_built_at = datetime.now(timezone.utc)
+        db.commit()
+        logger.info(f"USB-pakket {order_id} gebouwd: {key}")
+
+        # Verouderd artefact opruimen — de nieuwe staat er al
+        if previous_key and previous_key != key:
+            try:
+                s3.delete_object(Bucket=settings.s3_bucket, Key=previous_key)
+            except Exception as exc:
+                logger.warning(f"Kon oud USB-pakket {previous_key} niet verwijderen: {exc}")
+        return key
+
+    except Exception as exc:
+        retrying = self.request.retries < _MAX_RETRIES and not self.request.called_directly
+        logger.error(
+            f"USB-pakket bouwen mislukt voor order {order_id} "
+            f"(poging {self.request.retries + 1}/{_MAX_RETRIES + 1}): {exc}"
+        )
+        db.rollback()
+        try:
+            order = db.query(Order).filter(Order.id == order_id).first()
+            if order:
+                if retrying:
+                    mark_build_started(order, "queued")
+                else:
+                    order.usb_package_status = "failed"
+                db.commit()
+        except Exception:
+            db.rollback()
+        if retrying:
+            raise self.retry(exc=exc, countdown=_RETRY_BASE_SECONDS * 2 ** self.request.retries)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="usb.prebuild_queue")
+def prebuild_usb_queue() -> int:
+    """
+    Beat-taak: zet een build klaar voor elke order in de USB-wachtrij waarvan
+    het pakket ontbreekt of verouderd is (de klant heeft sindsdien opgenomen),
+    of waarvan de build verweesd op queued/building staat.
+    """
+    if not s3_configured():
+        return 0
+
+    db: Session = SessionLocal()
+    queued = 0
+    try:
+        orders = (
+            db.query(Order)
+            .filter(
+                Order.status == "PAID",
+                Order.package_type.in_(PHYSICAL_PACKAGES),
+                Order.usb_burned_at.is_(None),
+            )
+            .all()
+        )
+        for order in orders:
+            if build_in_flight(order):
+                continue
+            if order.usb_package_status == "ready" and order.usb_package_hash == package_fingerprint(db, order):
+                continue
+            if order.usb_package_status in ("queued", "building"):
+                logger.warning(f"USB-pakket {order.id} hing op {order.usb_package_status}, opnieuw ingepland")
+            mark_build_started(order, "queued")
+            db.commit()
+            build_usb_package.apply_async(args=[order.id], queue="media")
+            queued += 1
+        logger.info(f"USB-wachtrij: {queued} pakket(ten) opnieuw ingepland")
+        return queued
+    finally:
+        db.close()
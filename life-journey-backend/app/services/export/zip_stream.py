@@ -0,0 +1,124 @@
+"""
+Streaming ZIP-schrijver voor grote exportpakketten.
+
+`zipfile.ZipFile` kan naar een niet-seekbare stream schrijven: lokale headers
+krijgen dan een data descriptor en de centrale directory volgt aan het eind.
+`ZipStream` vangt de geschreven bytes op en geeft ze direct door aan een
+`StreamingResponse`, zodat het archief nooit in zijn geheel in het geheugen
+staat. Grote entries worden in blokken gekopieerd; ZIP64 wordt automatisch
+ingezet zodra een entry of het archief boven de 4 GiB uitkomt.
+"""
+
+from __future__ import annotations
+
+import io
+import time
+import zipfile
+from typing import IO, Iterator
+
+# Blokgrootte waarmee bestanden in het archief worden gekopieerd
+CHUNK_SIZE = 1024 * 1024
+
+# Audioformaten die al gecomprimeerd zijn — DEFLATE levert hier niets op
+_STORED_EXTENSIONS = {"mp3", "m4a", "aac", "ogg", "opus", "webm", "mp4", "wav", "flac", "jpg", "jpeg", "png"}
+
+
+class _Sink(io.RawIOBase):
+    """Niet-seekbare schrijfbuffer; `tell()` werkt wel zodat zipfile offsets kent."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:  # type: ignore[override]
+        data = bytes(b)
+        if data:
+            self._chunks.append(data)
+            self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def compress_type_for(filename: str) -> int:
+    """ZIP_STORED voor reeds gecomprimeerde media, anders ZIP_DEFLATED."""
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return zipfile.ZIP_STORED if ext in _STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+class ZipStream:
+    """
+    Incrementele ZIP-writer.
+
+    Gebruik:
+        zs = ZipStream()
+        zs.writestr("a.txt", b"...")
+        yield from zs.drain()
+        yield from zs.write_fileobj("audio/01.mp3", fileobj, size)
+        yield from zs.close()
+    """
+
+    def __init__(self) -> None:
+        self._sink = _Sink()
+        self._zf = zipfile.ZipFile(
+            self._sink, mode="w", compression=zipfile.ZIP_DEFLATED, allowZip64=True,
+        )
+        self._closed = False
+
+    @property
+    def bytes_written(self) -> int:
+        return self._sink.tell()
+
+    def namelist(self) -> list[str]:
+        return self._zf.namelist()
+
+    def drain(self) -> Iterator[bytes]:
+        data = self._sink.drain()
+        if data:
+            yield data
+
+    def writestr(self, arcname: str, data: bytes | str) -> None:
+        """Schrijf een kleine entry (tekst, HTML, PDF) in één keer."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._zf.writestr(self._zipinfo(arcname, len(data)), data)
+
+    def write_fileobj(self, arcname: str, fileobj: IO[bytes], size: int) -> Iterator[bytes]:
+        """
+        Kopieer `fileobj` in blokken naar het archief en yield de bytes per blok.
+
+        `size` moet vooraf bekend zijn: zonder seekbare output beslist zipfile
+        bij het openen van de entry of er ZIP64-extra's nodig zijn.
+        """
+        zinfo = self._zipinfo(arcname, size)
+        with self._zf.open(zinfo, mode="w") as dest:
+            while True:
+                chunk = fileobj.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                dest.write(chunk)
+                yield from self.drain()
+        yield from self.drain()
+
+    def close(self) -> Iterator[bytes]:
+        """Schrijf de centrale directory en yield de laatste bytes."""
+        if not self._closed:
+            self._closed = True
+            self._zf.close()
+        yield from self.drain()
+
+    def _zipinfo(self, arcname: str, size: int) -> zipfile.ZipInfo:
+        zinfo = zipfile.ZipInfo(arcname, date_time=time.localtime(time.time())[:6])
+        zinfo.compress_type = compress_type_for(arcname)
+        zinfo.external_attr = 0o644 << 16
+        zinfo.file_size = size
+        return zinfo
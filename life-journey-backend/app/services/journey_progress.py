@@ -2,13 +2,13 @@
 Journey Progress Service
 Handles chapter unlock logic and progress tracking
 
-PERFORMANCE OPTIMIZED: Uses bulk queries instead of per-chapter queries
+PERFORMANCE OPTIMIZED: Reads the maintained journey_chapter_stats counters
+(app/db/chapter_stats.py) instead of aggregating the media table
 """
 
 from typing import Dict
-from sqlalchemy import func
 from sqlalchemy.orm import Session
-from app.models.media import MediaAsset as MediaAssetModel
+from app.models.chapter_stats import JourneyChapterStats
 
 
 # Chapter order defines the linear progression
@@ -62,57 +62,60 @@ DEEP_CHAPTERS = {
 }
 
 
+def _build_unlock_predecessors() -> Dict[str, str | None]:
+    """Chapter whose media unlocks each chapter (None = always unlocked)."""
+    predecessors: Dict[str, str | None] = {}
+    for idx, chapter_id in enumerate(CHAPTER_ORDER):
+        if idx == 0:
+            predecessors[chapter_id] = None
+        elif chapter_id in BONUS_CHAPTERS:
+            # Bonus chapters unlock after completing fase 5
+            predecessors[chapter_id] = "future-gratitude"
+        elif chapter_id in DEEP_CHAPTERS:
+            # Deep chapters unlock after completing bonus phase
+            predecessors[chapter_id] = "bonus-culture"
+        else:
+            predecessors[chapter_id] = CHAPTER_ORDER[idx - 1]
+    return predecessors
+
+
+# Precomputed once: O(1) unlock checks instead of CHAPTER_ORDER.index per chapter
+UNLOCK_PREDECESSOR = _build_unlock_predecessors()
+
+
 def _is_chapter_unlocked_fast(chapter_id: str, media_counts: Dict[str, int]) -> bool:
     """
     Check if chapter is unlocked using preloaded media counts.
     No additional database queries needed!
     """
-    # First chapter is always unlocked
-    if chapter_id == CHAPTER_ORDER[0]:
+    # Unknown chapters (legacy ids) are never locked
+    if chapter_id not in UNLOCK_PREDECESSOR:
         return True
+    predecessor = UNLOCK_PREDECESSOR[chapter_id]
+    return predecessor is None or media_counts.get(predecessor, 0) > 0
 
-    # Bonus chapters unlock after completing fase 5
-    if chapter_id in BONUS_CHAPTERS:
-        return media_counts.get("future-gratitude", 0) > 0
-
-    # Deep chapters unlock after completing bonus phase
-    if chapter_id in DEEP_CHAPTERS:
-        return media_counts.get("bonus-culture", 0) > 0
-
-    # Regular chapters: check if previous chapter has media
-    try:
-        idx = CHAPTER_ORDER.index(chapter_id)
-        if idx > 0:
-            prev_chapter = CHAPTER_ORDER[idx - 1]
-            return media_counts.get(prev_chapter, 0) > 0
-    except ValueError:
-        return True
 
-    return False
+def _media_counts(db: Session, journey_id: str, *chapter_ids: str) -> Dict[str, int]:
+    """Media count per chapter from journey_chapter_stats (optionally only `chapter_ids`)."""
+    query = db.query(JourneyChapterStats.chapter_id, JourneyChapterStats.media_count).filter(
+        JourneyChapterStats.journey_id == journey_id
+    )
+    if chapter_ids:
+        query = query.filter(JourneyChapterStats.chapter_id.in_(chapter_ids))
+    return {chapter_id: count for chapter_id, count in query.all()}
 
 
 def get_all_chapter_statuses(db: Session, journey_id: str) -> Dict[str, Dict]:
     """
     Get status for all chapters in the journey.
     
-    PERFORMANCE OPTIMIZED: Uses a single GROUP BY query instead of
-    60-90 individual queries. Reduces load time from seconds to milliseconds.
+    PERFORMANCE OPTIMIZED: One read of the journey's rows in
+    journey_chapter_stats (primary-key prefix) instead of a GROUP BY over
+    all media on every dashboard load.
     
     Returns: { "chapter-id": { status, mediaCount, isUnlocked }, ... }
     """
-    # OPTIMIZATION: Single query to get all media counts by chapter
-    media_counts_query = (
-        db.query(
-            MediaAssetModel.chapter_id,
-            func.count(MediaAssetModel.id).label('count')
-        )
-        .filter(MediaAssetModel.journey_id == journey_id)
-        .group_by(MediaAssetModel.chapter_id)
-        .all()
-    )
-
-    # Convert to dict for O(1) lookup
-    media_counts = {row.chapter_id: row.count for row in media_counts_query}
+    media_counts = _media_counts(db, journey_id)
 
     # Build statuses using the preloaded media counts - NO MORE QUERIES!
     statuses = {}
@@ -139,23 +142,31 @@ def get_all_chapter_statuses(db: Session, journey_id: str) -> Dict[str, Dict]:
 def get_chapter_status(db: Session, journey_id: str, chapter_id: str) -> Dict[str, any]:
     """
     Get the status of a specific chapter.
-    For single chapter lookups - uses the optimized bulk function internally.
+    Reads only the chapter's own counter and that of its predecessor.
     """
-    statuses = get_all_chapter_statuses(db, journey_id)
-    return statuses.get(chapter_id, {
-        "status": "locked",
-        "mediaCount": 0,
-        "isUnlocked": False
-    })
+    if chapter_id not in UNLOCK_PREDECESSOR:
+        return {
+            "status": "locked",
+            "mediaCount": 0,
+            "isUnlocked": False
+        }
+    predecessor = UNLOCK_PREDECESSOR[chapter_id]
+    media_counts = _media_counts(db, journey_id, *filter(None, (chapter_id, predecessor)))
+    media_count = media_counts.get(chapter_id, 0)
+    is_unlocked = _is_chapter_unlocked_fast(chapter_id, media_counts)
+    return {
+        "status": "completed" if media_count > 0 else "available" if is_unlocked else "locked",
+        "mediaCount": media_count,
+        "isUnlocked": is_unlocked
+    }
 
 
 def is_chapter_unlocked(db: Session, journey_id: str, chapter_id: str) -> bool:
     """
     Check if a chapter is unlocked based on linear progression rules.
-    Uses the optimized bulk query internally.
+    Reads only the predecessor's counter.
     """
-    statuses = get_all_chapter_statuses(db, journey_id)
-    return statuses.get(chapter_id, {}).get("isUnlocked", False)
+    return get_chapter_status(db, journey_id, chapter_id)["isUnlocked"]
 
 
 def get_journey_progress(db: Session, journey_id: str) -> Dict[str, any]:
@@ -0,0 +1,213 @@
+"""
+Woord-index voor het uitlijnen van highlights op een transcript.
+
+Een `TranscriptAlignment` wordt één keer per transcript gebouwd uit de
+(gesorteerde) segmenten en beantwoordt daarna elke highlight zonder de tekst
+opnieuw te doorlopen:
+
+  • tekenpositie → woord: bisect over de beginposities van de woorden
+  • woord → tijd: elk woord krijgt een tijdvak binnen zijn segment
+  • tijd → woorden: bisect over de (oplopende) woordtijden
+  • citaat → woorden: via een index van woord-trigrammen; een letterlijk
+    citaat wordt exact gevonden, een door het taalmodel geparafraseerd citaat
+    via de plek waar de meeste trigrammen op dezelfde verschuiving vallen
+
+Citaten die nergens op lijken leveren `None` op in plaats van een gok.
+
+De detector (generate_transcript), de PDF-export en de journey-detailweergave
+delen de index via `alignment_for`, gecachet op (opname, transcriptversie).
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Iterable
+
+# Lengte van de woord-n-grammen in de index
+_NGRAM = 3
+# Minimaal deel van de citaat-trigrammen dat moet terugkomen voor een vage match
+_MIN_FUZZY_SCORE = 0.35
+
+_ALIGNMENT_CACHE_MAX_ENTRIES = 256
+
+_WORD_RE = re.compile(r"\S+")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+_alignment_cache: OrderedDict[tuple[str, int], "TranscriptAlignment"] = OrderedDict()
+_alignment_cache_lock = threading.Lock()
+
+
+def _field(seg: Any, name: str) -> Any:
+    return seg[name] if isinstance(seg, dict) else getattr(seg, name)
+
+
+def normalize_word(word: str) -> str:
+    """Kleine letters, zonder accenten en leestekens ("Één," → "een")."""
+    decomposed = unicodedata.normalize("NFKD", word.lower())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_WORD_RE.sub("", stripped)
+
+
+def _tokens(text: str) -> list[str]:
+    return [token for token in (normalize_word(w) for w in text.split()) if token]
+
+
+class TranscriptAlignment:
+    """Woord-index over de segmenten van één opname (dicts of TranscriptSegment-rijen)."""
+
+    def __init__(self, segments: Iterable[Any]):
+        ordered = sorted(
+            ((_field(s, "text") or "", int(_field(s, "start_ms")), int(_field(s, "end_ms"))) for s in segments),
+            key=lambda s: s[1],
+        )
+        # Zelfde samenvoeging als assemble_text/materialize_transcript
+        self.text = " ".join(text for text, _, _ in ordered)
+
+        self._char_starts: list[int] = []
+        self._char_ends: list[int] = []
+        self._start_ms: list[int] = []
+        self._end_ms: list[int] = []
+        self._normalized: list[str] = []
+
+        offset = 0
+        latest_end = 0
+        for text, start_ms, end_ms in ordered:
+            words = list(_WORD_RE.finditer(text))
+            span = max(0, end_ms - start_ms)
+            for i, match in enumerate(words):
+                self._char_starts.append(offset + match.start())
+                self._char_ends.append(offset + match.end())
+                # Segmenten kunnen overlappen; de eindtijden blijven oplopend voor bisect
+                latest_end = max(latest_end, start_ms + span * (i + 1) // len(words))
+                self._start_ms.append(start_ms + span * i // len(words))
+                self._end_ms.append(latest_end)
+                self._normalized.append(normalize_word(match.group()))
+            offset += len(text) + 1
+
+        self._ngrams: dict[tuple[str, ...], list[int]] = defaultdict(list)
+        self._unigrams: dict[str, list[int]] = defaultdict(list)
+        for index, word in enumerate(self._normalized):
+            if word:
+                self._unigrams[word].append(index)
+        for index in range(len(self._normalized) - _NGRAM + 1):
+            gram = tuple(self._normalized[index:index + _NGRAM])
+            if all(gram):
+                self._ngrams[gram].append(index)
+
+    def __len__(self) -> int:
+        return len(self._normalized)
+
+    def word_at(self, char_offset: int) -> int:
+        """Index van het woord waarin (of vlak na) `char_offset` in `text` valt."""
+        return max(0, bisect_right(self._char_starts, char_offset) - 1)
+
+    def word_span_ms(self, first: int, last: int) -> tuple[int, int]:
+        """Begin en einde (ms) van woorden `first` t/m `last`."""
+        return self._start_ms[first], self._end_ms[last]
+
+    def find_words(self, quote: str) -> tuple[int, int] | None:
+        """Eerste en laatste woordindex van `quote`, letterlijk of geparafraseerd."""
+        tokens = _tokens(quote)
+        if not tokens or not self._normalized:
+            return None
+        return self._find_exact(tokens) or self._find_fuzzy(tokens)
+
+    def _find_exact(self, tokens: list[str]) -> tuple[int, int] | None:
+        if len(tokens) >= _NGRAM:
+            candidates = self._ngrams.get(tuple(tokens[:_NGRAM]), ())
+        else:
+            candidates = self._unigrams.get(tokens[0], ())
+        for start in candidates:
+            if self._normalized[start:start + len(tokens)] == tokens:
+                return start, start + len(tokens) - 1
+        return None
+
+    def _find_fuzzy(self, tokens: list[str]) -> tuple[int, int] | None:
+        grams = len(tokens) - _NGRAM + 1
+        if grams < 1:
+            return None
+
+        # Elke gedeelde trigram stemt op een verschuiving (transcriptpositie - citaatpositie)
+        hits: list[tuple[int, int, int]] = []
+        for j in range(grams):
+            for position in self._ngrams.get(tuple(tokens[j:j + _NGRAM]), ()):
+                hits.append((position - j, position, j))
+        if not hits:
+            return None
+        hits.sort()
+
+        # Densste venster van verschuivingen; ruimte voor ingevoegde of weggelaten woorden.
+        # Schuivend venster met een teller per citaat-trigram: lineair in het aantal hits.
+        window = max(2, len(tokens) // 4)
+        best: tuple[int, int, int] | None = None
+        in_window: Counter[int] = Counter()
+        lo = 0
+        for hi, (shift, _, j) in enumerate(hits):
+            in_window[j] += 1
+            while shift - hits[lo][0] > window:
+                dropped = hits[lo][2]
+                in_window[dropped] -= 1
+                if not in_window[dropped]:
+                    del in_window[dropped]
+                lo += 1
+            matched = len(in_window)
+            if best is None or matched > best[0]:
+                best = (matched, lo, hi)
+        matched, lo, hi = best
+        if matched / grams < _MIN_FUZZY_SCORE:
+            return None
+
+        cluster = hits[lo:hi + 1]
+        _, first_pos, first_j = min(cluster, key=lambda h: h[1])
+        _, last_pos, last_j = max(cluster, key=lambda h: h[1])
+        # Ongematchte kop en staart van het citaat meenemen
+        first = max(0, first_pos - first_j)
+        last = min(len(self._normalized) - 1, last_pos + _NGRAM - 1 + (grams - 1 - last_j))
+        return first, last
+
+    def locate(self, quote: str) -> tuple[int, int] | None:
+        """Begin en einde (ms) van `quote` in de opname, of None als het niet te vinden is."""
+        words = self.find_words(quote)
+        if words is None:
+            return None
+        return self.word_span_ms(*words)
+
+    def text_between(self, start_ms: int, end_ms: int) -> str:
+        """De woorden die tussen `start_ms` en `end_ms` worden uitgesproken."""
+        first = bisect_right(self._end_ms, start_ms)
+        last = bisect_left(self._start_ms, end_ms) - 1
+        if first > last:
+            return ""
+        return self.text[self._char_starts[first]:self._char_ends[last]]
+
+
+def alignment_for(asset_id: str, transcript_version: int | None, segments: Iterable[Any]) -> TranscriptAlignment:
+    """
+    De index van een opname, uit de procescache als deze transcriptversie al gebouwd is.
+
+    `segments` wordt alleen gelezen bij een misser. Een nieuwe transcriptie
+    hoogt `transcript_version` op, zodat een oude index vanzelf niet meer past.
+    """
+    key = (asset_id, transcript_version or 0)
+    with _alignment_cache_lock:
+        hit = _alignment_cache.get(key)
+        if hit is not None:
+            _alignment_cache.move_to_end(key)
+            return hit
+
+    alignment = TranscriptAlignment(segments)
+    with _alignment_cache_lock:
+        _alignment_cache[key] = alignment
+        _alignment_cache.move_to_end(key)
+        while len(_alignment_cache) > _ALIGNMENT_CACHE_MAX_ENTRIES:
+            _alignment_cache.popitem(last=False)
+    return alignment
+
+
+def clear_alignment_cache() -> None:
+    with _alignment_cache_lock:
+        _alignment_cache.clear()
@@ -0,0 +1,220 @@
+"""
+Streamende opslag van uploads (PUT /media/local-upload en /quick-thoughts/local-upload).
+
+De body wordt in blokken gelezen en direct doorgezet naar S3/R2 (multipart
+upload) of naar schijf; er staat nooit meer dan één deel van
+`upload_part_size_bytes` per upload in het geheugen. Onderweg:
+
+  • magic bytes gecontroleerd op het eerste blok (validators.validate_header_bytes)
+  • grootte bijgehouden en tegen de limiet per bestandstype gehouden (413)
+  • SHA-256 berekend
+
+Past een upload in één deel, dan gaat hij met één `put_object` naar S3 in
+plaats van een multipart-upload. Faalt S3 voordat er iets is vastgelegd, dan
+valt de upload terug op lokale opslag, net als voorheen. Bij een fout
+wordt een half-geschreven multipart-upload of bestand opgeruimd.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+from loguru import logger
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.media.local_storage import local_storage
+from app.services.media.storage import get_s3_client, s3_configured
+from app.services.media.validators import (
+    MAGIC_READ_BYTES,
+    check_file_size,
+    validate_header_bytes,
+)
+
+# Bestandstypen waarvan de inhoud ook in de database komt (klein, max. MAX_TEXT_SIZE)
+_TEXT_EXTENSIONS = (".txt", ".md")
+# Leesgrootte voor multipart/form-data-bestanden (al door Starlette gespoold)
+_FORM_READ_BYTES = 1024 * 1024
+
+
+@dataclass
+class IngestResult:
+    object_key: str
+    size_bytes: int
+    sha256: str
+    location: str  # "s3" of "local"
+    # Volledige inhoud, alleen voor tekstbestanden
+    text_body: Optional[bytes] = None
+
+
+class _S3Sink:
+    location = "s3"
+
+    def __init__(self, object_key: str, content_type: str):
+        self._client = get_s3_client()
+        self._key = object_key
+        self._content_type = content_type
+        self._upload_id: Optional[str] = None
+        self._parts: list[dict] = []
+
+    @property
+    def committed(self) -> bool:
+        return self._upload_id is not None
+
+    def write_part(self, block: bytes) -> None:
+        if self._upload_id is None:
+            self._upload_id = self._client.create_multipart_upload(
+                Bucket=settings.s3_bucket, Key=self._key, ContentType=self._content_type,
+            )["UploadId"]
+        number = len(self._parts) + 1
+        response = self._client.upload_part(
+            Bucket=settings.s3_bucket, Key=self._key, UploadId=self._upload_id,
+            PartNumber=number, Body=block,
+        )
+        self._parts.append({"PartNumber": number, "ETag": response["ETag"]})
+
+    def finish(self, tail: bytes) -> None:
+        if self._upload_id is None:
+            # Alles paste in één deel
+            self._client.put_object(
+                Bucket=settings.s3_bucket, Key=self._key, Body=tail, ContentType=self._content_type,
+            )
+            return
+        if tail:
+            self.write_part(tail)
+        self._client.complete_multipart_upload(
+            Bucket=settings.s3_bucket, Key=self._key, UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+
+    def abort(self) -> None:
+        if self._upload_id is None:
+            return
+        try:
+            self._client.abort_multipart_upload(
+                Bucket=settings.s3_bucket, Key=self._key, UploadId=self._upload_id,
+            )
+        except Exception as exc:
+            logger.warning(f"Could not abort multipart upload for {self._key}: {exc}")
+
+
+class _LocalSink:
+    location = "local"
+    committed = False
+
+    def __init__(self, object_key: str):
+        self._target = local_storage.get_file_path(object_key)
+        self._target.parent.mkdir(parents=True, exist_ok=True)
+        # Pas na een volledige upload op de definitieve plek zetten
+        self._partial = self._target.with_name(self._target.name + ".part")
+        self._file = open(self._partial, "wb")
+
+    def write_part(self, block: bytes) -> None:
+        self._file.write(block)
+
+    def finish(self, tail: bytes) -> None:
+        self._file.write(tail)
+        self._file.close()
+        os.replace(self._partial, self._target)
+
+    def abort(self) -> None:
+        self._file.close()
+        Path(self._partial).unlink(missing_ok=True)
+
+
+async def form_file_chunks(file) -> AsyncIterator[bytes]:
+    """Blokken uit een multipart/form-data-bestand (UploadFile)."""
+    while True:
+        chunk = await file.read(_FORM_READ_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def ingest_upload(
+    chunks: AsyncIterator[bytes],
+    object_key: str,
+    extension: str,
+    content_type: str,
+    *,
+    use_s3: bool = True,
+) -> IngestResult:
+    """
+    Sla een upload streamend op onder `object_key` (al gevalideerd).
+
+    Raises:
+        HTTPException: 400 bij verkeerde magic bytes, 413 boven de limiet
+    """
+    part_size = settings.upload_part_size_bytes
+    sink = await run_in_threadpool(_open_sink, object_key, content_type, use_s3)
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    text_body = bytearray() if extension in _TEXT_EXTENSIONS else None
+    size = 0
+    header_checked = False
+
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            size += len(chunk)
+            check_file_size(size, extension)
+            digest.update(chunk)
+            buffer += chunk
+            if text_body is not None:
+                text_body += chunk
+            if not header_checked and len(buffer) >= MAGIC_READ_BYTES:
+                validate_header_bytes(bytes(buffer[:MAGIC_READ_BYTES]), extension)
+                header_checked = True
+            while len(buffer) >= part_size:
+                block = bytes(buffer[:part_size])
+                del buffer[:part_size]
+                sink = await _write(sink, "write_part", block, object_key)
+
+        if not header_checked:
+            validate_header_bytes(bytes(buffer), extension)
+        sink = await _write(sink, "finish", bytes(buffer), object_key)
+    except BaseException:
+        await run_in_threadpool(sink.abort)
+        raise
+
+    result = IngestResult(
+        object_key=object_key,
+        size_bytes=size,
+        sha256=digest.hexdigest(),
+        location=sink.location,
+        text_body=bytes(text_body) if text_body is not None else None,
+    )
+    logger.info(f"Stored {size} bytes ({sink.location}, sha256 {result.sha256[:12]}): {object_key}")
+    return result
+
+
+def _open_sink(object_key: str, content_type: str, use_s3: bool):
+    if use_s3 and s3_configured():
+        return _S3Sink(object_key, content_type)
+    return _LocalSink(object_key)
+
+
+async def _write(sink, method: str, block: bytes, object_key: str):
+    """Schrijf een blok; valt terug op lokale opslag als S3 nog niets heeft vastgelegd."""
+    committed = sink.committed
+    try:
+        await run_in_threadpool(getattr(sink, method), block)
+        return sink
+    except (BotoCoreError, ClientError) as exc:
+        if sink.location != "s3" or committed:
+            raise
+        logger.warning(f"S3 upload failed, falling back to local storage: {exc}")
+        await run_in_threadpool(sink.abort)
+        local = await run_in_threadpool(_LocalSink, object_key)
+        try:
+            await run_in_threadpool(getattr(local, method), block)
+        except BaseException:
+            await run_in_threadpool(local.abort)
+            raise
+        return local
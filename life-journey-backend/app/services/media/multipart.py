@@ -0,0 +1,146 @@
+"""
+Multipart-uploads rechtstreeks naar S3/R2.
+
+De browser uploadt elk deel met een eigen presigned URL naar de bucket; de
+API ondertekent alleen en controleert. Verloopt een verbinding halverwege,
+dan vraagt de client welke delen er al staan (`uploaded_parts`) en uploadt
+alleen de rest opnieuw.
+
+Bij afronden wordt niet op de client vertrouwd: de delen worden bij S3
+opgevraagd en moeten aansluitend genummerd zijn, de afgesproken deelgrootte
+hebben en samen precies de aangekondigde grootte opleveren. Daarna worden
+de magic bytes van het samengestelde object gecontroleerd.
+
+Let op: dit is backend-voorwerk. De recorder in de frontend uploadt nog via
+`/media/presign` en de backend-proxy (zie presigner.py); de browser praat
+pas rechtstreeks met de bucket als de recorder op deze flow is omgezet en de
+bucket CORS voor `PUT` vanaf het frontend-domein toestaat (DEPLOYMENT.md).
+"""
+
+from __future__ import annotations
+
+import math
+
+from fastapi import HTTPException
+from loguru import logger
+
+from app.core.config import settings
+from app.services.media.storage import get_s3_client
+from app.services.media.validators import MAGIC_READ_BYTES, validate_header_bytes
+
+# Grenzen van S3 (en R2) voor multipart-uploads
+_MIN_PART_SIZE = 5 * 1024 * 1024
+_MAX_PARTS = 10_000
+
+# Geldigheidsduur van een presigned deel-URL
+PART_URL_TTL_SECONDS = 3600
+
+
+def part_size_for(size_bytes: int) -> int:
+    """Deelgrootte voor een upload van `size_bytes`: minstens de ingestelde grootte, max. 10.000 delen."""
+    configured = max(_MIN_PART_SIZE, settings.upload_part_size_bytes)
+    return max(configured, math.ceil(size_bytes / _MAX_PARTS))
+
+
+def part_count(size_bytes: int, part_size: int) -> int:
+    return max(1, math.ceil(size_bytes / part_size))
+
+
+def start_upload(object_key: str, content_type: str) -> str:
+    """Start een multipart-upload en geef het upload-id terug."""
+    response = get_s3_client().create_multipart_upload(
+        Bucket=settings.s3_bucket, Key=object_key, ContentType=content_type,
+    )
+    return response["UploadId"]
+
+
+def presign_parts(object_key: str, upload_id: str, part_numbers: list[int]) -> dict[int, str]:
+    """Presigned PUT-URL per deelnummer (niet gecachet: elk deel wordt één keer geüpload)."""
+    client = get_s3_client()
+    return {
+        number: client.generate_presigned_url(
+            "upload_part",
+            Params={
+                "Bucket": settings.s3_bucket, "Key": object_key,
+                "UploadId": upload_id, "PartNumber": number,
+            },
+            ExpiresIn=PART_URL_TTL_SECONDS,
+        )
+        for number in part_numbers
+    }
+
+
+def uploaded_parts(object_key: str, upload_id: str) -> list[dict]:
+    """Alle delen die S3 al heeft ontvangen: PartNumber, Size en ETag, oplopend."""
+    client = get_s3_client()
+    parts: list[dict] = []
+    marker = 0
+    while True:
+        response = client.list_parts(
+            Bucket=settings.s3_bucket, Key=object_key, UploadId=upload_id, PartNumberMarker=marker,
+        )
+        parts.extend(response.get("Parts", []))
+        if not response.get("IsTruncated"):
+            break
+        marker = response["NextPartNumberMarker"]
+    return sorted(parts, key=lambda part: part["PartNumber"])
+
+
+def complete_upload(object_key: str, upload_id: str, size_bytes: int, part_size: int, extension: str) -> int:
+    """
+    Controleer de delen bij S3, stel het object samen en geef de grootte terug.
+
+    Raises:
+        HTTPException: 409 als er delen ontbreken of niet kloppen (de client
+            kan die opnieuw uploaden), 400 als de inhoud niet bij de extensie past
+    """
+    parts = uploaded_parts(object_key, upload_id)
+    expected = part_count(size_bytes, part_size)
+    received = {part["PartNumber"]: part for part in parts}
+
+    missing = [number for number in range(1, expected + 1) if number not in received]
+    if missing:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Upload is nog niet compleet", "missing_parts": missing},
+        )
+    wrong = [
+        number for number in sorted(received)
+        if number > expected
+        or received[number]["Size"] != min(part_size, size_bytes - (number - 1) * part_size)
+    ]
+    if wrong:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Upload-delen hebben een onverwachte grootte", "missing_parts": wrong},
+        )
+
+    client = get_s3_client()
+    client.complete_multipart_upload(
+        Bucket=settings.s3_bucket, Key=object_key, UploadId=upload_id,
+        MultipartUpload={
+            "Parts": [{"PartNumber": part["PartNumber"], "ETag": part["ETag"]} for part in parts],
+        },
+    )
+
+    header = client.get_object(
+        Bucket=settings.s3_bucket, Key=object_key, Range=f"bytes=0-{MAGIC_READ_BYTES - 1}",
+    )["Body"].read()
+    try:
+        validate_header_bytes(header, extension)
+    except HTTPException:
+        client.delete_object(Bucket=settings.s3_bucket, Key=object_key)
+        raise
+
+    logger.info(f"Completed multipart upload {object_key}: {expected} parts, {size_bytes} bytes")
+    return size_bytes
+
+
+def abort_upload(object_key: str, upload_id: str) -> None:
+    """Breek een lopende multipart-upload af; S3 gooit de al geüploade delen weg."""
+    try:
+        get_s3_client().abort_multipart_upload(
+            Bucket=settings.s3_bucket, Key=object_key, UploadId=upload_id,
+        )
+    except Exception as exc:
+        logger.warning(f"Could not abort multipart upload for {object_key}: {exc}")
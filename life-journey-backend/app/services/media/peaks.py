@@ -0,0 +1,210 @@
+"""
+Golfvorm (waveform peaks) van opnames.
+
+Na het transcoderen decodeert de worker de audio één keer naar mono 16-bit
+PCM (ffmpeg, 8 kHz) en reduceert die per blok van `samples_per_peak`
+samples tot een minimum en maximum. Dat gebeurt gevectoriseerd met NumPy,
+blok voor blok terwijl ffmpeg nog decodeert, zodat een uur audio nooit
+helemaal in het geheugen staat.
+
+Het resultaat wordt opgeslagen in het binaire formaat van BBC audiowaveform
+(.dat, versie 1, 8-bit), dat spelers als peaks.js direct kunnen tekenen:
+
+  int32 versie (1) | uint32 vlaggen (1 = 8-bit) | int32 sample rate |
+  int32 samples per peak | uint32 aantal | int8 min, int8 max, ...
+
+Een uur audio is zo ongeveer 40 KB in plaats van tientallen megabytes.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+import numpy as np
+
+# Decodeer-samplerate: ruim voldoende voor een omhullende, en 6x minder data dan 48 kHz
+SAMPLE_RATE = 8000
+# Basisresolutie: 20 peaks per seconde (50 ms per peak)
+_PEAKS_PER_SECOND = 20
+# Bovengrens per opname; lange opnames krijgen grovere peaks
+_MAX_PEAKS = 20_000
+# Aantal peaks dat per leesblok uit ffmpeg wordt verwerkt
+_PEAKS_PER_READ = 4096
+
+_DAT_HEADER = struct.Struct("<iIiiI")
+_DAT_VERSION = 1
+_FLAG_8BIT = 1
+
+
+@dataclass
+class WaveformPeaks:
+    sample_rate: int
+    samples_per_peak: int
+    # Genormaliseerd naar int8; mins[i] <= maxs[i]
+    mins: np.ndarray
+    maxs: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.mins)
+
+    def index_at(self, ms: int) -> int:
+        """Peak-index van tijdstip `ms`, begrensd tot de golfvorm."""
+        index = ms * self.sample_rate // (1000 * self.samples_per_peak)
+        return max(0, min(len(self) - 1, index))
+
+
+def _reduce(samples: np.ndarray, samples_per_peak: int) -> tuple[np.ndarray, np.ndarray]:
+    """Min/max per blok; een onvolledig laatste blok telt mee."""
+    full = len(samples) // samples_per_peak * samples_per_peak
+    blocks = samples[:full].reshape(-1, samples_per_peak)
+    mins, maxs = blocks.min(axis=1), blocks.max(axis=1)
+    if full < len(samples):
+        tail = samples[full:]
+        mins = np.append(mins, tail.min())
+        maxs = np.append(maxs, tail.max())
+    return mins, maxs
+
+
+def _coarsen(mins: np.ndarray, maxs: np.ndarray, factor: int) -> tuple[np.ndarray, np.ndarray]:
+    """Voeg telkens `factor` peaks samen (min van de minima, max van de maxima)."""
+    padded = math.ceil(len(mins) / factor) * factor
+    mins = np.pad(mins, (0, padded - len(mins)), mode="edge").reshape(-1, factor).min(axis=1)
+    maxs = np.pad(maxs, (0, padded - len(maxs)), mode="edge").reshape(-1, factor).max(axis=1)
+    return mins, maxs
+
+
+def _to_int8(mins: np.ndarray, maxs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Schaal naar int8 t.o.v. de luidste sample, zodat zachte opnames niet plat ogen."""
+    loudest = int(max(np.abs(mins.astype(np.int32)).max(initial=0), np.abs(maxs.astype(np.int32)).max(initial=0)))
+    if loudest == 0:
+        return np.zeros(len(mins), np.int8), np.zeros(len(maxs), np.int8)
+    scale = 127 / loudest
+    return (
+        np.round(mins * scale).astype(np.int8),
+        np.round(maxs * scale).astype(np.int8),
+    )
+
+
+def peaks_from_pcm(
+    stream: BinaryIO,
+    *,
+    sample_rate: int = SAMPLE_RATE,
+    max_peaks: int = _MAX_PEAKS,
+) -> WaveformPeaks:
+    """Peaks uit een stroom mono s16le-PCM, blok voor blok gelezen."""
+    samples_per_peak = sample_rate // _PEAKS_PER_SECOND
+    read_bytes = samples_per_peak * _PEAKS_PER_READ * 2
+    mins_parts: list[np.ndarray] = []
+    maxs_parts: list[np.ndarray] = []
+    carry = b""
+
+    while True:
+        block = stream.read(read_bytes)
+        if not block:
+            break
+        data = carry + block
+        # Alleen hele peaks verwerken; de rest schuift door naar het volgende blok
+        usable = len(data) // (samples_per_peak * 2) * samples_per_peak * 2
+        carry = data[usable:]
+        if usable:
+            mins, maxs = _reduce(np.frombuffer(data[:usable], dtype="<i2"), samples_per_peak)
+            mins_parts.append(mins)
+            maxs_parts.append(maxs)
+
+    if len(carry) >= 2:
+        mins, maxs = _reduce(np.frombuffer(carry[:len(carry) // 2 * 2], dtype="<i2"), samples_per_peak)
+        mins_parts.append(mins)
+        maxs_parts.append(maxs)
+
+    mins = np.concatenate(mins_parts) if mins_parts else np.zeros(0, np.int16)
+    maxs = np.concatenate(maxs_parts) if maxs_parts else np.zeros(0, np.int16)
+    if len(mins) > max_peaks:
+        factor = math.ceil(len(mins) / max_peaks)
+        mins, maxs = _coarsen(mins, maxs, factor)
+        samples_per_peak *= factor
+
+    mins, maxs = _to_int8(mins, maxs)
+    return WaveformPeaks(sample_rate, samples_per_peak, mins, maxs)
+
+
+def decode_command(source: str) -> list[str]:
+    """ffmpeg: eerste audiostroom als mono 16-bit PCM op stdout."""
+    return [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-i", source,
+        "-map", "0:a:0", "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "s16le", "-acodec", "pcm_s16le", "pipe:1",
+    ]
+
+
+def compute_peaks(source: str, timeout: Optional[float] = None) -> WaveformPeaks:
+    """
+    Decodeer `source` (presigned URL of lokaal pad) en bereken de peaks.
+
+    `timeout` geldt voor het hele decoderen: een watchdog stopt ffmpeg als
+    die blijft hangen (bijv. een trage bron), ook terwijl de stdout nog
+    gelezen wordt.
+
+    Raises:
+        subprocess.CalledProcessError / TimeoutExpired: als ffmpeg faalt
+    """
+    process = subprocess.Popen(
+        decode_command(source), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    timed_out = threading.Event()
+
+    def _kill() -> None:
+        timed_out.set()
+        process.kill()
+
+    watchdog = threading.Timer(timeout, _kill) if timeout is not None else None
+    if watchdog is not None:
+        watchdog.daemon = True
+        watchdog.start()
+    try:
+        peaks = peaks_from_pcm(process.stdout)
+        _, stderr = process.communicate(timeout=timeout)
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        if watchdog is not None:
+            watchdog.cancel()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(process.args, timeout)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(
+            process.returncode, "ffmpeg", stderr=stderr.decode("utf-8", "replace"),
+        )
+    return peaks
+
+
+def encode_dat(peaks: WaveformPeaks) -> bytes:
+    """audiowaveform .dat (versie 1, 8-bit): header plus afwisselend min en max."""
+    interleaved = np.empty(len(peaks) * 2, dtype=np.int8)
+    interleaved[0::2] = peaks.mins
+    interleaved[1::2] = peaks.maxs
+    header = _DAT_HEADER.pack(_DAT_VERSION, _FLAG_8BIT, peaks.sample_rate, peaks.samples_per_peak, len(peaks))
+    return header + interleaved.tobytes()
+
+
+def decode_dat(data: bytes) -> WaveformPeaks:
+    """Lees een .dat die door `encode_dat` is geschreven."""
+    version, flags, sample_rate, samples_per_peak, length = _DAT_HEADER.unpack_from(data)
+    if version != _DAT_VERSION or not flags & _FLAG_8BIT:
+        raise ValueError(f"Unsupported waveform data (version {version}, flags {flags})")
+    values = np.frombuffer(data, dtype=np.int8, count=length * 2, offset=_DAT_HEADER.size)
+    return WaveformPeaks(sample_rate, samples_per_peak, values[0::2].copy(), values[1::2].copy())
+
+
+def peaks_source_key(object_key: str, renditions: Optional[dict]) -> str:
+    """Kleinste bron met dezelfde tijdlijn: de preview-versie als die er is, anders het origineel."""
+    for name in ("preview", "aac", "opus"):
+        if renditions and name in renditions:
+            return renditions[name]["key"]
+    return object_key
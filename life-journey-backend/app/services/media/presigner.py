@@ -39,10 +39,42 @@ def verify_upload_signature(object_key: str, expires_at: int, signature: str) ->
     return hmac.compare_digest(expected, signature)
 
 
-def build_presigned_upload(payload: MediaPresignRequest) -> MediaPresignResponse:
+def _sign_playback(object_key: str, expires_at: int) -> str:
+    """HMAC voor een afspeel-capability; eigen prefix, zodat hij nooit als upload-URL geldt."""
+    message = f"play:{object_key}:{expires_at}".encode()
+    secret = (settings.jwt_secret_key or "").encode()
+    return hmac.new(secret, message, hashlib.sha256).hexdigest()
+
+
+def build_playback_url(object_key: str, expires_in: int = 3600) -> str:
+    """
+    Ondertekende URL voor de HLS-playlist van een opname.
+
+    Native HLS-spelers (iOS) sturen geen Bearer-token mee; serve_file heeft
+    de eigenaarscheck al gedaan en geeft deze URL als capability uit.
+    """
+    expires_at = int(time.time()) + expires_in
+    return (
+        f"{settings.api_base_url}/api/v1/media/hls/{object_key}"
+        f"?exp={expires_at}&sig={_sign_playback(object_key, expires_at)}"
+    )
+
+
+def verify_playback_signature(object_key: str, expires_at: int, signature: str) -> bool:
+    if not signature or expires_at <= 0 or time.time() > expires_at:
+        return False
+    return hmac.compare_digest(_sign_playback(object_key, expires_at), signature)
+
+
+def new_object_key(payload: MediaPresignRequest) -> tuple[str, str]:
+    """Nieuw asset-id en de bijbehorende object_key (journey_id/chapter_id/asset_id/filename)."""
     asset_id = str(uuid4())
     chapter_id_value = payload.chapter_id.value if hasattr(payload.chapter_id, 'value') else str(payload.chapter_id)
-    object_key = f"{payload.journey_id}/{chapter_id_value}/{asset_id}/{payload.filename}"
+    return asset_id, f"{payload.journey_id}/{chapter_id_value}/{asset_id}/{payload.filename}"
+
+
+def build_presigned_upload(payload: MediaPresignRequest) -> MediaPresignResponse:
+    asset_id, object_key = new_object_key(payload)
 
     # Always route through the backend proxy to avoid browser→R2 CORS issues.
     # The local-upload endpoint handles S3/R2 upload server-side when configured.
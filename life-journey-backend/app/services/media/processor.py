@@ -1,3 +1,4 @@
+import threading
 from typing import Optional
 from loguru import logger
 
@@ -68,6 +69,122 @@ def enqueue_gift_message_transcript_job(order_id: str) -> Optional[str]:
             return None
 
 
+def enqueue_usb_package_job(order_id: str, force: bool = False) -> Optional[str]:
+    """
+    Plan het vooraf bouwen van het USB-pakket voor een order.
+
+    Alleen via Celery: een synchrone build (PDF + alle audio) hoort niet in een
+    webhook- of admin-request. Zonder Celery valt de admin-download terug op
+    live streamen.
+    """
+    if not _is_celery_available():
+        logger.info(f"USB-pakket voor order {order_id} niet gepland (Celery not configured)")
+        return None
+
+    try:
+        from app.services.media.tasks import celery_app
+        result = celery_app.send_task(
+            "usb.build_package", args=[order_id], kwargs={"force": force}, queue="media",
+        )
+        logger.info(f"USB-pakket gequeued voor order {order_id}, task_id={result.id}")
+        return result.id
+    except Exception as e:
+        logger.warning(f"Queue USB-pakket faalde voor order {order_id}: {e}")
+        return None
+
+
+_MEMORY_REFRESH_KEY = "memory-refresh:{journey_id}"
+# Marker blijft iets langer staan dan de countdown, zodat een gecrashte worker
+# de journey niet voorgoed blokkeert
+_MEMORY_REFRESH_GRACE_SECONDS = 300
+
+# Zonder Celery: journeys waarvoor nu een refresh-thread loopt (één per journey)
+_local_refreshes: set[str] = set()
+_local_refreshes_lock = threading.Lock()
+
+
+def _redis_client():
+    import redis as redis_lib
+    return redis_lib.from_url(settings.redis_url, socket_connect_timeout=1)
+
+
+def clear_memory_refresh_marker(journey_id: str) -> None:
+    """Geef de debounce-marker vrij; aangeroepen zodra de refresh-taak start."""
+    if not _is_celery_available():
+        return
+    try:
+        _redis_client().delete(_MEMORY_REFRESH_KEY.format(journey_id=journey_id))
+    except Exception as e:
+        logger.warning(f"Kon memory-refresh marker voor journey {journey_id} niet verwijderen: {e}")
+
+
+def enqueue_memory_refresh_job(journey_id: str) -> Optional[str]:
+    """
+    Plan een (gedebouncede) herbouw van het journey-memory.
+
+    De taak start pas na `memory_refresh_debounce_seconds`; een Redis-marker
+    (SET NX) zorgt dat een reeks uploads binnen dat venster samen één rebuild
+    oplevert. Zonder Celery draait de rebuild (een reeks LLM-calls) in een
+    achtergrondthread, nooit op het request-pad dat hem aanvraagt.
+
+    Returns:
+        Task ID, "thread", "coalesced" als er al een refresh gepland staat, of None.
+    """
+    if not _is_celery_available():
+        return _refresh_memory_in_thread(journey_id)
+
+    debounce = settings.memory_refresh_debounce_seconds
+    try:
+        claimed = _redis_client().set(
+            _MEMORY_REFRESH_KEY.format(journey_id=journey_id), "1",
+            nx=True, ex=debounce + _MEMORY_REFRESH_GRACE_SECONDS,
+        )
+        if not claimed:
+            logger.debug(f"Memory-refresh voor journey {journey_id} staat al gepland")
+            return "coalesced"
+    except Exception as e:
+        # Zonder marker liever een dubbele rebuild dan geen
+        logger.warning(f"Memory-refresh marker voor journey {journey_id} niet gezet: {e}")
+
+    try:
+        from app.services.media.tasks import celery_app
+        result = celery_app.send_task(
+            "memory.refresh_journey", args=[journey_id], queue="media", countdown=debounce,
+        )
+        logger.info(f"Memory-refresh gequeued voor journey {journey_id} over {debounce}s, task_id={result.id}")
+        return result.id
+    except Exception as e:
+        logger.warning(f"Queue memory-refresh faalde voor journey {journey_id}: {e}")
+        clear_memory_refresh_marker(journey_id)
+        return None
+
+
+def _refresh_memory_in_thread(journey_id: str) -> Optional[str]:
+    with _local_refreshes_lock:
+        if journey_id in _local_refreshes:
+            return "coalesced"
+        _local_refreshes.add(journey_id)
+
+    def _run() -> None:
+        try:
+            from app.services.media.tasks import refresh_journey_memory
+            refresh_journey_memory(journey_id)
+        except Exception as e:
+            logger.error(f"Memory-refresh in achtergrondthread faalde voor journey {journey_id}: {e}")
+        finally:
+            with _local_refreshes_lock:
+                _local_refreshes.discard(journey_id)
+
+    try:
+        threading.Thread(target=_run, name=f"memory-refresh-{journey_id}", daemon=True).start()
+    except Exception as e:
+        logger.error(f"Kon memory-refresh-thread niet starten voor journey {journey_id}: {e}")
+        with _local_refreshes_lock:
+            _local_refreshes.discard(journey_id)
+        return None
+    return "thread"
+
+
 def enqueue_transcript_job(asset_id: str) -> Optional[str]:
     """
     Enqueue transcript generation job for media asset.
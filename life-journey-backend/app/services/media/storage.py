@@ -0,0 +1,129 @@
+"""
+Gedeelde S3/R2-client en presigned GET-URL's.
+
+Eén boto3-client per proces met een connection pool (geen nieuwe client en
+TLS-handshake per request of per item in een lijst). boto3-clients zijn
+thread-safe, dus routes in de threadpool en Celery-workers delen dezelfde.
+
+Presigned GET-URL's worden per object (en response-parameters) bewaard en
+hergebruikt tot kort voor ze verlopen: een lijst met 100 quick thoughts
+ondertekent zo niet 100 keer opnieuw.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import boto3
+from botocore.config import Config
+
+from app.core.config import settings
+
+# Een gecachete URL wordt vervangen zodra hij binnen deze marge verloopt
+_PRESIGN_REFRESH_MARGIN_SECONDS = 300
+
+_client: Any | None = None
+_client_key: tuple | None = None
+_client_lock = threading.Lock()
+
+# (object_key, expires_in, content_type, disposition) -> (verloopmoment, url)
+_url_cache: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+_url_cache_lock = threading.Lock()
+
+
+def s3_configured() -> bool:
+    """True als bucket en credentials ingesteld zijn."""
+    return bool(settings.s3_bucket and settings.aws_access_key_id and settings.aws_secret_access_key)
+
+
+def _endpoint_url() -> str | None:
+    return settings.s3_endpoint_url or (
+        f"https://s3.{settings.s3_region}.amazonaws.com" if settings.s3_region else None
+    )
+
+
+def get_s3_client() -> Any:
+    """
+    De gedeelde S3-client.
+
+    Wordt alleen opnieuw gebouwd als endpoint, regio of credentials wijzigen
+    (tests, herladen van settings).
+    """
+    global _client, _client_key
+    key = (
+        _endpoint_url(),
+        settings.s3_region,
+        settings.aws_access_key_id,
+        settings.aws_secret_access_key,
+        settings.s3_max_pool_connections,
+    )
+    with _client_lock:
+        if _client is None or _client_key != key:
+            _client = boto3.client(
+                "s3",
+                region_name=settings.s3_region,
+                endpoint_url=key[0],
+                aws_access_key_id=settings.aws_access_key_id,
+                aws_secret_access_key=settings.aws_secret_access_key,
+                config=Config(
+                    max_pool_connections=settings.s3_max_pool_connections,
+                    tcp_keepalive=True,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                ),
+            )
+            _client_key = key
+            clear_presigned_url_cache()
+        return _client
+
+
+def presigned_get_url(
+    object_key: str,
+    *,
+    expires_in: int = 3600,
+    response_content_type: str | None = None,
+    response_content_disposition: str | None = None,
+) -> str:
+    """
+    Presigned GET-URL voor `object_key`, hergebruikt tot kort voor het verlopen.
+
+    Bij korte geldigheden is de marge maximaal de helft van de looptijd, zodat
+    een URL altijd nog minstens die helft bruikbaar is als hij wordt uitgegeven.
+    """
+    cache_key = (object_key, expires_in, response_content_type, response_content_disposition)
+    margin = min(_PRESIGN_REFRESH_MARGIN_SECONDS, expires_in // 2)
+    now = time.monotonic()
+    with _url_cache_lock:
+        hit = _url_cache.get(cache_key)
+        if hit is not None and hit[0] - now > margin:
+            _url_cache.move_to_end(cache_key)
+            return hit[1]
+
+    params: dict[str, str] = {"Bucket": settings.s3_bucket, "Key": object_key}
+    if response_content_type:
+        params["ResponseContentType"] = response_content_type
+    if response_content_disposition:
+        params["ResponseContentDisposition"] = response_content_disposition
+    url = get_s3_client().generate_presigned_url("get_object", Params=params, ExpiresIn=expires_in)
+
+    if settings.s3_presign_cache_size > 0:
+        with _url_cache_lock:
+            _url_cache[cache_key] = (now + expires_in, url)
+            _url_cache.move_to_end(cache_key)
+            while len(_url_cache) > settings.s3_presign_cache_size:
+                _url_cache.popitem(last=False)
+    return url
+
+
+def invalidate_presigned_urls(object_key: str) -> None:
+    """Vergeet gecachete URL's van een object (na verwijderen of overschrijven)."""
+    with _url_cache_lock:
+        for cache_key in [k for k in _url_cache if k[0] == object_key]:
+            del _url_cache[cache_key]
+
+
+def clear_presigned_url_cache() -> None:
+    with _url_cache_lock:
+        _url_cache.clear()
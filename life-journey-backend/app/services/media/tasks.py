@@ -1,4 +1,5 @@
 import uuid
+from datetime import datetime, timezone
 from celery import Celery
 from loguru import logger
 from sqlalchemy.orm import Session
@@ -6,9 +7,12 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.db.session import SessionLocal
 from app.db import crud
-from app.services.ai.transcriber import transcribe_audio, split_into_segments
-from app.services.ai.highlight_detector import detect_highlights, find_text_position, validate_highlight_label
+from app.services.ai.transcriber import TRANSCRIPTION_LANGUAGE, transcribe_audio, transcribe_with_timestamps
+from app.services.ai.highlight_detector import detect_highlights, validate_highlight_label
+from app.services.media.alignment import alignment_for
 from app.services.media.local_storage import local_storage
+from app.services.media.storage import get_s3_client, s3_configured
+from app.services.media.transcripts import materialize_transcript
 from app.models.sharing import Highlight as HighlightModel
 
 celery_app = Celery("life_journey_media")
@@ -18,18 +22,28 @@ celery_app.conf.result_backend = settings.redis_url.replace("/0", "/1")
 celery_app.conf.broker_connection_timeout = 1
 celery_app.conf.broker_connection_retry = False
 
+# Memory rebuilds that still miss recordings (LLM errors) are retried after 5, 10, 20 minutes
+_MEMORY_REFRESH_RETRIES = 3
+_MEMORY_REFRESH_RETRY_SECONDS = 300
+
 
 @celery_app.task(name="media.transcode")
 def transcode_asset(asset_id: str) -> None:
     """
-    Transcode media asset for optimal playback using ffmpeg.
-    Re-encodes in the same format as the source to keep object_key unchanged.
-    Audio: loudness normalization. Video: H.264/AAC with CRF 23.
-    Skips silently when ffmpeg is not installed.
+    Create playback renditions for a media asset using ffmpeg.
+
+    The original is read straight from S3/R2 (or local disk) and left untouched;
+    normalised audio, a low-bitrate preview and, for long recordings, HLS
+    segments are written as new objects and recorded on `asset.renditions`.
+    Queues the waveform peaks stage afterwards, also when transcoding failed
+    (the peaks then come from the original). Skips silently when ffmpeg is not
+    installed.
     """
     import shutil
     import subprocess
-    from pathlib import Path
+
+    from app.services.ai.transcriber import probe_duration_seconds
+    from app.services.media.transcode import create_renditions, source_input
 
     logger.info(f"Transcoding asset {asset_id}")
 
@@ -38,69 +52,108 @@ def transcode_asset(asset_id: str) -> None:
         return
 
     db: Session = SessionLocal()
-    temp_path: Path | None = None
+    queue_peaks = False
     try:
         asset = crud.get_media_asset(db, asset_id)
         if not asset:
             logger.error(f"Asset {asset_id} not found for transcoding")
             return
-
-        source_path: Path = local_storage.get_file_path(asset.object_key)
-        if not source_path.exists():
-            logger.error(f"Source file missing for asset {asset_id}: {asset.object_key}")
+        if asset.modality not in ("audio", "video"):
             return
+        queue_peaks = True
 
-        # Output to a temp file with the same extension so object_key stays valid
-        temp_path = source_path.with_suffix(".tmp" + source_path.suffix)
-        is_audio = asset.modality == "audio"
-
-        cmd = ["ffmpeg", "-y", "-i", str(source_path)]
-        if is_audio:
-            # Re-encode with audio normalization, keep original container
-            cmd += ["-af", "loudnorm", "-codec:a", "aac", "-b:a", "128k"]
-        else:
-            cmd += [
-                "-codec:v", "libx264", "-crf", "23", "-preset", "fast",
-                "-codec:a", "aac", "-b:a", "128k",
-            ]
-        cmd.append(str(temp_path))
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-        if result.returncode != 0:
-            logger.error(f"ffmpeg failed for asset {asset_id}: {result.stderr[-500:]}")
-            return
+        duration = asset.duration_seconds or None
+        if not duration and shutil.which("ffprobe"):
+            source = source_input(asset.object_key)
+            duration = probe_duration_seconds(source) if source else None
+
+        renditions = create_renditions(asset.object_key, asset.modality, duration)
 
-        # Atomically swap temp → original (keeps object_key pointing to same path)
-        source_path.unlink()
-        temp_path.rename(source_path)
-        logger.info(f"Transcoding complete for asset {asset_id}: {source_path.name}")
+        # Re-read: the transcript task may have committed in the meantime
+        db.refresh(asset)
+        asset.renditions = renditions
+        if duration and not asset.duration_seconds:
+            asset.duration_seconds = int(round(duration))
+        db.commit()
+        logger.info(f"Transcoding complete for asset {asset_id}: {', '.join(renditions)}")
 
+    except FileNotFoundError:
+        logger.error(f"Source file missing for asset {asset_id}")
     except subprocess.TimeoutExpired:
-        logger.error(f"ffmpeg timed out (>5 min) for asset {asset_id}")
+        logger.error(f"ffmpeg timed out for asset {asset_id}")
+    except subprocess.CalledProcessError as e:
+        logger.error(f"ffmpeg failed for asset {asset_id}: {(e.stderr or '')[-500:]}")
     except Exception as e:
         logger.error(f"Transcoding error for asset {asset_id}: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+    if queue_peaks:
+        try:
+            compute_waveform_peaks.apply_async(args=[asset_id], queue="media")
+        except Exception as e:
+            logger.warning(f"Could not queue waveform peaks for asset {asset_id}: {e}")
+
+
+@celery_app.task(name="media.peaks")
+def compute_waveform_peaks(asset_id: str) -> None:
+    """
+    Precompute the waveform (min/max peaks) of an audio/video asset.
+
+    Decodes the smallest rendition to PCM and stores the peaks as 8-bit
+    audiowaveform data in `MediaPeaks`, served by GET /media/{asset_id}/peaks.
+    Replaces earlier peaks for the same asset.
+    """
+    import shutil
+    import subprocess
+
+    from app.models.media import MediaPeaks
+    from app.services.media.peaks import compute_peaks, encode_dat, peaks_source_key
+    from app.services.media.transcode import source_input
+
+    if not shutil.which("ffmpeg"):
+        logger.warning("ffmpeg not found — skipping waveform peaks")
+        return
+
+    db: Session = SessionLocal()
+    try:
+        asset = crud.get_media_asset(db, asset_id)
+        if not asset or asset.modality not in ("audio", "video"):
+            return
+
+        source = source_input(peaks_source_key(asset.object_key, asset.renditions))
+        if source is None:
+            logger.error(f"Source file missing for waveform peaks of asset {asset_id}")
+            return
+        peaks = compute_peaks(source, timeout=max(300, (asset.duration_seconds or 0)))
+
+        row = db.get(MediaPeaks, asset_id) or MediaPeaks(media_asset_id=asset_id)
+        row.sample_rate = peaks.sample_rate
+        row.samples_per_peak = peaks.samples_per_peak
+        row.length = len(peaks)
+        row.data = encode_dat(peaks)
+        row.created_at = datetime.now(timezone.utc)
+        db.add(row)
+        db.commit()
+        logger.info(f"Waveform peaks for asset {asset_id}: {len(peaks)} peaks, {len(row.data)} bytes")
+
+    except subprocess.TimeoutExpired:
+        logger.error(f"ffmpeg timed out computing peaks for asset {asset_id}")
+    except subprocess.CalledProcessError as e:
+        logger.error(f"ffmpeg failed computing peaks for asset {asset_id}: {(e.stderr or '')[-500:]}")
+    except Exception as e:
+        logger.error(f"Waveform peaks error for asset {asset_id}: {e}")
+        db.rollback()
     finally:
-        if temp_path and temp_path.exists():
-            temp_path.unlink()
         db.close()
 
 
 def _read_media_bytes(object_key: str) -> bytes | None:
     """Lees mediabytes uit S3/R2 (indien geconfigureerd), anders uit lokale opslag."""
-    if settings.s3_bucket and settings.aws_access_key_id and settings.aws_secret_access_key:
+    if s3_configured():
         try:
-            import boto3
-            endpoint_url = settings.s3_endpoint_url
-            if not endpoint_url and settings.s3_region:
-                endpoint_url = f"https://s3.{settings.s3_region}.amazonaws.com"
-            s3 = boto3.client(
-                "s3",
-                region_name=settings.s3_region,
-                endpoint_url=endpoint_url,
-                aws_access_key_id=settings.aws_access_key_id,
-                aws_secret_access_key=settings.aws_secret_access_key,
-            )
-            obj = s3.get_object(Bucket=settings.s3_bucket, Key=object_key)
+            obj = get_s3_client().get_object(Bucket=settings.s3_bucket, Key=object_key)
             return obj["Body"].read()
         except Exception as e:
             logger.warning(f"S3-read mislukt voor {object_key}, val terug op lokaal: {e}")
@@ -190,15 +243,13 @@ def generate_transcript(asset_id: str) -> None:
             logger.error(f"File not found for asset {asset_id}: {asset.object_key}")
             return
 
-        # Open the file and transcribe
-        with open(file_path, "rb") as audio_file:
-            transcribed_text = transcribe_audio(audio_file, asset.original_filename)
+        # Long recordings are split at pauses and transcribed in parallel;
+        # segments carry Whisper's timestamps shifted to their place in the file
+        segments = transcribe_with_timestamps(file_path, asset.original_filename)
+        transcribed_text = " ".join(s["text"] for s in segments).strip()
 
         logger.info(f"Transcription complete, creating segments for asset {asset_id}")
 
-        # Split into segments
-        segments = split_into_segments(transcribed_text)
-
         # Save segments to database
         for segment_data in segments:
             crud.create_transcript_segment(
@@ -209,6 +260,7 @@ def generate_transcript(asset_id: str) -> None:
                 end_ms=segment_data["end_ms"],
             )
 
+        materialize_transcript(asset, (s["text"] for s in segments), language=TRANSCRIPTION_LANGUAGE)
         db.commit()
         logger.info(f"Successfully created {len(segments)} transcript segments for asset {asset_id}")
 
@@ -224,7 +276,10 @@ def generate_transcript(asset_id: str) -> None:
         try:
             logger.info(f"Detecting highlights for asset {asset_id}")
             highlights = detect_highlights(transcribed_text, asset.chapter_id)
+            # One word index for all highlights; shared with the PDF and journey detail
+            alignment = alignment_for(asset_id, asset.transcript_version, segments)
 
+            created = 0
             for highlight_data in highlights:
                 label = validate_highlight_label(highlight_data.get("label", ""))
                 if not label:
@@ -234,8 +289,12 @@ def generate_transcript(asset_id: str) -> None:
                 if not highlight_text:
                     continue
 
-                # Find position in transcript
-                start_ms, end_ms = find_text_position(transcribed_text, highlight_text)
+                # Position in the audio, from the segment timestamps
+                position = alignment.locate(highlight_text)
+                if position is None:
+                    logger.warning(f"Highlight text not found in transcript of asset {asset_id}, skipping")
+                    continue
+                start_ms, end_ms = position
 
                 # Create highlight
                 highlight = HighlightModel(
@@ -249,27 +308,29 @@ def generate_transcript(asset_id: str) -> None:
                     created_by="ai",
                 )
                 db.add(highlight)
+                created += 1
 
             db.commit()
-            logger.info(f"Successfully created {len(highlights)} AI-detected highlights for asset {asset_id}")
+            logger.info(f"Successfully created {created} AI-detected highlights for asset {asset_id}")
 
         except Exception as e:
             logger.error(f"Failed to detect highlights for asset {asset_id}: {e}")
             # Don't fail the entire task if highlight detection fails
             db.rollback()
 
-        # Invalidate AI memory cache so next request triggers a rebuild
+        # Invalidate this recording's AI memory and rebuild the journey memory in
+        # the background, so the next prompt reads a warm cache
         try:
-            from app.models.memory_cache import JourneyMemoryCache
-            cache_row = db.query(JourneyMemoryCache).filter(
-                JourneyMemoryCache.journey_id == asset.journey_id
-            ).first()
-            if cache_row:
-                db.delete(cache_row)
-                db.commit()
-                logger.info(f"Invalidated memory cache for journey {asset.journey_id}")
+            from app.services.ai.memory import invalidate_asset_memory
+            invalidate_asset_memory(db, asset_id, asset.journey_id)
+            db.commit()
+            logger.info(f"Invalidated memory for asset {asset_id} in journey {asset.journey_id}")
         except Exception as cache_exc:
             logger.warning(f"Could not invalidate memory cache: {cache_exc}")
+            db.rollback()
+
+        from app.services.media.processor import enqueue_memory_refresh_job
+        enqueue_memory_refresh_job(asset.journey_id)
 
     except Exception as e:
         logger.error(f"Failed to generate transcript for asset {asset_id}: {e}")
@@ -277,3 +338,103 @@ def generate_transcript(asset_id: str) -> None:
         raise
     finally:
         db.close()
+
+
+@celery_app.task(name="memory.refresh_journey", bind=True, acks_late=True, max_retries=_MEMORY_REFRESH_RETRIES)
+def refresh_journey_memory(self, journey_id: str) -> None:
+    """
+    Rebuild the cached journey memory after new or changed transcripts.
+
+    Scheduled with a countdown by `enqueue_memory_refresh_job`; the debounce
+    marker is released first, so a transcript finishing during this rebuild
+    schedules the next one. Recordings whose LLM extraction still failed are
+    retried with backoff instead of waiting for the staleness check.
+    """
+    from app.services.ai.memory import build_journey_memory, recordings_missing_from_memory
+    from app.services.media.processor import clear_memory_refresh_marker
+
+    clear_memory_refresh_marker(journey_id)
+    db: Session = SessionLocal()
+    try:
+        build_journey_memory(db, journey_id, force=True)
+        missing = recordings_missing_from_memory(db, journey_id)
+    except Exception as e:
+        logger.error(f"Failed to refresh memory for journey {journey_id}: {e}")
+        db.rollback()
+        return
+    finally:
+        db.close()
+
+    if missing and not self.request.called_directly and self.request.retries < _MEMORY_REFRESH_RETRIES:
+        countdown = _MEMORY_REFRESH_RETRY_SECONDS * 2 ** self.request.retries
+        logger.warning(f"Memory for journey {journey_id} still misses {missing} recording(s); retrying in {countdown}s")
+        raise self.retry(countdown=countdown)
+
+
+@celery_app.task(name="stats.reconcile_chapter_stats")
+def reconcile_chapter_stats_task() -> int:
+    """
+    Nightly check of journey_chapter_stats against the media table.
+
+    The counters are maintained on every flush; this repairs drift from
+    concurrent writes or bulk operations that bypassed the session.
+    """
+    from app.db.chapter_stats import reconcile_chapter_stats
+
+    db: Session = SessionLocal()
+    try:
+        fixed = reconcile_chapter_stats(db)
+        db.commit()
+        if fixed:
+            logger.warning(f"Reconciled {fixed} journey_chapter_stats row(s)")
+        return fixed
+    except Exception as e:
+        logger.error(f"Chapter stats reconciliation failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="blog.flush_views")
+def flush_blog_views_task() -> int:
+    """
+    Write buffered blog view counts to the database.
+
+    Views are normally flushed by the API itself at most once per interval;
+    this periodic run picks up the tail when traffic stops. Does not touch
+    the database when the buffer is empty.
+    """
+    from app.services.blog_views import flush_pending_views
+
+    flushed = flush_pending_views()
+    if flushed:
+        logger.info(f"Flushed {flushed} buffered blog view(s)")
+    return flushed
+
+
+@celery_app.task(name="conversation.flush_sessions")
+def flush_conversation_sessions_task() -> int:
+    """
+    Write interview sessions with unsaved answers from the shared session store
+    to conversationsessionrecord.
+
+    Workers write a session behind every few answers and on completion; this
+    periodic run covers sessions that were left halfway. Only the Redis store
+    is visible here, so without Redis this is a no-op.
+    """
+    from app.services.ai.conversation import flush_conversation_sessions
+
+    db: Session = SessionLocal()
+    try:
+        written = flush_conversation_sessions(db)
+        if written:
+            logger.info(f"Wrote {written} conversation session(s) behind")
+        return written
+    finally:
+        db.close()
+
+# Registreer de USB-pakkettaken bij deze app: de media-worker draait tegen
+# `app.services.media.tasks:celery_app` en kent anders `usb.build_package` niet.
+# Onderaan geplaatst zodat celery_app al gedefinieerd is.
+from app.services.export import tasks as _export_tasks  # noqa: E402,F401
@@ -0,0 +1,289 @@
+"""
+Afspeelversies (renditions) van opnames.
+
+De worker leest het origineel rechtstreeks uit S3/R2 (ffmpeg krijgt een
+presigned URL en streamt zelf) of van lokale schijf, en schrijft in één
+ffmpeg-run alle versies als nieuwe objecten naast het origineel:
+
+  journey/chapter/asset/derived/<bestand>
+
+Audio: genormaliseerde AAC (.m4a) en Opus (.webm), een preview met lage
+bitrate en — voor lange opnames — HLS-segmenten. Video: H.264 tot 720p, een
+360p-preview en HLS. Het origineel wordt niet meer overschreven.
+
+De versies staan op `MediaAsset.renditions`; `pick_rendition` kiest daaruit
+voor serve_file de kleinste versie die het apparaat kan afspelen.
+"""
+
+from __future__ import annotations
+
+import math
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services.media.local_storage import local_storage
+from app.services.media.storage import get_s3_client, presigned_get_url, s3_configured
+
+_LOUDNORM = "loudnorm=I=-16:TP=-1.5:LRA=11"
+_HLS_PLAYLIST = "index.m3u8"
+# Maximum aantal sleutels per S3 DeleteObjects-aanroep
+_S3_DELETE_BATCH = 1000
+
+_CONTENT_TYPES = {
+    ".m4a": "audio/mp4",
+    ".webm": "audio/webm",
+    ".mp4": "video/mp4",
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+}
+
+
+@dataclass(frozen=True)
+class _Rendition:
+    name: str
+    filename: str
+    # ffmpeg-opties voor deze uitvoer; "{audio}" wordt de genormaliseerde audiostroom,
+    # "{workdir}" de map met de uitvoer
+    args: tuple[str, ...]
+    # Volledige kwaliteit (kandidaat voor gewoon afspelen) of alleen preview
+    full_quality: bool = True
+    content_type: Optional[str] = None
+
+
+def _hls_args(audio_bitrate: str, video: bool) -> tuple[str, ...]:
+    args: tuple[str, ...] = ()
+    if video:
+        args = ("-map", "0:v:0", "-vf", "scale=-2:'min(480,ih)'", "-c:v", "libx264",
+                "-crf", "26", "-preset", "veryfast", "-g", "48", "-sc_threshold", "0")
+    return args + (
+        "-map", "{audio}", "-ac", "1" if not video else "2", "-c:a", "aac", "-b:a", audio_bitrate,
+        "-f", "hls", "-hls_time", "6", "-hls_playlist_type", "vod",
+        "-hls_segment_filename", "{workdir}/hls/seg_%05d.ts",
+    )
+
+
+_AUDIO_RENDITIONS = (
+    _Rendition("aac", "audio.m4a", (
+        "-map", "{audio}", "-ac", "1", "-c:a", "aac", "-b:a", "96k", "-movflags", "+faststart",
+    )),
+    _Rendition("opus", "audio.webm", (
+        "-map", "{audio}", "-ac", "1", "-c:a", "libopus", "-b:a", "48k",
+    )),
+    _Rendition("preview", "preview.m4a", (
+        "-map", "{audio}", "-ac", "1", "-ar", "22050", "-c:a", "aac", "-b:a", "32k",
+        "-movflags", "+faststart",
+    ), full_quality=False),
+)
+
+_VIDEO_RENDITIONS = (
+    _Rendition("video", "video.mp4", (
+        "-map", "0:v:0", "-map", "{audio}", "-vf", "scale=-2:'min(720,ih)'",
+        "-c:v", "libx264", "-crf", "23", "-preset", "fast",
+        "-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart",
+    )),
+    _Rendition("preview", "preview.mp4", (
+        "-map", "0:v:0", "-map", "{audio}", "-vf", "scale=-2:'min(360,ih)'",
+        "-c:v", "libx264", "-crf", "30", "-preset", "veryfast",
+        "-c:a", "aac", "-b:a", "64k", "-movflags", "+faststart",
+    ), full_quality=False),
+)
+
+
+def plan_renditions(modality: str, duration_seconds: Optional[float]) -> list[_Rendition]:
+    """Te maken versies; HLS alleen voor lange opnames en alleen met S3 (segmenten via presigned URL's)."""
+    video = modality == "video"
+    renditions = list(_VIDEO_RENDITIONS if video else _AUDIO_RENDITIONS)
+    if s3_configured() and (duration_seconds or 0) >= settings.transcode_hls_min_seconds:
+        renditions.append(_Rendition(
+            "hls", f"hls/{_HLS_PLAYLIST}", _hls_args("96k" if video else "64k", video),
+            full_quality=False, content_type=_CONTENT_TYPES[".m3u8"],
+        ))
+    return renditions
+
+
+def derived_prefix(object_key: str) -> str:
+    """journey/chapter/asset/derived/ voor een origineel op journey/chapter/asset/bestand."""
+    return object_key.rsplit("/", 1)[0] + "/derived/"
+
+
+def build_command(source: str, renditions: list[_Rendition], workdir: Path) -> list[str]:
+    """Eén ffmpeg-run: bron één keer lezen, audio één keer normaliseren, alle uitvoer tegelijk."""
+    labels = [f"[a{i}]" for i in range(len(renditions))]
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", source,
+        "-filter_complex", f"[0:a:0]{_LOUDNORM},asplit={len(renditions)}{''.join(labels)}",
+    ]
+    for label, rendition in zip(labels, renditions):
+        cmd += [arg.replace("{audio}", label).replace("{workdir}", str(workdir)) for arg in rendition.args]
+        cmd.append(str(workdir / rendition.filename))
+    return cmd
+
+
+def source_input(object_key: str) -> Optional[str]:
+    """Invoer voor ffmpeg: presigned URL (streamt uit S3) of het lokale pad."""
+    if s3_configured():
+        return presigned_get_url(object_key, expires_in=6 * 3600)
+    path = local_storage.get_file_path(object_key)
+    return str(path) if path.exists() else None
+
+
+def _store(path: Path, key: str) -> None:
+    content_type = _CONTENT_TYPES.get(path.suffix, "application/octet-stream")
+    if s3_configured():
+        # upload_file streamt van schijf en gebruikt zelf multipart voor grote bestanden
+        get_s3_client().upload_file(
+            str(path), settings.s3_bucket, key, ExtraArgs={"ContentType": content_type},
+        )
+        return
+    with open(path, "rb") as f:
+        local_storage.save_file(key, f)
+
+
+def create_renditions(object_key: str, modality: str, duration_seconds: Optional[float]) -> dict[str, dict]:
+    """
+    Maak alle afspeelversies van een opname en sla ze op naast het origineel.
+
+    Geeft de renditions terug zoals ze op `MediaAsset.renditions` komen:
+    naam -> {key, content_type, size_bytes, full_quality}.
+
+    Raises:
+        FileNotFoundError: als het origineel niet te vinden is
+        subprocess.CalledProcessError / TimeoutExpired: als ffmpeg faalt
+    """
+    source = source_input(object_key)
+    if source is None:
+        raise FileNotFoundError(object_key)
+
+    renditions = plan_renditions(modality, duration_seconds)
+    prefix = derived_prefix(object_key)
+    # Ruim genoeg voor lange opnames; ffmpeg draait sneller dan realtime
+    timeout = max(300, int((duration_seconds or 0) * 2))
+
+    with tempfile.TemporaryDirectory(prefix="transcode-") as tmp:
+        workdir = Path(tmp)
+        (workdir / "hls").mkdir()
+        subprocess.run(
+            build_command(source, renditions, workdir),
+            check=True, capture_output=True, text=True, timeout=timeout,
+        )
+
+        result: dict[str, dict] = {}
+        for rendition in renditions:
+            output = workdir / rendition.filename
+            files = sorted(output.parent.iterdir()) if rendition.name == "hls" else [output]
+            for path in files:
+                _store(path, prefix + str(path.relative_to(workdir)))
+            result[rendition.name] = {
+                "key": prefix + rendition.filename,
+                "content_type": rendition.content_type or _CONTENT_TYPES[output.suffix],
+                "size_bytes": sum(path.stat().st_size for path in files),
+                "full_quality": rendition.full_quality,
+            }
+
+    logger.info(
+        f"Renditions for {object_key}: "
+        + ", ".join(f"{name} {info['size_bytes'] // 1024} KB" for name, info in result.items())
+    )
+    return result
+
+
+def remove_renditions(renditions: Optional[dict]) -> None:
+    """Verwijder de afgeleide bestanden (best-effort, bij het verwijderen van een opname)."""
+    if not renditions:
+        return
+    keys = [info["key"] for info in renditions.values()]
+    if s3_configured():
+        try:
+            client = get_s3_client()
+            paginator = client.get_paginator("list_objects_v2")
+            for prefix in {key.rsplit("/", 1)[0] + "/" for key in keys}:
+                # Lange HLS-opnames hebben meer segmenten dan één lijst- of delete-aanroep aankan
+                objects = [
+                    {"Key": obj["Key"]}
+                    for page in paginator.paginate(Bucket=settings.s3_bucket, Prefix=prefix)
+                    for obj in page.get("Contents", [])
+                ]
+                for start in range(0, len(objects), _S3_DELETE_BATCH):
+                    client.delete_objects(
+                        Bucket=settings.s3_bucket,
+                        Delete={"Objects": objects[start:start + _S3_DELETE_BATCH]},
+                    )
+        except Exception as exc:
+            logger.warning(f"Could not delete renditions {keys}: {exc}")
+        return
+    for key in keys:
+        path = local_storage.get_file_path(key)
+        if path.parent.name == "hls":
+            shutil.rmtree(path.parent, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+
+def _plays_webm(user_agent: str) -> bool:
+    """iOS en Safari spelen WebM/Opus niet (betrouwbaar) af."""
+    if any(device in user_agent for device in ("iPhone", "iPad", "iPod")):
+        return False
+    if "Safari" in user_agent and not any(engine in user_agent for engine in ("Chrome", "Chromium", "Android")):
+        return False
+    return True
+
+
+def pick_rendition(
+    object_key: str,
+    original_size: int,
+    renditions: Optional[dict],
+    *,
+    user_agent: str = "",
+    save_data: bool = False,
+    accept_hls: bool = False,
+) -> tuple[str, str, Optional[str]]:
+    """
+    Kies wat serve_file uitgeeft: (naam, object_key, content_type).
+
+    HLS als de speler dat aankan (lange opnames starten dan direct); met
+    Save-Data of `quality=preview` de preview; anders de kleinste afspeelbare
+    versie in volledige kwaliteit, met het origineel als kandidaat.
+    """
+    if not renditions:
+        return "original", object_key, None
+    if accept_hls and "hls" in renditions:
+        return "hls", renditions["hls"]["key"], renditions["hls"]["content_type"]
+    if save_data and "preview" in renditions:
+        return "preview", renditions["preview"]["key"], renditions["preview"]["content_type"]
+
+    webm_ok = _plays_webm(user_agent)
+    candidates = [("original", object_key, None, original_size or math.inf)]
+    candidates += [
+        (name, info["key"], info["content_type"], info["size_bytes"])
+        for name, info in renditions.items()
+        if info.get("full_quality")
+    ]
+    playable = [c for c in candidates if webm_ok or not c[1].endswith(".webm")]
+    name, key, content_type, _ = min(playable or candidates, key=lambda c: c[3])
+    return name, key, content_type
+
+
+def signed_playlist(playlist_key: str, expires_in: int = 3 * 3600) -> str:
+    """
+    De HLS-playlist met een presigned URL per segment.
+
+    Relatieve segmentnamen zouden tegen de (ondertekende) playlist-URL worden
+    opgelost en bij een privé-bucket geweigerd; de ondertekeningen komen uit
+    de gedeelde URL-cache, dus herhaald ophalen tekent niet opnieuw.
+    """
+    body = get_s3_client().get_object(Bucket=settings.s3_bucket, Key=playlist_key)["Body"].read()
+    base = playlist_key.rsplit("/", 1)[0] + "/"
+    lines = []
+    for line in body.decode("utf-8").splitlines():
+        entry = line.strip()
+        if entry and not entry.startswith("#"):
+            line = presigned_get_url(base + entry, expires_in=expires_in, response_content_type=_CONTENT_TYPES[".ts"])
+        lines.append(line)
+    return "\n".join(lines) + "\n"
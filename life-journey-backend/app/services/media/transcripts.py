@@ -0,0 +1,78 @@
+"""
+Gedeelde transcript-repository.
+
+De volledige tekst van een opname staat gematerialiseerd op
+`MediaAsset.full_transcript` (geschreven door generate_transcript). Lezers die
+de assets al geladen hebben krijgen de tekst dus zonder extra query; alleen
+opnames zonder gematerialiseerde tekst vallen terug op de TranscriptSegments,
+geladen in één `IN (...)`-query en per opname samengevoegd. Een journey met
+60 opnames kost zo hooguit 2 queries in plaats van 61.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from app.models.media import MediaAsset, TranscriptSegment
+
+def load_segments(db: Session, asset_ids: Iterable[str]) -> dict[str, list[TranscriptSegment]]:
+    """Alle segmenten van `asset_ids` in één query, per opname gesorteerd op start_ms."""
+    ids = list(dict.fromkeys(asset_ids))
+    if not ids:
+        return {}
+    segs_by_asset: dict[str, list[TranscriptSegment]] = {}
+    for seg in (
+        db.query(TranscriptSegment)
+        .filter(TranscriptSegment.media_asset_id.in_(ids))
+        .order_by(TranscriptSegment.media_asset_id, TranscriptSegment.start_ms.asc())
+        .all()
+    ):
+        segs_by_asset.setdefault(seg.media_asset_id, []).append(seg)
+    return segs_by_asset
+
+
+def assemble_text(segments: Iterable[TranscriptSegment]) -> str:
+    """Volledige tekst van een opname uit (gesorteerde) segmenten."""
+    return " ".join(s.text for s in segments).strip()
+
+
+def texts_for_assets(db: Session, assets: Iterable[MediaAsset]) -> dict[str, str]:
+    """
+    Volledige transcripttekst voor al geladen opnames; opnames zonder tekst ontbreken.
+
+    Leest `full_transcript` van de rijen zelf (query met
+    `undefer(MediaAsset.full_transcript)`); rijen waarop de kolom nog
+    uitgesteld is krijgen hem samen in één query. Alleen niet-gematerialiseerde
+    opnames (oude data, mislukte backfill) kosten één segmentquery samen.
+    """
+    assets = list(assets)
+    # Een geladen kolom staat in de instance-__dict__; een uitgestelde (nog) niet
+    deferred_ids = {asset.id for asset in assets if "full_transcript" not in asset.__dict__}
+    loaded: dict[str, str | None] = dict(
+        db.query(MediaAsset.id, MediaAsset.full_transcript).filter(MediaAsset.id.in_(deferred_ids)).all()
+    ) if deferred_ids else {}
+
+    texts: dict[str, str] = {}
+    fallback: list[str] = []
+    for asset in assets:
+        full_transcript = loaded.get(asset.id) if asset.id in deferred_ids else asset.full_transcript
+        if full_transcript is None:
+            fallback.append(asset.id)
+        elif full_transcript:
+            texts[asset.id] = full_transcript
+    for asset_id, segs in load_segments(db, fallback).items():
+        text = assemble_text(segs)
+        if text:
+            texts[asset_id] = text
+    return texts
+
+
+def materialize_transcript(asset: MediaAsset, segment_texts: Iterable[str], *, language: str) -> None:
+    """Schrijf de volledige tekst, het aantal woorden en de taal op de opname en hoog de versie op."""
+    text = " ".join(segment_texts).strip()
+    asset.full_transcript = text
+    asset.transcript_word_count = len(text.split())
+    asset.transcript_language = language
+    asset.transcript_version = (asset.transcript_version or 0) + 1
@@ -10,7 +10,12 @@ from fastapi import HTTPException, UploadFile
 # A signature is a list of (offset, expected_bytes) — ALL must match (AND).
 # Multiple signatures per extension = alternatives (OR).
 _MAGIC_SIGNATURES: dict[str, list[list[tuple[int, bytes]]]] = {
-    ".webm": [[(0, b"\x1a\x45\xdf\xa3")]],
+    ".webm": [
+        [(0, b"\x1a\x45\xdf\xa3")],  # EBML (Matroska/WebM)
+        # Safari/iPad MediaRecorder produces mp4 or ogg; the recorder still names it .webm
+        [(4, b"ftyp")],
+        [(0, b"OggS")],
+    ],
     ".mp4":  [[(4, b"ftyp")]],
     ".m4a":  [[(4, b"ftyp")]],
     ".mov":  [[(4, b"ftyp")]],
@@ -26,17 +31,24 @@ _MAGIC_SIGNATURES: dict[str, list[list[tuple[int, bytes]]]] = {
     ],
 }
 
-_MAGIC_READ_BYTES = 16
+MAGIC_READ_BYTES = 16
 
 
 def validate_magic_bytes(file: UploadFile, extension: str) -> None:
     """Validate that the file's magic bytes match the expected extension."""
-    signatures = _MAGIC_SIGNATURES.get(extension)
-    if not signatures:
+    if extension not in _MAGIC_SIGNATURES:
         return  # No magic check for text files
 
-    header = file.file.read(_MAGIC_READ_BYTES)
+    header = file.file.read(MAGIC_READ_BYTES)
     file.file.seek(0)
+    validate_header_bytes(header, extension)
+
+
+def validate_header_bytes(header: bytes, extension: str) -> None:
+    """Validate the first MAGIC_READ_BYTES of a (streamed) upload against the extension."""
+    signatures = _MAGIC_SIGNATURES.get(extension)
+    if not signatures:
+        return  # No magic check for text files
 
     for signature in signatures:
         if all(header[offset:offset + len(expected)] == expected for offset, expected in signature):
@@ -193,29 +205,36 @@ def validate_file_size(file: UploadFile, extension: str) -> None:
     Raises:
         HTTPException: If file is too large
     """
-    # Determine max size based on file type
-    if extension in [".webm", ".mp4", ".mov", ".avi"]:
-        max_size = MAX_VIDEO_SIZE
-        file_type = "video"
-    elif extension in [".wav", ".mp3", ".m4a", ".ogg", ".flac"]:
-        max_size = MAX_AUDIO_SIZE
-        file_type = "audio"
-    elif extension in [".txt", ".md"]:
-        max_size = MAX_TEXT_SIZE
-        file_type = "text"
-    else:
-        max_size = MAX_FILE_SIZE
-        file_type = "file"
-
     # Check file size if available
     if hasattr(file, 'size') and file.size:
-        if file.size > max_size:
-            max_mb = max_size / (1024 * 1024)
-            actual_mb = file.size / (1024 * 1024)
-            raise HTTPException(
-                status_code=413,
-                detail=f"{file_type.capitalize()} file too large: {actual_mb:.1f}MB. Maximum: {max_mb:.0f}MB"
-            )
+        check_file_size(file.size, extension)
+
+
+def max_file_size(extension: str) -> tuple[int, str]:
+    """Maximum size in bytes and the file type name for an extension."""
+    if extension in [".webm", ".mp4", ".mov", ".avi"]:
+        return MAX_VIDEO_SIZE, "video"
+    if extension in [".wav", ".mp3", ".m4a", ".ogg", ".flac"]:
+        return MAX_AUDIO_SIZE, "audio"
+    if extension in [".txt", ".md"]:
+        return MAX_TEXT_SIZE, "text"
+    return MAX_FILE_SIZE, "file"
+
+
+def check_file_size(size: int, extension: str) -> None:
+    """
+    Raise 413 when `size` exceeds the limit for the extension.
+
+    Also used while streaming, with the number of bytes received so far.
+    """
+    max_size, file_type = max_file_size(extension)
+    if size > max_size:
+        max_mb = max_size / (1024 * 1024)
+        actual_mb = size / (1024 * 1024)
+        raise HTTPException(
+            status_code=413,
+            detail=f"{file_type.capitalize()} file too large: {actual_mb:.1f}MB. Maximum: {max_mb:.0f}MB"
+        )
 
 
 def validate_upload_file(file: UploadFile) -> tuple[str, str]:
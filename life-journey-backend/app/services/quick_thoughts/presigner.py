@@ -3,12 +3,12 @@ Presigned URL generation for quick thought uploads.
 """
 from uuid import uuid4
 
-import boto3
 from botocore.exceptions import BotoCoreError, NoCredentialsError
 from loguru import logger
 
 from app.core.config import settings
 from app.schemas.quick_thought import QuickThoughtPresignResponse
+from app.services.media.storage import get_s3_client, s3_configured
 
 
 def build_quick_thought_presigned_upload(
@@ -33,19 +33,9 @@ def build_quick_thought_presigned_upload(
     object_key = f"quick-thoughts/{journey_id}/{thought_id}/{filename}"
 
     # Try S3 first if configured
-    if settings.s3_bucket and settings.aws_access_key_id and settings.aws_secret_access_key:
+    if s3_configured():
         try:
-            endpoint_url = settings.s3_endpoint_url
-            if not endpoint_url and settings.s3_region:
-                endpoint_url = f"https://s3.{settings.s3_region}.amazonaws.com"
-
-            client = boto3.client(
-                "s3",
-                region_name=settings.s3_region,
-                endpoint_url=endpoint_url,
-                aws_access_key_id=settings.aws_access_key_id,
-                aws_secret_access_key=settings.aws_secret_access_key,
-            )
+            client = get_s3_client()
 
             # Determine content type based on modality
             content_type = "video/webm" if modality == "video" else "audio/webm"
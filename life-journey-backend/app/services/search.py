@@ -0,0 +1,125 @@
+"""
+Zoeken in je eigen verhaal: transcripties, tekstopnames, memo's en quick thoughts.
+
+Alle doorzoekbare tekst staat in `searchdocument` (bijgehouden door
+app/db/search_index.py). Op Postgres zoekt de query via de GIN-index op de
+tsvector-kolom (Nederlandse configuratie: "verhuisde" vindt ook "verhuizen"),
+gerangschikt met ts_rank_cd; op SQLite via FTS5 met bm25 en prefix-matching.
+
+Fragmenten worden alleen voor de getoonde resultaten gemaakt (ts_headline is
+duur). De database markeert treffers met stuurtekens; pas na het escapen van
+de tekst worden dat `<mark>`-tags, zodat een fragment veilig als HTML kan.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+KINDS = ("transcript", "text", "memo", "quick_thought")
+
+# Stuurtekens die niet in gewone tekst voorkomen
+_MARK_START = "\x02"
+_MARK_STOP = "\x03"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_POSTGRES_QUERY = """
+WITH q AS (SELECT websearch_to_tsquery('dutch', :query) AS query),
+hits AS (
+  SELECT d.id, d.kind, d.source_id, d.media_asset_id, d.chapter_id, d.start_ms, d.title, d.body,
+         ts_rank_cd(d.search_vector, q.query) AS rank
+  FROM searchdocument d, q
+  WHERE d.journey_id = :journey_id AND d.search_vector @@ q.query {kind_filter}
+  ORDER BY rank DESC, d.id
+  LIMIT :limit
+)
+SELECT hits.kind, hits.source_id, hits.media_asset_id, hits.chapter_id, hits.start_ms, hits.title, hits.rank,
+       ts_headline('dutch', hits.body, q.query, :headline_options) AS snippet
+FROM hits, q
+ORDER BY hits.rank DESC, hits.id
+"""
+
+_SQLITE_QUERY = """
+SELECT d.kind, d.source_id, d.media_asset_id, d.chapter_id, d.start_ms, d.title,
+       -bm25(searchdocument_fts, 2.0, 1.0) AS rank,
+       snippet(searchdocument_fts, 1, :mark_start, :mark_stop, '…', 24) AS snippet
+FROM searchdocument_fts
+JOIN searchdocument d ON d.id = searchdocument_fts.rowid
+WHERE searchdocument_fts MATCH :match AND d.journey_id = :journey_id {kind_filter}
+ORDER BY rank DESC, d.id
+LIMIT :limit
+"""
+
+_HEADLINE_OPTIONS = (
+    f"StartSel={_MARK_START}, StopSel={_MARK_STOP}, MinWords=12, MaxWords=30, "
+    "MaxFragments=2, FragmentDelimiter=\" … \""
+)
+
+
+def fts5_match(query: str) -> Optional[str]:
+    """Zoekterm voor FTS5: elk woord als prefix, alle woorden verplicht; None als er geen woord in staat."""
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def render_snippet(raw: Optional[str]) -> str:
+    """Escape het fragment en zet de treffermarkeringen om naar <mark>."""
+    escaped = html.escape(raw or "")
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_STOP, "</mark>")
+
+
+def search_journey(
+    db: Session,
+    journey_id: str,
+    query: str,
+    *,
+    kinds: Optional[Iterable[str]] = None,
+    limit: int = 20,
+) -> list[dict]:
+    """
+    Doorzoek één journey; de beste treffers eerst.
+
+    Elk resultaat: kind, source_id, media_asset_id, chapter_id, start_ms,
+    title, score en snippet (HTML met <mark> rond de treffers).
+    """
+    kinds = [kind for kind in (kinds or ()) if kind in KINDS]
+    params: dict = {"journey_id": journey_id, "limit": limit}
+    kind_filter = "AND d.kind IN :kinds" if kinds else ""
+    if kinds:
+        params["kinds"] = kinds
+
+    if db.get_bind().dialect.name == "postgresql":
+        if not _TOKEN_RE.search(query):
+            return []
+        statement = text(_POSTGRES_QUERY.format(kind_filter=kind_filter))
+        params.update(query=query, headline_options=_HEADLINE_OPTIONS)
+    else:
+        match = fts5_match(query)
+        if match is None:
+            return []
+        statement = text(_SQLITE_QUERY.format(kind_filter=kind_filter))
+        params.update(match=match, mark_start=_MARK_START, mark_stop=_MARK_STOP)
+
+    if kinds:
+        statement = statement.bindparams(bindparam("kinds", expanding=True))
+
+    return [
+        {
+            "kind": row.kind,
+            "source_id": row.source_id,
+            "media_asset_id": row.media_asset_id,
+            "chapter_id": row.chapter_id,
+            "start_ms": row.start_ms,
+            "title": row.title,
+            "score": float(row.rank or 0.0),
+            "snippet": render_snippet(row.snippet),
+        }
+        for row in db.execute(statement, params)
+    ]
@@ -12,6 +12,7 @@ from loguru import logger
 from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
+from app.db.journey_version import bump_journey_version
 from app.models.sharing import ShareGrant
 
 
@@ -155,18 +156,17 @@ def cleanup_old_grants(db: Session, days_old: int = 90) -> int:
 
     cutoff = datetime.now(timezone.utc) - timedelta(days=days_old)
 
-    deleted = (
-        db.query(ShareGrant)
-        .filter(
-            and_(
-                ShareGrant.status.in_(["expired", "revoked"]),
-                ShareGrant.created_at < cutoff,
-            )
+    old_grants = db.query(ShareGrant).filter(
+        and_(
+            ShareGrant.status.in_(["expired", "revoked"]),
+            ShareGrant.created_at < cutoff,
         )
-        .delete(synchronize_session=False)
     )
+    journey_ids = [row[0] for row in old_grants.with_entities(ShareGrant.journey_id).distinct().all()]
+    deleted = old_grants.delete(synchronize_session=False)
 
     if deleted > 0:
+        bump_journey_version(db, *journey_ids)
         db.commit()
         logger.info(f"Cleaned up {deleted} old share grants")
 
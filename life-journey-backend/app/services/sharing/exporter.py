@@ -8,28 +8,16 @@ import zipfile
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-import boto3
 from botocore.exceptions import BotoCoreError, NoCredentialsError
 from loguru import logger
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
 from app.core.config import settings
 from app.models.journey import Journey
-from app.models.media import MediaAsset, TranscriptSegment, PromptRun
+from app.models.media import MediaAsset, PromptRun
 from app.models.memo import Memo
-
-
-def _build_s3_client():
-  endpoint_url = settings.s3_endpoint_url
-  if not endpoint_url and settings.s3_region:
-    endpoint_url = f"https://s3.{settings.s3_region}.amazonaws.com"
-  return boto3.client(
-    "s3",
-    region_name=settings.s3_region,
-    endpoint_url=endpoint_url,
-    aws_access_key_id=settings.aws_access_key_id,
-    aws_secret_access_key=settings.aws_secret_access_key,
-  )
+from app.services.media.storage import get_s3_client, s3_configured
+from app.services.media.transcripts import texts_for_assets
 
 
 def _format_date(dt: datetime | None) -> str:
@@ -52,20 +40,13 @@ def generate_export_bundle(journey_id: str, db: Session) -> dict[str, str]:
 
   media_assets: list[MediaAsset] = (
     db.query(MediaAsset)
+    .options(undefer(MediaAsset.full_transcript))
     .filter(MediaAsset.journey_id == journey_id)
     .order_by(MediaAsset.recorded_at)
     .all()
   )
 
-  asset_ids = [a.id for a in media_assets]
-  transcripts: list[TranscriptSegment] = []
-  if asset_ids:
-    transcripts = (
-      db.query(TranscriptSegment)
-      .filter(TranscriptSegment.media_asset_id.in_(asset_ids))
-      .order_by(TranscriptSegment.start_ms)
-      .all()
-    )
+  transcript_texts = texts_for_assets(db, media_assets)
 
   prompt_runs: list[PromptRun] = (
     db.query(PromptRun)
@@ -81,16 +62,10 @@ def generate_export_bundle(journey_id: str, db: Session) -> dict[str, str]:
     .all()
   )
 
-  # Build transcript index: asset_id → sorted segments
-  transcript_by_asset: dict[str, list[TranscriptSegment]] = {}
-  for seg in transcripts:
-    transcript_by_asset.setdefault(seg.media_asset_id, []).append(seg)
-
   # Build transcript index: chapter_id → full text
   transcript_by_chapter: dict[str, list[str]] = {}
   for asset in media_assets:
-    segs = transcript_by_asset.get(asset.id, [])
-    full_text = " ".join(s.text for s in sorted(segs, key=lambda s: s.start_ms))
+    full_text = transcript_texts.get(asset.id)
     if full_text:
       transcript_by_chapter.setdefault(asset.chapter_id, []).append(full_text)
 
@@ -175,9 +150,9 @@ def generate_export_bundle(journey_id: str, db: Session) -> dict[str, str]:
   zip_bytes = zip_buffer.read()
 
   # Try upload to S3
-  if settings.s3_bucket and settings.aws_access_key_id and settings.aws_secret_access_key:
+  if s3_configured():
     try:
-      s3 = _build_s3_client()
+      s3 = get_s3_client()
       object_key = f"exports/{journey_id}/{bundle_id}.zip"
       s3.put_object(
         Bucket=settings.s3_bucket,
@@ -5,11 +5,11 @@ Aggregates journey, chapter, and media data into a structured format
 optimized for rendering an interactive timeline visualization.
 """
 
+from sqlalchemy.orm import Session, undefer
 
-from sqlalchemy.orm import Session
-
+from app.models.chapter_stats import JourneyChapterStats
 from app.models.journey import Journey
-from app.models.media import MediaAsset, TranscriptSegment
+from app.models.media import MediaAsset
 from app.models.preferences import ChapterPreference
 from app.schemas.common import ChapterId
 from app.core.config import settings
@@ -24,22 +24,21 @@ from app.schemas.timeline import (
     TimelinePhase,
     TimelineResponse,
 )
+from app.services.media.transcripts import texts_for_assets
 
 
-def get_chapter_media_stats(db: Session, journey_id: str, chapter_id: str) -> dict:
-    """Get media statistics for a specific chapter."""
-    assets = (
-        db.query(MediaAsset)
-        .filter(
-            MediaAsset.journey_id == journey_id,
-            MediaAsset.chapter_id == chapter_id,
-            MediaAsset.storage_state.in_(["ready", "processing"]),
-        )
-        .all()
-    )
+# Hoofdstukken per fase in catalogusvolgorde, eenmalig afgeleid van CHAPTER_TO_PHASE
+_PHASE_CHAPTERS: dict[LifePhase, list[ChapterId]] = {}
+for _chapter_id, _phase in CHAPTER_TO_PHASE.items():
+    _PHASE_CHAPTERS.setdefault(_phase, []).append(_chapter_id)
+_PHASE_INDEX: dict[ChapterId, int] = {
+    cid: idx for chapters in _PHASE_CHAPTERS.values() for idx, cid in enumerate(chapters)
+}
+
 
-    stats = {
-        "count": len(assets),
+def _empty_stats() -> dict:
+    return {
+        "count": 0,
         "has_video": False,
         "has_audio": False,
         "has_text": False,
@@ -47,21 +46,40 @@ def get_chapter_media_stats(db: Session, journey_id: str, chapter_id: str) -> di
         "last_recorded_at": None,
     }
 
-    for asset in assets:
-        if asset.modality == "video":
-            stats["has_video"] = True
-        elif asset.modality == "audio":
-            stats["has_audio"] = True
-        elif asset.modality == "text":
-            stats["has_text"] = True
 
-        stats["total_duration"] += asset.duration_seconds or 0
+def _stats_dict(row: JourneyChapterStats) -> dict:
+    return {
+        "count": row.ready_count,
+        "has_video": row.video_count > 0,
+        "has_audio": row.audio_count > 0,
+        "has_text": row.text_count > 0,
+        "total_duration": row.duration_seconds,
+        "last_recorded_at": row.last_recorded_at,
+    }
+
+
+def get_journey_media_stats(db: Session, journey_id: str) -> dict[str, dict]:
+    """
+    Mediastatistieken per hoofdstuk uit de bijgehouden journey_chapter_stats.
+
+    Hoofdstukken zonder opnames in "ready"/"processing" ontbreken in het
+    resultaat; gebruik `_empty_stats()` als default.
+    """
+    rows = (
+        db.query(JourneyChapterStats)
+        .filter(
+            JourneyChapterStats.journey_id == journey_id,
+            JourneyChapterStats.ready_count > 0,
+        )
+        .all()
+    )
+    return {row.chapter_id: _stats_dict(row) for row in rows}
 
-        if asset.recorded_at:
-            if stats["last_recorded_at"] is None or asset.recorded_at > stats["last_recorded_at"]:
-                stats["last_recorded_at"] = asset.recorded_at
 
-    return stats
+def get_chapter_media_stats(db: Session, journey_id: str, chapter_id: str) -> dict:
+    """Get media statistics for a specific chapter."""
+    row = db.get(JourneyChapterStats, (journey_id, chapter_id))
+    return _stats_dict(row) if row is not None and row.ready_count > 0 else _empty_stats()
 
 
 def get_active_chapters(db: Session, journey_id: str) -> set[str]:
@@ -97,15 +115,8 @@ def is_chapter_unlocked(
     if not phase:
         return False
 
-    phase_chapters = [
-        cid for cid, p in CHAPTER_TO_PHASE.items() if p == phase
-    ]
-
-    # Find index of current chapter
-    try:
-        idx = phase_chapters.index(chapter_id)
-    except ValueError:
-        return False
+    phase_chapters = _PHASE_CHAPTERS[phase]
+    idx = _PHASE_INDEX[chapter_id]
 
     # First chapter in phase - check if phase is unlocked
     if idx == 0:
@@ -133,19 +144,16 @@ def build_timeline(db: Session, journey_id: str) -> TimelineResponse:
     # Get progress data
     chapter_progress = journey.progress or {}
 
-    # Get all media for aggregation
-    all_media = (
-        db.query(MediaAsset)
-        .filter(
-            MediaAsset.journey_id == journey_id,
-            MediaAsset.storage_state.in_(["ready", "processing"]),
-        )
-        .all()
-    )
+    # Bijgehouden tellers van alle hoofdstukken; totalen volgen uit dezelfde rijen
+    media_stats = get_journey_media_stats(db, journey_id)
 
-    total_media = len(all_media)
-    total_duration = sum(m.duration_seconds or 0 for m in all_media)
-    last_activity = max((m.recorded_at for m in all_media if m.recorded_at), default=None)
+    total_media = sum(st["count"] for st in media_stats.values())
+    total_duration = sum(st["total_duration"] for st in media_stats.values())
+    last_activity = max(
+        (st["last_recorded_at"] for st in media_stats.values() if st["last_recorded_at"]),
+        default=None,
+    )
+    empty_stats = _empty_stats()
 
     # Build phases
     phases: list[TimelinePhase] = []
@@ -156,14 +164,10 @@ def build_timeline(db: Session, journey_id: str) -> TimelineResponse:
         phase_meta = PHASE_METADATA[phase]
         phase_chapters: list[TimelineChapter] = []
 
-        for chapter_id, ch_phase in CHAPTER_TO_PHASE.items():
-            if ch_phase != phase:
-                continue
-
+        for chapter_id in _PHASE_CHAPTERS.get(phase, []):
             total_chapters += 1
 
-            # Get chapter stats
-            stats = get_chapter_media_stats(db, journey_id, chapter_id.value)
+            stats = media_stats.get(chapter_id.value, empty_stats)
             progress = chapter_progress.get(chapter_id.value, 0.0)
 
             if progress >= 1.0:
@@ -265,6 +269,7 @@ def get_chapter_detail(
     # Get media assets (simplified)
     assets = (
         db.query(MediaAsset)
+        .options(undefer(MediaAsset.full_transcript))
         .filter(
             MediaAsset.journey_id == journey_id,
             MediaAsset.chapter_id == chapter_id.value,
@@ -289,16 +294,10 @@ def get_chapter_detail(
 
     # Build transcript preview from the most recent asset with segments
     transcripts_preview: str | None = None
+    texts = texts_for_assets(db, assets)
     for asset in assets:
-        segs = (
-            db.query(TranscriptSegment)
-            .filter(TranscriptSegment.media_asset_id == asset.id)
-            .order_by(TranscriptSegment.start_ms.asc())
-            .limit(20)
-            .all()
-        )
-        if segs:
-            full_text = " ".join(s.text for s in segs)
+        full_text = texts.get(asset.id)
+        if full_text:
             if len(full_text) > 280:
                 transcripts_preview = full_text[:280].rsplit(" ", 1)[0] + "…"
             else:
@@ -0,0 +1,123 @@
+"""
+Benchmark van de KB-interne-link injector over de volledige kennisbank.
+
+Vergelijkt de voorgecompileerde matcher (inject_kb_internal_links) met de
+oorspronkelijke per-anker-lus (_inject_block_sequential) op alle artikelen
+uit update_kennisbank.py en seed_kennisbank.py:
+
+  * controleert eerst dat beide exact dezelfde html opleveren, ook bij een
+    tweede run (idempotent);
+  * meet daarna de tijd per volledige pass, met de echte anker-map en met
+    een opgeschaalde map (extra ankers uit woordparen van de corpus zelf),
+    om te laten zien hoe beide groeien met het aantal ankers.
+
+    cd life-journey-backend && python scripts/bench_kb_internal_links.py [--repeat 10] [--scale 1 10 25]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.kb_internal_links import (  # noqa: E402
+    KB_ANCHORS,
+    KbAnchor,
+    _PARA_RE,
+    _inject_block_sequential,
+    inject_kb_internal_links,
+)
+from scripts.seed_kennisbank import ARTICLES as SEED_ARTICLES  # noqa: E402
+from scripts.update_kennisbank import ARTICLES as UPDATE_ARTICLES  # noqa: E402
+
+_WORD_RE = re.compile(r"[^\W\d_]{4,}")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def corpus() -> list[tuple[str, str]]:
+    """(slug, html) van alle kennisbankartikelen; update-versie wint van de seed."""
+    articles = {art["slug"]: art["content"] for art in SEED_ARTICLES}
+    articles.update({art["slug"]: art["content"] for art in UPDATE_ARTICLES})
+    return list(articles.items())
+
+
+def sequential(html: str, anchors: list[KbAnchor], exclude_slug: str) -> str:
+    active = [a for a in anchors if a.target != exclude_slug]
+    return _PARA_RE.sub(
+        lambda m: f"{m.group(1)}{_inject_block_sequential(m.group(3), active, 1)}{m.group(4)}",
+        html,
+    )
+
+
+def compiled(html: str, anchors: list[KbAnchor], exclude_slug: str) -> str:
+    return inject_kb_internal_links(html, anchors, exclude_slug=exclude_slug)
+
+
+def scaled_anchors(articles: list[tuple[str, str]], factor: int) -> list[KbAnchor]:
+    """De echte map plus (factor - 1) x zoveel ankers op woordparen die echt in de tekst staan."""
+    if factor <= 1:
+        return list(KB_ANCHORS)
+    pairs: Counter = Counter()
+    for _, html in articles:
+        words = _WORD_RE.findall(_TAG_RE.sub(" ", html).lower())
+        pairs.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    extra = [
+        KbAnchor(f"synthetisch-{i}", phrase)
+        for i, (phrase, _) in enumerate(pairs.most_common(len(KB_ANCHORS) * (factor - 1)))
+    ]
+    return list(KB_ANCHORS) + extra
+
+
+def verify(articles: list[tuple[str, str]], anchors: list[KbAnchor]) -> int:
+    links = 0
+    for slug, html in articles:
+        once = compiled(html, anchors, slug)
+        if once != sequential(html, anchors, slug):
+            raise SystemExit(f"Verschil in uitvoer voor {slug}")
+        if compiled(once, anchors, slug) != once:
+            raise SystemExit(f"Niet idempotent voor {slug}")
+        links += once.count('href="/kennisbank/') - html.count('href="/kennisbank/')
+    return links
+
+
+def best_of(fn, articles: list[tuple[str, str]], anchors: list[KbAnchor], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for slug, html in articles:
+            fn(html, anchors, slug)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="aantal passes per meting (beste telt)")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 25], help="factor op het aantal ankers")
+    args = parser.parse_args()
+
+    articles = corpus()
+    blocks = sum(len(_PARA_RE.findall(html)) for _, html in articles)
+    size = sum(len(html) for _, html in articles)
+    print(f"Corpus: {len(articles)} artikelen, {blocks} <p>/<li>-blokken, {size // 1024} KB html\n")
+    print(f"{'ankers':>7}  {'links':>6}  {'per-anker-lus':>14}  {'gecompileerd':>13}  {'winst':>6}")
+
+    for factor in args.scale:
+        anchors = scaled_anchors(articles, factor)
+        added = verify(articles, anchors)
+        # Eén keer opwarmen zodat het compileren van de matcher niet meetelt
+        compiled(articles[0][1], anchors, "")
+        slow = best_of(sequential, articles, anchors, args.repeat)
+        fast = best_of(compiled, articles, anchors, args.repeat)
+        print(
+            f"{len(anchors):>7}  {added:>6}  {slow * 1000:>11.1f} ms  {fast * 1000:>10.1f} ms  "
+            f"{slow / fast:>5.1f}x"
+        )
+
+    print("\nUitvoer identiek aan de per-anker-lus en idempotent bij een tweede run.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,9 @@ from pathlib import Path
 from uuid import uuid4
 
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from starlette.testclient import TestClient
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -12,6 +15,7 @@ if str(ROOT) not in sys.path:
 
 # Import all models so SQLAlchemy can resolve all mapper relationships
 import app.db.base  # noqa: F401, E402
+from app.models.base import Base  # noqa: E402
 
 
 @pytest.fixture(scope="module")
@@ -21,6 +25,19 @@ def test_client():
         yield client
 
 
+@pytest.fixture
+def db_factory():
+    """Session factory over a fresh in-memory SQLite database with every table.
+
+    StaticPool keeps one connection, so sessions from the factory (and the app,
+    via a get_db override) all see the same data.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    engine.dispose()
+
+
 @dataclass
 class FakeQuery:
     data: list
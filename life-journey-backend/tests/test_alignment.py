@@ -0,0 +1,82 @@
+"""Tests for the per-transcript word alignment index."""
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+from app.services.media import alignment as alignment_module
+from app.services.media.alignment import TranscriptAlignment, alignment_for
+
+SEGMENTS = [
+    {"text": "Ik groeide op in Leiden, vlak bij de Burcht.", "start_ms": 0, "end_ms": 9_000},
+    {"text": "Mijn moeder zong altijd in de keuken als het regende.", "start_ms": 60_000, "end_ms": 70_000},
+    {"text": "Mijn vader lachte dan en deed de radio uit.", "start_ms": 70_000, "end_ms": 78_000},
+]
+
+
+def test_exact_quote_ignores_case_and_punctuation():
+    index = TranscriptAlignment(SEGMENTS)
+    start_ms, end_ms = index.locate("moeder zong altijd")
+    assert 60_000 < start_ms < end_ms < 70_000
+    assert index.locate("leiden vlak bij") == index.word_span_ms(4, 6)
+
+
+def test_paraphrased_quote_finds_the_right_passage():
+    index = TranscriptAlignment(SEGMENTS)
+    # Reworded tail and a dropped word, as the model tends to do
+    first, last = index.find_words("mijn moeder zong altijd in de keuken wanneer het regende")
+    assert index.text[index._char_starts[first]:index._char_ends[last]] == (
+        "Mijn moeder zong altijd in de keuken als het regende."
+    )
+
+
+def test_unrelated_quote_is_not_placed_in_the_middle():
+    index = TranscriptAlignment(SEGMENTS)
+    assert index.locate("we gingen elke zomer kamperen in Frankrijk") is None
+    assert TranscriptAlignment([]).locate("iets") is None
+
+
+def test_fuzzy_search_stays_linear_on_repetitive_transcripts():
+    # Hours of "ja ja ja": every quote trigram hits at nearly every shift
+    segments = [{"text": "ja " * 50, "start_ms": n * 10_000, "end_ms": (n + 1) * 10_000} for n in range(400)]
+    segments.append({"text": "ja ja en toen gingen we samen naar de markt", "start_ms": 4_000_000, "end_ms": 4_010_000})
+    index = TranscriptAlignment(segments)
+
+    started = time.monotonic()
+    words = index.find_words("ja " * 30 + "toen gingen we met z'n allen naar de markt")
+    assert time.monotonic() - started < 2
+    assert words is not None and index.word_span_ms(*words)[1] == 4_010_000
+
+
+def test_character_offsets_map_to_words():
+    index = TranscriptAlignment(SEGMENTS)
+    offset = index.text.index("Burcht")
+    assert index.word_at(offset) == index.word_at(offset + 3) == 8
+    assert index.word_at(0) == 0
+
+
+def test_text_between_uses_only_this_recording():
+    index = TranscriptAlignment(reversed(SEGMENTS))
+    assert index.text_between(70_000, 78_000) == "Mijn vader lachte dan en deed de radio uit."
+    assert index.text_between(20_000, 50_000) == ""
+    start_ms, end_ms = index.locate("vader lachte")
+    assert index.text_between(start_ms, end_ms) == "vader lachte"
+
+
+def test_orm_segments_and_cache_per_transcript_version(monkeypatch):
+    alignment_module.clear_alignment_cache()
+    built = []
+    real_init = TranscriptAlignment.__init__
+
+    def counting_init(self, segments):
+        built.append(1)
+        real_init(self, segments)
+
+    monkeypatch.setattr(TranscriptAlignment, "__init__", counting_init)
+    rows = [SimpleNamespace(**seg) for seg in SEGMENTS]
+
+    first = alignment_for("a1", 1, rows)
+    assert alignment_for("a1", 1, rows) is first
+    assert alignment_for("a1", 2, rows) is not first
+    assert len(built) == 2
+    assert first.locate("radio uit") is not None
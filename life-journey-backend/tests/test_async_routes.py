@@ -0,0 +1,89 @@
+"""
+Guard: async route handlers must not do blocking DB or storage work inline.
+
+The app uses a synchronous SQLAlchemy Session and boto3. Inside an
+`async def` handler such calls run on the event loop and stall every other
+request; handlers are either plain `def` (FastAPI runs them in its
+threadpool) or hand the blocking part to `run_in_threadpool`.
+"""
+
+import ast
+from pathlib import Path
+
+ROUTES_DIR = Path(__file__).resolve().parent.parent / "app" / "api" / "v1" / "routes"
+
+_BLOCKING_ATTRS = {"write_bytes", "put_object", "generate_presigned_url", "upload_fileobj", "get_object"}
+_BLOCKING_MODULES = {"db", "boto3", "local_storage"}
+
+
+def _is_route(fn: ast.AsyncFunctionDef) -> bool:
+    for deco in fn.decorator_list:
+        target = deco.func if isinstance(deco, ast.Call) else deco
+        if isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) and target.value.id == "router":
+            return True
+    return False
+
+
+def _root_name(node: ast.AST) -> str | None:
+    while isinstance(node, (ast.Attribute, ast.Call)):
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _blocking_calls(fn: ast.AsyncFunctionDef) -> list[str]:
+    found: list[str] = []
+
+    def visit(node: ast.AST, awaited: bool = False) -> None:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)) and node is not fn:
+            return
+        if isinstance(node, ast.Await):
+            visit(node.value, awaited=True)
+            return
+        if isinstance(node, ast.Call) and not awaited:
+            func = node.func
+            name = ast.unparse(func)
+            problem = None
+            if _root_name(func) in _BLOCKING_MODULES:
+                problem = f"{name}()"
+            elif isinstance(func, ast.Attribute) and func.attr in _BLOCKING_ATTRS:
+                problem = f"{name}()"
+            elif any(isinstance(a, ast.Name) and a.id == "db" for a in node.args):
+                problem = f"{name}(db, ...)"
+            if problem:
+                # One report per chain (db.query(...).all()); still check the arguments
+                found.append(f"line {node.lineno}: {problem}")
+                for child in [*node.args, *node.keywords]:
+                    visit(child)
+                return
+        for child in ast.iter_child_nodes(node):
+            visit(child)
+
+    for stmt in fn.body:
+        visit(stmt)
+    return found
+
+
+def test_async_handlers_do_not_block_the_event_loop():
+    problems = []
+    for path in sorted(ROUTES_DIR.glob("*.py")):
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.AsyncFunctionDef) and _is_route(node):
+                for call in _blocking_calls(node):
+                    problems.append(f"{path.name}:{node.name} {call}")
+    assert not problems, "Blocking calls in async handlers:\n" + "\n".join(problems)
+
+
+def test_guard_flags_inline_session_use():
+    src = (
+        "@router.get('/x')\n"
+        "async def handler(db=None):\n"
+        "    db.query(1).all()\n"
+        "    helper(db)\n"
+        "    await run_in_threadpool(helper, db)\n"
+    )
+    fn = ast.parse(src).body[0]
+    found = _blocking_calls(fn)
+    assert len(found) == 2
+    assert "db.query(1).all()" in found[0]
+    assert "helper(db, ...)" in found[1]
@@ -0,0 +1,133 @@
+"""Tests for HTTP caching headers and cache purging on the public blog endpoints."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from starlette.testclient import TestClient
+
+import app.db.base  # noqa: F401
+from app.api.deps import get_current_admin_user
+from app.api.v1.routes import blog as blog_routes
+from app.core.http_cache import http_date, not_modified
+from app.db.session import get_db
+from app.models.blog_post import BlogPost
+from app.models.user import User
+from app.services import blog_listings
+from app.services.blog_purge import public_api_urls
+
+
+@pytest.fixture
+def client(monkeypatch, db_factory):
+    from app.main import app
+
+    factory = db_factory
+    blog_listings.invalidate_listings()
+
+    purged: list[tuple] = []
+
+    async def _record_purge(slug, section, *, old_slug=None):
+        purged.append((slug, section, old_slug))
+
+    monkeypatch.setattr(blog_routes, "purge_public_caches", _record_purge)
+
+    def _override_get_db():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    admin = User(id=str(uuid4()), display_name="Beheer", email="beheer@example.com", country="NL", is_admin=True)
+    app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_current_admin_user] = lambda: admin
+    try:
+        with TestClient(app) as test_client:
+            test_client.factory = factory
+            test_client.purged = purged
+            yield test_client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def _add_post(factory, slug: str, *, status: str = "published") -> str:
+    with factory() as db:
+        post = BlogPost(
+            id=str(uuid4()), author_id="admin", section="knowledge", title=slug.title(), slug=slug,
+            content="<p>Lange tekst</p>", transcript="Lang transcript", status=status,
+            published_at=datetime.now(timezone.utc) - timedelta(days=1), updated_at=datetime(2026, 10, 1, 9, 30),
+        )
+        db.add(post)
+        db.commit()
+        return post.id
+
+
+def test_not_modified_prefers_etag_over_date():
+    modified = datetime(2026, 10, 1, 9, 30, 15, 500)
+    assert http_date(modified) == "Thu, 01 Oct 2026 09:30:15 GMT"
+    assert not_modified({"if-modified-since": http_date(modified)}, 'W/"a"', modified)
+    assert not not_modified({"if-modified-since": "Thu, 01 Oct 2026 09:30:14 GMT"}, 'W/"a"', modified)
+    assert not not_modified({"if-none-match": 'W/"b"', "if-modified-since": http_date(modified)}, 'W/"a"', modified)
+    assert not not_modified({"if-modified-since": "gisteren"}, 'W/"a"', modified)
+
+
+def test_public_post_revalidates_without_loading_content(client):
+    post_id = _add_post(client.factory, "oma-vertelt")
+
+    response = client.get("/api/v1/blog/public/slug/oma-vertelt")
+    assert response.status_code == 200
+    assert response.json()["content"] == "<p>Lange tekst</p>"
+    assert response.headers["cache-control"].startswith("public, max-age=300, s-maxage=3600")
+    assert response.headers["last-modified"] == "Thu, 01 Oct 2026 09:30:00 GMT"
+    etag = response.headers["etag"]
+
+    revalidated = client.get("/api/v1/blog/public/slug/oma-vertelt", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    by_date = client.get(
+        "/api/v1/blog/public/slug/oma-vertelt", headers={"If-Modified-Since": response.headers["last-modified"]},
+    )
+    assert by_date.status_code == 304
+
+    assert client.patch(f"/api/v1/blog/{post_id}", json={"title": "Oma vertelt verder"}).status_code == 200
+    changed = client.get("/api/v1/blog/public/slug/oma-vertelt", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+
+def test_public_lists_carry_validators_and_skip_heavy_columns(client):
+    _add_post(client.factory, "opa-vertelt")
+    _add_post(client.factory, "concept", status="draft")
+
+    for path in ("/api/v1/blog/public/list", "/api/v1/blog/public/most-read"):
+        response = client.get(path, params={"section": "knowledge"})
+        assert response.status_code == 200
+        assert [item["slug"] for item in response.json()] == ["opa-vertelt"]
+        assert "content" not in response.json()[0]
+        assert response.headers["cache-control"].startswith("public, max-age=60")
+        assert "last-modified" not in response.headers
+        again = client.get(path, params={"section": "knowledge"}, headers={"If-None-Match": response.headers["etag"]})
+        assert again.status_code == 304
+
+
+def test_changes_to_published_posts_purge_public_caches(client):
+    draft_id = _add_post(client.factory, "concept", status="draft")
+    post_id = _add_post(client.factory, "oud-adres")
+
+    assert client.patch(f"/api/v1/blog/{draft_id}", json={"title": "Nog concept"}).status_code == 200
+    assert client.purged == []
+
+    assert client.patch(f"/api/v1/blog/{post_id}", json={"slug": "nieuw-adres"}).status_code == 200
+    assert client.post(f"/api/v1/blog/{post_id}/unpublish").status_code == 200
+    assert client.post(f"/api/v1/blog/{post_id}/publish").status_code == 200
+    assert client.purged == [
+        ("nieuw-adres", "knowledge", "oud-adres"),
+        ("nieuw-adres", "knowledge", None),
+        ("nieuw-adres", "knowledge", None),
+    ]
+
+
+def test_purge_urls_cover_the_post_and_fixed_lists():
+    urls = public_api_urls("oma-vertelt", "knowledge")
+    assert urls[0].endswith("/api/v1/blog/public/slug/oma-vertelt")
+    assert any(url.endswith("/blog/public/list?section=knowledge") for url in urls)
+    assert any(url.endswith("/blog/public/most-read") for url in urls)
@@ -0,0 +1,127 @@
+"""Tests for the blog_tag index and the cached public blog listings."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from starlette.testclient import TestClient
+
+import app.db.base  # noqa: F401
+from app.api.deps import get_current_admin_user
+from app.db.blog_tags import parse_tags
+from app.db.session import get_db
+from app.models.blog_post import BlogPost, BlogTag
+from app.models.user import User
+from app.services import blog_listings
+
+
+@pytest.fixture
+def factory(db_factory):
+    blog_listings.invalidate_listings()
+    return db_factory
+
+
+def _post(slug: str, tags: str | None, *, section: str = "knowledge", days_ago: int = 0) -> BlogPost:
+    return BlogPost(
+        id=str(uuid4()), author_id="admin", section=section, title=slug.title(), slug=slug,
+        content="<p>" + "lang verhaal " * 200 + "</p>", tags=tags, status="published",
+        published_at=datetime.now(timezone.utc) - timedelta(days=days_ago),
+    )
+
+
+def _tags(db) -> set[tuple[str, str]]:
+    return {(row.post_id, row.tag) for row in db.query(BlogTag)}
+
+
+def test_parse_tags_normalises_and_dedupes():
+    assert parse_tags(" Vaderdag, cadeau ,familie geschiedenis,,VADERDAG") == [
+        "vaderdag", "cadeau", "familiegeschiedenis",
+    ]
+    assert parse_tags(None) == []
+
+
+def test_flushes_keep_blog_tag_in_step(factory):
+    with factory() as db:
+        post = _post("vaderdag-cadeau", "vaderdag,cadeau")
+        db.add(post)
+        db.commit()
+        assert _tags(db) == {(post.id, "vaderdag"), (post.id, "cadeau")}
+
+        post.tags = "Cadeau, familie"
+        db.commit()
+        assert _tags(db) == {(post.id, "cadeau"), (post.id, "familie")}
+
+        post.title = "Alleen de titel"
+        db.commit()
+        assert _tags(db) == {(post.id, "cadeau"), (post.id, "familie")}
+
+        db.delete(post)
+        db.commit()
+        assert _tags(db) == set()
+
+
+def test_published_listing_matches_whole_tags_without_loading_content(factory):
+    with factory() as db:
+        newest = _post("nieuw", "vaderdag,familie", days_ago=1)
+        oldest = _post("oud", "Vaderdag", days_ago=5)
+        db.add_all([newest, oldest, _post("ander", "va,cadeau"), _post("blog", "vaderdag", section="blog")])
+        db.commit()
+
+        items = blog_listings.published_listing(db, section="knowledge", tag=" VADERDAG ").items
+        assert [item["slug"] for item in items] == ["nieuw", "oud"]
+        assert [item["slug"] for item in blog_listings.published_listing(db, tag="va").items] == ["ander"]
+
+        row = blog_listings.list_query(db).filter(BlogPost.slug == "nieuw").one()
+        assert "content" not in row._fields and "transcript" not in row._fields
+
+
+def test_listings_are_cached_until_invalidated(factory):
+    with factory() as db:
+        db.add(_post("eerste", "familie"))
+        db.commit()
+        assert len(blog_listings.published_listing(db, tag="familie").items) == 1
+
+        db.add(_post("tweede", "familie"))
+        db.commit()
+        assert len(blog_listings.published_listing(db, tag="familie").items) == 1
+
+        blog_listings.invalidate_listings()
+        assert len(blog_listings.published_listing(db, tag="familie").items) == 2
+
+
+def test_patch_and_unpublish_refresh_the_public_tag_page(factory):
+    from app.main import app
+
+    with factory() as db:
+        post = _post("opa-vertelt", "familie")
+        db.add(post)
+        db.commit()
+        post_id = post.id
+    admin = User(id=str(uuid4()), display_name="Beheer", email="beheer@example.com", country="NL", is_admin=True)
+
+    def _override_get_db():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_current_admin_user] = lambda: admin
+    try:
+        with TestClient(app) as client:
+            def slugs(tag: str) -> list[str]:
+                response = client.get("/api/v1/blog/public/list", params={"tag": tag})
+                assert response.status_code == 200
+                return [item["slug"] for item in response.json()]
+
+            assert slugs("familie") == ["opa-vertelt"]
+            assert client.patch(f"/api/v1/blog/{post_id}", json={"tags": "herinneringen"}).status_code == 200
+            assert slugs("familie") == []
+            assert slugs("herinneringen") == ["opa-vertelt"]
+
+            assert client.post(f"/api/v1/blog/{post_id}/unpublish").status_code == 200
+            assert slugs("herinneringen") == []
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,104 @@
+"""Tests for buffered blog view counting and the most-read ranking."""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from starlette.testclient import TestClient
+
+import app.db.base  # noqa: F401
+from app.models.blog_post import BlogPost
+from app.services import blog_listings, blog_views
+
+
+@pytest.fixture
+def factory(monkeypatch, db_factory):
+    monkeypatch.setattr(blog_views, "_pending", blog_views.Counter())
+    monkeypatch.setattr(blog_views, "_ranking", None)
+    monkeypatch.setattr(blog_views, "_last_flush", time.monotonic())
+    blog_listings.invalidate_listings()
+    return db_factory
+
+
+def _post(slug: str, *, views: int = 0, section: str = "knowledge", status: str = "published") -> BlogPost:
+    return BlogPost(
+        id=str(uuid4()), author_id="admin", section=section, title=slug.title(), slug=slug, content="<p>x</p>",
+        view_count=views, status=status, published_at=datetime.now(timezone.utc) - timedelta(days=1),
+        updated_at=datetime(2026, 1, 1),
+    )
+
+
+def _counts(db) -> dict[str, int]:
+    db.expire_all()
+    return {post.slug: post.view_count for post in db.query(BlogPost)}
+
+
+def test_flush_applies_one_increment_per_slug(factory):
+    with factory() as db:
+        db.add_all([_post("oma", views=3), _post("opa"), _post("concept", status="draft")])
+        db.commit()
+
+        for slug in ["oma", "oma", "opa", "oma", "concept", "bestaat-niet"]:
+            blog_views.record_view(slug)
+        assert _counts(db) == {"oma": 3, "opa": 0, "concept": 0}
+
+        assert blog_views.flush_views(db) == 6
+        assert _counts(db) == {"oma": 6, "opa": 1, "concept": 0}
+        assert db.query(BlogPost).filter_by(slug="oma").one().updated_at == datetime(2026, 1, 1)
+
+        assert blog_views.flush_views(None) == 0  # lege buffer raakt de database niet
+
+
+def test_failed_flush_keeps_the_views_buffered(factory):
+    class Broken:
+        def execute(self, *args, **kwargs):
+            raise RuntimeError("database weg")
+
+        def rollback(self):
+            pass
+
+    blog_views.record_view("oma")
+    blog_views.record_view("oma")
+    with pytest.raises(RuntimeError):
+        blog_views.flush_views(Broken())
+    assert blog_views._pending == {"oma": 2}
+
+
+def test_record_view_asks_for_a_flush_once_per_interval(factory, monkeypatch):
+    assert blog_views.record_view("oma") is False
+    monkeypatch.setattr(blog_views, "_last_flush", time.monotonic() - blog_views._FLUSH_INTERVAL_SECONDS)
+    assert blog_views.record_view("oma") is True
+    assert blog_views.record_view("oma") is False
+
+
+def test_most_read_follows_flushes_and_publication_changes(factory):
+    with factory() as db:
+        db.add_all([_post("oma", views=5), _post("opa", views=2), _post("blog-post", views=9, section="blog")])
+        db.commit()
+
+        assert [item["slug"] for item in blog_views.most_read(db, limit=2)] == ["blog-post", "oma"]
+        assert [item["slug"] for item in blog_views.most_read(db, section="knowledge")] == ["oma", "opa"]
+
+        for _ in range(4):
+            blog_views.record_view("opa")
+        # Nog niet geflusht: de ranglijst blijft staan
+        assert [item["slug"] for item in blog_views.most_read(db, section="knowledge")] == ["oma", "opa"]
+        blog_views.flush_views(db)
+        ranked = blog_views.most_read(db, section="knowledge")
+        assert [(item["slug"], item["view_count"]) for item in ranked] == [("opa", 6), ("oma", 5)]
+
+        db.query(BlogPost).filter_by(slug="opa").one().status = "draft"
+        db.commit()
+        blog_listings.invalidate_listings()
+        assert [item["slug"] for item in blog_views.most_read(db, section="knowledge")] == ["oma"]
+
+
+def test_view_route_buffers_without_touching_the_database(factory):
+    from app.main import app
+
+    with TestClient(app) as client:
+        assert client.post("/api/v1/blog/public/oma-vertelt/view").status_code == 204
+        assert client.post("/api/v1/blog/public/Geen%20Slug/view").status_code == 204
+    assert blog_views._pending == {"oma-vertelt": 1}
@@ -0,0 +1,135 @@
+"""Tests for the maintained journey_chapter_stats counters."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete
+
+import app.db.base  # noqa: F401
+from app.db.chapter_stats import reconcile_chapter_stats, refresh_chapter_stats
+from app.models.chapter_stats import JourneyChapterStats
+from app.models.journey import Journey
+from app.models.media import MediaAsset
+from app.models.user import User
+from app.services import journey_progress
+from app.services.entitlements import assert_can_record
+
+
+def _asset(asset_id, chapter_id, modality="audio", state="ready", duration=10, recorded_at=None):
+    return MediaAsset(
+        id=asset_id, journey_id="j1", chapter_id=chapter_id, modality=modality,
+        object_key=f"j1/{asset_id}", original_filename="opname", storage_state=state,
+        duration_seconds=duration, recorded_at=recorded_at or datetime(2026, 1, 1),
+    )
+
+
+@pytest.fixture
+def db(db_factory):
+    session = db_factory()
+    session.add(User(id="u1", display_name="Riet", email="riet@example.com", country="NL"))
+    session.add(Journey(id="j1", user_id="u1", title="Mijn verhaal"))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _stats(session, chapter_id):
+    session.expire_all()
+    return session.get(JourneyChapterStats, ("j1", chapter_id))
+
+
+def test_counters_follow_create_finish_and_delete(db):
+    db.add(_asset("a1", "intro-reflection", state="pending", duration=30))
+    db.commit()
+    row = _stats(db, "intro-reflection")
+    assert (row.media_count, row.ready_count, row.duration_seconds) == (1, 0, 0)
+
+    db.get(MediaAsset, "a1").storage_state = "ready"
+    db.add(_asset("a2", "intro-reflection", modality="video", duration=5, recorded_at=datetime(2026, 2, 1)))
+    db.commit()
+    row = _stats(db, "intro-reflection")
+    assert (row.media_count, row.ready_count, row.audio_count, row.video_count) == (2, 2, 1, 1)
+    assert row.duration_seconds == 35
+    assert row.last_recorded_at == datetime(2026, 2, 1)
+
+    db.delete(db.get(MediaAsset, "a2"))
+    db.commit()
+    row = _stats(db, "intro-reflection")
+    assert (row.media_count, row.video_count, row.last_recorded_at) == (1, 0, datetime(2026, 1, 1))
+
+    db.delete(db.get(MediaAsset, "a1"))
+    db.commit()
+    assert _stats(db, "intro-reflection") is None
+
+
+def test_moving_an_asset_updates_both_chapters(db):
+    db.add(_asset("a1", "intro-reflection"))
+    db.commit()
+    db.get(MediaAsset, "a1").chapter_id = "intro-intention"
+    db.commit()
+    assert _stats(db, "intro-reflection") is None
+    assert _stats(db, "intro-intention").media_count == 1
+
+
+def test_reconcile_repairs_bulk_changes(db):
+    db.add_all([_asset("a1", "intro-reflection"), _asset("a2", "youth-hero")])
+    db.commit()
+    # Bulk delete bypasses the flush listener
+    db.execute(delete(MediaAsset).where(MediaAsset.id == "a2"))
+    db.execute(delete(JourneyChapterStats).where(JourneyChapterStats.chapter_id == "intro-reflection"))
+
+    assert reconcile_chapter_stats(db) == 2
+    db.commit()
+    assert _stats(db, "intro-reflection").media_count == 1
+    assert _stats(db, "youth-hero") is None
+    assert reconcile_chapter_stats(db) == 0
+
+
+def test_refresh_handles_explicit_keys(db):
+    db.add(_asset("a1", "intro-reflection"))
+    db.commit()
+    db.execute(delete(JourneyChapterStats))
+    refresh_chapter_stats(db, [("j1", "intro-reflection")])
+    assert _stats(db, "intro-reflection").media_count == 1
+
+
+def test_progress_and_unlocks_read_the_counters(db):
+    db.add_all([_asset("a1", "intro-reflection"), _asset("a2", "future-gratitude")])
+    db.commit()
+
+    statuses = journey_progress.get_all_chapter_statuses(db, "j1")
+    assert statuses["intro-reflection"]["status"] == "completed"
+    assert statuses["intro-intention"]["status"] == "available"
+    assert statuses["intro-uniqueness"]["status"] == "locked"
+    assert statuses["bonus-funny"]["isUnlocked"] is True
+    assert statuses["deep-statue"]["isUnlocked"] is False
+
+    for chapter_id in journey_progress.CHAPTER_ORDER:
+        assert journey_progress.get_chapter_status(db, "j1", chapter_id) == statuses[chapter_id]
+    assert journey_progress.is_chapter_unlocked(db, "j1", "onbekend") is False
+
+
+def test_unlock_predecessors_match_the_chapter_order():
+    order = journey_progress.CHAPTER_ORDER
+    assert journey_progress.UNLOCK_PREDECESSOR[order[0]] is None
+    assert journey_progress.UNLOCK_PREDECESSOR["youth-sounds"] == "youth-favorite-place"
+    assert journey_progress.UNLOCK_PREDECESSOR["bonus-culture"] == "future-gratitude"
+    assert journey_progress.UNLOCK_PREDECESSOR["deep-daily-ritual"] == "bonus-culture"
+
+
+def test_chapter_limit_uses_the_counters(db):
+    db.add_all([_asset("a1", "intro-reflection"), _asset("a2", "intro-intention")])
+    db.commit()
+    user = SimpleNamespace(
+        package_tier="NONE", max_chapters=2,
+        trial_expires_at=datetime.now(timezone.utc) + timedelta(days=5),
+    )
+    assert_can_record(db, user, "j1", "intro-reflection") is None
+    with pytest.raises(HTTPException) as exc:
+        assert_can_record(db, user, "j1", "youth-hero")
+    assert exc.value.status_code == 402
@@ -0,0 +1,221 @@
+"""Tests for the bounded conversation session store and write-behind persistence."""
+from __future__ import annotations
+
+import json
+from uuid import uuid4
+
+import pytest
+
+import app.db.base  # noqa: F401
+from app.models.conversation import ConversationSessionRecord
+from app.schemas.common import ChapterId
+from app.services.ai import conversation
+from app.services.ai.conversation_store import (
+    ConversationStoreUnavailable,
+    LocalConversationStore,
+    RedisConversationStore,
+    StoredConversation,
+    dumps,
+    loads,
+    set_conversation_store,
+)
+
+
+class _SharedStore(LocalConversationStore):
+    """Stands in for the Redis store: visible to every worker, so answers are written behind."""
+
+    shared = True
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = _SharedStore()
+    set_conversation_store(store)
+    monkeypatch.setattr(conversation.settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(conversation, "get_personalized_prompt_context", lambda *args: None)
+    monkeypatch.setattr(conversation.ConversationSession, "_fetch_relevant_quick_thoughts", lambda self: [])
+    monkeypatch.setattr(
+        conversation.ConversationSession, "_generate_opening_question", lambda self, *args, **kwargs: "Vraag 1",
+    )
+    monkeypatch.setattr(
+        conversation.ConversationSession, "_analyze_response_with_ai", lambda self, text: {"story_depth": 3},
+    )
+    monkeypatch.setattr(
+        conversation.ConversationSession, "_generate_intelligent_follow_up",
+        lambda self: f"Vraag {len(self.turns) + 1}",
+    )
+    yield store
+    set_conversation_store(None)
+
+
+@pytest.fixture
+def factory(db_factory):
+    return db_factory
+
+
+def _record_turns(factory, session_id: str) -> list[dict]:
+    with factory() as db:
+        return db.get(ConversationSessionRecord, session_id).turns
+
+
+def _stored(unsaved: int = 0, turns: int = 1, answer: str = "Kort antwoord") -> StoredConversation:
+    rows = [[n, f"Vraag {n}", answer, {"story_depth": 4, "people": ["oma"]}, 1_760_000_000_000_001]
+            for n in range(1, turns + 1)]
+    return StoredConversation("journey", "intro-reflection", "asset", rows, 1_760_000_000_000_001, unsaved)
+
+
+def test_serialisation_round_trips_and_compresses_long_sessions():
+    small, large = _stored(), _stored(turns=7, answer="Mijn oma vertelde over de oorlog. " * 30)
+    assert loads(dumps(small)) == small
+    assert loads(dumps(large)) == large
+    assert dumps(small)[:1] == b"j" and dumps(large)[:1] == b"z"
+
+    turns = conversation._turns_from_compact(large.turns)
+    assert conversation._turns_to_compact(turns) == large.turns
+    # Het databaseformaat (volledige sleutels, ISO-tijden) is vele malen groter
+    assert len(dumps(large)) * 10 < len(json.dumps(conversation._turns_to_json(turns)))
+
+
+def test_local_store_is_bounded_and_hands_back_unsaved_sessions(monkeypatch):
+    store = LocalConversationStore(max_sessions=2, ttl_seconds=60)
+    assert store.put("a", _stored(unsaved=1)) == []
+    assert store.put("b", _stored()) == []
+    assert store.get("a") is not None  # a is nu het recentst gebruikt
+
+    assert store.put("c", _stored()) == []  # b valt eruit, zonder niet-opgeslagen wijzigingen
+    assert store.get("b") is None and len(store) == 2
+
+    dropped = store.put("d", _stored())
+    assert [key for key, _ in dropped] == ["a"]
+
+    clock = [1000.0]
+    monkeypatch.setattr("app.services.ai.conversation_store.time.monotonic", lambda: clock[0])
+    store = LocalConversationStore(ttl_seconds=60)
+    store.put("klaar", _stored())
+    store.put("open", _stored(unsaved=2))
+    clock[0] += 61
+    assert store.get("klaar") is None
+    assert store.get("open").unsaved == 2  # verlopen, maar nieuwer dan de database
+
+
+def test_answers_are_written_behind_and_completion_is_written_through(store, factory):
+    with factory() as db:
+        session_id, opening = conversation.start_conversation_session(
+            db, journey_id=str(uuid4()), chapter_id=ChapterId.intro_reflection, asset_id="asset-1",
+        )
+    assert opening == "Vraag 1"
+    assert len(_record_turns(factory, session_id)) == 1
+
+    with factory() as db:
+        assert conversation.add_response_to_conversation(db, session_id, "Eerste antwoord") == "Vraag 2"
+        assert conversation.add_response_to_conversation(db, session_id, "Tweede antwoord") == "Vraag 3"
+    # Nog in de store, de database is niet herschreven
+    assert _record_turns(factory, session_id)[0]["user_response"] is None
+    assert store.get(session_id).unsaved == 2
+
+    with factory() as db:
+        assert conversation.add_response_to_conversation(db, session_id, "Derde antwoord") == "Vraag 4"
+    assert [t["user_response"] for t in _record_turns(factory, session_id)] == [
+        "Eerste antwoord", "Tweede antwoord", "Derde antwoord", None,
+    ]
+    assert store.get(session_id).unsaved == 0
+
+    with factory() as db:
+        assert conversation.end_conversation_session(db, session_id)["total_turns"] == 4
+        record = db.get(ConversationSessionRecord, session_id)
+        assert record.is_complete and len(record.turns) == 4
+    assert store.get(session_id) is None
+
+
+def test_another_worker_resumes_from_the_record_and_flush_catches_up(store, factory):
+    journey_id = str(uuid4())
+    with factory() as db:
+        session_id, _ = conversation.start_conversation_session(
+            db, journey_id=journey_id, chapter_id=ChapterId.intro_reflection, asset_id="asset-1",
+        )
+        conversation.add_response_to_conversation(db, session_id, "Eerste antwoord")
+
+        # Zelfde worker: de store is nieuwer dan het record
+        assert conversation.resume_conversation_session(db, journey_id, "intro-reflection")[1:3] == ("Vraag 2", 2)
+
+        # Een worker zonder deze sessie in zijn store valt terug op het record
+        set_conversation_store(LocalConversationStore())
+        assert conversation.resume_conversation_session(db, journey_id, "intro-reflection")[1:3] == ("Vraag 1", 1)
+
+        set_conversation_store(store)
+        assert conversation.flush_conversation_sessions(db) == 1
+        assert conversation.flush_conversation_sessions(db) == 0
+        assert conversation._load_session_from_db(db, session_id).turns[0].user_response == "Eerste antwoord"
+
+
+def test_stale_flush_does_not_overwrite_a_newer_record(store, factory):
+    with factory() as db:
+        session_id, _ = conversation.start_conversation_session(
+            db, journey_id=str(uuid4()), chapter_id=ChapterId.intro_reflection, asset_id="asset-1",
+        )
+        conversation.add_response_to_conversation(db, session_id, "Eerste antwoord")
+        stale = store.get(session_id)
+        conversation.add_response_to_conversation(db, session_id, "Tweede antwoord")
+        conversation.end_conversation_session(db, session_id)
+
+        assert conversation._persist_session(db, session_id, stale)
+        record = db.get(ConversationSessionRecord, session_id)
+        db.refresh(record)
+        assert record.is_complete and record.turns[1]["user_response"] == "Tweede antwoord"
+
+
+def test_failed_completion_stays_in_the_store_until_the_flush_writes_it(store, factory, monkeypatch):
+    persist = conversation._persist_session
+    failing = [True]
+
+    def flaky_persist(db, session_id, stored, is_complete=False, create=False):
+        if is_complete and failing[0]:
+            return False
+        return persist(db, session_id, stored, is_complete=is_complete, create=create)
+
+    monkeypatch.setattr(conversation, "_persist_session", flaky_persist)
+    journey_id = str(uuid4())
+    with factory() as db:
+        session_id, _ = conversation.start_conversation_session(
+            db, journey_id=journey_id, chapter_id=ChapterId.intro_reflection, asset_id="asset-1",
+        )
+        conversation.add_response_to_conversation(db, session_id, "Eerste antwoord")
+        conversation.end_conversation_session(db, session_id)
+
+        kept = store.get(session_id)
+        assert kept.complete and kept.unsaved
+        assert conversation.resume_conversation_session(db, journey_id, "intro-reflection") is None
+
+        failing[0] = False
+        assert conversation.flush_conversation_sessions(db) == 1
+    assert store.get(session_id) is None
+    with factory() as db:
+        record = db.get(ConversationSessionRecord, session_id)
+        assert record.is_complete and record.turns[0]["user_response"] == "Eerste antwoord"
+
+
+def test_worker_local_store_writes_every_answer_through(store, factory):
+    set_conversation_store(LocalConversationStore())
+    with factory() as db:
+        session_id, _ = conversation.start_conversation_session(
+            db, journey_id=str(uuid4()), chapter_id=ChapterId.intro_reflection, asset_id="asset-1",
+        )
+        conversation.add_response_to_conversation(db, session_id, "Eerste antwoord")
+
+    # Another worker (or a restart) only sees the record
+    assert _record_turns(factory, session_id)[0]["user_response"] == "Eerste antwoord"
+
+
+def test_unreadable_redis_fails_instead_of_continuing_from_the_record(store, factory):
+    class _DownClient:
+        def get(self, key):
+            raise ConnectionError("redis down")
+
+    with factory() as db:
+        session_id, _ = conversation.start_conversation_session(
+            db, journey_id=str(uuid4()), chapter_id=ChapterId.intro_reflection, asset_id="asset-1",
+        )
+        set_conversation_store(RedisConversationStore(client=_DownClient()))
+        with pytest.raises(ConversationStoreUnavailable):
+            conversation.add_response_to_conversation(db, session_id, "Eerste antwoord")
+    assert _record_turns(factory, session_id)[0]["user_response"] is None
@@ -44,6 +44,7 @@ class _Asset:
     duration_seconds: int = 42
     recorded_at: datetime = field(default_factory=_utc)
     storage_state: str = "ready"
+    full_transcript: str | None = None
 
     def __post_init__(self):
         if not self.object_key:
@@ -88,6 +89,9 @@ class _FakeQuery:
     def filter(self, *_):
         return self
 
+    def options(self, *_):
+        return self
+
     def filter_by(self, **kwargs):
         filtered = [i for i in self._data if all(getattr(i, k) == v for k, v in kwargs.items())]
         return _FakeQuery(filtered)
@@ -193,6 +197,18 @@ def test_generate_export_zip_includes_transcript():
         assert "testverhaal" in content
 
 
+def test_generate_export_zip_uses_materialised_transcript():
+    journey_id = str(uuid4())
+    asset = _Asset(id=str(uuid4()), journey_id=journey_id, full_transcript="Opa vertelt over de haven.")
+
+    # No segments at all: the text comes from the asset row
+    db = _FakeDb(journeys=[_Journey(id=journey_id)], assets=[asset])
+    result = generate_export_bundle(journey_id, db)
+    with _read_zip(result) as zf:
+        content = zf.read("transcripties/intro-reflection.txt").decode("utf-8")
+    assert "Opa vertelt over de haven." in content
+
+
 def test_generate_export_bundle_id_is_url_safe():
     journey_id = str(uuid4())
     db = _FakeDb(journeys=[_Journey(id=journey_id)])
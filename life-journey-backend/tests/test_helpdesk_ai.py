@@ -0,0 +1,121 @@
+"""Tests for helpdesk retrieval (BM25 over FAQ + kennisbank) and the answer cache."""
+from __future__ import annotations
+
+import json
+import re
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+import app.db.base  # noqa: F401
+from app.models.blog_post import BlogPost
+from app.services import blog_listings
+from app.services.ai import helpdesk_ai
+from app.services.ai.helpdesk_retrieval import Bm25Index, article_passages, faq_passages, normalize_question
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.calls: list[list[dict]] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, *, messages, **kwargs):
+        self.calls.append(messages)
+        answer = {"message": f"Antwoord {len(self.calls)}", "escalate": False, "suggested_questions": [], "action_links": []}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(answer)))])
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = _FakeLLM()
+    monkeypatch.setattr(helpdesk_ai.settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(helpdesk_ai, "get_llm_client", lambda: fake)
+    monkeypatch.setattr(helpdesk_ai, "_index_state", None)
+    monkeypatch.setattr(helpdesk_ai, "_answer_cache", helpdesk_ai.OrderedDict())
+    blog_listings.invalidate_listings()
+    return fake
+
+
+@pytest.fixture
+def db(db_factory):
+    with db_factory() as session:
+        yield session
+
+
+def _article(slug: str, title: str, content: str, status: str = "published") -> BlogPost:
+    return BlogPost(
+        id=str(uuid4()), author_id="admin", section="knowledge", title=title, slug=slug, content=content,
+        status=status, published_at=datetime.now(timezone.utc),
+    )
+
+
+def test_bm25_ranks_the_matching_faq_entry_first():
+    index = Bm25Index(faq_passages(helpdesk_ai.FAQ_KNOWLEDGE_BASE))
+    assert len(index) > 10
+
+    top, score = index.search("Hoe zeg ik m'n abonnement op?", k=3)[0]
+    assert top.title == "Hoe zeg ik mijn abonnement op?" and score > 0
+    assert index.search("microfoon doet het niet")[0][0].title.startswith("Mijn microfoon werkt niet")
+    assert index.search("xyzzy") == []
+
+
+def test_articles_are_split_into_linked_passages():
+    content = "".join(f"<p>Alinea {i} over de AI-interviewer &amp; je verhaal.</p>" for i in range(60))
+    passages = article_passages("Wat doet de AI-interviewer?", "ai-interviewer", "Korte intro.", content)
+    assert len(passages) > 1
+    assert all(p.href == "/kennisbank/ai-interviewer" for p in passages)
+    assert "&amp;" not in passages[0].text and "<p>" not in passages[0].text
+
+
+def test_normalize_question_only_ignores_case_punctuation_and_whitespace():
+    assert normalize_question("Hoe zeg ik mijn abonnement op?") == normalize_question("  hoe zeg ik, mijn ABONNEMENT op ")
+    assert normalize_question("Hoe doe ik dat?") == "hoe doe ik dat"
+    # Stopwoorden en woordvolgorde dragen betekenis
+    assert normalize_question("Kan ik niet opzeggen?") != normalize_question("Kan ik opzeggen?")
+    assert normalize_question("Wachtwoord vergeten!") != normalize_question("vergeten wachtwoord")
+
+
+def test_prompt_only_carries_the_top_passages_including_published_articles(llm, db):
+    db.add_all([
+        _article("stamboom-koppelen", "Kan ik mijn stamboom koppelen?", "<p>Ja, een GEDCOM-stamboom koppel je via Familie.</p>"),
+        _article("concept", "Geheim concept over stamboom", "<p>GEDCOM concepttekst</p>", status="draft"),
+    ])
+    db.commit()
+
+    helpdesk_ai.chat_with_helpdesk("Kan ik een GEDCOM stamboom koppelen?", db=db)
+
+    system_prompt = llm.calls[0][0]["content"]
+    assert "/kennisbank/stamboom-koppelen" in system_prompt
+    assert "Geheim concept" not in system_prompt
+    assert len(re.findall(r"^\[\d+\] ", system_prompt, re.MULTILINE)) <= helpdesk_ai._RETRIEVAL_TOP_K
+    # De rest van de FAQ gaat niet meer mee
+    assert "Mijn microfoon werkt niet" not in system_prompt
+
+
+def test_repeated_first_questions_skip_the_llm(llm, db):
+    first = helpdesk_ai.chat_with_helpdesk("Hoe zeg ik mijn abonnement op?", db=db)
+    again = helpdesk_ai.chat_with_helpdesk("hoe zeg ik mijn ABONNEMENT op", db=db)
+    assert again == first and len(llm.calls) == 1
+
+    # Vervolgvragen en gepersonaliseerde antwoorden worden niet hergebruikt
+    helpdesk_ai.chat_with_helpdesk(
+        "Hoe zeg ik mijn abonnement op?", conversation_history=[{"role": "user", "content": "Hallo"}], db=db,
+    )
+    helpdesk_ai.chat_with_helpdesk("Werkt het op mijn tablet?", user_name="Riet", db=db)
+    helpdesk_ai.chat_with_helpdesk("Werkt het op mijn tablet?", db=db)
+    assert len(llm.calls) == 4
+
+
+def test_publishing_rebuilds_the_index_and_expires_cached_answers(llm, db):
+    helpdesk_ai.chat_with_helpdesk("Hoe maak ik een fotoboek?", db=db)
+    assert "/kennisbank/fotoboek" not in llm.calls[0][0]["content"]
+
+    db.add(_article("fotoboek", "Een fotoboek maken van je verhaal", "<p>Een fotoboek bestel je via Export.</p>"))
+    db.commit()
+    blog_listings.invalidate_listings()
+
+    helpdesk_ai.chat_with_helpdesk("Hoe maak ik een fotoboek?", db=db)
+    assert len(llm.calls) == 2
+    assert "/kennisbank/fotoboek" in llm.calls[1][0]["content"]
@@ -0,0 +1,137 @@
+"""Tests for the streaming upload ingest."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+
+import pytest
+from botocore.exceptions import EndpointConnectionError
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.media import ingest, validators
+
+WEBM = b"\x1a\x45\xdf\xa3" + bytes(range(96))
+
+
+class _FakeS3:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def _record(self, name, **kwargs):
+        if self.fail:
+            raise EndpointConnectionError(endpoint_url="https://r2.example")
+        self.calls.append((name, kwargs))
+
+    def create_multipart_upload(self, **kwargs):
+        self._record("create", **kwargs)
+        return {"UploadId": "up-1"}
+
+    def upload_part(self, **kwargs):
+        self._record("part", **kwargs)
+        return {"ETag": f"etag-{kwargs['PartNumber']}"}
+
+    def complete_multipart_upload(self, **kwargs):
+        self._record("complete", **kwargs)
+
+    def put_object(self, **kwargs):
+        self._record("put", **kwargs)
+
+    def abort_multipart_upload(self, **kwargs):
+        self.calls.append(("abort", kwargs))
+
+
+@pytest.fixture
+def storage_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(ingest.local_storage, "base_path", tmp_path)
+    monkeypatch.setattr(settings, "upload_part_size_bytes", 32)
+    return tmp_path
+
+
+def _use_s3(monkeypatch, client):
+    monkeypatch.setattr(ingest, "s3_configured", lambda: True)
+    monkeypatch.setattr(ingest, "get_s3_client", lambda: client)
+
+
+async def _chunks(data, size=7):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _ingest(data, key="j1/intro-reflection/a1/opname.webm", ext=".webm", **kwargs):
+    # Own loop: asyncio.run() would unset the loop other tests rely on
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(ingest.ingest_upload(_chunks(data), key, ext, "video/webm", **kwargs))
+    finally:
+        loop.close()
+
+
+def test_streams_to_disk_with_size_and_checksum(storage_dir):
+    result = _ingest(WEBM)
+
+    stored = storage_dir / "j1/intro-reflection/a1/opname.webm"
+    assert stored.read_bytes() == WEBM
+    assert (result.size_bytes, result.sha256, result.location) == (
+        len(WEBM), hashlib.sha256(WEBM).hexdigest(), "local",
+    )
+    assert result.text_body is None
+    assert not list(storage_dir.rglob("*.part"))
+
+
+def test_wrong_magic_bytes_are_rejected_before_anything_is_stored(storage_dir):
+    with pytest.raises(HTTPException) as exc:
+        _ingest(b"MZ" + bytes(98))
+    assert exc.value.status_code == 400
+    assert not [p for p in storage_dir.rglob("*") if p.is_file()]
+
+
+@pytest.mark.parametrize("header", [b"\x00\x00\x00\x1cftypiso5", b"OggS\x00\x02"])
+def test_safari_recordings_named_webm_are_accepted(storage_dir, header):
+    data = header + bytes(64)
+    _ingest(data)
+    assert (storage_dir / "j1/intro-reflection/a1/opname.webm").read_bytes() == data
+
+
+def test_size_limit_is_enforced_while_streaming(storage_dir, monkeypatch):
+    monkeypatch.setattr(validators, "MAX_VIDEO_SIZE", 50)
+    with pytest.raises(HTTPException) as exc:
+        _ingest(WEBM)
+    assert exc.value.status_code == 413
+    assert not [p for p in storage_dir.rglob("*") if p.is_file()]
+
+
+def test_large_uploads_use_s3_multipart_with_bounded_parts(storage_dir, monkeypatch):
+    client = _FakeS3()
+    _use_s3(monkeypatch, client)
+
+    result = _ingest(WEBM)
+
+    names = [name for name, _ in client.calls]
+    assert names == ["create", "part", "part", "part", "part", "complete"]
+    bodies = [kwargs["Body"] for name, kwargs in client.calls if name == "part"]
+    assert b"".join(bodies) == WEBM
+    assert max(len(body) for body in bodies) <= settings.upload_part_size_bytes
+    assert client.calls[-1][1]["MultipartUpload"]["Parts"][-1] == {"PartNumber": 4, "ETag": "etag-4"}
+    assert result.location == "s3"
+
+
+def test_small_uploads_use_a_single_put(storage_dir, monkeypatch):
+    client = _FakeS3()
+    _use_s3(monkeypatch, client)
+    text = "Mijn eerste herinnering.".encode("utf-8")
+
+    result = _ingest(text, key="j1/intro-reflection/a1/tekst.txt", ext=".txt")
+
+    assert [name for name, _ in client.calls] == ["put"]
+    assert result.text_body == text
+
+
+def test_s3_failure_before_commit_falls_back_to_disk(storage_dir, monkeypatch):
+    _use_s3(monkeypatch, _FakeS3(fail=True))
+
+    result = _ingest(WEBM)
+
+    assert result.location == "local"
+    assert (storage_dir / "j1/intro-reflection/a1/opname.webm").read_bytes() == WEBM
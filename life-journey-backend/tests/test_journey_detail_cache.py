@@ -0,0 +1,101 @@
+"""
+Tests for the journey content version and the ETag/304 handling of
+GET /journeys/{id}.
+"""
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from starlette.testclient import TestClient
+
+import app.db.base  # noqa: F401
+from app.api.deps import get_current_user
+from app.db.session import get_db
+from app.models.journey import Journey
+from app.models.media import MediaAsset, TranscriptSegment
+from app.models.user import User
+
+
+@pytest.fixture
+def seeded(db_factory):
+    db = db_factory()
+    owner = User(id=str(uuid4()), display_name="Eigenaar", email=f"{uuid4()}@test.nl", country="NL")
+    db.add(owner)
+    journey = Journey(id=str(uuid4()), title="Verhaal", user_id=owner.id, progress={})
+    db.add(journey)
+    db.commit()
+    yield {"db": db, "owner": owner, "journey_id": journey.id}
+    db.close()
+
+
+def _version(db, journey_id: str) -> int:
+    db.expire_all()
+    return db.query(Journey.content_version).filter(Journey.id == journey_id).scalar()
+
+
+def test_writes_bump_content_version(seeded):
+    db, journey_id, owner = seeded["db"], seeded["journey_id"], seeded["owner"]
+    assert _version(db, journey_id) == 0
+
+    asset = MediaAsset(
+        id=str(uuid4()), journey_id=journey_id, chapter_id="intro-reflection", modality="audio",
+        object_key="k", original_filename="opname.webm", storage_state="ready",
+    )
+    db.add(asset)
+    db.commit()
+    assert _version(db, journey_id) == 1
+
+    db.add(TranscriptSegment(id=str(uuid4()), media_asset_id=asset.id, start_ms=0, end_ms=1, text="hallo"))
+    db.commit()
+    assert _version(db, journey_id) == 2
+
+    owner.display_name = "Nieuwe naam"
+    db.commit()
+    assert _version(db, journey_id) == 3
+
+    # Fields that are not part of the journey detail leave the version alone
+    owner.password_hash = "x"
+    db.commit()
+    assert _version(db, journey_id) == 3
+
+
+def test_journey_detail_etag_roundtrip(db_factory, seeded):
+    from app.api.v1.routes import journeys as journeys_route
+    from app.main import app
+
+    def _override_get_db():
+        db = db_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    journeys_route._detail_cache.clear()
+    app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_current_user] = lambda: seeded["owner"]
+    try:
+        with TestClient(app) as client:
+            url = f"/api/v1/journeys/{seeded['journey_id']}"
+            first = client.get(url)
+            assert first.status_code == 200
+            etag = first.headers["etag"]
+            assert etag.startswith('W/"')
+            assert first.json()["title"] == "Verhaal"
+
+            unchanged = client.get(url, headers={"If-None-Match": etag})
+            assert unchanged.status_code == 304
+            assert unchanged.content == b""
+
+            db = seeded["db"]
+            journey = db.get(Journey, seeded["journey_id"])
+            journey.title = "Ander verhaal"
+            db.commit()
+
+            changed = client.get(url, headers={"If-None-Match": etag})
+            assert changed.status_code == 200
+            assert changed.headers["etag"] != etag
+            assert changed.json()["title"] == "Ander verhaal"
+    finally:
+        app.dependency_overrides.clear()
+        journeys_route._detail_cache.clear()
@@ -9,11 +9,22 @@ uitvoerbaar (net als Bijeen's tsc-typecheck als bewijs).
 from app.lib.kb_internal_links import (
     KB_ANCHORS,
     KbAnchor,
+    _PARA_RE,
+    _inject_block_sequential,
     count_kb_links,
     inject_kb_internal_links,
 )
 
 
+def _sequential(html, anchors, exclude_slug="x", max_per_anchor=1):
+    # Referentie: de oorspronkelijke per-anker-lus, blok voor blok
+    active = [a for a in anchors if a.target != exclude_slug]
+    return _PARA_RE.sub(
+        lambda m: f"{m.group(1)}{_inject_block_sequential(m.group(3), active, max_per_anchor)}{m.group(4)}",
+        html,
+    )
+
+
 def test_linkt_phrase_in_paragraaf():
     html = "<p>Ik maak een gratis account aan vandaag.</p>"
     out = inject_kb_internal_links(html, exclude_slug="x")
@@ -75,6 +86,45 @@ def test_count_kb_links():
     assert count_kb_links(html) == 2
 
 
+# ---------------------------------------------------------------------------
+# Gecompileerde matcher: zelfde uitvoer als de per-anker-lus
+# ---------------------------------------------------------------------------
+
+_OVERLAP_ANCHORS = [
+    KbAnchor("doel-1", "oma"),
+    KbAnchor("doel-2", "verhaal van oma"),
+    KbAnchor("doel-3", "verhaal"),
+    KbAnchor("doel-4", "oma vertelt"),
+    KbAnchor("doel-5", "opzeggen", require="abonnement"),
+    KbAnchor("doel-6", "account"),
+]
+
+
+def test_matcher_gelijk_aan_per_anker_lus_bij_overlap_en_require():
+    blocks = [
+        "<p>Het verhaal van oma en oma vertelt het verhaal opnieuw.</p>",
+        "<li>Oma, OMA en oma/opa; verhaal-oma.</li>",
+        "<p>Abonnement opzeggen kan altijd, ook opzeggen zonder account.</p>",
+        '<p>Zie <a href="/kennisbank/doel-1">oma</a> en het verhaal van oma hier.</p>',
+        "<p>account<b>account</b> accountant account</p>",
+        "<h2>oma</h2><p>geen match in kop, wel oma hier</p>",
+    ]
+    for html in blocks:
+        for limit in (1, 2, 0):
+            expected = _sequential(html, _OVERLAP_ANCHORS, max_per_anchor=limit)
+            out = inject_kb_internal_links(html, _OVERLAP_ANCHORS, exclude_slug="x", max_per_anchor=limit)
+            assert out == expected, (html, limit)
+            assert inject_kb_internal_links(out, _OVERLAP_ANCHORS, exclude_slug="x", max_per_anchor=limit) == out
+
+
+def test_matcher_gelijk_aan_per_anker_lus_op_kennisbank():
+    from scripts.update_kennisbank import ARTICLES
+
+    for article in ARTICLES:
+        html, slug = article["content"], article["slug"]
+        assert inject_kb_internal_links(html, exclude_slug=slug) == _sequential(html, KB_ANCHORS, slug)
+
+
 # ---------------------------------------------------------------------------
 # publish.py excerpt-sanitization (voorkomt markup-lek in blog-excerpt)
 # ---------------------------------------------------------------------------
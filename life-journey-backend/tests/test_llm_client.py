@@ -0,0 +1,40 @@
+"""Tests for the shared LLM client layer."""
+from __future__ import annotations
+
+import time
+
+from app.services.ai import llm_client
+from app.services.ai.llm_client import get_llm_client, run_parallel
+
+
+def test_run_parallel_overlaps_independent_calls():
+    def slow(value):
+        time.sleep(0.2)
+        return value
+
+    started = time.monotonic()
+    results = run_parallel({name: (lambda n=name: slow(n)) for name in ("people", "places", "events", "summary")})
+
+    assert results == {"people": "people", "places": "places", "events": "events", "summary": "summary"}
+    assert time.monotonic() - started < 0.6
+
+
+def test_run_parallel_drops_calls_over_budget_and_failures():
+    def boom():
+        raise RuntimeError("api down")
+
+    results = run_parallel(
+        {"fast": lambda: 1, "slow": lambda: time.sleep(1) or 2, "broken": boom},
+        budget_seconds=0.2,
+    )
+
+    assert results == {"fast": 1}
+
+
+def test_get_llm_client_is_shared_until_settings_change(monkeypatch):
+    monkeypatch.setattr(llm_client.settings, "openai_api_key", "key-a")
+    first = get_llm_client()
+    assert get_llm_client() is first
+
+    monkeypatch.setattr(llm_client.settings, "openai_api_key", "key-b")
+    assert get_llm_client() is not first
@@ -0,0 +1,189 @@
+"""Tests for resumable direct-to-bucket multipart uploads."""
+from __future__ import annotations
+
+import io
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from starlette.testclient import TestClient
+
+import app.db.base  # noqa: F401
+from app.api.deps import get_current_user
+from app.api.v1.routes import media as media_routes
+from app.core.config import settings
+from app.db.session import get_db
+from app.models.journey import Journey
+from app.models.media import MediaAsset
+from app.models.user import User
+from app.services.media import multipart
+
+MB = 1024 * 1024
+WEBM_HEADER = b"\x1a\x45\xdf\xa3" + bytes(12)
+
+
+class _FakeBucket:
+    """Just enough of S3 multipart for the API: parts are kept per upload id."""
+
+    def __init__(self):
+        self.uploads: dict[str, dict[int, int]] = {}
+        self.objects: dict[str, bytes] = {}
+        self.completed = []
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        upload_id = f"up-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def generate_presigned_url(self, op, Params, ExpiresIn):
+        return f"https://r2.example/{Params['Key']}?uploadId={Params['UploadId']}&partNumber={Params['PartNumber']}"
+
+    def put_part(self, upload_id, number, size):
+        # What the browser does with a presigned URL
+        self.uploads[upload_id][number] = size
+
+    def list_parts(self, Bucket, Key, UploadId, PartNumberMarker=0):
+        parts = [
+            {"PartNumber": n, "Size": size, "ETag": f'"etag-{n}"'}
+            for n, size in sorted(self.uploads[UploadId].items()) if n > PartNumberMarker
+        ]
+        return {"Parts": parts[:2], "IsTruncated": len(parts) > 2,
+                "NextPartNumberMarker": parts[1]["PartNumber"] if len(parts) > 2 else None}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed.append((Key, MultipartUpload["Parts"]))
+        self.objects[Key] = WEBM_HEADER
+        del self.uploads[UploadId]
+
+    def get_object(self, Bucket, Key, Range):
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    fake = _FakeBucket()
+    monkeypatch.setattr(multipart, "get_s3_client", lambda: fake)
+    monkeypatch.setattr(media_routes, "s3_configured", lambda: True)
+    monkeypatch.setattr(media_routes, "assert_can_record", lambda *args: None)
+    monkeypatch.setattr(media_routes, "enqueue_transcode_job", lambda asset_id: True)
+    monkeypatch.setattr(media_routes, "enqueue_transcript_job", lambda asset_id: True)
+    monkeypatch.setattr(settings, "upload_part_size_bytes", 8 * MB)
+    return fake
+
+
+def test_part_size_stays_within_s3_limits(monkeypatch):
+    monkeypatch.setattr(settings, "upload_part_size_bytes", 1 * MB)
+    assert multipart.part_size_for(20 * MB) == 5 * MB
+    monkeypatch.setattr(settings, "upload_part_size_bytes", 8 * MB)
+    assert multipart.part_count(20 * MB, multipart.part_size_for(20 * MB)) == 3
+    assert multipart.part_count(200_000 * MB, multipart.part_size_for(200_000 * MB)) <= 10_000
+
+
+def test_complete_reports_missing_and_wrong_parts(bucket):
+    upload_id = multipart.start_upload("j/c/a/opname.webm", "video/webm")
+    bucket.put_part(upload_id, 1, 8 * MB)
+
+    with pytest.raises(HTTPException) as exc:
+        multipart.complete_upload("j/c/a/opname.webm", upload_id, 20 * MB, 8 * MB, ".webm")
+    assert exc.value.status_code == 409
+    assert exc.value.detail["missing_parts"] == [2, 3]
+
+    bucket.put_part(upload_id, 2, 7 * MB)
+    bucket.put_part(upload_id, 3, 4 * MB)
+    with pytest.raises(HTTPException) as exc:
+        multipart.complete_upload("j/c/a/opname.webm", upload_id, 20 * MB, 8 * MB, ".webm")
+    assert exc.value.detail["missing_parts"] == [2]
+    assert not bucket.completed
+
+
+def test_complete_rejects_content_that_does_not_match_the_extension(bucket):
+    upload_id = multipart.start_upload("j/c/a/opname.mp3", "audio/mpeg")
+    bucket.put_part(upload_id, 1, 1 * MB)
+
+    with pytest.raises(HTTPException) as exc:
+        multipart.complete_upload("j/c/a/opname.mp3", upload_id, 1 * MB, 8 * MB, ".mp3")
+    assert exc.value.status_code == 400
+    assert "j/c/a/opname.mp3" not in bucket.objects
+
+
+@pytest.fixture
+def client(bucket, db_factory):
+    from app.main import app
+
+    factory = db_factory
+    db = factory()
+    user = User(id=str(uuid4()), display_name="Riet", email="riet@example.com", country="NL")
+    journey = Journey(id=str(uuid4()), title="Verhaal", user_id=user.id, progress={})
+    db.add_all([user, journey])
+    db.commit()
+
+    def _override_get_db():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    with TestClient(app) as c:
+        yield c, journey, factory
+    app.dependency_overrides.clear()
+    db.close()
+
+
+def test_upload_resumes_after_a_dropped_connection(client, bucket):
+    c, journey, factory = client
+    res = c.post("/api/v1/media/multipart", json={
+        "journey_id": journey.id, "chapter_id": "intro-reflection", "modality": "video",
+        "filename": "opname.webm", "size_bytes": 20 * MB, "checksum": "",
+    })
+    assert res.status_code == 200, res.text
+    created = res.json()
+    asset_id = created["asset_id"]
+    assert (created["part_size"], created["part_count"]) == (8 * MB, 3)
+
+    urls = c.post(f"/api/v1/media/{asset_id}/multipart/parts", json={"part_numbers": [1, 2, 3]}).json()["urls"]
+    assert set(urls) == {"1", "2", "3"}
+    upload_id = factory().get(MediaAsset, asset_id).upload_id
+    bucket.put_part(upload_id, 1, 8 * MB)
+    # Connection dropped: part 2 and 3 never arrived
+
+    assert c.post(f"/api/v1/media/{asset_id}/complete").status_code == 409
+    status = c.get(f"/api/v1/media/{asset_id}/multipart").json()
+    assert status["uploaded_parts"] == [1]
+
+    bucket.put_part(upload_id, 2, 8 * MB)
+    bucket.put_part(upload_id, 3, 4 * MB)
+    res = c.post(f"/api/v1/media/{asset_id}/complete")
+    assert res.status_code == 202, res.text
+
+    asset = factory().get(MediaAsset, asset_id)
+    assert asset.upload_id is None and asset.storage_state == "processing"
+    assert [part["PartNumber"] for part in bucket.completed[0][1]] == [1, 2, 3]
+    assert c.get(f"/api/v1/media/{asset_id}/multipart").status_code == 409
+
+
+def test_part_numbers_are_bounded(client, bucket):
+    c, journey, _ = client
+    asset_id = c.post("/api/v1/media/multipart", json={
+        "journey_id": journey.id, "chapter_id": "intro-reflection", "modality": "audio",
+        "filename": "opname.webm", "size_bytes": 3 * MB, "checksum": "",
+    }).json()["asset_id"]
+    res = c.post(f"/api/v1/media/{asset_id}/multipart/parts", json={"part_numbers": [2]})
+    assert res.status_code == 400
+
+
+def test_text_uploads_keep_using_presign(client):
+    c, journey, _ = client
+    res = c.post("/api/v1/media/multipart", json={
+        "journey_id": journey.id, "chapter_id": "intro-reflection", "modality": "text",
+        "filename": "tekst.txt", "size_bytes": 10, "checksum": "",
+    })
+    assert res.status_code == 409
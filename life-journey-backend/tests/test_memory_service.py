@@ -1,10 +1,8 @@
 """Tests for the AI memory service."""
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
-from uuid import uuid4
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
@@ -12,58 +10,52 @@ from app.services.ai.memory import (
     JourneyMemory,
     _ai_extract_people,
     _ai_extract_places,
-    _extract_themes,
+    _match_themes,
+    _people_fallback,
     build_journey_memory,
 )
 
 
-# ── _ai_extract_people (fallback path, no API key) ────────────────────────────
+# ── _people_fallback (keyword heuristic when the LLM is unavailable) ─────────
 
-def test_extract_people_fallback_finds_oma():
-    # When Claude is unavailable, keyword fallback runs
-    result = _ai_extract_people("Mijn oma deed altijd zo fijn voor ons.")
+def test_people_fallback_finds_oma():
+    result = _people_fallback("Mijn oma deed altijd zo fijn voor ons.")
     assert any("oma" in r.lower() for r in result)
 
 
-def test_extract_people_fallback_finds_papa():
-    result = _ai_extract_people("Papa werkte altijd heel hard in de fabriek.")
+def test_people_fallback_finds_papa():
+    result = _people_fallback("Papa werkte altijd heel hard in de fabriek.")
     assert any("papa" in r.lower() for r in result)
 
 
-def test_extract_people_empty_text():
-    result = _ai_extract_people("")
-    assert result == []
+def test_people_fallback_empty_text():
+    assert _people_fallback("") == []
 
 
-# ── _ai_extract_places (fallback path — returns [] when API unavailable) ─────
+# ── LLM extractors report failure instead of falling back themselves ─────────
 
-def test_extract_places_empty_on_fallback():
-    # No Claude key in test env — fallback returns []
-    result = _ai_extract_places("Ik woonde in Amsterdam en later in Rotterdam.")
-    # Either Claude results (list of strings) or empty fallback list
-    assert isinstance(result, list)
+def test_extractors_return_none_without_llm(monkeypatch):
+    from app.services.ai import memory as memory_module
 
+    monkeypatch.setattr(memory_module.settings, "openai_api_key", "")
+    assert _ai_extract_people("Mijn oma deed altijd zo fijn voor ons.") is None
+    assert _ai_extract_places("Ik woonde in Amsterdam en later in Rotterdam.") is None
 
-# ── _extract_themes ────────────────────────────────────────────────────────────
 
-def test_extract_themes_detects_familie():
-    transcripts = [{"chapter_id": "intro", "text": "Mijn familie was altijd belangrijk. Mijn ouders, kinderen.", "sentiment": None}]
-    themes = _extract_themes(transcripts)
+# ── _match_themes ──────────────────────────────────────────────────────────────
+
+def test_match_themes_detects_familie():
+    themes = _match_themes("Mijn familie was altijd belangrijk. Mijn ouders, kinderen.")
     assert "familie" in themes
 
 
-def test_extract_themes_detects_multiple():
-    transcripts = [
-        {"chapter_id": "intro", "text": "Mijn huwelijk was mooi. De liefde was groot.", "sentiment": None},
-        {"chapter_id": "werk", "text": "Ik werkte hard in mijn eerste baan.", "sentiment": None},
-    ]
-    themes = _extract_themes(transcripts)
-    assert "liefde" in themes or "werk" in themes
+def test_match_themes_detects_multiple():
+    themes = _match_themes("Mijn huwelijk was mooi. De liefde was groot. Ik werkte hard in mijn eerste baan.")
+    assert "liefde" in themes and "werk" in themes
 
 
-def test_extract_themes_empty():
-    themes = _extract_themes([])
-    assert themes == []
+def test_match_themes_empty():
+    assert _match_themes("") == []
 
 
 # ── JourneyMemory.to_context_string ───────────────────────────────────────────
@@ -175,3 +167,247 @@ def test_build_journey_memory_empty_journey():
     assert memory.completed_chapters == []
     assert memory.key_people == []
     assert memory.key_places == []
+
+
+# ── build_journey_memory (incremental, per-recording entries) ─────────────────
+
+@pytest.fixture
+def memory_db(monkeypatch, db_factory):
+    from app.models.journey import Journey
+    from app.models.user import User
+    from app.services.ai import memory as memory_module
+
+    session = db_factory()
+    session.add(User(id="u1", display_name="Riet", email="riet@example.com", country="NL"))
+    session.add(Journey(id="j1", user_id="u1", title="Mijn verhaal"))
+    session.commit()
+
+    calls: list[str] = []
+    monkeypatch.setattr(memory_module.settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(memory_module, "_ai_summarize_chapter", lambda c, t: calls.append("summary") or f"Over {c}")
+    monkeypatch.setattr(memory_module, "_ai_extract_people", lambda t: calls.append("people") or (["oma Riet"] if "oma" in t else ["vader Jan"]))
+    monkeypatch.setattr(memory_module, "_ai_extract_places", lambda t: calls.append("places") or ["Leiden"])
+    monkeypatch.setattr(memory_module, "_ai_extract_events", lambda t: calls.append("events") or [])
+    try:
+        yield session, calls
+    finally:
+        session.close()
+
+
+def _add_recording(db, asset_id: str, chapter_id: str, text: str) -> None:
+    from app.models.media import MediaAsset, TranscriptSegment
+
+    db.add(MediaAsset(
+        id=asset_id, journey_id="j1", chapter_id=chapter_id, modality="audio",
+        object_key=f"j1/{asset_id}.webm", original_filename="opname.webm", storage_state="ready",
+    ))
+    db.add(TranscriptSegment(id=f"{asset_id}-s0", media_asset_id=asset_id, start_ms=0, end_ms=1000, text=text))
+    db.commit()
+
+
+def test_build_journey_memory_only_summarises_new_recording(memory_db):
+    from app.services.ai.memory import invalidate_asset_memory
+
+    db, calls = memory_db
+    _add_recording(db, "a1", "roots-mother", "Mijn oma woonde in Leiden.")
+    _add_recording(db, "a2", "roots-father", "Mijn vader werkte hard.")
+    first = build_journey_memory(db, "j1")
+    assert calls.count("summary") == 2
+    assert set(first.chapter_summaries) == {"roots-mother", "roots-father"}
+
+    calls.clear()
+    _add_recording(db, "a3", "youth-friends", "Met mijn oma naar de markt.")
+    invalidate_asset_memory(db, "a3", "j1")
+    db.commit()
+    second = build_journey_memory(db, "j1")
+
+    assert calls.count("summary") == 1
+    assert calls.count("people") == 1
+    assert second.key_people[0] == "oma Riet"  # mentioned in two recordings
+    assert second.key_places == ["Leiden"]
+    assert len(second.completed_chapters) == 3
+
+
+def test_llm_outage_is_not_stored_as_a_complete_memory(memory_db, monkeypatch):
+    from app.models.memory_cache import AssetMemory
+    from app.services.ai import memory as memory_module
+
+    db, calls = memory_db
+    _add_recording(db, "a1", "roots-mother", "Mijn oma woonde in Leiden.")
+    monkeypatch.setattr(memory_module, "_ai_extract_people", lambda t: calls.append("people") or None)
+
+    memory = build_journey_memory(db, "j1")
+    assert memory.key_people == ["Oma"]  # heuristic fallback serves this prompt
+    assert db.query(AssetMemory).count() == 0
+
+    # The next build retries the recording instead of trusting the journey cache
+    calls.clear()
+    monkeypatch.setattr(memory_module, "_ai_extract_people", lambda t: calls.append("people") or ["oma Riet"])
+    assert build_journey_memory(db, "j1").key_people == ["oma Riet"]
+    assert calls.count("people") == 1
+    assert db.query(AssetMemory).count() == 1
+
+
+def test_first_prompt_without_cache_schedules_a_build_instead_of_running_it(memory_db, monkeypatch):
+    from app.services.ai.memory import get_personalized_prompt_context
+    from app.services.media import processor
+
+    db, calls = memory_db
+    scheduled: list[str] = []
+    monkeypatch.setattr(processor, "enqueue_memory_refresh_job", scheduled.append)
+
+    assert get_personalized_prompt_context(db, "j1", "roots-mother") == ""
+    assert scheduled == []  # nothing recorded yet, nothing to build
+
+    _add_recording(db, "a1", "roots-mother", "Mijn oma woonde in Leiden.")
+    context = get_personalized_prompt_context(db, "j1", "roots-father")
+    assert context.startswith("De gebruiker heeft al gesproken over:")
+    assert calls == []
+    assert scheduled == ["j1"]
+
+
+def test_background_rebuild_waits_for_every_llm_call(memory_db, monkeypatch):
+    from app.services.ai import memory as memory_module
+
+    db, _ = memory_db
+    _add_recording(db, "a1", "roots-mother", "Mijn oma woonde in Leiden.")
+    budgets: list = []
+    run_parallel = memory_module.run_parallel
+    monkeypatch.setattr(
+        memory_module, "run_parallel", lambda calls, budget=None: budgets.append(budget) or run_parallel(calls, budget),
+    )
+
+    build_journey_memory(db, "j1")
+    memory_module.invalidate_asset_memory(db, "a1", "j1")
+    db.commit()
+    build_journey_memory(db, "j1", force=True)
+
+    assert budgets == [None, memory_module.NO_BUDGET]
+
+
+# ── prompt context reads the precomputed cache ────────────────────────────────
+
+def test_prompt_context_reads_cache_and_schedules_stale_refresh(memory_db, monkeypatch):
+    from app.models.memory_cache import JourneyMemoryCache
+    from app.services.ai.memory import get_personalized_prompt_context
+    from app.services.media import processor
+
+    db, calls = memory_db
+    _add_recording(db, "a1", "roots-mother", "Mijn oma woonde in Leiden.")
+    build_journey_memory(db, "j1")
+    calls.clear()
+
+    scheduled: list[str] = []
+    monkeypatch.setattr(processor, "enqueue_memory_refresh_job", scheduled.append)
+
+    # A recording the memory doesn't cover yet is not built on the request path, only scheduled
+    _add_recording(db, "a2", "roots-father", "Mijn vader werkte hard.")
+    context = get_personalized_prompt_context(db, "j1", "roots-father")
+    assert "oma Riet" in context
+    assert calls == []
+    assert scheduled == ["j1"]
+
+    build_journey_memory(db, "j1", force=True)
+    calls.clear()
+    scheduled.clear()
+    get_personalized_prompt_context(db, "j1", "roots-father")
+    assert scheduled == []
+
+    # Beyond the staleness tolerance the old memory is still served, plus a refresh
+    cached = db.query(JourneyMemoryCache).filter_by(journey_id="j1").one()
+    cached.built_at = datetime.now(timezone.utc) - timedelta(days=3)
+    db.commit()
+    assert "oma Riet" in get_personalized_prompt_context(db, "j1", "roots-father")
+    assert calls == []
+    assert scheduled == ["j1"]
+
+
+def test_memory_refresh_bursts_coalesce(monkeypatch):
+    from app.services.media import processor
+    from app.services.media import tasks as media_tasks
+
+    class _FakeRedis:
+        def __init__(self):
+            self.keys: dict[str, str] = {}
+
+        def set(self, key, value, nx=False, ex=None):
+            if nx and key in self.keys:
+                return None
+            self.keys[key] = value
+            return True
+
+        def delete(self, key):
+            self.keys.pop(key, None)
+
+    fake_redis = _FakeRedis()
+    sent: list[tuple] = []
+
+    class _Result:
+        id = "task-1"
+
+    monkeypatch.setattr(processor, "_is_celery_available", lambda: True)
+    monkeypatch.setattr(processor, "_redis_client", lambda: fake_redis)
+    monkeypatch.setattr(
+        media_tasks.celery_app, "send_task",
+        lambda name, args=None, queue=None, countdown=None: sent.append((name, args, countdown)) or _Result(),
+    )
+
+    results = [processor.enqueue_memory_refresh_job("j1") for _ in range(3)]
+    assert results == ["task-1", "coalesced", "coalesced"]
+    assert sent == [("memory.refresh_journey", ["j1"], processor.settings.memory_refresh_debounce_seconds)]
+
+    # Once the task starts, the next transcript schedules a new refresh
+    processor.clear_memory_refresh_marker("j1")
+    assert processor.enqueue_memory_refresh_job("j1") == "task-1"
+    assert len(sent) == 2
+
+
+def test_memory_refresh_without_broker_leaves_the_request_path(monkeypatch):
+    import threading
+
+    from app.services.media import processor
+    from app.services.media import tasks as media_tasks
+
+    started, release, done = threading.Event(), threading.Event(), threading.Event()
+
+    def _slow_refresh(journey_id):
+        started.set()
+        release.wait(5)
+        done.set()
+
+    monkeypatch.setattr(processor, "_is_celery_available", lambda: False)
+    monkeypatch.setattr(media_tasks, "refresh_journey_memory", _slow_refresh)
+
+    assert processor.enqueue_memory_refresh_job("j1") == "thread"
+    assert started.wait(5)
+    # Still rebuilding: the caller returned immediately and a repeat coalesces
+    assert processor.enqueue_memory_refresh_job("j1") == "coalesced"
+
+    release.set()
+    assert done.wait(5)
+
+
+def test_refresh_retries_while_recordings_are_missing(monkeypatch):
+    from app.services.ai import memory as memory_module
+    from app.services.media import processor
+    from app.services.media import tasks as media_tasks
+
+    builds: list[str] = []
+
+    class _Session:
+        def close(self):
+            pass
+
+    monkeypatch.setattr(media_tasks, "SessionLocal", _Session)
+    monkeypatch.setattr(processor, "clear_memory_refresh_marker", lambda journey_id: None)
+    monkeypatch.setattr(memory_module, "build_journey_memory", lambda db, journey_id, force: builds.append(journey_id))
+    monkeypatch.setattr(memory_module, "recordings_missing_from_memory", lambda db, journey_id: 2)
+
+    # Eager apply runs the retries immediately
+    media_tasks.refresh_journey_memory.apply(args=["j1"])
+    assert len(builds) == 1 + media_tasks._MEMORY_REFRESH_RETRIES
+
+    # Called directly (no broker, background thread) it never retries itself
+    builds.clear()
+    media_tasks.refresh_journey_memory("j1")
+    assert builds == ["j1"]
@@ -0,0 +1,177 @@
+"""Tests for precomputed waveform peaks and the peaks endpoints."""
+from __future__ import annotations
+
+import io
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from starlette.testclient import TestClient
+
+import app.db.base  # noqa: F401
+from app.api.deps import get_current_user
+from app.db.session import get_db
+from app.models.journey import Journey
+from app.models.media import MediaAsset, MediaPeaks
+from app.models.sharing import Highlight
+from app.models.user import User
+from app.services.media import peaks as peaks_service
+
+
+def _pcm(samples: np.ndarray) -> io.BytesIO:
+    return io.BytesIO(samples.astype("<i2").tobytes())
+
+
+def test_peaks_are_min_max_per_block():
+    # 1 second at 8 kHz: 20 peaks of 400 samples; the loudest block reaches full scale
+    samples = np.zeros(8000, dtype=np.int16)
+    samples[400:800] = np.linspace(-1000, 1000, 400)
+    samples[7600:] = np.linspace(-16000, 16000, 400)
+
+    peaks = peaks_service.peaks_from_pcm(_pcm(samples))
+
+    assert (peaks.sample_rate, peaks.samples_per_peak, len(peaks)) == (8000, 400, 20)
+    assert peaks.mins.dtype == np.int8
+    assert (peaks.mins[0], peaks.maxs[0]) == (0, 0)
+    assert (peaks.mins[1], peaks.maxs[1]) == (-8, 8)
+    assert (peaks.mins[-1], peaks.maxs[-1]) == (-127, 127)
+
+
+def test_reading_in_small_blocks_gives_the_same_peaks(monkeypatch):
+    rng = np.random.default_rng(7)
+    samples = rng.integers(-30000, 30000, size=8000 * 3 + 123, dtype=np.int16)
+    whole = peaks_service.peaks_from_pcm(_pcm(samples))
+
+    monkeypatch.setattr(peaks_service, "_PEAKS_PER_READ", 3)
+    chunked = peaks_service.peaks_from_pcm(_pcm(samples))
+
+    assert len(whole) == 61  # the 123 trailing samples form a last, partial peak
+    assert np.array_equal(whole.mins, chunked.mins)
+    assert np.array_equal(whole.maxs, chunked.maxs)
+
+
+def test_long_recordings_are_capped_by_coarser_peaks():
+    samples = np.zeros(8000 * 10, dtype=np.int16)
+    samples[-1] = 32767
+    peaks = peaks_service.peaks_from_pcm(_pcm(samples), max_peaks=60)
+
+    assert len(peaks) <= 60
+    assert peaks.samples_per_peak == 400 * 4
+    assert peaks.maxs[-1] == 127
+
+
+def test_dat_roundtrip_matches_audiowaveform_layout():
+    peaks = peaks_service.WaveformPeaks(
+        8000, 400, np.array([-3, -100], dtype=np.int8), np.array([5, 90], dtype=np.int8),
+    )
+    data = peaks_service.encode_dat(peaks)
+
+    assert len(data) == 20 + 4
+    assert data[:4] == (1).to_bytes(4, "little")
+    assert data[20:] == bytes([253, 5, 156, 90])
+    decoded = peaks_service.decode_dat(data)
+    assert np.array_equal(decoded.mins, peaks.mins) and decoded.samples_per_peak == 400
+
+
+def test_peaks_come_from_the_smallest_rendition():
+    renditions = {"aac": {"key": "j/c/a/derived/audio.m4a"}, "preview": {"key": "j/c/a/derived/preview.m4a"}}
+    assert peaks_service.peaks_source_key("j/c/a/opname.webm", renditions) == "j/c/a/derived/preview.m4a"
+    assert peaks_service.peaks_source_key("j/c/a/opname.webm", None) == "j/c/a/opname.webm"
+
+
+def test_hanging_decoder_is_killed_after_the_timeout(monkeypatch):
+    # Writes a little PCM and then stalls with stdout still open, like ffmpeg on a dead source
+    stall = "import sys, time; sys.stdout.buffer.write(bytes(800)); sys.stdout.flush(); time.sleep(30)"
+    monkeypatch.setattr(peaks_service, "decode_command", lambda source: [sys.executable, "-c", stall])
+
+    started = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        peaks_service.compute_peaks("stil.webm", timeout=0.5)
+    assert time.monotonic() - started < 10
+
+
+@pytest.fixture
+def client(db_factory):
+    from app.main import app
+
+    factory = db_factory
+    db = factory()
+    user = User(id=str(uuid4()), display_name="Riet", email="riet@example.com", country="NL")
+    journey = Journey(id=str(uuid4()), title="Verhaal", user_id=user.id, progress={})
+    asset = MediaAsset(
+        id=str(uuid4()), journey_id=journey.id, chapter_id="intro-reflection", modality="audio",
+        object_key=f"{journey.id}/intro-reflection/a/opname.webm", original_filename="opname.webm",
+        duration_seconds=60, size_bytes=1000, storage_state="ready",
+    )
+    db.add_all([user, journey, asset])
+    db.commit()
+
+    def _override_get_db():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    with TestClient(app) as c:
+        yield c, journey, asset.id, factory
+    app.dependency_overrides.clear()
+    db.close()
+
+
+def _store_peaks(factory, asset_id: str) -> bytes:
+    peaks = peaks_service.WaveformPeaks(
+        8000, 400, np.full(1200, -10, dtype=np.int8), np.full(1200, 10, dtype=np.int8),
+    )
+    data = peaks_service.encode_dat(peaks)
+    with factory() as db:
+        db.add(MediaPeaks(
+            media_asset_id=asset_id, sample_rate=8000, samples_per_peak=400, length=1200, data=data,
+            created_at=datetime(2026, 10, 17, tzinfo=timezone.utc),
+        ))
+        db.commit()
+    return data
+
+
+def test_peaks_endpoint_serves_cacheable_binary(client):
+    c, _, asset_id, factory = client
+    assert c.get(f"/api/v1/media/{asset_id}/peaks").status_code == 404
+
+    data = _store_peaks(factory, asset_id)
+    response = c.get(f"/api/v1/media/{asset_id}/peaks")
+
+    assert response.status_code == 200
+    assert response.content == data
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert "max-age" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+
+    again = c.get(f"/api/v1/media/{asset_id}/peaks", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+
+def test_highlight_markers_are_placed_on_the_waveform(client):
+    c, journey, asset_id, factory = client
+    with factory() as db:
+        db.add(Highlight(
+            id=str(uuid4()), journey_id=journey.id, media_asset_id=asset_id, chapter_id="intro-reflection",
+            label="moment", start_ms=30_000, end_ms=35_500, created_by="ai",
+        ))
+        db.commit()
+
+    before = c.get(f"/api/v1/media/{asset_id}/peaks/markers").json()
+    assert before["markers"][0]["start_index"] is None
+
+    _store_peaks(factory, asset_id)
+    body = c.get(f"/api/v1/media/{asset_id}/peaks/markers").json()
+
+    assert body["samples_per_peak"] == 400
+    marker = body["markers"][0]
+    assert (marker["start_ms"], marker["start_index"], marker["end_index"]) == (30_000, 600, 710)
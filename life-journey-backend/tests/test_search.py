@@ -0,0 +1,175 @@
+"""Tests for the journey-wide full-text search index (SQLite FTS5 fallback)."""
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func
+from starlette.testclient import TestClient
+
+import app.db.base  # noqa: F401
+from app.api.deps import get_current_user
+from app.db.search_index import reindex_journey
+from app.db.session import get_db
+from app.models.journey import Journey
+from app.models.media import MediaAsset, TranscriptSegment
+from app.models.memo import Memo
+from app.models.quick_thought import QuickThought
+from app.models.search import SearchDocument
+from app.models.user import User
+from app.services.search import fts5_match, render_snippet, search_journey
+
+
+@pytest.fixture
+def factory(db_factory):
+    return db_factory
+
+
+@pytest.fixture
+def journey(factory):
+    with factory() as db:
+        user = User(id=str(uuid4()), display_name="Riet", email="riet@example.com", country="NL")
+        journey = Journey(id=str(uuid4()), title="Verhaal", user_id=user.id, progress={})
+        db.add_all([user, journey])
+        db.commit()
+        return journey.id, user.id
+
+
+def _audio(journey_id: str, chapter_id: str = "intro-reflection") -> MediaAsset:
+    return MediaAsset(
+        id=str(uuid4()), journey_id=journey_id, chapter_id=chapter_id, modality="audio",
+        object_key="j/c/a/opname.webm", original_filename="opname.webm", storage_state="ready",
+    )
+
+
+def _kinds(db, journey_id: str) -> list[str]:
+    return sorted(kind for (kind,) in db.query(SearchDocument.kind).filter(SearchDocument.journey_id == journey_id))
+
+
+def test_flushes_keep_the_index_in_step(factory, journey):
+    journey_id, _ = journey
+    with factory() as db:
+        asset = _audio(journey_id)
+        memo = Memo(journey_id=journey_id, title="Zolder", content="De oude kist op zolder.")
+        db.add_all([asset, memo])
+        db.flush()
+        db.add_all([
+            TranscriptSegment(id=str(uuid4()), media_asset_id=asset.id, start_ms=0, end_ms=4000,
+                              text="We verhuisden in 1962 naar Leiden."),
+            TranscriptSegment(id=str(uuid4()), media_asset_id=asset.id, start_ms=4000, end_ms=8000,
+                              text="Mijn vader werkte bij de spoorwegen."),
+            QuickThought(journey_id=journey_id, modality="text", transcript="Oma's appeltaart op zondag."),
+        ])
+        db.commit()
+        assert _kinds(db, journey_id) == ["memo", "quick_thought", "transcript", "transcript"]
+
+        memo.content = "Brieven van tante Jo."
+        db.commit()
+        assert [hit["source_id"] for hit in search_journey(db, journey_id, "brieven")] == [memo.id]
+        assert search_journey(db, journey_id, "kist") == []
+
+        db.delete(asset)
+        db.delete(memo)
+        db.commit()
+        assert _kinds(db, journey_id) == ["quick_thought"]
+
+
+def test_only_the_current_text_version_is_indexed(factory, journey):
+    journey_id, _ = journey
+    with factory() as db:
+        old = MediaAsset(
+            id=str(uuid4()), journey_id=journey_id, chapter_id="intro-reflection", modality="text",
+            object_key="j/c/a/tekst.txt", original_filename="tekst.txt", text_content="Eerste versie over de markt.",
+        )
+        db.add(old)
+        db.commit()
+        new = MediaAsset(
+            id=str(uuid4()), journey_id=journey_id, chapter_id="intro-reflection", modality="text",
+            object_key="j/c/b/tekst.txt", original_filename="tekst.txt", text_content="Tweede versie over de markt.",
+        )
+        old.is_current = False
+        old.replaced_by = new.id
+        db.add(new)
+        db.commit()
+
+        hits = search_journey(db, journey_id, "markt")
+        assert [(hit["kind"], hit["source_id"]) for hit in hits] == [("text", new.id)]
+
+
+def test_results_are_ranked_scoped_and_highlighted(factory, journey):
+    journey_id, _ = journey
+    with factory() as db:
+        other = Journey(id=str(uuid4()), title="Ander", user_id=journey[1], progress={})
+        asset = _audio(journey_id)
+        db.add_all([other, asset])
+        db.flush()
+        db.add_all([
+            TranscriptSegment(id=str(uuid4()), media_asset_id=asset.id, start_ms=61_000, end_ms=65_000,
+                              text="Op de fiets naar school, elke dag de fiets."),
+            Memo(journey_id=journey_id, title="Fiets", content="<b>Rood</b> met een bel & een mand."),
+            Memo(journey_id=other.id, title="Fiets", content="Niet van deze journey."),
+        ])
+        db.commit()
+
+        hits = search_journey(db, journey_id, "fiets")
+        assert {hit["kind"] for hit in hits} == {"memo", "transcript"}
+        transcript = next(hit for hit in hits if hit["kind"] == "transcript")
+        assert transcript["start_ms"] == 61_000
+        assert "<mark>fiets</mark>" in transcript["snippet"]
+
+        memo = search_journey(db, journey_id, "bel", kinds=["memo"])[0]
+        assert "&lt;b&gt;Rood&lt;/b&gt;" in memo["snippet"]
+        assert "<mark>bel</mark> &amp; een mand" in memo["snippet"]
+        assert search_journey(db, journey_id, "fiets", kinds=["quick_thought"]) == []
+
+
+def test_user_input_cannot_break_the_match_syntax():
+    assert fts5_match('"verhuizing" OR NEAR(') == '"verhuizing"* "or"* "near"*'
+    assert fts5_match("  ?! ") is None
+    assert render_snippet("a <i>\x02b\x03</i>") == "a &lt;i&gt;<mark>b</mark>&lt;/i&gt;"
+
+
+def test_reindex_journey_rebuilds_from_the_sources(factory, journey):
+    journey_id, _ = journey
+    with factory() as db:
+        db.add(Memo(journey_id=journey_id, title="Haven", content="Schepen kijken in Rotterdam."))
+        db.commit()
+        db.query(SearchDocument).delete()
+        db.commit()
+        assert search_journey(db, journey_id, "rotterdam") == []
+
+        assert reindex_journey(db, journey_id) == 1
+        db.commit()
+        assert len(search_journey(db, journey_id, "rotterdam")) == 1
+        assert db.query(func.count(SearchDocument.id)).scalar() == 1
+
+
+def test_search_route_checks_ownership(factory, journey):
+    from app.main import app
+
+    journey_id, user_id = journey
+    with factory() as db:
+        db.add(Memo(journey_id=journey_id, title="Kermis", content="Suikerspin op de kermis."))
+        db.commit()
+        user = db.get(User, user_id)
+        stranger = User(id=str(uuid4()), display_name="Kees", email="kees@example.com", country="NL")
+
+    def _override_get_db():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        with TestClient(app) as client:
+            response = client.get(f"/api/v1/search/{journey_id}", params={"q": "kermis", "kind": "memo"})
+            assert response.status_code == 200
+            assert [hit["title"] for hit in response.json()["results"]] == ["Kermis"]
+
+            app.dependency_overrides[get_current_user] = lambda: stranger
+            assert client.get(f"/api/v1/search/{journey_id}", params={"q": "kermis"}).status_code == 403
+    finally:
+        app.dependency_overrides.clear()
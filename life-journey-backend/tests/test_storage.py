@@ -0,0 +1,84 @@
+"""Tests for the shared S3 client and the presigned-URL cache."""
+
+import pytest
+
+from app.core.config import settings
+from app.services.media import storage
+
+
+class _FakeS3:
+    def __init__(self):
+        self.signed = 0
+
+    def generate_presigned_url(self, op, Params, ExpiresIn):
+        self.signed += 1
+        return f"https://r2.example/{Params['Key']}?sig={self.signed}&ct={Params.get('ResponseContentType')}"
+
+
+@pytest.fixture
+def fake_s3(monkeypatch):
+    built = []
+
+    def _client(*args, **kwargs):
+        client = _FakeS3()
+        built.append((kwargs, client))
+        return client
+
+    monkeypatch.setattr(storage.boto3, "client", _client)
+    monkeypatch.setattr(settings, "s3_bucket", "bucket")
+    monkeypatch.setattr(settings, "aws_access_key_id", "key")
+    monkeypatch.setattr(settings, "aws_secret_access_key", "secret")
+    monkeypatch.setattr(storage, "_client", None)
+    monkeypatch.setattr(storage, "_client_key", None)
+    storage.clear_presigned_url_cache()
+    yield built
+    storage.clear_presigned_url_cache()
+    storage._client = None
+    storage._client_key = None
+
+
+def test_client_is_built_once_with_pool(fake_s3):
+    assert storage.get_s3_client() is storage.get_s3_client()
+    assert len(fake_s3) == 1
+    kwargs = fake_s3[0][0]
+    assert kwargs["config"].max_pool_connections == settings.s3_max_pool_connections
+
+
+def test_client_is_rebuilt_when_credentials_change(fake_s3, monkeypatch):
+    first = storage.get_s3_client()
+    monkeypatch.setattr(settings, "aws_access_key_id", "rotated")
+    assert storage.get_s3_client() is not first
+    assert len(fake_s3) == 2
+
+
+def test_presigned_url_is_reused_per_key(fake_s3):
+    urls = [storage.presigned_get_url(f"k/{i % 10}") for i in range(100)]
+    assert len(set(urls)) == 10
+    assert fake_s3[0][1].signed == 10
+    assert len(fake_s3) == 1
+
+
+def test_response_params_are_part_of_the_cache_key(fake_s3):
+    plain = storage.presigned_get_url("a.webm")
+    typed = storage.presigned_get_url("a.webm", response_content_type="video/webm")
+    assert plain != typed
+
+
+def test_presigned_url_is_refreshed_shortly_before_expiry(fake_s3, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(storage.time, "monotonic", lambda: clock[0])
+    first = storage.presigned_get_url("k", expires_in=3600)
+
+    clock[0] += 3600 - storage._PRESIGN_REFRESH_MARGIN_SECONDS - 1
+    assert storage.presigned_get_url("k", expires_in=3600) == first
+
+    clock[0] += 2
+    assert storage.presigned_get_url("k", expires_in=3600) != first
+
+
+def test_invalidate_drops_all_variants(fake_s3):
+    first = storage.presigned_get_url("k")
+    storage.presigned_get_url("k", response_content_type="audio/mp4")
+    storage.invalidate_presigned_urls("k")
+    assert storage.presigned_get_url("k") != first
+    assert fake_s3[0][1].signed == 3
@@ -0,0 +1,81 @@
+"""Tests for the single-pass timeline aggregation."""
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+import app.db.base  # noqa: F401
+import app.db.chapter_stats  # noqa: F401 registers the stats listener
+from app.models.journey import Journey
+from app.models.media import MediaAsset
+from app.models.user import User
+from app.schemas.timeline import CHAPTER_TO_PHASE
+from app.services import timeline
+
+
+def _asset(asset_id, chapter_id, modality, duration, recorded_at, state="ready"):
+    return MediaAsset(
+        id=asset_id, journey_id="j1", chapter_id=chapter_id, modality=modality,
+        object_key=f"j1/{asset_id}", original_filename="opname", storage_state=state,
+        duration_seconds=duration, recorded_at=recorded_at,
+    )
+
+
+@pytest.fixture
+def db(db_factory):
+    session = db_factory()
+    session.add(User(id="u1", display_name="Riet", email="riet@example.com", country="NL"))
+    session.add(Journey(id="j1", user_id="u1", title="Mijn verhaal", progress={"youth-hero": 1.0}))
+    session.add_all([
+        _asset("a1", "youth-hero", "audio", 60, datetime(2026, 1, 1)),
+        _asset("a2", "youth-hero", "video", 30, datetime(2026, 3, 1)),
+        _asset("a3", "youth-hero", "text", 0, datetime(2026, 2, 1)),
+        _asset("a4", "youth-sounds", "audio", 45, datetime(2026, 4, 1)),
+        _asset("a5", "youth-sounds", "audio", 999, datetime(2026, 5, 1), state="pending"),
+    ])
+    session.commit()
+
+    statements: list[str] = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    try:
+        yield session, statements
+    finally:
+        session.close()
+
+
+def test_build_timeline_query_count_is_independent_of_catalogue(db):
+    session, statements = db
+    result = timeline.build_timeline(session, "j1")
+
+    # Journey, chapter preferences and one aggregate — not one query per chapter
+    assert len(statements) == 3
+    assert result.total_chapters == len(CHAPTER_TO_PHASE)
+    assert result.completed_chapters == 1
+
+
+def test_build_timeline_aggregates_per_chapter(db):
+    session, _ = db
+    result = timeline.build_timeline(session, "j1")
+    chapters = {c.id.value: c for phase in result.phases for c in phase.chapters}
+
+    hero = chapters["youth-hero"]
+    assert (hero.media_count, hero.duration_total_seconds) == (3, 90)
+    assert (hero.has_audio, hero.has_video, hero.has_text) == (True, True, True)
+    assert hero.last_recorded_at == datetime(2026, 3, 1)
+
+    sounds = chapters["youth-sounds"]
+    assert (sounds.media_count, sounds.duration_total_seconds) == (1, 45)
+    assert not sounds.has_video
+
+    assert chapters["love-symbol"].media_count == 0
+    assert result.total_media == 4
+    assert result.total_duration_seconds == 135
+    assert result.last_activity_at == datetime(2026, 4, 1)
+
+
+def test_chapter_media_stats_for_a_single_chapter(db):
+    session, _ = db
+    assert timeline.get_chapter_media_stats(session, "j1", "youth-sounds")["count"] == 1
+    assert timeline.get_chapter_media_stats(session, "j1", "love-symbol") == timeline._empty_stats()
@@ -0,0 +1,147 @@
+"""Tests for playback renditions and how serve_file picks one."""
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.services.media import transcode
+from app.services.media.presigner import build_playback_url
+
+IPHONE = "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 Version/17.0 Mobile Safari/604.1"
+CHROME = "Mozilla/5.0 (Linux; Android 14) AppleWebKit/537.36 Chrome/126.0 Mobile Safari/537.36"
+
+RENDITIONS = {
+    "aac": {"key": "j/c/a/derived/audio.m4a", "content_type": "audio/mp4", "size_bytes": 900, "full_quality": True},
+    "opus": {"key": "j/c/a/derived/audio.webm", "content_type": "audio/webm", "size_bytes": 500, "full_quality": True},
+    "preview": {"key": "j/c/a/derived/preview.m4a", "content_type": "audio/mp4", "size_bytes": 300, "full_quality": False},
+    "hls": {"key": "j/c/a/derived/hls/index.m3u8", "content_type": "application/vnd.apple.mpegurl",
+            "size_bytes": 700, "full_quality": False},
+}
+
+
+def test_one_ffmpeg_pass_writes_every_rendition(monkeypatch, tmp_path):
+    monkeypatch.setattr(transcode, "s3_configured", lambda: True)
+    monkeypatch.setattr(settings, "transcode_hls_min_seconds", 600)
+    renditions = transcode.plan_renditions("audio", 1800)
+    cmd = transcode.build_command("https://r2.example/src", renditions, tmp_path)
+
+    assert [r.name for r in renditions] == ["aac", "opus", "preview", "hls"]
+    assert cmd.count("-i") == 1
+    assert "asplit=4[a0][a1][a2][a3]" in cmd[cmd.index("-filter_complex") + 1]
+    assert f"{tmp_path}/hls/seg_%05d.ts" in cmd
+    assert cmd[-1] == str(tmp_path / "hls/index.m3u8")
+
+
+def test_hls_only_for_long_recordings_in_object_storage(monkeypatch):
+    monkeypatch.setattr(transcode, "s3_configured", lambda: True)
+    assert "hls" not in [r.name for r in transcode.plan_renditions("video", 120)]
+    monkeypatch.setattr(transcode, "s3_configured", lambda: False)
+    assert "hls" not in [r.name for r in transcode.plan_renditions("video", 7200)]
+
+
+def test_renditions_are_stored_next_to_the_untouched_original(monkeypatch, tmp_path):
+    monkeypatch.setattr(transcode, "s3_configured", lambda: False)
+    monkeypatch.setattr(transcode.local_storage, "base_path", tmp_path)
+    original = tmp_path / "j/c/a/opname.webm"
+    original.parent.mkdir(parents=True)
+    original.write_bytes(b"origineel")
+
+    def fake_ffmpeg(cmd, **kwargs):
+        assert cmd[cmd.index("-i") + 1] == str(original)
+        for i, arg in enumerate(cmd):
+            if arg.endswith((".m4a", ".webm")) and cmd[i - 1] not in ("-i",):
+                Path(arg).write_bytes(b"x" * (i + 1))
+        return subprocess.CompletedProcess(cmd, 0)
+
+    monkeypatch.setattr(transcode.subprocess, "run", fake_ffmpeg)
+    result = transcode.create_renditions("j/c/a/opname.webm", "audio", 90)
+
+    assert original.read_bytes() == b"origineel"
+    assert set(result) == {"aac", "opus", "preview"}
+    for info in result.values():
+        assert (tmp_path / info["key"]).stat().st_size == info["size_bytes"]
+    assert result["aac"]["key"] == "j/c/a/derived/audio.m4a"
+
+    transcode.remove_renditions(result)
+    assert not (tmp_path / "j/c/a/derived/audio.m4a").exists()
+    assert original.exists()
+
+
+@pytest.mark.parametrize("user_agent, save_data, hls, expected", [
+    (CHROME, False, False, "opus"),
+    (IPHONE, False, False, "aac"),
+    (IPHONE, True, False, "preview"),
+    (IPHONE, False, True, "hls"),
+])
+def test_pick_smallest_playable_rendition(user_agent, save_data, hls, expected):
+    name, key, _ = transcode.pick_rendition(
+        "j/c/a/opname.wav", 50_000, RENDITIONS, user_agent=user_agent, save_data=save_data, accept_hls=hls,
+    )
+    assert name == expected
+    assert key == RENDITIONS[expected]["key"]
+
+
+def test_original_is_served_when_it_is_smaller_or_nothing_was_made():
+    assert transcode.pick_rendition("j/c/a/opname.m4a", 100, RENDITIONS, user_agent=IPHONE)[0] == "original"
+    assert transcode.pick_rendition("j/c/a/opname.m4a", 100, None) == ("original", "j/c/a/opname.m4a", None)
+
+
+def test_playlist_segments_are_presigned(monkeypatch):
+    class _Body:
+        def read(self):
+            return b"#EXTM3U\n#EXTINF:6.0,\nseg_00000.ts\n#EXT-X-ENDLIST\n"
+
+    class _Client:
+        def get_object(self, Bucket, Key):
+            return {"Body": _Body()}
+
+    monkeypatch.setattr(transcode, "get_s3_client", lambda: _Client())
+    monkeypatch.setattr(transcode, "presigned_get_url", lambda key, **kwargs: f"https://r2.example/{key}?sig=1")
+
+    playlist = transcode.signed_playlist("j/c/a/derived/hls/index.m3u8")
+    assert "https://r2.example/j/c/a/derived/hls/seg_00000.ts?sig=1" in playlist.splitlines()
+    assert playlist.startswith("#EXTM3U\n")
+
+
+def test_removing_long_hls_renditions_pages_and_batches_deletes(monkeypatch):
+    keys = [f"j/c/a/derived/hls/seg_{n:05d}.ts" for n in range(2500)]
+
+    class _Paginator:
+        def paginate(self, Bucket, Prefix):
+            matching = [key for key in keys if key.startswith(Prefix)]
+            for start in range(0, len(matching), 1000):
+                yield {"Contents": [{"Key": key} for key in matching[start:start + 1000]]}
+
+    class _Client:
+        deleted: list[list[str]] = []
+
+        def get_paginator(self, name):
+            assert name == "list_objects_v2"
+            return _Paginator()
+
+        def delete_objects(self, Bucket, Delete):
+            self.deleted.append([obj["Key"] for obj in Delete["Objects"]])
+
+    monkeypatch.setattr(transcode, "s3_configured", lambda: True)
+    monkeypatch.setattr(transcode, "get_s3_client", lambda: _Client())
+
+    transcode.remove_renditions({"hls": RENDITIONS["hls"]})
+
+    assert [len(batch) for batch in _Client.deleted] == [1000, 1000, 500]
+    assert sum(_Client.deleted, []) == keys
+
+
+def test_playback_urls_are_not_upload_capabilities():
+    from urllib.parse import parse_qs, urlparse
+
+    from app.services.media.presigner import verify_playback_signature, verify_upload_signature
+
+    key = "j/c/a/derived/hls/index.m3u8"
+    query = parse_qs(urlparse(build_playback_url(key)).query)
+    exp, sig = int(query["exp"][0]), query["sig"][0]
+    assert verify_playback_signature(key, exp, sig)
+    assert not verify_upload_signature(key, exp, sig)
+    assert not verify_playback_signature("j/c/b/derived/hls/index.m3u8", exp, sig)
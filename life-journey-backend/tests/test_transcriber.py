@@ -0,0 +1,104 @@
+"""Tests for chunked, timestamped transcription."""
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.services.ai import transcriber
+from app.services.media.alignment import TranscriptAlignment
+
+
+def test_plan_chunks_cuts_at_the_latest_pause_before_each_target():
+    silences = [(100.0, 102.0), (500.0, 504.0), (560.0, 562.0), (1300.0, 1301.0)]
+    chunks = transcriber.plan_chunks(1500.0, silences, chunk_seconds=600)
+
+    # Pause around 561s is the latest before the 600s target; none near 1161s, so a hard cut
+    assert chunks == [(0.0, 561.0), (561.0, 1161.0), (1161.0, 1500.0)]
+
+
+def test_plan_chunks_keeps_short_recordings_whole():
+    assert transcriber.plan_chunks(300.0, [(10.0, 11.0)], chunk_seconds=600) == [(0.0, 300.0)]
+
+
+def test_split_into_segments_spreads_over_known_duration():
+    segments = transcriber.split_into_segments("een twee drie vier", 2, offset_ms=10_000, duration_ms=4_000)
+    assert segments == [
+        {"text": "een twee", "start_ms": 10_000, "end_ms": 12_000},
+        {"text": "drie vier", "start_ms": 12_000, "end_ms": 14_000},
+    ]
+    assert transcriber.split_into_segments("   ") == []
+
+
+def _fake_client(responses):
+    def create(**kwargs):
+        return responses(kwargs)
+    audio = SimpleNamespace(transcriptions=SimpleNamespace(create=create))
+    return SimpleNamespace(audio=audio)
+
+
+def test_chunk_timestamps_are_shifted_by_offset(monkeypatch, tmp_path):
+    chunk = tmp_path / "chunk.mp3"
+    chunk.write_bytes(b"audio")
+    response = SimpleNamespace(
+        text="Hallo daar. Welkom.",
+        segments=[
+            SimpleNamespace(start=0.0, end=1.5, text=" Hallo daar."),
+            SimpleNamespace(start=1.5, end=2.0, text=" "),
+            SimpleNamespace(start=2.0, end=3.25, text=" Welkom."),
+        ],
+    )
+    seen = {}
+    monkeypatch.setattr(
+        transcriber, "_whisper_client",
+        lambda: _fake_client(lambda kwargs: seen.update(kwargs) or response),
+    )
+
+    segments = transcriber._transcribe_chunk(chunk, "chunk.mp3", 600_000, 3_250)
+
+    assert seen["response_format"] == "verbose_json"
+    assert segments == [
+        {"text": "Hallo daar.", "start_ms": 600_000, "end_ms": 601_500},
+        {"text": "Welkom.", "start_ms": 602_000, "end_ms": 603_250},
+    ]
+
+
+def test_long_recordings_are_transcribed_concurrently_in_order(monkeypatch, tmp_path):
+    source = tmp_path / "lang.webm"
+    source.write_bytes(b"audio")
+    monkeypatch.setattr(transcriber.settings, "transcription_chunk_seconds", 600)
+    monkeypatch.setattr(transcriber.settings, "transcription_max_concurrency", 3)
+    monkeypatch.setattr(transcriber.shutil, "which", lambda name: f"/usr/bin/{name}")
+    monkeypatch.setattr(transcriber, "probe_duration_seconds", lambda path: 1800.0)
+    monkeypatch.setattr(transcriber, "detect_silences", lambda path: [])
+    monkeypatch.setattr(transcriber, "_extract_chunk", lambda src, start, end, target: target.write_bytes(b"x"))
+
+    active = []
+    peak = [0]
+    lock = threading.Lock()
+
+    def fake_chunk(path: Path, filename, offset_ms, duration_ms):
+        with lock:
+            active.append(path)
+            peak[0] = max(peak[0], len(active))
+        time.sleep(0.1)
+        with lock:
+            active.remove(path)
+        return [{"text": f"deel {offset_ms // 600_000}", "start_ms": offset_ms, "end_ms": offset_ms + duration_ms}]
+
+    monkeypatch.setattr(transcriber, "_transcribe_chunk", fake_chunk)
+    segments = transcriber.transcribe_with_timestamps(source, "lang.webm")
+
+    assert [s["text"] for s in segments] == ["deel 0", "deel 1", "deel 2"]
+    assert [s["start_ms"] for s in segments] == [0, 600_000, 1_200_000]
+    assert peak[0] == 3
+
+
+def test_highlight_position_uses_segment_timestamps():
+    segments = [
+        {"text": "Ik groeide op in Leiden.", "start_ms": 0, "end_ms": 4_000},
+        {"text": "Mijn moeder zong altijd in de keuken.", "start_ms": 61_000, "end_ms": 66_000},
+    ]
+    start_ms, end_ms = TranscriptAlignment(segments).locate("moeder zong altijd")
+    assert 61_000 < start_ms < end_ms < 66_000
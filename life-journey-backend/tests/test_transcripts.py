@@ -0,0 +1,104 @@
+"""Tests for the shared transcript repository."""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import undefer
+
+import app.db.base  # noqa: F401
+from app.models.journey import Journey
+from app.models.media import MediaAsset, TranscriptSegment
+from app.models.user import User
+from app.services.media import transcripts
+
+
+@pytest.fixture
+def db(db_factory):
+    session = db_factory()
+    session.add(User(id="u1", display_name="Riet", email="riet@example.com", country="NL"))
+    session.add(Journey(id="j1", user_id="u1", title="Mijn verhaal"))
+    for i in range(60):
+        session.add(MediaAsset(
+            id=f"a{i}", journey_id="j1", chapter_id="roots-mother", modality="audio",
+            object_key=f"j1/a{i}.webm", original_filename="opname.webm", storage_state="ready",
+        ))
+        # Inserted out of order on purpose
+        session.add(TranscriptSegment(id=f"a{i}-s1", media_asset_id=f"a{i}", start_ms=1000, end_ms=2000, text="wereld"))
+        session.add(TranscriptSegment(id=f"a{i}-s0", media_asset_id=f"a{i}", start_ms=0, end_ms=1000, text=f"hallo {i}"))
+    session.commit()
+
+    statements: list[str] = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    try:
+        yield session, statements
+    finally:
+        session.close()
+
+
+def test_segment_fallback_is_one_batched_query(db):
+    session, statements = db
+    assets = session.query(MediaAsset).options(undefer(MediaAsset.full_transcript)).all()
+    statements.clear()
+
+    texts = transcripts.texts_for_assets(session, assets)
+
+    # None of the recordings is materialised: one segment query for all 60
+    assert len(statements) == 1
+    assert len(texts) == 60
+    assert texts["a7"] == "hallo 7 wereld"
+
+
+def test_deferred_transcripts_are_loaded_together(db):
+    session, statements = db
+    assets = session.query(MediaAsset).all()
+    assert "full_transcript" not in assets[0].__dict__  # listings don't load the text
+    statements.clear()
+
+    assert len(transcripts.texts_for_assets(session, assets)) == 60
+    # One column fetch for all deferred rows, then the segment fallback
+    assert len(statements) == 2
+
+
+def test_materialised_transcript_needs_no_segment_query(db):
+    session, statements = db
+    assets = session.query(MediaAsset).filter(MediaAsset.id.in_(["a1", "a2"])).order_by(MediaAsset.id).all()
+    transcripts.materialize_transcript(assets[0], ["hallo", "daar  "], language="nl")
+    session.commit()
+    statements.clear()
+
+    texts = transcripts.texts_for_assets(session, assets)
+
+    assert texts == {"a1": "hallo daar", "a2": "hallo 2 wereld"}
+    assert assets[0].transcript_word_count == 2
+    assert assets[0].transcript_language == "nl"
+    assert assets[0].transcript_version == 1
+    # Only a2 still needed its segments
+    segment_queries = [s for s in statements if "transcriptsegment" in s.lower()]
+    assert len(segment_queries) == 1
+
+
+def test_transcript_endpoint_serves_the_materialised_text(db):
+    from starlette.testclient import TestClient
+
+    from app.api.deps import get_current_user
+    from app.db.session import get_db
+    from app.main import app
+
+    session, statements = db
+    asset = session.get(MediaAsset, "a1")
+    transcripts.materialize_transcript(asset, ["hallo", "daar"], language="nl")
+    session.commit()
+
+    app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[get_current_user] = lambda: session.get(User, "u1")
+    try:
+        with TestClient(app) as client:
+            statements.clear()
+            materialised = client.get("/api/v1/media/a1/transcript").json()
+            assert not [s for s in statements if "transcriptsegment" in s.lower()]
+            legacy = client.get("/api/v1/media/a2/transcript").json()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert materialised == {"ready": True, "text": "hallo daar", "word_count": 2}
+    assert legacy == {"ready": True, "text": "hallo 2 wereld", "word_count": 3}
@@ -0,0 +1,217 @@
+"""Tests for the streaming USB package builder and its pre-built artifacts."""
+from __future__ import annotations
+
+import io
+import threading
+import time
+import zipfile
+
+from app.services.export import usb_package
+from app.services.export.usb_package import (
+    UsbPackageInputs,
+    _AudioItem,
+    _IterReader,
+    iter_usb_package,
+)
+from app.services.export.zip_stream import ZipStream
+
+
+class _FakeS3:
+    """Serves deterministic payloads and records peak download concurrency."""
+
+    def __init__(self, payloads: dict[str, bytes]):
+        self.payloads = payloads
+        self._lock = threading.Lock()
+        self._active = 0
+        self.peak = 0
+
+    def download_fileobj(self, bucket, key, fileobj):
+        with self._lock:
+            self._active += 1
+            self.peak = max(self.peak, self._active)
+        try:
+            time.sleep(0.01)
+            fileobj.write(self.payloads[key])
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+def _inputs(items) -> UsbPackageInputs:
+    return UsbPackageInputs(
+        order_id="order-1",
+        naam="Oma Test",
+        safe_naam="Oma Test",
+        customer_email="oma@example.com",
+        pdf_entry=("01_Mijn_Levensboek_PDF/Oma Test_Levensboek.pdf", b"%PDF-1.7 test"),
+        audio_items=items,
+    )
+
+
+def _build(items, s3, on_progress=None) -> zipfile.ZipFile:
+    chunks = list(iter_usb_package(_inputs(items), s3, on_progress))
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def test_zip_stream_roundtrip_stores_audio_and_deflates_text():
+    zs = ZipStream()
+    zs.writestr("tekst.txt", "hallo " * 100)
+    out = b"".join(zs.drain())
+    payload = bytes(range(256)) * 4096
+    out += b"".join(zs.write_fileobj("audio/01.mp3", io.BytesIO(payload), len(payload)))
+    out += b"".join(zs.close())
+
+    zf = zipfile.ZipFile(io.BytesIO(out))
+    assert zf.testzip() is None
+    assert zf.getinfo("audio/01.mp3").compress_type == zipfile.ZIP_STORED
+    assert zf.getinfo("tekst.txt").compress_type == zipfile.ZIP_DEFLATED
+    assert zf.read("audio/01.mp3") == payload
+
+
+def test_usb_package_streams_audio_in_recorded_order(monkeypatch):
+    monkeypatch.setattr(usb_package.settings, "s3_bucket", "bucket")
+    items = [
+        _AudioItem(f"a{i}", f"media/a{i}.mp3", "roots-father" if i % 2 else "love-lessons", "opname.mp3")
+        for i in range(10)
+    ]
+    s3 = _FakeS3({it.object_key: f"audio-{it.asset_id}".encode() * 1000 for it in items})
+
+    zf = _build(items, s3)
+
+    assert zf.testzip() is None
+    names = zf.namelist()
+    audio = [n for n in names if n.startswith("02_Gesproken_Herinneringen/") and n.endswith(".mp3")]
+    assert len(audio) == 10
+    assert audio[1].startswith("02_Gesproken_Herinneringen/Fase_1_Vroege_Jeugd/01_")
+    assert zf.read(audio[0]) == b"audio-a0" * 1000
+    assert "02_Gesproken_Herinneringen/Fase_3_Later_Leven/.keep" in names
+    assert "01_Mijn_Levensboek_PDF/Oma Test_Levensboek.pdf" in names
+    assert s3.peak <= usb_package._DOWNLOAD_WINDOW
+
+
+def test_usb_package_skips_failed_downloads(monkeypatch):
+    monkeypatch.setattr(usb_package.settings, "s3_bucket", "bucket")
+    items = [_AudioItem("a1", "media/a1.mp3", "roots-father", "opname.mp3"),
+             _AudioItem("a2", "media/missing.mp3", "roots-father", "opname.mp3")]
+    s3 = _FakeS3({"media/a1.mp3": b"x" * 10})
+
+    zf = _build(items, s3)
+
+    audio = [n for n in zf.namelist() if n.endswith(".mp3")]
+    assert len(audio) == 1
+    dashboard = zf.read("04_Start_Hier_Offline/index.html").decode()
+    assert audio[0].rsplit("/", 1)[-1] in dashboard
+
+
+def test_usb_package_reports_progress_per_track(monkeypatch):
+    monkeypatch.setattr(usb_package.settings, "s3_bucket", "bucket")
+    items = [_AudioItem(f"a{i}", f"media/a{i}.mp3", "roots-father", "opname.mp3") for i in range(3)]
+    s3 = _FakeS3({it.object_key: b"x" * 10 for it in items})
+    progress: list[tuple[int, int]] = []
+
+    _build(items, s3, on_progress=lambda done, total: progress.append((done, total)))
+
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_iter_reader_fills_fixed_size_parts():
+    # upload_fileobj needs full-size multipart parts from a non-seekable stream
+    reader = io.BufferedReader(_IterReader(iter([b"ab", b"", b"cde", b"f" * 10])))
+    assert reader.read(4) == b"abcd"
+    assert reader.read(100) == b"e" + b"f" * 10
+    assert reader.read(1) == b""
+
+
+def test_usb_queue_lists_every_paid_physical_package(db_factory):
+    from datetime import datetime, timedelta
+    from uuid import uuid4
+
+    from starlette.testclient import TestClient
+
+    from app.api.deps import get_current_admin_user
+    from app.db.session import get_db
+    from app.main import app
+    from app.models.order import Order
+    from app.models.user import User
+
+    with db_factory() as db:
+        for offset, package in enumerate(["NALATENSCHAP", "ERFGOED", "VERHAAL", "BABY_GIFT"]):
+            db.add(Order(
+                id=f"order-{package.lower()}", package_type=package, price_paid=10000, status="PAID",
+                recipient_name="Oma", paid_at=datetime(2026, 10, 1) + timedelta(hours=offset),
+            ))
+        db.commit()
+
+    def _override_get_db():
+        with db_factory() as session:
+            yield session
+
+    admin = User(id=str(uuid4()), display_name="Beheer", email="beheer@example.com", country="NL", is_admin=True)
+    app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_current_admin_user] = lambda: admin
+    try:
+        with TestClient(app) as client:
+            response = client.get("/api/v1/admin/usb/queue")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert [item["package_type"] for item in response.json()] == ["NALATENSCHAP", "ERFGOED"]
+
+
+def test_stale_builds_are_requeued_by_the_sweep(db_factory, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    from app.models.order import Order
+    from app.services.export import tasks as usb_tasks
+
+    now = datetime.now(timezone.utc)
+    with db_factory() as db:
+        db.add_all([
+            Order(id="vers", package_type="ERFGOED", price_paid=14900, status="PAID",
+                  usb_package_status="building", usb_package_started_at=now - timedelta(minutes=10)),
+            Order(id="verweesd", package_type="NALATENSCHAP", price_paid=22900, status="PAID",
+                  usb_package_status="building", usb_package_started_at=now - timedelta(hours=3)),
+            Order(id="zonder-tijd", package_type="ERFGOED", price_paid=14900, status="PAID",
+                  usb_package_status="queued"),
+        ])
+        db.commit()
+        assert usb_package.build_in_flight(db.get(Order, "vers"))
+        assert not usb_package.build_in_flight(db.get(Order, "verweesd"))
+
+    scheduled: list[str] = []
+    monkeypatch.setattr(usb_tasks, "SessionLocal", db_factory)
+    monkeypatch.setattr(usb_tasks, "s3_configured", lambda: True)
+    monkeypatch.setattr(usb_tasks.build_usb_package, "apply_async", lambda args, queue: scheduled.append(args[0]))
+
+    assert usb_tasks.prebuild_usb_queue() == 2
+    assert sorted(scheduled) == ["verweesd", "zonder-tijd"]
+    with db_factory() as db:
+        requeued = db.get(Order, "verweesd")
+        assert requeued.usb_package_status == "queued"
+        assert usb_package.build_in_flight(requeued)
+
+
+def test_retranscription_changes_the_package_fingerprint(db_factory):
+    from app.models.journey import Journey
+    from app.models.media import MediaAsset
+    from app.models.order import Order
+    from app.models.user import User
+    from app.services.media.transcripts import materialize_transcript
+
+    with db_factory() as db:
+        db.add_all([
+            User(id="u1", display_name="Riet", email="riet@example.com", country="NL"),
+            Journey(id="j1", user_id="u1", title="Mijn verhaal"),
+            MediaAsset(id="a1", journey_id="j1", chapter_id="roots-mother", modality="audio",
+                       object_key="j1/a1.webm", original_filename="opname.webm", storage_state="ready"),
+            Order(id="order-1", user_id="u1", package_type="ERFGOED", price_paid=14900, status="PAID"),
+        ])
+        db.commit()
+        order = db.get(Order, "order-1")
+        before = usb_package.package_fingerprint(db, order)
+
+        # Same segment count, new text: only the transcript version moves
+        materialize_transcript(db.get(MediaAsset, "a1"), ["Mijn moeder zong"], language="nl")
+        db.commit()
+        assert usb_package.package_fingerprint(db, order) != before
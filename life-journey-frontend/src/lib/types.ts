@@ -139,6 +139,7 @@ export interface Highlight {
   endMs: number;
   label: "laugh" | "insight" | "love" | "wisdom";
   createdBy: "ai" | "user";
+  text?: string | null;
 }
 
 export interface ShareGrant {
@@ -356,6 +356,20 @@ def print_verify_report(drive_path: str, naam: str) -> None:
 
 # ─── API CLIENT ───────────────────────────────────────────────────────────────
 
+def _package_label(order: dict) -> str:
+    """Bouwstatus van het vooraf gebouwde pakket (klaar = directe download)."""
+    status = order.get("package_status")
+    if status == "ready":
+        return "klaar"
+    if status == "building":
+        return f"bouwen {order.get('package_progress') or 0}%"
+    if status == "queued":
+        return "gepland"
+    if status == "failed":
+        return "mislukt"
+    return "live"
+
+
 class UsbApiClient:
     """Communiceert met de Bewaardvoorjou-backend."""
 
@@ -473,15 +487,15 @@ def run_branden_modus() -> None:
 
     # Tabel met bestellingen
     print()
-    header = f"  {_BOLD}{'#':<4} {'Naam':<26} {'Pakket':<12} {'Tracks':<7} {'Betaald op'}{_R}"
+    header = f"  {_BOLD}{'#':<4} {'Naam':<26} {'Pakket':<12} {'Tracks':<7} {'Betaald op':<12} {'ZIP'}{_R}"
     print(header)
-    print(f"  {'─' * 64}")
+    print(f"  {'─' * 76}")
     for i, o in enumerate(queue, 1):
         naam    = (o.get("customer_name") or "—")[:25]
         pakket  = o.get("package_type", "?")
         tracks  = o.get("audio_tracks", 0)
         betaald = (o.get("paid_at") or "")[:10]
-        print(f"  {_BOLD}{i:<4}{_R} {naam:<26} {pakket:<12} {tracks:<7} {betaald}")
+        print(f"  {_BOLD}{i:<4}{_R} {naam:<26} {pakket:<12} {tracks:<7} {betaald:<12} {_package_label(o)}")
 
     print()
     while True: